@@ -4,6 +4,7 @@ import logging
 from dataclasses import dataclass
 from typing import Any
 
+from app.domain.ai_response import DraftingOutput
 from app.integrations.bedrock import BedrockInvocationError, invoke_json
 
 logger = logging.getLogger("saihai.drafting")
@@ -28,7 +29,7 @@ def generate_drafts(context: dict[str, Any]) -> DraftingResult:
         f"[Context]\n{context}"
     )
     try:
-        payload = invoke_json(prompt, system_prompt=system_prompt, retries=1)
+        payload = invoke_json(prompt, system_prompt=system_prompt, retries=1, schema=DraftingOutput)
     except BedrockInvocationError:
         logger.exception("drafting Bedrock invocation failed")
         raise
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import json
 import logging
 from dataclasses import dataclass
 from typing import Any
 
-from app.integrations.bedrock import BedrockInvocationError, invoke_json
+from app.domain.ai_response import StrategyProposal
+from app.integrations.bedrock import BedrockError, BedrockInvocationError, invoke_json
 
 logger = logging.getLogger("saihai.gunshi")
 
@@ -29,7 +31,7 @@ def generate_plans(context: dict[str, Any]) -> list[GunshiPlan]:
         f"[Context]\n{context}"
     )
     try:
-        payload = invoke_json(prompt, system_prompt=system_prompt, retries=1)
+        payload = invoke_json(prompt, system_prompt=system_prompt, retries=1, schema=StrategyProposal)
     except BedrockInvocationError:
         logger.exception("gunshi Bedrock invocation failed")
         raise
@@ -37,6 +39,78 @@ def generate_plans(context: dict[str, Any]) -> list[GunshiPlan]:
     if not isinstance(payload, dict):
         raise BedrockInvocationError("gunshi returned non-object JSON")
 
+    plans = _to_gunshi_plans(payload)
+    if not plans:
+        plans = [
+            GunshiPlan(
+                plan_type="Plan_A",
+                description="Maintain current staffing and monitor risk weekly.",
+                predicted_future_impact="Short-term stability, limited mitigation.",
+                is_recommended=True,
+            ),
+            GunshiPlan(
+                plan_type="Plan_B",
+                description="Adjust workload and introduce support coverage.",
+                predicted_future_impact="Risk reduction with moderate disruption.",
+                is_recommended=False,
+            ),
+        ]
+
+    return plans
+
+
+def generate_plans_batch(contexts: dict[str, dict[str, Any]]) -> dict[str, list[GunshiPlan]]:
+    """Propose plans for several projects in one prompt.
+
+    Projects whose entry is missing or has no plans are left out so callers can fall back to
+    :func:`generate_plans` for them.
+    """
+    if not contexts:
+        return {}
+    system_prompt = (
+        "You are a senior strategist. Handle every project independently. Return only JSON with key "
+        "projects: an array with one object per input project, each with keys project_id (string, copied "
+        "from the input), recommended_plan and plans. plans is an array of objects with "
+        "plan_type (Plan_A/Plan_B/Plan_C), description, predicted_future_impact."
+    )
+    projects = [{"project_id": project_id, "context": context} for project_id, context in contexts.items()]
+    prompt = (
+        "Use each project's context to propose two or three plans for that project. "
+        "Return JSON only.\n\n"
+        f"[Projects]\n{json.dumps(projects, ensure_ascii=False, default=str)}"
+    )
+    try:
+        payload = invoke_json(
+            prompt,
+            system_prompt=system_prompt,
+            max_tokens=min(16384, 512 + 768 * len(projects)),
+            retries=1,
+        )
+    except BedrockError:
+        logger.exception("gunshi batch Bedrock invocation failed projects=%s", len(projects))
+        return {}
+
+    entries = payload.get("projects") if isinstance(payload, dict) else payload
+    if not isinstance(entries, list):
+        logger.warning("gunshi batch returned no projects array projects=%s", len(projects))
+        return {}
+
+    results: dict[str, list[GunshiPlan]] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        project_id = str(entry.get("project_id") or "").strip()
+        if project_id not in contexts or project_id in results:
+            continue
+        plans = _to_gunshi_plans(entry)
+        if plans:
+            results[project_id] = plans
+    if len(results) < len(contexts):
+        logger.warning("gunshi batch incomplete requested=%s returned=%s", len(contexts), len(results))
+    return results
+
+
+def _to_gunshi_plans(payload: dict[str, Any]) -> list[GunshiPlan]:
     recommended = str(payload.get("recommended_plan") or "Plan_A")
     raw_plans = payload.get("plans")
     if not isinstance(raw_plans, list):
@@ -61,21 +135,4 @@ def generate_plans(context: dict[str, Any]) -> list[GunshiPlan]:
                 is_recommended=plan_type == recommended,
             )
         )
-
-    if not plans:
-        plans = [
-            GunshiPlan(
-                plan_type="Plan_A",
-                description="Maintain current staffing and monitor risk weekly.",
-                predicted_future_impact="Short-term stability, limited mitigation.",
-                is_recommended=True,
-            ),
-            GunshiPlan(
-                plan_type="Plan_B",
-                description="Adjust workload and introduce support coverage.",
-                predicted_future_impact="Risk reduction with moderate disruption.",
-                is_recommended=False,
-            ),
-        ]
-
     return plans
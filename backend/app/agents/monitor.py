@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import json
 import logging
 from dataclasses import dataclass
 from typing import Any
 
-from app.integrations.bedrock import BedrockInvocationError, invoke_json
+from app.domain.ai_response import MonitorAssessment
+from app.integrations.bedrock import BedrockError, BedrockInvocationError, invoke_json
 
 logger = logging.getLogger("saihai.monitor")
 
@@ -28,7 +30,7 @@ def analyze_risk(text_bundle: str) -> MonitorResult:
         f"[Input]\n{text_bundle}"
     )
     try:
-        payload = invoke_json(prompt, system_prompt=system_prompt, retries=1)
+        payload = invoke_json(prompt, system_prompt=system_prompt, retries=1, schema=MonitorAssessment)
     except BedrockInvocationError:
         logger.exception("monitor Bedrock invocation failed")
         raise
@@ -36,6 +38,62 @@ def analyze_risk(text_bundle: str) -> MonitorResult:
     if not isinstance(payload, dict):
         raise BedrockInvocationError("monitor returned non-object JSON")
 
+    return _to_monitor_result(payload)
+
+
+def analyze_risk_batch(text_bundles: dict[str, str]) -> dict[str, MonitorResult]:
+    """Analyze several projects in one prompt.
+
+    Only entries that come back keyed by a requested project id are returned; callers should fall
+    back to :func:`analyze_risk` for anything missing.
+    """
+    if not text_bundles:
+        return {}
+    system_prompt = (
+        "You are a HR risk analyst. Assess every project independently. Return only JSON with key "
+        "projects: an array with one object per input project, each with keys project_id (string, copied "
+        "from the input), risk_level (0-100), reason (string), urgency (High|Med|Low)."
+    )
+    projects = [{"project_id": project_id, "input": bundle} for project_id, bundle in text_bundles.items()]
+    prompt = (
+        "Analyze the weekly reports and Slack logs of each project below. "
+        "Return JSON only.\n\n"
+        f"[Projects]\n{json.dumps(projects, ensure_ascii=False)}"
+    )
+    try:
+        payload = invoke_json(
+            prompt,
+            system_prompt=system_prompt,
+            max_tokens=min(8192, 256 + 320 * len(projects)),
+            retries=1,
+        )
+    except BedrockError:
+        logger.exception("monitor batch Bedrock invocation failed projects=%s", len(projects))
+        return {}
+
+    entries = payload.get("projects") if isinstance(payload, dict) else payload
+    if not isinstance(entries, list):
+        logger.warning("monitor batch returned no projects array projects=%s", len(projects))
+        return {}
+
+    results: dict[str, MonitorResult] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        project_id = str(entry.get("project_id") or "").strip()
+        if project_id not in text_bundles or project_id in results:
+            continue
+        if entry.get("risk_level") is None:
+            continue
+        results[project_id] = _to_monitor_result(entry)
+    if len(results) < len(text_bundles):
+        logger.warning(
+            "monitor batch incomplete requested=%s returned=%s", len(text_bundles), len(results)
+        )
+    return results
+
+
+def _to_monitor_result(payload: dict[str, Any]) -> MonitorResult:
     risk_level = payload.get("risk_level")
     try:
         risk_value = int(float(risk_level))
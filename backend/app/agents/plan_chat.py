@@ -5,6 +5,7 @@ import logging
 from dataclasses import dataclass
 from typing import Any
 
+from app.domain.ai_response import PlanChatOutput
 from app.integrations.bedrock import BedrockInvocationError, invoke_json
 
 logger = logging.getLogger("saihai.plan_chat")
@@ -80,7 +81,14 @@ def update_plan_via_chat(
     )
 
     try:
-        payload = invoke_json(prompt, system_prompt=system_prompt, max_tokens=1200, temperature=0.2, retries=1)
+        payload = invoke_json(
+            prompt,
+            system_prompt=system_prompt,
+            max_tokens=1200,
+            temperature=0.2,
+            retries=1,
+            schema=PlanChatOutput,
+        )
     except BedrockInvocationError:
         logger.exception("plan chat Bedrock invocation failed plan_type=%s", plan_type)
         raise
@@ -3,11 +3,13 @@ from __future__ import annotations
 import json
 import logging
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from typing import Any
 
-from app.integrations.bedrock import BedrockInvocationError, invoke_json
+from app.domain.ai_response import AgentOpinion, GunshiSynthesis
+from app.integrations.bedrock import BedrockError, BedrockInvocationError, invoke_json
 
 logger = logging.getLogger("saihai.simulator_planner")
 
@@ -131,6 +133,37 @@ _LOG_BEDROCK_CONTEXT_FULL = os.getenv("LOG_BEDROCK_CONTEXT_FULL", "").lower() in
 _LOG_BEDROCK_CONTEXT_MAX_CHARS = max(0, int(os.getenv("LOG_BEDROCK_CONTEXT_MAX_CHARS", "8000") or "8000"))
 _LOG_BEDROCK_CONTEXT_NOTES_MAX_CHARS = max(0, int(os.getenv("LOG_BEDROCK_CONTEXT_NOTES_MAX_CHARS", "200") or "200"))
 
+PIPELINE_MODE_ALL = "all"
+PIPELINE_MODE_QUORUM = "quorum"
+STRAGGLER_POLICY_MISSING = "missing"
+STRAGGLER_POLICY_REFINE = "refine"
+
+_AGENT_NAMES = ("PM", "HR", "Risk")
+
+
+def _env_int(name: str, default: int = 0) -> int:
+    """Non-negative integer from the environment; ``default`` when unset or invalid."""
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        logger.warning("invalid %s=%r; using %s", name, raw, default)
+        return default
+
+
+_PLAN_PIPELINE_MODE = os.getenv("PLAN_PIPELINE_MODE", PIPELINE_MODE_ALL).strip().lower() or PIPELINE_MODE_ALL
+_PLAN_AGENT_QUORUM = max(1, min(len(_AGENT_NAMES), _env_int("PLAN_AGENT_QUORUM", 2)))
+_PLAN_AGENT_DEADLINE_MS = _env_int("PLAN_AGENT_DEADLINE_MS")
+_PLAN_STRAGGLER_POLICY = (
+    os.getenv("PLAN_STRAGGLER_POLICY", STRAGGLER_POLICY_MISSING).strip().lower() or STRAGGLER_POLICY_MISSING
+)
+_PLAN_AGENT_TIMEOUT_MS = {
+    name: _env_int(f"PLAN_AGENT_TIMEOUT_MS_{name.upper()}", _env_int("PLAN_AGENT_TIMEOUT_MS"))
+    for name in _AGENT_NAMES
+}
+
 
 def _truncate(text: str, max_chars: int) -> str:
     if max_chars <= 0:
@@ -316,9 +349,16 @@ class SimulationPlansResult:
     raw: dict[str, Any]
 
 
+@dataclass(frozen=True)
+class _AgentRound:
+    payloads: dict[str, dict[str, Any]]
+    status: dict[str, str]
+    elapsed_ms: dict[str, float]
+    pending: dict[Future, str]
+
+
 def _invoke_agent(agent_name: str, prompt: str, max_tokens: int) -> tuple[str, dict[str, Any]]:
     """エージェントを呼び出すヘルパー関数（並列実行用）"""
-    import time
     start_time = time.perf_counter()
     logger.info("Bedrock prompt[%s]=%s", agent_name, prompt)
     payload = invoke_json(
@@ -326,6 +366,7 @@ def _invoke_agent(agent_name: str, prompt: str, max_tokens: int) -> tuple[str, d
         max_tokens=max_tokens,
         temperature=_AGENT_TEMPERATURE,
         retries=1,
+        schema=AgentOpinion,
     )
     elapsed_ms = (time.perf_counter() - start_time) * 1000
     logger.info("Agent %s completed in %.1fms", agent_name, elapsed_ms)
@@ -334,86 +375,212 @@ def _invoke_agent(agent_name: str, prompt: str, max_tokens: int) -> tuple[str, d
     return agent_name, payload
 
 
+def _collect_agents(futures: dict[Future, str], mode: str, started_at: float) -> _AgentRound:
+    """Wait for agent futures until the pipeline gate opens.
+
+    In ``all`` mode the gate opens once every agent has returned or timed out; in ``quorum`` mode it
+    opens as soon as ``PLAN_AGENT_QUORUM`` agents have returned or ``PLAN_AGENT_DEADLINE_MS`` passes.
+    Agents still running when the gate opens are returned in ``pending``.
+    """
+    pending = dict(futures)
+    payloads: dict[str, dict[str, Any]] = {}
+    status: dict[str, str] = {}
+    elapsed_ms: dict[str, float] = {}
+    failures: list[BedrockError] = []
+
+    target = len(pending) if mode != PIPELINE_MODE_QUORUM else min(_PLAN_AGENT_QUORUM, len(pending))
+    gate_deadline = (
+        started_at + _PLAN_AGENT_DEADLINE_MS / 1000
+        if mode == PIPELINE_MODE_QUORUM and _PLAN_AGENT_DEADLINE_MS
+        else None
+    )
+    agent_deadlines = {
+        name: started_at + _PLAN_AGENT_TIMEOUT_MS[name] / 1000 if _PLAN_AGENT_TIMEOUT_MS.get(name) else None
+        for name in pending.values()
+    }
+
+    while pending and len(payloads) < target:
+        now = time.perf_counter()
+        if gate_deadline is not None and payloads and now >= gate_deadline:
+            break
+        for future, name in list(pending.items()):
+            deadline = agent_deadlines.get(name)
+            if deadline is not None and now >= deadline:
+                logger.warning("Agent %s timed out after %.1fms", name, (now - started_at) * 1000)
+                status[name] = "timeout"
+                del pending[future]
+        if not pending:
+            break
+
+        candidates = [agent_deadlines[name] for name in pending.values() if agent_deadlines.get(name) is not None]
+        if gate_deadline is not None and payloads:
+            candidates.append(gate_deadline)
+        timeout = max(0.0, min(candidates) - now) if candidates else None
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            elapsed_ms[name] = (time.perf_counter() - started_at) * 1000
+            try:
+                _, payload = future.result()
+            except BedrockError as exc:
+                if mode != PIPELINE_MODE_QUORUM:
+                    raise
+                logger.warning("Agent %s failed; continuing without it: %s", name, exc)
+                status[name] = "error"
+                failures.append(exc)
+                continue
+            payloads[name] = payload
+            status[name] = "ok"
+            logger.info("Agent %s completed", name)
+
+    if not payloads:
+        if failures:
+            raise failures[0]
+        raise BedrockInvocationError("simulator planner agents did not return within their timeouts")
+    return _AgentRound(payloads=payloads, status=status, elapsed_ms=elapsed_ms, pending=pending)
+
+
+def _absorb_stragglers(round_: _AgentRound, started_at: float) -> list[str]:
+    absorbed: list[str] = []
+    for future, name in list(round_.pending.items()):
+        if not future.done():
+            continue
+        del round_.pending[future]
+        round_.elapsed_ms[name] = (time.perf_counter() - started_at) * 1000
+        try:
+            _, payload = future.result()
+        except BedrockError as exc:
+            logger.warning("Straggler agent %s failed: %s", name, exc)
+            round_.status[name] = "error"
+            continue
+        round_.payloads[name] = payload
+        round_.status[name] = "ok"
+        absorbed.append(name)
+    return absorbed
+
+
+def _opinion_for(round_: _AgentRound, name: str) -> dict[str, Any]:
+    payload = round_.payloads.get(name)
+    if payload is not None:
+        return payload
+    return {"agent_id": name, "status": "missing", "reason": round_.status.get(name, "straggler")}
+
+
+def _invoke_gunshi(context: dict[str, Any], round_: _AgentRound) -> Any:
+    project_context = {
+        "project": context.get("project") or {},
+        "metrics": context.get("metrics") or {},
+        "pattern": context.get("pattern") or "",
+        "requirement_result": context.get("requirement_result") or [],
+    }
+    candidate_profile = {
+        "team": context.get("team") or [],
+    }
+    gunshi_prompt = _render_template(
+        _GUNSHI_USER_PROMPT,
+        {
+            "project_context": json.dumps(project_context, ensure_ascii=False),
+            "candidate_profile": json.dumps(candidate_profile, ensure_ascii=False),
+            "pm_opinion": json.dumps(_opinion_for(round_, "PM"), ensure_ascii=False),
+            "hr_opinion": json.dumps(_opinion_for(round_, "HR"), ensure_ascii=False),
+            "risk_opinion": json.dumps(_opinion_for(round_, "Risk"), ensure_ascii=False),
+        },
+    )
+    logger.info("Bedrock prompt[Gunshi][system]=%s", _GUNSHI_SYSTEM_PROMPT)
+    logger.info("Bedrock prompt[Gunshi][user]=%s", gunshi_prompt)
+    return invoke_json(
+        gunshi_prompt,
+        system_prompt=_GUNSHI_SYSTEM_PROMPT,
+        max_tokens=_GUNSHI_MAX_TOKENS,
+        temperature=_AGENT_TEMPERATURE,
+        retries=1,
+        schema=GunshiSynthesis,
+    )
+
+
 def generate_simulation_plans(context: dict[str, Any]) -> SimulationPlansResult:
-    import time
     total_start_time = time.perf_counter()
-    
+    mode = _PLAN_PIPELINE_MODE if _PLAN_PIPELINE_MODE in {PIPELINE_MODE_ALL, PIPELINE_MODE_QUORUM} else PIPELINE_MODE_ALL
+
     if _LOG_BEDROCK_CONTEXT:
         logger.warning(
             "Bedrock plan generation context=%s",
             _safe_json_dumps(_sanitize_bedrock_context(context), max_chars=_LOG_BEDROCK_CONTEXT_MAX_CHARS),
         )
+    # Straggling agents keep running in the pool; shutdown(wait=False) lets us return without them.
+    executor = ThreadPoolExecutor(max_workers=len(_AGENT_NAMES))
     try:
         data_json = json.dumps(context, ensure_ascii=False)
-        
+
         # プロンプトを事前に準備
         pm_prompt = _render_template(_PM_USER_PROMPT, {"data": data_json})
         hr_prompt = _render_template(_HR_USER_PROMPT, {"data": data_json})
         risk_prompt = _render_template(_RISK_USER_PROMPT, {"data": data_json})
-        
+
         # PM、HR、Riskエージェントを並列実行
         parallel_start_time = time.perf_counter()
-        logger.info("Starting parallel agent invocations (PM, HR, Risk)")
-        agent_results: dict[str, dict[str, Any]] = {}
-        
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = {
-                executor.submit(_invoke_agent, "PM", pm_prompt, _PM_MAX_TOKENS): "PM",
-                executor.submit(_invoke_agent, "HR", hr_prompt, _HR_MAX_TOKENS): "HR",
-                executor.submit(_invoke_agent, "Risk", risk_prompt, _RISK_MAX_TOKENS): "Risk",
-            }
-            
-            for future in as_completed(futures):
-                agent_name, payload = future.result()
-                agent_results[agent_name] = payload
-                logger.info("Agent %s completed", agent_name)
-        
-        pm_payload = agent_results["PM"]
-        hr_payload = agent_results["HR"]
-        risk_payload = agent_results["Risk"]
-        
-        parallel_elapsed_ms = (time.perf_counter() - parallel_start_time) * 1000
-        logger.info("All parallel agent invocations completed in %.1fms", parallel_elapsed_ms)
-
-        project_context = {
-            "project": context.get("project") or {},
-            "metrics": context.get("metrics") or {},
-            "pattern": context.get("pattern") or "",
-            "requirement_result": context.get("requirement_result") or [],
-        }
-        candidate_profile = {
-            "team": context.get("team") or [],
+        logger.info("Starting parallel agent invocations (PM, HR, Risk) mode=%s", mode)
+        futures = {
+            executor.submit(_invoke_agent, "PM", pm_prompt, _PM_MAX_TOKENS): "PM",
+            executor.submit(_invoke_agent, "HR", hr_prompt, _HR_MAX_TOKENS): "HR",
+            executor.submit(_invoke_agent, "Risk", risk_prompt, _RISK_MAX_TOKENS): "Risk",
         }
-        gunshi_prompt = _render_template(
-            _GUNSHI_USER_PROMPT,
-            {
-                "project_context": json.dumps(project_context, ensure_ascii=False),
-                "candidate_profile": json.dumps(candidate_profile, ensure_ascii=False),
-                "pm_opinion": json.dumps(pm_payload, ensure_ascii=False),
-                "hr_opinion": json.dumps(hr_payload, ensure_ascii=False),
-                "risk_opinion": json.dumps(risk_payload, ensure_ascii=False),
-            },
+        agents = _collect_agents(futures, mode, parallel_start_time)
+
+        parallel_elapsed_ms = (time.perf_counter() - parallel_start_time) * 1000
+        logger.info(
+            "Agent gate opened in %.1fms (ok=%s pending=%s)",
+            parallel_elapsed_ms,
+            sorted(agents.payloads),
+            sorted(agents.pending.values()),
         )
-        logger.info("Bedrock prompt[Gunshi][system]=%s", _GUNSHI_SYSTEM_PROMPT)
-        logger.info("Bedrock prompt[Gunshi][user]=%s", gunshi_prompt)
-        
+
         gunshi_start_time = time.perf_counter()
-        gunshi_payload = invoke_json(
-            gunshi_prompt,
-            system_prompt=_GUNSHI_SYSTEM_PROMPT,
-            max_tokens=_GUNSHI_MAX_TOKENS,
-            temperature=_AGENT_TEMPERATURE,
-            retries=1,
-        )
+        gunshi_payload = _invoke_gunshi(context, agents)
+        gunshi_passes = 1
+        preliminary_gunshi = None
+        if agents.pending and _PLAN_STRAGGLER_POLICY == STRAGGLER_POLICY_REFINE:
+            absorbed = _absorb_stragglers(agents, parallel_start_time)
+            if absorbed:
+                logger.info("Refining Gunshi synthesis with straggler agents %s", absorbed)
+                preliminary_gunshi = gunshi_payload
+                gunshi_payload = _invoke_gunshi(context, agents)
+                gunshi_passes += 1
+        for name in agents.pending.values():
+            agents.status.setdefault(name, "straggler")
         gunshi_elapsed_ms = (time.perf_counter() - gunshi_start_time) * 1000
-        logger.info("Gunshi agent completed in %.1fms", gunshi_elapsed_ms)
-        
+        logger.info("Gunshi agent completed in %.1fms passes=%s", gunshi_elapsed_ms, gunshi_passes)
+
         total_elapsed_ms = (time.perf_counter() - total_start_time) * 1000
-        logger.info("Total plan generation completed in %.1fms (parallel: %.1fms, gunshi: %.1fms)", 
+        logger.info("Total plan generation completed in %.1fms (parallel: %.1fms, gunshi: %.1fms)",
                    total_elapsed_ms, parallel_elapsed_ms, gunshi_elapsed_ms)
     except BedrockInvocationError:
         logger.exception("simulator planner Bedrock invocation failed")
         raise
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    pm_payload = agents.payloads.get("PM") or {}
+    hr_payload = agents.payloads.get("HR") or {}
+    risk_payload = agents.payloads.get("Risk") or {}
+    missing = [name for name in _AGENT_NAMES if name not in agents.payloads]
+    pipeline = {
+        "mode": mode,
+        "quorum": _PLAN_AGENT_QUORUM if mode == PIPELINE_MODE_QUORUM else len(_AGENT_NAMES),
+        "straggler_policy": _PLAN_STRAGGLER_POLICY,
+        "agents": {
+            name: {"status": agents.status.get(name, "ok"), "elapsed_ms": round(agents.elapsed_ms[name], 1)}
+            if name in agents.elapsed_ms
+            else {"status": agents.status.get(name, "straggler")}
+            for name in _AGENT_NAMES
+        },
+        "missing": missing,
+        "gunshi_passes": gunshi_passes,
+        "gate_ms": round(parallel_elapsed_ms, 1),
+        "total_ms": round(total_elapsed_ms, 1),
+    }
+    if preliminary_gunshi is not None:
+        pipeline["preliminary_gunshi"] = preliminary_gunshi
 
     if not isinstance(gunshi_payload, dict):
         raise BedrockInvocationError("simulator planner returned non-object JSON")
@@ -511,6 +678,7 @@ def generate_simulation_plans(context: dict[str, Any]) -> SimulationPlansResult:
             "hr": hr_payload,
             "risk": risk_payload,
             "gunshi": gunshi_payload,
+            "pipeline": pipeline,
         },
     )
 
@@ -527,6 +695,16 @@ def build_simulation_plan_logs(result: SimulationPlansResult) -> list[dict[str,
         logs.append({"agent": "HR", "message": hr_message, "tone": "hr"})
     if risk_message:
         logs.append({"agent": "RISK", "message": risk_message, "tone": "risk"})
+    pipeline = raw.get("pipeline") if isinstance(raw.get("pipeline"), dict) else {}
+    missing = [str(name) for name in pipeline.get("missing") or []]
+    if missing:
+        logs.append(
+            {
+                "agent": "SYSTEM",
+                "message": f"{', '.join(missing)} の意見が期限内に揃わなかったため、残りの意見で統合しました。",
+                "tone": "gunshi",
+            }
+        )
 
     recommended = next((p for p in result.plans if p.is_recommended), None)
     if recommended:
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 from sqlalchemy.engine import Connection
 
 from app.auth import AuthUser, get_current_user
 from app.db import get_db
+from app.domain.execution_queue import fetch_execution_job, fetch_execution_queue_stats
 from app.domain.hitl import (
+    AUDIT_PAGE_SIZE,
     ApprovalResult,
     ExecutionJobResult,
     apply_steer,
@@ -16,6 +18,9 @@ from app.domain.hitl import (
     reject_request,
     request_approval,
 )
+from app.domain.slack_inbox import fetch_slack_inbox_stats
+from app.domain.slack_outbox import fetch_slack_outbox_stats
+from app.integrations.http_client import get_http_client
 
 router = APIRouter(prefix="/v1", tags=["hitl"])
 
@@ -177,13 +182,61 @@ def execute_api(
     return _to_job_response(job)
 
 
+@router.get("/execution-jobs/stats")
+def execution_queue_stats_api(
+    window_seconds: int = Query(default=3600, ge=60, le=7 * 24 * 3600),
+    user: AuthUser = Depends(get_current_user),
+    conn: Connection = Depends(get_db),
+) -> dict:
+    return fetch_execution_queue_stats(conn, window_seconds=window_seconds)
+
+
+@router.get("/execution-jobs/{job_id}")
+def execution_job_api(
+    job_id: str,
+    user: AuthUser = Depends(get_current_user),
+    conn: Connection = Depends(get_db),
+) -> dict:
+    job = fetch_execution_job(conn, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="execution job not found")
+    return job
+
+
+@router.get("/slack-inbox/stats")
+def slack_inbox_stats_api(
+    window_seconds: int = Query(default=3600, ge=60, le=7 * 24 * 3600),
+    user: AuthUser = Depends(get_current_user),
+    conn: Connection = Depends(get_db),
+) -> dict:
+    return fetch_slack_inbox_stats(conn, window_seconds=window_seconds)
+
+
+@router.get("/slack-outbox/stats")
+def slack_outbox_stats_api(
+    window_seconds: int = Query(default=3600, ge=60, le=7 * 24 * 3600),
+    user: AuthUser = Depends(get_current_user),
+    conn: Connection = Depends(get_db),
+) -> dict:
+    return fetch_slack_outbox_stats(conn, window_seconds=window_seconds)
+
+
+@router.get("/http-client/stats")
+def http_client_stats_api(user: AuthUser = Depends(get_current_user)) -> dict:
+    return get_http_client().stats()
+
+
 @router.get("/audit/{thread_id}")
 def audit_api(
     thread_id: str,
+    after: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=AUDIT_PAGE_SIZE, ge=1, le=1000),
     user: AuthUser = Depends(get_current_user),
     conn: Connection = Depends(get_db),
 ) -> dict:
-    return {"thread_id": thread_id, "events": fetch_audit_logs(conn, thread_id)}
+    events = fetch_audit_logs(conn, thread_id, after=after, limit=limit)
+    next_after = events[-1]["audit_id"] if len(events) == limit else None
+    return {"thread_id": thread_id, "events": events, "next_after": next_after}
 
 
 def _to_approval_response(result: ApprovalResult) -> ApprovalRequestResponse:
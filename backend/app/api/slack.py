@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import json
 import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from sqlalchemy import text
+from sqlalchemy.engine import Connection
 
 from app.db import db_connection
 from app.domain.demo import (
@@ -15,7 +19,9 @@ from app.domain.demo import (
     record_demo_plan_selection,
     reject_demo,
 )
-from app.domain.hitl import apply_steer, approve_request, reject_request
+from app.domain.hitl import apply_steer, approve_request, find_approval_by_slack_ts, reject_request
+from app.domain.slack_outbox import enqueue_thread_message
+from app.domain.slack_inbox import enqueue_slack_inbox, notify_slack_inbox, record_slack_inbox_ack
 from app.integrations.slack import (
     DEMO_ACTION_APPROVE,
     DEMO_ACTION_CANCEL,
@@ -28,7 +34,6 @@ from app.integrations.slack import (
     open_demo_intervention_modal,
     parse_action_value,
     parse_interaction_payload,
-    post_thread_message,
     verify_slack_signature,
 )
 
@@ -38,6 +43,7 @@ logger = logging.getLogger("saihai.slack")
 
 @router.post("/interactions")
 async def slack_interactions(request: Request, background_tasks: BackgroundTasks) -> JSONResponse:
+    started = time.perf_counter()
     body = await request.body()
     if not verify_slack_signature(body, request.headers):
         raise HTTPException(status_code=401, detail="invalid slack signature")
@@ -58,8 +64,12 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
                 if isinstance(block, dict):
                     intervention_value = (block.get(DEMO_MODAL_ACTION_ID, {}) or {}).get("value", "")
             if alert_id and intervention_value:
-                background_tasks.add_task(
-                    record_demo_intervention,
+                await _accept(
+                    background_tasks,
+                    started,
+                    kind="interaction",
+                    handler=record_demo_intervention,
+                    ordering_key=f"demo:{alert_id}",
                     alert_id=alert_id,
                     actor=payload.get("user", {}).get("id"),
                     intervention=intervention_value,
@@ -88,7 +98,8 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
         if action_id == DEMO_ACTION_INTERVENE:
             trigger_id = payload.get("trigger_id")
             if alert_id and trigger_id:
-                open_demo_intervention_modal(str(trigger_id), alert_id)
+                # views.open must use the trigger within 3 s, so it runs inline, but off the event loop.
+                await run_in_threadpool(open_demo_intervention_modal, str(trigger_id), alert_id)
             return JSONResponse({"ok": True})
 
         idempotency_key = _demo_idempotency_key(payload, action, alert_id, action_id)
@@ -96,8 +107,12 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
         if action_id == DEMO_ACTION_PLAN:
             plan = metadata.get("plan")
             if alert_id and plan:
-                background_tasks.add_task(
-                    record_demo_plan_selection,
+                await _accept(
+                    background_tasks,
+                    started,
+                    kind="interaction",
+                    handler=record_demo_plan_selection,
+                    ordering_key=f"demo:{alert_id}",
                     alert_id=alert_id,
                     actor=actor,
                     plan=plan,
@@ -106,8 +121,12 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
             return JSONResponse({"ok": True})
         if action_id == DEMO_ACTION_APPROVE:
             if alert_id:
-                background_tasks.add_task(
-                    approve_demo,
+                await _accept(
+                    background_tasks,
+                    started,
+                    kind="interaction",
+                    handler=approve_demo,
+                    ordering_key=f"demo:{alert_id}",
                     alert_id=alert_id,
                     actor=actor,
                     idempotency_key=idempotency_key,
@@ -115,8 +134,12 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
             return JSONResponse({"ok": True})
         if action_id == DEMO_ACTION_REJECT:
             if alert_id:
-                background_tasks.add_task(
-                    reject_demo,
+                await _accept(
+                    background_tasks,
+                    started,
+                    kind="interaction",
+                    handler=reject_demo,
+                    ordering_key=f"demo:{alert_id}",
                     alert_id=alert_id,
                     actor=actor,
                     idempotency_key=idempotency_key,
@@ -124,8 +147,12 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
             return JSONResponse({"ok": True})
         if action_id == DEMO_ACTION_CANCEL:
             if alert_id:
-                background_tasks.add_task(
-                    cancel_demo,
+                await _accept(
+                    background_tasks,
+                    started,
+                    kind="interaction",
+                    handler=cancel_demo,
+                    ordering_key=f"demo:{alert_id}",
                     alert_id=alert_id,
                     actor=actor,
                     idempotency_key=idempotency_key,
@@ -141,8 +168,12 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
         return JSONResponse({"ok": True})
 
     if action_id == "hitl_approve":
-        background_tasks.add_task(
-            _handle_interaction,
+        await _accept(
+            background_tasks,
+            started,
+            kind="interaction",
+            handler=_handle_interaction,
+            ordering_key=_interaction_ordering_key(payload, approval_request_id),
             approval_request_id=approval_request_id,
             action_id=action_id,
             actor=actor,
@@ -150,8 +181,12 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
         )
         return JSONResponse({"text": "approved"})
     if action_id == "hitl_reject":
-        background_tasks.add_task(
-            _handle_interaction,
+        await _accept(
+            background_tasks,
+            started,
+            kind="interaction",
+            handler=_handle_interaction,
+            ordering_key=_interaction_ordering_key(payload, approval_request_id),
             approval_request_id=approval_request_id,
             action_id=action_id,
             actor=actor,
@@ -159,8 +194,12 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
         )
         return JSONResponse({"text": "rejected"})
     if action_id == "hitl_request_changes":
-        background_tasks.add_task(
-            _handle_interaction,
+        await _accept(
+            background_tasks,
+            started,
+            kind="interaction",
+            handler=_handle_interaction,
+            ordering_key=_interaction_ordering_key(payload, approval_request_id),
             approval_request_id=approval_request_id,
             action_id=action_id,
             actor=actor,
@@ -173,6 +212,7 @@ async def slack_interactions(request: Request, background_tasks: BackgroundTasks
 
 @router.post("/events")
 async def slack_events(request: Request, background_tasks: BackgroundTasks) -> JSONResponse:
+    started = time.perf_counter()
     body = await request.body()
     if not verify_slack_signature(body, request.headers):
         raise HTTPException(status_code=401, detail="invalid slack signature")
@@ -193,11 +233,62 @@ async def slack_events(request: Request, background_tasks: BackgroundTasks) -> J
     if not thread_ts:
         return JSONResponse({"ok": True})
 
-    background_tasks.add_task(_handle_event, payload)
+    channel = event.get("channel") or ""
+    await _accept(
+        background_tasks,
+        started,
+        kind="event",
+        handler=_handle_event,
+        ordering_key=f"slack-thread:{channel}:{thread_ts}",
+        idempotency_key=_event_idempotency_key(payload, thread_ts),
+        payload=payload,
+    )
 
     return JSONResponse({"ok": True})
 
 
+async def _accept(
+    background_tasks: BackgroundTasks,
+    started: float,
+    *,
+    kind: str,
+    handler: Any,
+    ordering_key: str,
+    idempotency_key: str | None,
+    **arguments: Any,
+) -> None:
+    """Persist a verified payload to the inbox before acking, so a crash after the 200 cannot lose it."""
+    if handler is not _handle_event:
+        arguments["idempotency_key"] = idempotency_key
+    inbox_key = idempotency_key or f"slack:{uuid.uuid4().hex}"
+    received_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    inbox_id = await run_in_threadpool(
+        _store_inbox_item,
+        kind=kind,
+        handler=handler.__name__,
+        arguments=arguments,
+        idempotency_key=inbox_key,
+        ordering_key=ordering_key,
+        received_at=received_at,
+    )
+    if inbox_id is None:
+        logger.info("slack.inbox_duplicate idempotency_key=%s", inbox_key)
+        return
+    notify_slack_inbox()
+    # Measured after the commit, so it covers the inbox write; stored once the response has gone out.
+    background_tasks.add_task(_record_inbox_ack, inbox_id, (time.perf_counter() - started) * 1000)
+
+
+def _store_inbox_item(**kwargs: Any) -> int | None:
+    with db_connection() as conn:
+        return enqueue_slack_inbox(conn, **kwargs)
+
+
+def _record_inbox_ack(inbox_id: int, ack_ms: float) -> None:
+    with db_connection() as conn:
+        record_slack_inbox_ack(conn, inbox_id, ack_ms)
+
+
 def _handle_interaction(
     *,
     approval_request_id: str,
@@ -242,10 +333,11 @@ def _handle_event(payload: dict) -> None:
         selected_plan = _parse_plan(text_value)
         if not selected_plan and not _contains_action_keyword(text_value):
             channel = event.get("channel")
-            post_thread_message(
-                channel=str(channel) if channel else "",
-                thread_ts=thread_ts,
-                text="対象が不明です。メール/カレンダー/稟議のどれを調整しますか？",
+            enqueue_thread_message(
+                conn,
+                str(channel) if channel else "",
+                thread_ts,
+                "対象が不明です。メール/カレンダー/稟議のどれを調整しますか？",
             )
             return
 
@@ -260,28 +352,9 @@ def _handle_event(payload: dict) -> None:
 
 
 def _find_approval_by_thread(conn: Connection, thread_ts: str) -> dict | None:
-    rows = conn.execute(
-        text("SELECT metadata FROM langgraph_checkpoints")
-    ).mappings().all()
-    for row in rows:
-        metadata = row.get("metadata")
-        if isinstance(metadata, (bytes, bytearray, memoryview)):
-            try:
-                metadata = metadata.decode("utf-8")
-            except UnicodeDecodeError:
-                continue
-        if isinstance(metadata, str):
-            try:
-                metadata = json.loads(metadata)
-            except json.JSONDecodeError:
-                continue
-        if not isinstance(metadata, dict):
-            continue
-        slack = metadata.get("slack") or {}
-        if slack.get("thread_ts") == thread_ts or slack.get("message_ts") == thread_ts:
-            approval_request_id = metadata.get("approval_request_id")
-            if approval_request_id:
-                return {"approval_request_id": approval_request_id}
+    approval_request_id = find_approval_by_slack_ts(conn, thread_ts)
+    if approval_request_id:
+        return {"approval_request_id": approval_request_id}
     return None
 
 
@@ -326,6 +399,21 @@ def _interaction_idempotency_key(
     return f"slack-interaction:{fallback}:{approval_request_id}:{action_id}"
 
 
+def _event_idempotency_key(payload: dict, thread_ts: str) -> str:
+    event = payload.get("event") or {}
+    return payload.get("event_id") or f"slack-event:{thread_ts}:{event.get('ts') or 'unknown'}"
+
+
+def _interaction_ordering_key(payload: dict, approval_request_id: str) -> str:
+    """Button presses share the ordering key of replies in the same Slack thread."""
+    message = payload.get("message") or {}
+    thread_ts = message.get("thread_ts") or message.get("ts")
+    channel = (payload.get("channel") or {}).get("id") or (payload.get("container") or {}).get("channel_id") or ""
+    if thread_ts:
+        return f"slack-thread:{channel}:{thread_ts}"
+    return f"approval:{approval_request_id}"
+
+
 def _demo_idempotency_key(
     payload: dict,
     action: dict | None,
@@ -343,3 +431,18 @@ def _demo_idempotency_key(
     view_id = payload.get("view", {}).get("id")
     fallback = action_ts or message_ts or view_id or trigger_id or "unknown"
     return f"demo:{alert_id}:{action_id}:{fallback}"
+
+
+# Handlers the inbox consumers may run, by name; their arguments are stored as JSON.
+SLACK_INBOX_HANDLERS = {
+    handler.__name__: handler
+    for handler in (
+        record_demo_intervention,
+        record_demo_plan_selection,
+        approve_demo,
+        reject_demo,
+        cancel_demo,
+        _handle_interaction,
+        _handle_event,
+    )
+}
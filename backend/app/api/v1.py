@@ -8,7 +8,7 @@ from datetime import datetime, timezone
 from typing import Any, Literal
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import text
@@ -44,10 +44,16 @@ from app.domain.input_sources import (
     ingest_slack_logs,
     ingest_weekly_reports,
 )
-from app.domain.hitl import fetch_history
+from app.domain.hitl import fetch_history_page
+from app.domain.retention import MOTIVATION, PROJECT_HEALTH, load_trend
 from app.integrations.bedrock import BedrockError, is_bedrock_configured
 from app.agents.plan_chat import update_plan_via_chat
-from app.agents.simulator_planner import build_simulation_plan_logs, generate_simulation_plans
+from app.agents.simulator_planner import (
+    SimulationPlansResult,
+    build_simulation_plan_logs,
+    generate_simulation_plans,
+)
+from app.singleflight import SingleFlight, fingerprint
 
 router = APIRouter(prefix="/v1")
 
@@ -55,6 +61,8 @@ DEV_LOGIN_PASSWORD = os.getenv("DEV_LOGIN_PASSWORD", "saihai")
 auth_logger = logging.getLogger("saihai.auth")
 logger = logging.getLogger("saihai.api.v1")
 
+_plan_flight = SingleFlight("simulation_plans")
+
 
 class LoginRequest(BaseModel):
     userId: str = Field(min_length=1)
@@ -349,6 +357,22 @@ class DashboardInitialResponse(BaseModel):
     checkpointWaiting: bool
 
 
+class TrendPoint(BaseModel):
+    periodStart: str
+    samples: int
+    average: float | None = None
+    min: float | None = None
+    max: float | None = None
+    values: dict[str, float | None]
+    worstRiskLevel: str | None = None
+
+
+class TrendResponse(BaseModel):
+    resolution: Literal["day", "week", "month"]
+    since: str
+    points: list[TrendPoint]
+
+
 class ExternalEmailActionRequest(BaseModel):
     to: str = Field(min_length=1)
     subject: str = Field(min_length=1)
@@ -470,6 +494,21 @@ def get_project_team(project_id: str, conn: Connection = Depends(get_db)) -> dic
     return {"projectId": project_id, "members": members}
 
 
+@router.get(
+    "/projects/{project_id}/health-trend",
+    response_model=TrendResponse,
+    dependencies=[Depends(get_current_user)],
+)
+def get_project_health_trend(
+    project_id: str,
+    days: int = Query(default=90, ge=1, le=3650),
+    conn: Connection = Depends(get_db),
+) -> dict:
+    if not fetch_project(conn, project_id):
+        raise HTTPException(status_code=404, detail="project not found")
+    return _trend_payload(load_trend(conn, PROJECT_HEALTH, project_id, days=days))
+
+
 @router.get("/members", response_model=list[MemberResponse], dependencies=[Depends(get_current_user)])
 def list_members(conn: Connection = Depends(get_db)) -> list[dict]:
     members = fetch_members(conn)
@@ -497,6 +536,40 @@ def get_member(member_id: str, conn: Connection = Depends(get_db)) -> dict:
     return member
 
 
+@router.get(
+    "/members/{member_id}/motivation-trend",
+    response_model=TrendResponse,
+    dependencies=[Depends(get_current_user)],
+)
+def get_member_motivation_trend(
+    member_id: str,
+    days: int = Query(default=90, ge=1, le=3650),
+    conn: Connection = Depends(get_db),
+) -> dict:
+    if not fetch_member_detail(conn, member_id):
+        raise HTTPException(status_code=404, detail="member not found")
+    return _trend_payload(load_trend(conn, MOTIVATION, member_id, days=days))
+
+
+def _trend_payload(trend: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "resolution": trend["resolution"],
+        "since": trend["since"],
+        "points": [
+            {
+                "periodStart": point["period_start"],
+                "samples": point["samples"],
+                "average": point["average"],
+                "min": point["min"],
+                "max": point["max"],
+                "values": point["values"],
+                "worstRiskLevel": point["worst_risk_level"],
+            }
+            for point in trend["points"]
+        ],
+    }
+
+
 @router.get(
     "/dashboard/initial",
     response_model=DashboardInitialResponse,
@@ -514,9 +587,15 @@ def dashboard_initial(conn: Connection = Depends(get_db)) -> dict:
     snapshots = conn.execute(
         text(
             """
-            SELECT snapshot_id, project_id, health_score, risk_level, variance_score, manager_gap_score, calculated_at
-            FROM project_health_snapshots
-            ORDER BY snapshot_id
+            SELECT s.snapshot_id, s.project_id, s.health_score, s.risk_level, s.variance_score,
+                   s.manager_gap_score, s.calculated_at
+            FROM project_health_snapshots s
+            JOIN (
+                SELECT project_id, MAX(snapshot_id) AS snapshot_id
+                FROM project_health_snapshots
+                GROUP BY project_id
+            ) latest ON latest.snapshot_id = s.snapshot_id
+            ORDER BY s.snapshot_id
             """
         )
     ).mappings().all()
@@ -1029,7 +1108,7 @@ async def stream_plans(
                     await asyncio.sleep(0.2)
 
         try:
-            plans, ai_logs = await asyncio.to_thread(_build_plans_with_bedrock, simulation_id, simulation)
+            plans, ai_logs = await _build_plans_with_bedrock_async(simulation_id, simulation)
             for entry in ai_logs:
                 yield _sse_event("log", entry)
                 await asyncio.sleep(0.12)
@@ -1416,12 +1495,23 @@ def list_attendance_runs(conn: Connection = Depends(get_db)) -> list[dict]:
     dependencies=[Depends(get_current_user)],
 )
 def list_history_api(
+    response: Response,
     status: str | None = None,
     project_id: str | None = None,
-    limit: int = 50,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    compact: bool = False,
     conn: Connection = Depends(get_db),
 ) -> list[dict]:
-    return fetch_history(conn, status=status, project_id=project_id, limit=limit)
+    try:
+        page = fetch_history_page(
+            conn, status=status, project_id=project_id, limit=limit, cursor=cursor, compact=compact
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.entries
 
 
 def _format_timestamp(value: Any) -> str | None:
@@ -1710,13 +1800,29 @@ def _build_plans(simulation_id: str, risk_score: int) -> list[dict]:
 
 
 def _build_plans_with_bedrock(simulation_id: str, simulation: dict) -> tuple[list[dict], list[dict[str, str]]]:
+    context = _build_simulation_plan_context(simulation_id, simulation)
+    result = _plan_flight.do(_simulation_plan_flight_key(simulation_id, context), generate_simulation_plans, context)
+    return _apply_simulation_plan_result(simulation_id, result)
+
+
+async def _build_plans_with_bedrock_async(
+    simulation_id: str, simulation: dict
+) -> tuple[list[dict], list[dict[str, str]]]:
+    context = _build_simulation_plan_context(simulation_id, simulation)
+    result = await _plan_flight.do_async(
+        _simulation_plan_flight_key(simulation_id, context), generate_simulation_plans, context
+    )
+    return _apply_simulation_plan_result(simulation_id, result)
+
+
+def _build_simulation_plan_context(simulation_id: str, simulation: dict) -> dict[str, Any]:
     if not is_bedrock_configured():
         raise BedrockError("Bedrock is not configured.")
 
     evaluation = simulation.get("evaluation") or {}
     project = simulation.get("project") or evaluation.get("project") or {}
     team = simulation.get("team") or []
-    context = {
+    return {
         "simulation_id": simulation_id,
         "project": project,
         "team": team,
@@ -1725,7 +1831,14 @@ def _build_plans_with_bedrock(simulation_id: str, simulation: dict) -> tuple[lis
         "requirement_result": evaluation.get("requirementResult") or [],
     }
 
-    result = generate_simulation_plans(context)
+
+def _simulation_plan_flight_key(simulation_id: str, context: dict[str, Any]) -> str:
+    return f"{simulation_id}:{fingerprint(context)}"
+
+
+def _apply_simulation_plan_result(
+    simulation_id: str, result: SimulationPlansResult
+) -> tuple[list[dict], list[dict[str, str]]]:
     plans: list[dict] = []
     for draft in result.plans:
         plan_id = f"plan-{simulation_id}-{draft.plan_type}"
@@ -6,7 +6,7 @@ from pydantic import BaseModel
 from sqlalchemy.engine import Connection
 
 from app.db import get_db
-from app.domain.watchdog import enqueue_watchdog_job, run_watchdog_job
+from app.domain.watchdog import enqueue_watchdog_job, fetch_watchdog_job, run_watchdog_job
 
 router = APIRouter(prefix="/api/v1", tags=["watchdog"])
 
@@ -42,10 +42,26 @@ def watchdog_run(
     except ValueError:
         if not req.auto_enqueue:
             raise HTTPException(status_code=404, detail="no queued job")
-        job = enqueue_watchdog_job(conn, payload=None)
+        job = enqueue_watchdog_job(conn, payload=None, coalesce=True)
+        if job["status"] == "coalesced":
+            # A worker already has an equivalent cycle queued or running.
+            return {"job_id": job["job_id"], "status": "coalesced", "summary": "equivalent watchdog job in progress"}
         return run_watchdog_job(conn, job_id=job["job_id"])
 
 
+@router.get("/watchdog/jobs/{job_id}")
+def watchdog_job(
+    job_id: int,
+    conn: Connection = Depends(get_db),
+    x_internal_token: str | None = Header(default=None),
+) -> dict:
+    _require_internal(x_internal_token)
+    job = fetch_watchdog_job(conn, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="watchdog job not found")
+    return job
+
+
 def _require_internal(token: str | None) -> None:
     expected = os.getenv("INTERNAL_API_TOKEN")
     if expected and token != expected:
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.elements import TextClause
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def chunked(rows: Iterable[Any], size: int = DEFAULT_CHUNK_SIZE) -> Iterator[list[Any]]:
+    chunk: list[Any] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def execute_chunked(
+    conn: Connection,
+    statement: TextClause,
+    rows: Iterable[dict[str, Any]] | Sequence[dict[str, Any]],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Run ``statement`` as executemany over ``rows`` in chunks; returns the number of rows sent."""
+    sent = 0
+    for chunk in chunked(rows, max(1, chunk_size)):
+        conn.execute(statement, chunk)
+        sent += len(chunk)
+    return sent
+
+
+def insert_returning_new(
+    conn: Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[dict[str, Any]],
+    *,
+    conflict_columns: Sequence[str],
+    returning: str,
+    chunk_size: int = 500,
+) -> list[Any]:
+    """Multi-row ``INSERT ... ON CONFLICT (...) DO NOTHING RETURNING``, one statement per chunk.
+
+    Returns the ``returning`` column of the rows that were actually inserted, so duplicates are not counted.
+    """
+    inserted: list[Any] = []
+    column_list = ", ".join(columns)
+    for chunk in chunked(rows, max(1, chunk_size)):
+        values = ", ".join(
+            "(" + ", ".join(f":{column}_{index}" for column in columns) + ")" for index in range(len(chunk))
+        )
+        params = {f"{column}_{index}": row.get(column) for index, row in enumerate(chunk) for column in columns}
+        result = conn.execute(
+            text(
+                f"INSERT INTO {table} ({column_list}) VALUES {values} "
+                f"ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING RETURNING {returning}"
+            ),
+            params,
+        )
+        inserted.extend(result.scalars().all())
+    return inserted
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+_MULTI_COLUMN_ALTER_RE = re.compile(
+    r"^\s*ALTER\s+TABLE\s+(\S+)\s+((?:ADD|DROP)\s+COLUMN\s.*)$", flags=re.IGNORECASE | re.DOTALL
+)
+
+_TIMESTAMP_DEFAULT_RE = re.compile(
+    r"^\s*ALTER\s+TABLE\s+(\S+)\s+ALTER\s+COLUMN\s+(\S+)\s+(SET\s+DEFAULT\s+CURRENT_TIMESTAMP|DROP\s+DEFAULT)\s*$",
+    flags=re.IGNORECASE,
+)
+
+
+def ensure_schema_migrations(conn: Connection) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version TEXT PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+    )
+
+
+def split_sql(sql: str) -> list[str]:
+    statements: list[str] = []
+    for chunk in sql.split(";"):
+        stmt = chunk.strip()
+        if stmt:
+            statements.append(stmt)
+    return statements
+
+
+def load_migrations(suffix: str, migrations_dir: Path = MIGRATIONS_DIR) -> list[Path]:
+    return sorted(migrations_dir.glob(f"*{suffix}"))
+
+
+def translate_for_sqlite(sql: str) -> list[str]:
+    sql = "\n".join(line for line in sql.splitlines() if "CREATE EXTENSION" not in line.upper())
+    sql = sql.replace("SERIAL PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT")
+    sql = sql.replace("BYTEA", "BLOB")
+    sql = sql.replace("JSONB", "TEXT")
+    sql = sql.replace("vector(1024)", "BLOB")
+    sql = sql.replace("TEXT[]", "TEXT")
+    sql = sql.replace("jsonb_array_length(", "json_array_length(")
+    sql = sql.replace("jsonb_typeof(", "json_type(")
+    # Backfills cast JSON text to TIMESTAMP on PostgreSQL; SQLite stores the text as is.
+    sql = sql.replace("::timestamp", "")
+
+    statements: list[str] = []
+    for stmt in split_sql(sql):
+        # SQLite accepts a single ADD/DROP COLUMN per ALTER TABLE and no DROP COLUMN IF EXISTS.
+        match = _MULTI_COLUMN_ALTER_RE.match(stmt)
+        if match:
+            table = match.group(1)
+            for clause in re.split(r",\s*(?=(?:ADD|DROP)\s+COLUMN\b)", match.group(2), flags=re.IGNORECASE):
+                clause = re.sub(r"^DROP\s+COLUMN\s+IF\s+EXISTS\b", "DROP COLUMN", clause.strip(), flags=re.IGNORECASE)
+                statements.append(f"ALTER TABLE {table} {clause}")
+            continue
+        # SQLite cannot change a column default; an insert trigger fills the column instead.
+        match = _TIMESTAMP_DEFAULT_RE.match(stmt)
+        if match:
+            table, column, action = match.groups()
+            trigger = f"{table}_{column}_default"
+            if action.upper().startswith("DROP"):
+                statements.append(f"DROP TRIGGER IF EXISTS {trigger}")
+            else:
+                statements.append(
+                    f"CREATE TRIGGER {trigger} AFTER INSERT ON {table} FOR EACH ROW WHEN NEW.{column} IS NULL "
+                    f"BEGIN UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END"
+                )
+            continue
+        statements.append(stmt)
+    return statements
+
+
+def apply_migrations(conn: Connection, *, sqlite: bool, migrations_dir: Path = MIGRATIONS_DIR) -> list[str]:
+    ensure_schema_migrations(conn)
+    applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+    newly_applied: list[str] = []
+    for path in load_migrations(".up.sql", migrations_dir):
+        version = path.name.split("_", 1)[0]
+        if version in applied:
+            continue
+        sql = path.read_text(encoding="utf-8")
+        statements = translate_for_sqlite(sql) if sqlite else split_sql(sql)
+        for stmt in statements:
+            conn.execute(text(stmt))
+        conn.execute(
+            text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+            {"version": version},
+        )
+        newly_applied.append(version)
+    return newly_applied
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+from datetime import datetime, timezone
+from typing import Any, Protocol, TypeVar
+
+
+class QueueWorker(Protocol):
+    worker_id: str
+
+    def run(self) -> None: ...
+
+
+_WorkerT = TypeVar("_WorkerT", bound=QueueWorker)
+
+
+def utcnow() -> datetime:
+    """Naive UTC now, the form queue timestamps are stored and compared in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def as_datetime(value: Any) -> datetime | None:
+    """A timestamp column as a ``datetime``; SQLite returns ISO text."""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def decode_json_object(value: Any) -> dict[str, Any]:
+    """A JSON column as a dict; text that does not decode to an object gives ``{}``."""
+    if isinstance(value, (str, bytes)):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return {}
+    return value if isinstance(value, dict) else {}
+
+
+def worker_id_prefix(*parts: str) -> str:
+    """``host-pid`` plus ``parts``, unique per process, for naming worker threads and leases."""
+    return "-".join((socket.gethostname(), str(os.getpid()), *parts))
+
+
+def run_workers(workers: list[_WorkerT]) -> list[_WorkerT]:
+    """Run each worker's loop on its own thread and return once all of them have exited."""
+    threads = [threading.Thread(target=worker.run, name=worker.worker_id) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return workers
@@ -9,6 +9,7 @@ from typing import Any, Iterable
 from sqlalchemy import bindparam, text
 from sqlalchemy.engine import Connection
 
+from app.db.bulk import chunked
 from app.security import decrypt_value, encrypt_value
 
 
@@ -250,18 +251,25 @@ def _load_latest_reports(conn: Connection, user_ids: Iterable[str]) -> dict[str,
     ids = list(user_ids)
     if not ids:
         return {}
+    # Rank in SQL so only one report per user crosses the wire, however long the history is.
     stmt = text(
             """
             SELECT user_id, reporting_date, reported_at, content_text
-            FROM weekly_reports
-            WHERE user_id IN :ids
-            ORDER BY user_id, reporting_date DESC, reported_at DESC
+            FROM (
+              SELECT user_id, reporting_date, reported_at, content_text,
+                     ROW_NUMBER() OVER (
+                       PARTITION BY user_id
+                       ORDER BY reporting_date DESC, reported_at DESC, report_id DESC
+                     ) AS report_rank
+              FROM weekly_reports
+              WHERE user_id IN :ids
+            ) ranked
+            WHERE report_rank = 1
             """
     ).bindparams(bindparam("ids", expanding=True))
-    rows = conn.execute(stmt, {"ids": ids}).mappings().all()
     latest: dict[str, dict[str, Any]] = {}
-    for row in rows:
-        if row["user_id"] not in latest:
+    for chunk in chunked(ids):
+        for row in conn.execute(stmt, {"ids": chunk}).mappings():
             latest[row["user_id"]] = dict(row)
     return latest
 
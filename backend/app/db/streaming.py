@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Iterator, Sequence
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, RowMapping
+
+STREAM_BATCH_SIZE = max(1, int(os.getenv("DB_STREAM_BATCH_SIZE", "1000") or "1000"))
+
+
+def stream_rows(
+    conn: Connection,
+    sql: str,
+    params: dict[str, Any] | None = None,
+    *,
+    key: str,
+    descending: bool = False,
+    expanding: Sequence[str] = (),
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> Iterator[RowMapping]:
+    """Yield the rows of ``sql`` ordered by ``key`` without holding more than ``batch_size`` of them.
+
+    ``sql`` is a plain ``SELECT`` (no ``ORDER BY``/``LIMIT``) whose columns include ``key``, a unique
+    non-null column. PostgreSQL reads it through one server-side cursor; SQLite has none, so it is
+    paged by key (``WHERE key > :last ORDER BY key LIMIT n``), which stays an index seek per page.
+    Consume the iterator before writing on the same connection.
+    """
+    params = dict(params or {})
+    direction = "DESC" if descending else "ASC"
+    batch_size = max(1, batch_size)
+    if conn.dialect.name != "sqlite":
+        statement = _bind(text(f"SELECT * FROM ({sql}) AS streamed ORDER BY {key} {direction}"), expanding)
+        # Per-statement options: Connection.execution_options() would switch the caller's connection for good.
+        result = conn.execute(
+            statement, params, execution_options={"stream_results": True, "yield_per": batch_size}
+        )
+        yield from result.mappings()
+        return
+
+    comparison = "<" if descending else ">"
+    first_page = _bind(text(f"SELECT * FROM ({sql}) AS page ORDER BY {key} {direction} LIMIT :_limit"), expanding)
+    next_page = _bind(
+        text(
+            f"SELECT * FROM ({sql}) AS page WHERE {key} {comparison} :_after ORDER BY {key} {direction} LIMIT :_limit"
+        ),
+        expanding,
+    )
+    statement, after = first_page, None
+    while True:
+        rows = conn.execute(statement, {**params, "_limit": batch_size, "_after": after}).mappings().all()
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        statement, after = next_page, rows[-1][key]
+
+
+def _bind(statement: Any, expanding: Sequence[str]) -> Any:
+    if not expanding:
+        return statement
+    return statement.bindparams(*(bindparam(name, expanding=True) for name in expanding))
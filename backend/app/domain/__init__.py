@@ -1,3 +1,31 @@
-from .ai_response import AIResponse, AnalysisMeta, DebateSummaryEntry, FinalJudgment, Plan
+from .ai_response import (
+    AgentOpinion,
+    AIResponse,
+    AnalysisMeta,
+    DebateSummaryEntry,
+    DraftingOutput,
+    FinalJudgment,
+    GunshiSynthesis,
+    MonitorAssessment,
+    Plan,
+    PlanChatOutput,
+    PlanChatPlan,
+    StrategyPlan,
+    StrategyProposal,
+)
 
-__all__ = ["AIResponse", "AnalysisMeta", "DebateSummaryEntry", "FinalJudgment", "Plan"]
+__all__ = [
+    "AIResponse",
+    "AgentOpinion",
+    "AnalysisMeta",
+    "DebateSummaryEntry",
+    "DraftingOutput",
+    "FinalJudgment",
+    "GunshiSynthesis",
+    "MonitorAssessment",
+    "Plan",
+    "PlanChatOutput",
+    "PlanChatPlan",
+    "StrategyPlan",
+    "StrategyProposal",
+]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -36,3 +36,59 @@ class Plan(BaseModel):
 class AIResponse(BaseModel):
     analysis_meta: AnalysisMeta
     three_plans: list[Plan]
+
+
+# Per-agent output schemas used to validate Bedrock JSON before it reaches the agents. They are no stricter
+# than the agents' parsers, which coerce values with str()/float() and fall back to their own defaults.
+
+
+class AgentOpinion(BaseModel):
+    agent_id: Any = None
+    opinion_summary: Any = None
+    detailed_analysis: Any = None
+    analysis_evidence: Any = None
+    critical_alert: Any = None
+    discussion_draft: Any = None
+
+
+class MonitorAssessment(BaseModel):
+    # Required so a reply without it is re-prompted; a value that does not parse as a number scores 0.
+    risk_level: float | str | None
+    reason: Any = None
+    urgency: Any = None
+
+
+class StrategyPlan(BaseModel):
+    plan_type: str | None = None
+    description: str | None = None
+    predicted_future_impact: str | None = None
+
+
+class StrategyProposal(BaseModel):
+    recommended_plan: str | None = None
+    plans: list[StrategyPlan] = Field(default_factory=list)
+
+
+class GunshiSynthesis(BaseModel):
+    # Plan ids, scores and speakers are normalised by the simulator's parser, so only the shape is checked here;
+    # AIResponse describes the ideal output but is too strict to gate on.
+    analysis_meta: dict | None = None
+    three_plans: list[dict] = Field(min_length=1)
+
+
+class DraftingOutput(BaseModel):
+    email_draft: str | None = None
+    approval_doc: str | None = None
+    email_payload: dict | None = None
+
+
+class PlanChatPlan(BaseModel):
+    summary: str | None = None
+    pros: list[str] | str | None = None
+    cons: list[str] | str | None = None
+    score: float | None = None
+
+
+class PlanChatOutput(BaseModel):
+    assistant_message: str | None = None
+    plan: PlanChatPlan
@@ -22,13 +22,10 @@ from app.domain.external_actions import (
     DEFAULT_CALENDAR_OWNER_EMAIL,
     DEFAULT_CALENDAR_TIMEZONE,
 )
+from app.domain.hitl import upsert_checkpoint
 from app.integrations.google_calendar import create_google_calendar_event, refresh_google_access_token
-from app.integrations.slack import (
-    post_demo_alert,
-    post_demo_approval_prompt,
-    post_demo_retry_prompt,
-    post_thread_message,
-)
+from app.domain.slack_outbox import enqueue_slack_message
+from app.integrations.slack import demo_approval_prompt_blocks, demo_retry_prompt_blocks, post_demo_alert
 
 logger = logging.getLogger("saihai.demo")
 
@@ -106,11 +103,11 @@ def record_demo_plan_selection(
             logger.warning("demo plan selection invalid plan=%s alert_id=%s", plan, alert_id)
             return
         if metadata.get("status") in {DEMO_STATUS_REJECTED, DEMO_STATUS_CANCELLED}:
-            _notify_thread(metadata, "すでに終了しています。新しいデモを開始してください。")
+            _notify_thread(conn, metadata, "すでに終了しています。新しいデモを開始してください。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
         if metadata.get("status") in {DEMO_STATUS_APPROVED, DEMO_STATUS_CALENDAR_CREATING, DEMO_STATUS_CALENDAR_CREATED}:
-            _notify_thread(metadata, "すでにApprove済みです。")
+            _notify_thread(conn, metadata, "すでにApprove済みです。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
 
@@ -123,7 +120,7 @@ def record_demo_plan_selection(
         _upsert_demo_metadata(conn, alert_id, metadata)
 
         summary = _build_demo_summary(metadata)
-        _post_demo_prompt(metadata, summary)
+        _post_demo_prompt(conn, metadata, summary)
 
 
 def record_demo_intervention(
@@ -143,11 +140,11 @@ def record_demo_intervention(
         _record_idempotency_key(metadata, idempotency_key)
 
         if metadata.get("status") in {DEMO_STATUS_APPROVED, DEMO_STATUS_CALENDAR_CREATING, DEMO_STATUS_CALENDAR_CREATED}:
-            _notify_thread(metadata, "すでにApprove済みです。")
+            _notify_thread(conn, metadata, "すでにApprove済みです。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
         if metadata.get("status") in {DEMO_STATUS_REJECTED, DEMO_STATUS_CANCELLED}:
-            _notify_thread(metadata, "すでに終了しています。新しいデモを開始してください。")
+            _notify_thread(conn, metadata, "すでに終了しています。新しいデモを開始してください。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
 
@@ -163,7 +160,7 @@ def record_demo_intervention(
         _upsert_demo_metadata(conn, alert_id, metadata)
 
         summary = _build_demo_summary(metadata)
-        _post_demo_prompt(metadata, summary)
+        _post_demo_prompt(conn, metadata, summary)
 
 
 def approve_demo(
@@ -183,18 +180,18 @@ def approve_demo(
         _record_idempotency_key(metadata, idempotency_key)
 
         if metadata.get("status") in {DEMO_STATUS_REJECTED, DEMO_STATUS_CANCELLED}:
-            _notify_thread(metadata, "すでにReject/Cancelされています。新しいデモを開始してください。")
+            _notify_thread(conn, metadata, "すでにReject/Cancelされています。新しいデモを開始してください。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
 
         if not _is_actor_allowed(actor):
-            _notify_thread(metadata, "Approve権限がありません。")
+            _notify_thread(conn, metadata, "Approve権限がありません。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
 
         calendar = metadata.get("calendar") or {}
         if calendar.get("event_id") or calendar.get("event_link"):
-            _notify_thread(metadata, "すでにカレンダー登録済みです。")
+            _notify_thread(conn, metadata, "すでにカレンダー登録済みです。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
 
@@ -247,7 +244,7 @@ def approve_demo(
             latest["calendar"] = calendar
             latest["updated_at"] = datetime.now(timezone.utc).isoformat()
             _upsert_demo_metadata(conn, alert_id, latest)
-        _notify_retry(phase1_metadata, reason)
+            _notify_retry(conn, phase1_metadata, reason)
         logger.warning("demo calendar failed alert_id=%s error=%s", alert_id, reason)
         return
 
@@ -271,9 +268,7 @@ def approve_demo(
         latest["calendar"] = calendar
         latest["updated_at"] = datetime.now(timezone.utc).isoformat()
         _upsert_demo_metadata(conn, alert_id, latest)
-
-    message = _build_success_message(phase1_metadata, event_link, event_id)
-    _notify_thread(phase1_metadata, message)
+        _notify_thread(conn, phase1_metadata, _build_success_message(phase1_metadata, event_link, event_id))
 
 
 def reject_demo(
@@ -292,7 +287,7 @@ def reject_demo(
         _record_idempotency_key(metadata, idempotency_key)
 
         if metadata.get("status") in {DEMO_STATUS_APPROVED, DEMO_STATUS_CALENDAR_CREATING, DEMO_STATUS_CALENDAR_CREATED}:
-            _notify_thread(metadata, "すでにApprove済みです。")
+            _notify_thread(conn, metadata, "すでにApprove済みです。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
 
@@ -301,7 +296,7 @@ def reject_demo(
         metadata["rejected_by"] = actor
         metadata["updated_at"] = datetime.now(timezone.utc).isoformat()
         _upsert_demo_metadata(conn, alert_id, metadata)
-        _notify_thread(metadata, "Rejectされました。")
+        _notify_thread(conn, metadata, "Rejectされました。")
 
 
 def cancel_demo(
@@ -320,7 +315,7 @@ def cancel_demo(
         _record_idempotency_key(metadata, idempotency_key)
 
         if metadata.get("status") in {DEMO_STATUS_APPROVED, DEMO_STATUS_CALENDAR_CREATING, DEMO_STATUS_CALENDAR_CREATED}:
-            _notify_thread(metadata, "すでにApprove済みです。")
+            _notify_thread(conn, metadata, "すでにApprove済みです。")
             _upsert_demo_metadata(conn, alert_id, metadata)
             return
 
@@ -329,7 +324,7 @@ def cancel_demo(
         metadata["cancelled_by"] = actor
         metadata["updated_at"] = datetime.now(timezone.utc).isoformat()
         _upsert_demo_metadata(conn, alert_id, metadata)
-        _notify_thread(metadata, "キャンセルされました。")
+        _notify_thread(conn, metadata, "キャンセルされました。")
 
 
 def _demo_db():
@@ -500,31 +495,30 @@ def _build_success_message(metadata: dict, event_link: str | None, event_id: str
     )
 
 
-def _post_demo_prompt(metadata: dict, summary: str) -> None:
-    slack = metadata.get("slack") or {}
-    channel = slack.get("channel")
-    thread_ts = slack.get("thread_ts") or slack.get("message_ts")
-    if not channel or not thread_ts:
-        return
-    post_demo_approval_prompt(str(channel), str(thread_ts), summary, metadata.get("alert_id") or "")
+def _post_demo_prompt(conn: Connection, metadata: dict, summary: str) -> None:
+    blocks = demo_approval_prompt_blocks(summary, metadata.get("alert_id") or "")
+    _enqueue_thread_post(conn, metadata, "Demo approval required", blocks)
 
 
-def _notify_retry(metadata: dict, reason: str) -> None:
-    slack = metadata.get("slack") or {}
-    channel = slack.get("channel")
-    thread_ts = slack.get("thread_ts") or slack.get("message_ts")
-    if not channel or not thread_ts:
-        return
-    post_demo_retry_prompt(str(channel), str(thread_ts), metadata.get("alert_id") or "", reason)
+def _notify_retry(conn: Connection, metadata: dict, reason: str) -> None:
+    blocks = demo_retry_prompt_blocks(metadata.get("alert_id") or "", reason)
+    _enqueue_thread_post(conn, metadata, "Demo approval retry", blocks)
+
 
+def _notify_thread(conn: Connection, metadata: dict, text: str) -> None:
+    _enqueue_thread_post(conn, metadata, text)
 
-def _notify_thread(metadata: dict, text: str) -> None:
+
+def _enqueue_thread_post(conn: Connection, metadata: dict, text: str, blocks: list[dict] | None = None) -> None:
     slack = metadata.get("slack") or {}
     channel = slack.get("channel")
     thread_ts = slack.get("thread_ts") or slack.get("message_ts")
     if not channel or not thread_ts:
         return
-    post_thread_message(str(channel), str(thread_ts), text)
+    payload: dict = {"channel": str(channel), "thread_ts": str(thread_ts), "text": text}
+    if blocks:
+        payload["blocks"] = blocks
+    enqueue_slack_message(conn, payload)
 
 
 def _demo_thread_id(alert_id: str) -> str:
@@ -567,35 +561,7 @@ def _load_demo_metadata(conn: Connection, alert_id: str, *, for_update: bool = F
 
 
 def _upsert_demo_metadata(conn: Connection, alert_id: str, metadata: dict) -> None:
-    thread_id = _demo_thread_id(alert_id)
-    checkpoint_bytes = json.dumps({"alert_id": alert_id}).encode("utf-8")
-    metadata_json = json.dumps(metadata or {})
-    exists = conn.execute(
-        text("SELECT 1 FROM langgraph_checkpoints WHERE thread_id = :thread_id"),
-        {"thread_id": thread_id},
-    ).scalar()
-    if exists:
-        conn.execute(
-            text(
-                """
-                UPDATE langgraph_checkpoints
-                SET checkpoint = :checkpoint,
-                    metadata = :metadata
-                WHERE thread_id = :thread_id
-                """
-            ),
-            {"thread_id": thread_id, "checkpoint": checkpoint_bytes, "metadata": metadata_json},
-        )
-        return
-    conn.execute(
-        text(
-            """
-            INSERT INTO langgraph_checkpoints (thread_id, checkpoint, metadata)
-            VALUES (:thread_id, :checkpoint, :metadata)
-            """
-        ),
-        {"thread_id": thread_id, "checkpoint": checkpoint_bytes, "metadata": metadata_json},
-    )
+    upsert_checkpoint(conn, _demo_thread_id(alert_id), {"alert_id": alert_id}, metadata)
 
 
 def _idempotency_seen(metadata: dict, key: str | None) -> bool:
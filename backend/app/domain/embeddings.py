@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import hashlib
+import heapq
 import json
 import math
 import random
-from typing import Any, Iterable
+from typing import Any, Iterable, Mapping, Sequence
 
 from sqlalchemy.engine import Connection
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
+
+from app.db.bulk import DEFAULT_CHUNK_SIZE, chunked
+from app.db.streaming import stream_rows
 
 
 EMBEDDING_DIM = 1024
@@ -39,54 +43,97 @@ def ensure_weekly_report_embeddings(conn: Connection, limit: int = 50) -> int:
         ),
         {"limit": limit},
     ).mappings().all()
+    return _store_report_embeddings(conn, rows)
 
-    if not rows:
-        return 0
 
-    dialect = conn.engine.dialect.name
+def embed_weekly_reports(conn: Connection, report_ids: Sequence[int], *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Embed the given reports that have no vector yet: one SELECT and one executemany UPDATE per chunk."""
     updated = 0
-    for row in rows:
-        content = row.get("content_text") or ""
-        embedding = generate_embedding(content)
-        payload = embedding_to_db_value(embedding, dialect)
-        conn.execute(
+    for chunk in chunked(report_ids, max(1, chunk_size)):
+        rows = conn.execute(
             text(
                 """
-                UPDATE weekly_reports
-                SET content_vector = :embedding
-                WHERE report_id = :report_id
+                SELECT report_id, content_text
+                FROM weekly_reports
+                WHERE report_id IN :ids
+                  AND content_vector IS NULL
                 """
-            ),
-            {"embedding": payload, "report_id": row["report_id"]},
-        )
-        updated += 1
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(chunk)},
+        ).mappings().all()
+        updated += _store_report_embeddings(conn, rows)
     return updated
 
 
+def _store_report_embeddings(conn: Connection, rows: Sequence[Mapping[str, Any]]) -> int:
+    if not rows:
+        return 0
+    dialect = conn.engine.dialect.name
+    conn.execute(
+        text(
+            """
+            UPDATE weekly_reports
+            SET content_vector = :embedding
+            WHERE report_id = :report_id
+            """
+        ),
+        [
+            {
+                "embedding": embedding_to_db_value(generate_embedding(row.get("content_text") or ""), dialect),
+                "report_id": row["report_id"],
+            }
+            for row in rows
+        ],
+    )
+    return len(rows)
+
+
 def search_weekly_reports(
     conn: Connection,
     query_text: str,
     *,
     limit: int = 5,
 ) -> list[dict[str, Any]]:
+    if limit <= 0:
+        return []
     query_embedding = generate_embedding(query_text)
+    # Score vectors as they stream in and keep only the best ``limit`` ids; texts are fetched for those.
+    best: list[tuple[float, int]] = []
+    for row in stream_rows(
+        conn,
+        "SELECT report_id, content_vector FROM weekly_reports WHERE content_vector IS NOT NULL",
+        key="report_id",
+    ):
+        embedding = _parse_embedding(row.get("content_vector"))
+        if not embedding:
+            continue
+        # Ties go to the lower report_id, as in the previous stable sort over report_id order.
+        entry = (_cosine_similarity(query_embedding, embedding), -row["report_id"])
+        if len(best) < limit:
+            heapq.heappush(best, entry)
+        elif entry > best[0]:
+            heapq.heapreplace(best, entry)
+    if not best:
+        return []
+
+    ranked = sorted(best, reverse=True)
     rows = conn.execute(
         text(
             """
-            SELECT report_id, user_id, project_id, reporting_date, content_text, content_vector
+            SELECT report_id, user_id, project_id, reporting_date, content_text
             FROM weekly_reports
-            WHERE content_vector IS NOT NULL
-            ORDER BY report_id
+            WHERE report_id IN :ids
             """
-        )
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"ids": [-negated_id for _, negated_id in ranked]},
     ).mappings().all()
-    scored: list[dict[str, Any]] = []
-    for row in rows:
-        embedding = _parse_embedding(row.get("content_vector"))
-        if not embedding:
+    by_id = {row["report_id"]: row for row in rows}
+    results: list[dict[str, Any]] = []
+    for score, negated_id in ranked:
+        row = by_id.get(-negated_id)
+        if row is None:
             continue
-        score = _cosine_similarity(query_embedding, embedding)
-        scored.append(
+        results.append(
             {
                 "report_id": row["report_id"],
                 "user_id": row.get("user_id"),
@@ -96,8 +143,7 @@ def search_weekly_reports(
                 "score": score,
             }
         )
-    scored.sort(key=lambda item: item.get("score") or 0, reverse=True)
-    return scored[:limit]
+    return results
 
 
 def _parse_embedding(value: Any) -> list[float] | None:
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.queue_utils import as_datetime, decode_json_object, utcnow
+
+EXECUTION_QUEUE_MODE_INLINE = "inline"
+EXECUTION_QUEUE_MODE_QUEUE = "queue"
+
+# ``queue`` hands approved actions to scripts/execution_worker.py; ``inline`` runs them in the request.
+EXECUTION_QUEUE_MODE = os.getenv("EXECUTION_QUEUE_MODE", EXECUTION_QUEUE_MODE_INLINE).strip().lower()
+EXECUTION_MAX_ATTEMPTS = max(1, int(os.getenv("EXECUTION_MAX_ATTEMPTS", "5") or "5"))
+EXECUTION_LEASE_SECONDS = max(10, int(os.getenv("EXECUTION_LEASE_SECONDS", "300") or "300"))
+EXECUTION_RETRY_BASE_SECONDS = max(1.0, float(os.getenv("EXECUTION_RETRY_BASE_SECONDS", "30") or "30"))
+EXECUTION_RETRY_MAX_SECONDS = max(1.0, float(os.getenv("EXECUTION_RETRY_MAX_SECONDS", "3600") or "3600"))
+
+EXECUTION_JOB_STATUSES = ("queued", "running", "succeeded", "dead")
+
+logger = logging.getLogger("saihai.execution_queue")
+
+
+class ExecutionLeaseLost(RuntimeError):
+    """The job's lease expired and another worker took it over; the result must not be committed."""
+
+
+def enqueue_execution_job(
+    conn: Connection,
+    *,
+    job_key: str,
+    thread_id: str,
+    action_id: int,
+    payload: dict[str, Any] | None = None,
+    idempotency_key: str | None = None,
+) -> dict[str, Any]:
+    """Queue an approved action. A second enqueue with the same ``idempotency_key`` returns the first job."""
+    now = utcnow()
+    row = conn.execute(
+        text(
+            """
+            INSERT INTO execution_jobs
+              (job_key, thread_id, action_id, status, payload, idempotency_key, attempts, max_attempts, run_after,
+               created_at)
+            VALUES
+              (:job_key, :thread_id, :action_id, 'queued', :payload, :idempotency_key, 0, :max_attempts, :now, :now)
+            ON CONFLICT (idempotency_key) DO NOTHING
+            RETURNING job_id, job_key, status
+            """
+        ),
+        {
+            "job_key": job_key,
+            "thread_id": thread_id,
+            "action_id": action_id,
+            "payload": json.dumps(payload or {}, ensure_ascii=False),
+            "idempotency_key": idempotency_key,
+            "max_attempts": EXECUTION_MAX_ATTEMPTS,
+            "now": now,
+        },
+    ).mappings().first()
+    if row is None:
+        row = conn.execute(
+            text("SELECT job_id, job_key, status FROM execution_jobs WHERE idempotency_key = :idempotency_key"),
+            {"idempotency_key": idempotency_key},
+        ).mappings().one()
+        return {**dict(row), "enqueued": False}
+    logger.info("execution.enqueued job_id=%s job_key=%s action_id=%s", row["job_id"], job_key, action_id)
+    return {**dict(row), "enqueued": True}
+
+
+def claim_execution_job(
+    conn: Connection,
+    worker_id: str,
+    *,
+    lease_seconds: int = EXECUTION_LEASE_SECONDS,
+) -> dict[str, Any] | None:
+    """Lease the oldest job that is due, or whose previous worker's lease has expired."""
+    now = utcnow()
+    # SQLite serialises writers, so the single UPDATE is already atomic there.
+    lock = "" if conn.dialect.name == "sqlite" else "FOR UPDATE SKIP LOCKED"
+    row = conn.execute(
+        text(
+            f"""
+            UPDATE execution_jobs
+            SET status = 'running',
+                worker_id = :worker_id,
+                attempts = COALESCE(attempts, 0) + 1,
+                started_at = :now,
+                lease_expires_at = :lease_expires_at
+            WHERE job_id = (
+                SELECT job_id
+                FROM execution_jobs
+                WHERE (status = 'queued' AND (run_after IS NULL OR run_after <= :now))
+                   OR (status = 'running' AND lease_expires_at < :now
+                       AND attempts < COALESCE(max_attempts, :max_attempts))
+                ORDER BY job_id
+                LIMIT 1
+                {lock}
+            )
+            RETURNING job_id, job_key, thread_id, action_id, payload, attempts, max_attempts
+            """
+        ),
+        {
+            "worker_id": worker_id,
+            "now": now,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            "max_attempts": EXECUTION_MAX_ATTEMPTS,
+        },
+    ).mappings().first()
+    if not row:
+        return None
+    job = dict(row)
+    job["payload"] = decode_json_object(job.get("payload"))
+    return job
+
+
+def finish_execution_job(conn: Connection, job: dict[str, Any], worker_id: str, result: dict[str, Any]) -> None:
+    """Mark a claimed job succeeded; raises ``ExecutionLeaseLost`` when the lease has moved on."""
+    _update_claimed(
+        conn,
+        job,
+        worker_id,
+        "status = 'succeeded', finished_at = :now, lease_expires_at = NULL, last_error = NULL, payload = :payload",
+        {"payload": json.dumps({**job["payload"], "result": result}, ensure_ascii=False)},
+    )
+
+
+def retry_execution_job(
+    conn: Connection,
+    job: dict[str, Any],
+    worker_id: str,
+    error: str,
+    *,
+    retryable: bool = True,
+    rng: random.Random | None = None,
+) -> str:
+    """Requeue a failed attempt with exponential backoff, or move it to ``dead`` once attempts run out.
+
+    Returns the new status. Raises ``ExecutionLeaseLost`` when the lease has moved on.
+    """
+    attempts = int(job.get("attempts") or 1)
+    max_attempts = int(job.get("max_attempts") or EXECUTION_MAX_ATTEMPTS)
+    if not retryable or attempts >= max_attempts:
+        _update_claimed(
+            conn,
+            job,
+            worker_id,
+            "status = 'dead', finished_at = :now, lease_expires_at = NULL, last_error = :error",
+            {"error": error},
+        )
+        logger.warning("execution.dead job_id=%s attempts=%s error=%s", job["job_id"], attempts, error)
+        return "dead"
+
+    delay = execution_backoff_seconds(attempts, rng=rng)
+    _update_claimed(
+        conn,
+        job,
+        worker_id,
+        "status = 'queued', run_after = :run_after, lease_expires_at = NULL, last_error = :error",
+        {"error": error, "run_after": utcnow() + timedelta(seconds=delay)},
+    )
+    logger.info("execution.retry job_id=%s attempts=%s delay_s=%.1f error=%s", job["job_id"], attempts, delay, error)
+    return "queued"
+
+
+def execution_backoff_seconds(attempts: int, *, rng: random.Random | None = None) -> float:
+    """``base * 2^(attempts-1)`` capped at the maximum, with jitter over its upper half."""
+    ceiling = min(EXECUTION_RETRY_MAX_SECONDS, EXECUTION_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return ceiling * (rng or random).uniform(0.5, 1.0)
+
+
+def bury_abandoned_execution_jobs(conn: Connection) -> list[dict[str, Any]]:
+    """Move jobs whose last allowed attempt lost its worker to ``dead`` and return them."""
+    now = utcnow()
+    rows = conn.execute(
+        text(
+            """
+            UPDATE execution_jobs
+            SET status = 'dead',
+                finished_at = :now,
+                lease_expires_at = NULL,
+                last_error = COALESCE(last_error, 'worker lease expired')
+            WHERE status = 'running'
+              AND lease_expires_at < :now
+              AND attempts >= COALESCE(max_attempts, :max_attempts)
+            RETURNING job_id, job_key, thread_id, action_id, attempts, last_error
+            """
+        ),
+        {"now": now, "max_attempts": EXECUTION_MAX_ATTEMPTS},
+    ).mappings().all()
+    if rows:
+        logger.warning("execution.jobs_abandoned count=%s", len(rows))
+    return [dict(row) for row in rows]
+
+
+def fetch_execution_job(conn: Connection, job_key: str) -> dict[str, Any] | None:
+    row = conn.execute(
+        text(
+            """
+            SELECT job_id, job_key, thread_id, action_id, status, attempts, max_attempts, run_after, worker_id,
+                   started_at, finished_at, last_error, created_at
+            FROM execution_jobs
+            WHERE job_key = :job_key
+            """
+        ),
+        {"job_key": job_key},
+    ).mappings().first()
+    if not row:
+        return None
+    job = dict(row)
+    for key in ("run_after", "started_at", "finished_at", "created_at"):
+        if isinstance(job.get(key), datetime):
+            job[key] = job[key].isoformat()
+    return job
+
+
+def fetch_execution_queue_stats(conn: Connection, *, window_seconds: int = 3600) -> dict[str, Any]:
+    """Queue depth by status, the backlog that is due now, and completions over the last ``window_seconds``."""
+    now = utcnow()
+    since = now - timedelta(seconds=window_seconds)
+    depth = {status: 0 for status in EXECUTION_JOB_STATUSES}
+    for row in conn.execute(text("SELECT status, COUNT(*) AS jobs FROM execution_jobs GROUP BY status")).mappings():
+        depth[str(row["status"])] = int(row["jobs"])
+    ready = conn.execute(
+        text(
+            """
+            SELECT COUNT(*) AS jobs, MIN(run_after) AS oldest
+            FROM execution_jobs
+            WHERE status = 'queued' AND (run_after IS NULL OR run_after <= :now)
+            """
+        ),
+        {"now": now},
+    ).mappings().one()
+    finished = {
+        str(row["status"]): int(row["jobs"])
+        for row in conn.execute(
+            text(
+                """
+                SELECT status, COUNT(*) AS jobs
+                FROM execution_jobs
+                WHERE status IN ('succeeded', 'dead') AND finished_at >= :since
+                GROUP BY status
+                """
+            ),
+            {"since": since},
+        ).mappings()
+    }
+    oldest = as_datetime(ready["oldest"])
+    completed = finished.get("succeeded", 0) + finished.get("dead", 0)
+    return {
+        "mode": EXECUTION_QUEUE_MODE,
+        "depth": depth,
+        "ready": int(ready["jobs"] or 0),
+        "oldest_ready_age_seconds": round((now - oldest).total_seconds(), 1) if oldest else None,
+        "window_seconds": window_seconds,
+        "succeeded": finished.get("succeeded", 0),
+        "dead": finished.get("dead", 0),
+        "throughput_per_minute": round(completed / (window_seconds / 60), 2) if window_seconds else None,
+    }
+
+
+def _update_claimed(
+    conn: Connection,
+    job: dict[str, Any],
+    worker_id: str,
+    assignments: str,
+    params: dict[str, Any],
+) -> None:
+    result = conn.execute(
+        text(
+            f"""
+            UPDATE execution_jobs
+            SET {assignments}
+            WHERE job_id = :job_id
+              AND worker_id = :worker_id
+              AND status = 'running'
+            """
+        ),
+        {**params, "job_id": job["job_id"], "worker_id": worker_id, "now": utcnow()},
+    )
+    if result.rowcount != 1:
+        raise ExecutionLeaseLost(f"execution job {job['job_id']} is no longer leased by {worker_id}")
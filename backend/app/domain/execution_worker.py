@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.queue_utils import run_workers, worker_id_prefix
+from app.domain.execution_queue import (
+    EXECUTION_LEASE_SECONDS,
+    ExecutionLeaseLost,
+    bury_abandoned_execution_jobs,
+    claim_execution_job,
+    finish_execution_job,
+    retry_execution_job,
+)
+from app.domain.external_actions import ExternalActionError
+from app.domain.hitl import fail_execution_job, run_execution_job
+
+EXECUTION_WORKER_CONCURRENCY = max(1, int(os.getenv("EXECUTION_WORKER_CONCURRENCY", "4") or "4"))
+EXECUTION_POLL_SECONDS = max(0.1, float(os.getenv("EXECUTION_POLL_SECONDS", "2") or "2"))
+
+logger = logging.getLogger("saihai.execution.worker")
+
+
+@dataclass
+class ExecutionWorkerStats:
+    claimed: int = 0
+    succeeded: int = 0
+    retried: int = 0
+    dead: int = 0
+    lease_lost: int = 0
+    busy_seconds: float = 0.0
+
+
+class ExecutionWorker:
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        worker_id: str,
+        stop_event: threading.Event,
+        lease_seconds: int = EXECUTION_LEASE_SECONDS,
+        poll_seconds: float = EXECUTION_POLL_SECONDS,
+        exit_when_idle: bool = False,
+    ) -> None:
+        self.engine = engine
+        self.worker_id = worker_id
+        self.stop_event = stop_event
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.exit_when_idle = exit_when_idle
+        self.stats = ExecutionWorkerStats()
+
+    def run_once(self) -> str | None:
+        """Claim and run one job. Returns its new status, or ``None`` when nothing is due."""
+        with self.engine.begin() as conn:
+            for job in bury_abandoned_execution_jobs(conn):
+                fail_execution_job(conn, job, job.get("last_error") or "worker lease expired")
+                self.stats.dead += 1
+            job = claim_execution_job(conn, self.worker_id, lease_seconds=self.lease_seconds)
+        if not job:
+            return None
+
+        self.stats.claimed += 1
+        started = time.perf_counter()
+        logger.info(
+            "execution.claimed job_id=%s job_key=%s worker_id=%s attempt=%s",
+            job["job_id"],
+            job["job_key"],
+            self.worker_id,
+            job["attempts"],
+        )
+        try:
+            with self.engine.begin() as conn:
+                try:
+                    result = run_execution_job(conn, job)
+                except (ExternalActionError, ValueError) as exc:
+                    # Same transaction, so the failed external_action_runs rows are kept with the retry.
+                    status = self._retry(conn, job, str(exc), retryable=isinstance(exc, ExternalActionError))
+                else:
+                    finish_execution_job(conn, job, self.worker_id, {"status": result.status})
+                    status = "succeeded"
+        except ExecutionLeaseLost:
+            logger.warning("execution.result_discarded job_id=%s worker_id=%s", job["job_id"], self.worker_id)
+            self.stats.lease_lost += 1
+            return "lease_lost"
+        except Exception as exc:
+            logger.exception("execution job failed job_id=%s worker_id=%s", job["job_id"], self.worker_id)
+            with self.engine.begin() as conn:
+                status = self._retry(conn, job, str(exc), retryable=True)
+        finally:
+            self.stats.busy_seconds += time.perf_counter() - started
+        if status == "succeeded":
+            self.stats.succeeded += 1
+        return status
+
+    def _retry(self, conn: Connection, job: dict, error: str, *, retryable: bool) -> str:
+        status = retry_execution_job(conn, job, self.worker_id, error, retryable=retryable)
+        if status == "dead":
+            fail_execution_job(conn, job, error)
+            self.stats.dead += 1
+        else:
+            self.stats.retried += 1
+        return status
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                status = self.run_once()
+            except Exception:
+                logger.exception("execution.claim_failed worker_id=%s", self.worker_id)
+                status = None
+            if status is None:
+                if self.exit_when_idle:
+                    return
+                self.stop_event.wait(self.poll_seconds)
+
+
+def serve(
+    engine: Engine,
+    *,
+    concurrency: int = EXECUTION_WORKER_CONCURRENCY,
+    stop_event: threading.Event | None = None,
+    **worker_kwargs: object,
+) -> list[ExecutionWorker]:
+    """Run ``concurrency`` workers until ``stop_event`` is set; in-flight jobs finish before returning."""
+    stop_event = stop_event or threading.Event()
+    prefix = worker_id_prefix("exec")
+    workers = [
+        ExecutionWorker(engine, worker_id=f"{prefix}-{index}", stop_event=stop_event, **worker_kwargs)
+        for index in range(max(1, concurrency))
+    ]
+    return run_workers(workers)
@@ -3,11 +3,12 @@ from __future__ import annotations
 import json
 import logging
 import os
-import urllib.error
-import urllib.request
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable
 from uuid import uuid4
 
 from sqlalchemy import text
@@ -36,6 +37,11 @@ DEFAULT_CALENDAR_ATTENDEE = os.getenv("CALENDAR_DEFAULT_ATTENDEE", DEFAULT_EMAIL
 DEFAULT_CALENDAR_TIMEZONE = os.getenv("CALENDAR_DEFAULT_TIMEZONE", "Asia/Tokyo")
 DEFAULT_CALENDAR_OWNER_EMAIL = os.getenv("CALENDAR_DEFAULT_OWNER_EMAIL", "")
 
+EXTERNAL_ACTION_TIMEOUT_SECONDS = max(1.0, float(os.getenv("EXTERNAL_ACTION_TIMEOUT_SECONDS", "10") or "10"))
+EXTERNAL_BATCH_DEADLINE_SECONDS = max(1.0, float(os.getenv("EXTERNAL_BATCH_DEADLINE_SECONDS", "20") or "20"))
+EXTERNAL_BATCH_CONCURRENCY = max(1, int(os.getenv("EXTERNAL_BATCH_CONCURRENCY", "4") or "4"))
+_BATCH_POLL_SECONDS = 0.1
+
 logger = logging.getLogger("saihai.external_actions")
 
 
@@ -105,6 +111,10 @@ def execute_external_action(
     if isinstance(raw_payload.get("actions"), list):
         return _execute_batch_actions(conn, job_id, action_id, raw_payload.get("actions") or [])
 
+    # A retried queue job must not repeat an action an earlier attempt already completed.
+    if _succeeded_run_keys(conn, job_id):
+        return None
+
     if payload_override:
         payload = _coerce_payload(action_type, payload_override)
     else:
@@ -191,22 +201,16 @@ def _create_calendar_event(conn: Connection, payload: CalendarPayload) -> dict[s
     raise RuntimeError(f"unsupported CALENDAR_PROVIDER={CALENDAR_PROVIDER}")
 
 
-def _send_hr_request(payload: dict[str, Any]) -> dict[str, Any]:
+def _send_hr_request(payload: dict[str, Any], *, timeout: float = EXTERNAL_ACTION_TIMEOUT_SECONDS) -> dict[str, Any]:
     if HR_PROVIDER != "mock":
         if not HR_API_URL:
             raise RuntimeError("HR_API_URL is not configured")
-        data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(
-            HR_API_URL,
-            data=data,
-            headers={"Content-Type": "application/json; charset=utf-8"},
-            method="POST",
-        )
         try:
-            with urllib.request.urlopen(request, timeout=10) as response:
-                body = response.read().decode("utf-8")
-        except urllib.error.URLError as exc:
+            # No client-side retries: a retried job re-sends, and waiting on Retry-After would outlive the deadline.
+            response = get_http_client().post_json(HR_API_URL, payload, timeout=timeout, retries=0)
+        except HttpClientError as exc:
             raise RuntimeError(f"HR API error: {exc}") from exc
+        body = response.text()
         try:
             return json.loads(body)
         except json.JSONDecodeError:
@@ -233,6 +237,11 @@ def _resolve_calendar_owner(payload: dict[str, Any]) -> tuple[str | None, str |
 
 
 def _create_google_calendar_event(conn: Connection, payload: CalendarPayload) -> dict[str, Any]:
+    access_token, event_payload = _prepare_google_calendar_event(conn, payload)
+    return create_google_calendar_event(access_token, event_payload)
+
+
+def _prepare_google_calendar_event(conn: Connection, payload: CalendarPayload) -> tuple[str, dict[str, Any]]:
     token = _resolve_google_oauth_token(conn, payload)
     access_token = token.access_token
     expires_at = token.expires_at
@@ -242,7 +251,7 @@ def _create_google_calendar_event(conn: Connection, payload: CalendarPayload) ->
     event_payload = _payload_to_dict(payload)
     event_payload.pop("owner_email", None)
     event_payload.pop("owner_user_id", None)
-    return create_google_calendar_event(access_token, event_payload)
+    return access_token, event_payload
 
 
 def _resolve_google_oauth_token(conn: Connection, payload: CalendarPayload) -> GoogleOAuthToken:
@@ -320,47 +329,70 @@ def _execute_single_action(
     raise_on_error: bool = True,
 ) -> ExternalActionRun:
     payload = _coerce_payload(action_type, payload)
-    if action_type == ACTION_TYPE_EMAIL:
-        provider_name = EMAIL_PROVIDER
-    elif action_type == ACTION_TYPE_CALENDAR:
-        provider_name = CALENDAR_PROVIDER
-    else:
-        provider_name = HR_PROVIDER
-
     response: dict[str, Any] | None = None
     error: str | None = None
-    status = "succeeded"
     try:
-        if action_type == ACTION_TYPE_EMAIL:
-            response = _send_email(payload)
-        elif action_type == ACTION_TYPE_HR:
-            response = _send_hr_request(payload)
-        else:
-            response = _create_calendar_event(conn, payload)
+        response = _prepare_call(conn, action_type, payload)(EXTERNAL_ACTION_TIMEOUT_SECONDS)
     except Exception as exc:
-        status = "failed"
         error = str(exc)
 
-    run_id = f"ext-{uuid4().hex[:12]}"
-    executed_at = datetime.now(timezone.utc).isoformat()
+    result = _record_run(conn, job_id, action_id, action_type, payload, response, error)
+    if result.status != "succeeded" and raise_on_error:
+        raise ExternalActionError(error or "external action failed")
+    return result
+
+
+def _prepare_call(
+    conn: Connection,
+    action_type: str,
+    payload: EmailPayload | CalendarPayload | dict[str, Any],
+) -> Callable[[float], dict[str, Any]]:
+    """Do the database work of an action here and return its provider call, which needs no connection.
+
+    The call takes the seconds it has left and sends once with that socket timeout, so it ends close to its
+    deadline instead of finishing (and succeeding unrecorded) after the batch gave up on it.
+    """
+    if action_type == ACTION_TYPE_EMAIL:
+        return lambda timeout: _send_email(payload)
+    if action_type == ACTION_TYPE_HR:
+        return lambda timeout: _send_hr_request(payload, timeout=timeout)
+    if CALENDAR_PROVIDER == "google":
+        access_token, event_payload = _prepare_google_calendar_event(conn, payload)
+        return lambda timeout: create_google_calendar_event(access_token, event_payload, timeout=timeout, retries=0)
+    return lambda timeout: _create_calendar_event(conn, payload)
+
+
+def _record_run(
+    conn: Connection,
+    job_id: str,
+    action_id: int,
+    action_type: str,
+    payload: EmailPayload | CalendarPayload | dict[str, Any],
+    response: dict[str, Any] | None,
+    error: str | None,
+) -> ExternalActionRun:
+    if action_type == ACTION_TYPE_EMAIL:
+        provider_name = EMAIL_PROVIDER
+    elif action_type == ACTION_TYPE_CALENDAR:
+        provider_name = CALENDAR_PROVIDER
+    else:
+        provider_name = HR_PROVIDER
     result = ExternalActionRun(
-        run_id=run_id,
-        status=status,
+        run_id=f"ext-{uuid4().hex[:12]}",
+        status="failed" if error is not None else "succeeded",
         provider=provider_name,
         action_type=action_type,
         job_id=job_id,
         action_id=action_id,
         response=response,
         error=error,
-        executed_at=executed_at,
+        executed_at=datetime.now(timezone.utc).isoformat(),
     )
     _record_external_action_run(
         conn,
         result,
         payload=_payload_to_dict(payload),
     )
-    if status != "succeeded" and raise_on_error:
-        raise ExternalActionError(error or "external action failed")
     return result
 
 
@@ -402,35 +434,131 @@ def _execute_batch_actions(
     action_id: int,
     actions: list[dict[str, Any]],
 ) -> list[ExternalActionRun]:
-    results: list[ExternalActionRun] = []
-    errors: list[str] = []
-    for item in actions:
+    """Run the batch's provider calls concurrently and record every outcome, failures included.
+
+    Each call gets ``EXTERNAL_ACTION_TIMEOUT_SECONDS`` from its start and the batch as a whole
+    ``EXTERNAL_BATCH_DEADLINE_SECONDS``; a call past either is recorded as failed and its result is
+    discarded. Non-calendar failures are raised together afterwards, in batch order.
+    """
+    completed = _succeeded_run_keys(conn, job_id)
+    planned: list[tuple[int, str, Any]] = []
+    errors_at: dict[int, str] = {}
+    outcomes: dict[int, tuple[dict[str, Any] | None, str | None]] = {}
+    calls: dict[int, Callable[[float], dict[str, Any]]] = {}
+    for index, item in enumerate(actions):
         action_type = str(item.get("type") or item.get("action_type") or "")
-        payload = item.get("payload") if isinstance(item.get("payload"), dict) else {}
+        raw_payload = item.get("payload") if isinstance(item.get("payload"), dict) else {}
         if action_type not in (ACTION_TYPE_EMAIL, ACTION_TYPE_CALENDAR, ACTION_TYPE_HR):
             continue
         try:
-            run = _execute_single_action(
-                conn,
-                job_id,
-                action_id,
-                action_type,
-                payload,
-                raise_on_error=False,
-            )
-            results.append(run)
-            if run.status != "succeeded":
-                if run.action_type == ACTION_TYPE_CALENDAR:
-                    _log_calendar_failure(action_id, job_id, payload, run.error)
-                else:
-                    errors.append(run.error or "unknown error")
+            payload = _coerce_payload(action_type, raw_payload)
+        except Exception as exc:
+            errors_at[index] = str(exc)
+            continue
+        key = _run_key(action_type, _payload_to_dict(payload))
+        if completed[key]:
+            # Done by an earlier attempt of this job.
+            completed[key] -= 1
+            continue
+        planned.append((index, action_type, payload))
+        try:
+            calls[index] = _prepare_call(conn, action_type, payload)
         except Exception as exc:
-            errors.append(str(exc))
-    if errors:
-        raise ExternalActionError("; ".join(errors))
+            outcomes[index] = (None, str(exc))
+
+    outcomes.update(_run_calls_concurrently(calls))
+
+    results: list[ExternalActionRun] = []
+    for index, action_type, payload in planned:
+        response, error = outcomes[index]
+        run = _record_run(conn, job_id, action_id, action_type, payload, response, error)
+        results.append(run)
+        if run.status != "succeeded":
+            if run.action_type == ACTION_TYPE_CALENDAR:
+                _log_calendar_failure(action_id, job_id, payload, run.error)
+            else:
+                errors_at[index] = run.error or "unknown error"
+    if errors_at:
+        raise ExternalActionError("; ".join(errors_at[index] for index in sorted(errors_at)))
     return results
 
 
+def _run_calls_concurrently(
+    calls: dict[int, Callable[[float], dict[str, Any]]],
+) -> dict[int, tuple[dict[str, Any] | None, str | None]]:
+    if not calls:
+        return {}
+    outcomes: dict[int, tuple[dict[str, Any] | None, str | None]] = {}
+    started: dict[int, float] = {}
+
+    batch_started = time.monotonic()
+    batch_deadline = batch_started + EXTERNAL_BATCH_DEADLINE_SECONDS
+
+    def _run(index: int, call: Callable[[float], dict[str, Any]]) -> dict[str, Any]:
+        started[index] = now = time.monotonic()
+        return call(max(_BATCH_POLL_SECONDS, min(EXTERNAL_ACTION_TIMEOUT_SECONDS, batch_deadline - now)))
+    executor = ThreadPoolExecutor(
+        max_workers=min(len(calls), EXTERNAL_BATCH_CONCURRENCY), thread_name_prefix="external-action"
+    )
+    futures = {executor.submit(_run, index, call): index for index, call in calls.items()}
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            deadlines = {
+                future: min(batch_deadline, started[futures[future]] + EXTERNAL_ACTION_TIMEOUT_SECONDS)
+                if futures[future] in started
+                else batch_deadline
+                for future in pending
+            }
+            for future in [future for future in pending if deadlines[future] <= now]:
+                index = futures[future]
+                pending.discard(future)
+                future.cancel()
+                waited = now - started.get(index, batch_started)
+                outcomes[index] = (None, f"timed out after {waited:.1f}s")
+                logger.warning("external action timed out index=%s waited_s=%.1f", index, waited)
+            if not pending:
+                break
+            # Calls that start while we wait get their own deadline on the next pass.
+            timeout = min(min(deadlines[future] for future in pending) - now, _BATCH_POLL_SECONDS)
+            done, _ = wait(pending, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                try:
+                    outcomes[futures[future]] = (future.result(), None)
+                except Exception as exc:
+                    outcomes[futures[future]] = (None, str(exc))
+    finally:
+        # Timed-out calls cannot be interrupted; their socket timeout ends them shortly after the deadline.
+        executor.shutdown(wait=False, cancel_futures=True)
+    return outcomes
+
+
+def _succeeded_run_keys(conn: Connection, job_id: str) -> Counter[tuple[str, str]]:
+    rows = conn.execute(
+        text(
+            """
+            SELECT action_type, payload
+            FROM external_action_runs
+            WHERE job_id = :job_id AND status = 'succeeded'
+            """
+        ),
+        {"job_id": job_id},
+    ).mappings()
+    keys: Counter[tuple[str, str]] = Counter()
+    for row in rows:
+        payload = row["payload"]
+        if isinstance(payload, (str, bytes)):
+            payload = json.loads(payload)
+        keys[_run_key(row["action_type"], payload)] += 1
+    return keys
+
+
+def _run_key(action_type: str, payload: dict[str, Any]) -> tuple[str, str]:
+    return action_type, json.dumps(payload, sort_keys=True, ensure_ascii=False)
+
+
 def _payload_to_dict(payload: EmailPayload | CalendarPayload | dict[str, Any]) -> dict[str, Any]:
     if isinstance(payload, EmailPayload):
         return {"to": payload.to, "subject": payload.subject, "body": payload.body, "from": payload.sender}
@@ -1,5 +1,6 @@
 ﻿from __future__ import annotations
 
+import base64
 import json
 import logging
 from dataclasses import dataclass
@@ -8,7 +9,7 @@ from typing import Any
 from uuid import uuid4
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.engine import Connection
 
 from app.domain.external_actions import (
@@ -23,7 +24,19 @@ from app.domain.external_actions import (
     _extract_payload_from_draft,
     execute_external_action,
 )
-from app.integrations.slack import SlackMeta, post_thread_message, send_approval_message
+from app.domain.execution_queue import (
+    EXECUTION_QUEUE_MODE,
+    EXECUTION_QUEUE_MODE_QUEUE,
+    enqueue_execution_job,
+)
+from app.domain.slack_outbox import enqueue_slack_message, enqueue_thread_message, register_slack_outbox_callback
+from app.integrations.slack import (
+    SlackMeta,
+    build_approval_payload,
+    send_approval_message,
+    slack_bot_configured,
+    slack_meta_from_response,
+)
 
 
 @dataclass
@@ -43,6 +56,12 @@ class ExecutionJobResult:
     action_id: int
 
 
+@dataclass
+class HistoryPage:
+    entries: list[dict[str, Any]]
+    next_cursor: str | None = None
+
+
 HITL_STATUS_DRAFTED = "drafted"
 HITL_STATUS_PENDING = "approval_pending"
 HITL_STATUS_APPROVED = "approved"
@@ -51,6 +70,10 @@ HITL_STATUS_EXECUTING = "executing"
 HITL_STATUS_DONE = "executed"
 HITL_STATUS_FAILED = "failed"
 
+AUDIT_PAGE_SIZE = 200
+# Slack outbox callback that records a queued approval message's channel/ts on its thread.
+SLACK_APPROVAL_POSTED = "hitl.approval_posted"
+
 logger = logging.getLogger("saihai.hitl")
 
 
@@ -110,7 +133,15 @@ def request_approval(
     requested_by: str | None,
     idempotency_key: str | None = None,
     summary: str | None = None,
+    *,
+    defer_slack: bool = False,
 ) -> ApprovalResult:
+    """Open an approval thread for ``action_id`` and post its Slack approval message.
+
+    ``defer_slack`` queues the message in the Slack outbox instead of posting it before returning (the
+    watchdog does this so a large cycle is not paced by Slack's rate limits); the thread's Slack
+    metadata is filled in once the message is delivered. A message that cannot be posted now is queued too.
+    """
     action = _load_action(conn, action_id)
     if not action:
         raise ValueError("action not found")
@@ -156,7 +187,9 @@ def request_approval(
         }
     )
 
-    metadata = _append_audit(
+    _append_audit(
+        conn,
+        thread_id,
         metadata,
         event_type="approval_requested",
         actor=requested_by,
@@ -165,15 +198,25 @@ def request_approval(
     )
 
     slack_existing = _slack_meta_from_metadata(metadata)
-    slack_meta = send_approval_message(
-        action_id=action_id,
-        approval_request_id=approval_request_id,
-        thread_id=thread_id,
-        summary=summary,
-        draft=action.get("draft_content"),
-        channel=slack_existing.channel if slack_existing else None,
-        thread_ts=slack_existing.thread_ts if slack_existing else None,
-    )
+    message = {
+        "action_id": action_id,
+        "approval_request_id": approval_request_id,
+        "thread_id": thread_id,
+        "summary": summary,
+        "draft": action.get("draft_content"),
+        "channel": slack_existing.channel if slack_existing else None,
+        "thread_ts": slack_existing.thread_ts if slack_existing else None,
+    }
+    # With a bot token a failed post is queued to the outbox, so it must not also go out through the webhook.
+    queue_failures = slack_bot_configured()
+    slack_meta = None if defer_slack else send_approval_message(**message, webhook_fallback=not queue_failures)
+    if not slack_meta and (defer_slack or queue_failures):
+        enqueue_slack_message(
+            conn,
+            build_approval_payload(**message),
+            on_delivered=SLACK_APPROVAL_POSTED,
+            context={"thread_id": thread_id, "approval_request_id": approval_request_id},
+        )
     if slack_meta:
         metadata["slack"] = {
             "channel": slack_meta.channel,
@@ -183,7 +226,7 @@ def request_approval(
 
     metadata = _apply_tentative_calendar_hold(conn, action_id, action, metadata)
 
-    _upsert_checkpoint(conn, thread_id, state, metadata)
+    upsert_checkpoint(conn, thread_id, state, metadata)
 
     conn.execute(
         text(
@@ -255,14 +298,16 @@ def approve_request(
     _record_idempotency_key(metadata, idempotency_key)
 
     metadata["status"] = HITL_STATUS_APPROVED
-    metadata = _append_audit(
+    _append_audit(
+        conn,
+        thread_id,
         metadata,
         event_type="approval_approved",
         actor=actor,
         correlation_id=approval_request_id,
         detail={"action_id": action_id},
     )
-    _upsert_checkpoint(conn, thread_id, checkpoint, metadata)
+    upsert_checkpoint(conn, thread_id, checkpoint, metadata)
 
     conn.execute(
         text(
@@ -301,14 +346,16 @@ def reject_request(
         return
     _record_idempotency_key(metadata, idempotency_key)
     metadata["status"] = HITL_STATUS_REJECTED
-    metadata = _append_audit(
+    _append_audit(
+        conn,
+        thread_id,
         metadata,
         event_type="approval_rejected",
         actor=actor,
         correlation_id=approval_request_id,
         detail={"action_id": action_id},
     )
-    _upsert_checkpoint(conn, thread_id, checkpoint, metadata)
+    upsert_checkpoint(conn, thread_id, checkpoint, metadata)
 
     if action_id:
         conn.execute(
@@ -329,7 +376,7 @@ def reject_request(
         action_id,
         approval_request_id,
     )
-    _upsert_checkpoint(conn, thread_id, checkpoint, metadata)
+    upsert_checkpoint(conn, thread_id, checkpoint, metadata)
 
     if action_id:
         conn.execute(
@@ -388,14 +435,16 @@ def apply_steer(
     checkpoint = checkpoint or {}
     checkpoint.update({"draft": updated_draft, "feedback": feedback, "selected_plan": selected_plan})
     metadata["status"] = HITL_STATUS_DRAFTED
-    metadata = _append_audit(
+    _append_audit(
+        conn,
+        thread_id,
         metadata,
         event_type="human_feedback_received",
         actor=actor,
         correlation_id=approval_request_id,
         detail={"feedback": feedback, "selected_plan": selected_plan},
     )
-    _upsert_checkpoint(conn, thread_id, checkpoint, metadata)
+    upsert_checkpoint(conn, thread_id, checkpoint, metadata)
 
     logger.info(
         "steer applied thread_id=%s action_id=%s approval_request_id=%s",
@@ -442,17 +491,30 @@ def process_execution_job(
         )
 
     job_id = f"job-{uuid4().hex[:12]}"
+    queued = EXECUTION_QUEUE_MODE == EXECUTION_QUEUE_MODE_QUEUE
+    if queued:
+        job = enqueue_execution_job(
+            conn,
+            job_key=job_id,
+            thread_id=thread_id,
+            action_id=action_id,
+            payload={"simulate_failure": simulate_failure, "payload_override": payload_override},
+            idempotency_key=f"execute:{thread_id}",
+        )
+        job_id = str(job["job_key"])
     metadata["status"] = HITL_STATUS_EXECUTING
     metadata["execution_job_id"] = job_id
     metadata["execution_status"] = HITL_STATUS_EXECUTING
-    metadata = _append_audit(
+    _append_audit(
+        conn,
+        thread_id,
         metadata,
-        event_type="execution_started",
+        event_type="execution_queued" if queued else "execution_started",
         actor="worker",
         correlation_id=job_id,
         detail={"action_id": action_id},
     )
-    _upsert_checkpoint(conn, thread_id, checkpoint, metadata)
+    upsert_checkpoint(conn, thread_id, checkpoint, metadata)
 
     conn.execute(
         text(
@@ -465,14 +527,78 @@ def process_execution_job(
         {"status": HITL_STATUS_EXECUTING, "action_id": action_id},
     )
 
-    if simulate_failure:
-        return _mark_failed(conn, thread_id, checkpoint, metadata, job_id, action_id, "simulated failure")
+    if queued:
+        logger.info("execution queued thread_id=%s action_id=%s job_id=%s", thread_id, action_id, job_id)
+        return ExecutionJobResult(job_id=job_id, status=HITL_STATUS_EXECUTING, thread_id=thread_id, action_id=action_id)
 
     try:
-        execute_external_action(conn, job_id=job_id, action_id=action_id, payload_override=payload_override)
+        _run_external_action(conn, job_id, action_id, simulate_failure, payload_override)
     except (ExternalActionError, ValueError) as exc:
         return _mark_failed(conn, thread_id, checkpoint, metadata, job_id, action_id, str(exc))
+    return _mark_succeeded(conn, thread_id, checkpoint, metadata, job_id, action_id)
+
+
+def run_execution_job(conn: Connection, job: dict[str, Any]) -> ExecutionJobResult:
+    """Run a job claimed from the execution queue and record its success on the checkpoint.
+
+    Failures raise (``ExternalActionError`` is worth retrying, ``ValueError`` is not) so the worker can
+    requeue or bury the job. A job whose checkpoint already records its outcome is not run again.
+    """
+    thread_id = str(job["thread_id"])
+    action_id = int(job["action_id"])
+    job_id = str(job["job_key"])
+    checkpoint, metadata = _load_checkpoint(conn, thread_id)
+    metadata = metadata or {}
+    status = metadata.get("execution_status")
+    if metadata.get("execution_job_id") == job_id and status in {HITL_STATUS_DONE, HITL_STATUS_FAILED}:
+        return ExecutionJobResult(job_id=job_id, status=str(status), thread_id=thread_id, action_id=action_id)
+
+    if int(job.get("attempts") or 1) == 1:
+        _append_audit(
+            conn,
+            thread_id,
+            metadata,
+            event_type="execution_started",
+            actor="worker",
+            correlation_id=job_id,
+            detail={"action_id": action_id},
+        )
+    payload = job.get("payload") or {}
+    _run_external_action(
+        conn, job_id, action_id, bool(payload.get("simulate_failure")), payload.get("payload_override")
+    )
+    return _mark_succeeded(conn, thread_id, checkpoint, metadata, job_id, action_id)
+
+
+def fail_execution_job(conn: Connection, job: dict[str, Any], error_message: str) -> ExecutionJobResult:
+    """Record a dead-lettered execution job as failed on its checkpoint and notify the thread."""
+    thread_id = str(job["thread_id"])
+    checkpoint, metadata = _load_checkpoint(conn, thread_id)
+    return _mark_failed(
+        conn, thread_id, checkpoint, metadata or {}, str(job["job_key"]), int(job["action_id"]), error_message
+    )
+
+
+def _run_external_action(
+    conn: Connection,
+    job_id: str,
+    action_id: int,
+    simulate_failure: bool,
+    payload_override: dict[str, Any] | None,
+) -> None:
+    if simulate_failure:
+        raise ExternalActionError("simulated failure")
+    execute_external_action(conn, job_id=job_id, action_id=action_id, payload_override=payload_override)
 
+
+def _mark_succeeded(
+    conn: Connection,
+    thread_id: str,
+    checkpoint: dict[str, Any] | None,
+    metadata: dict[str, Any],
+    job_id: str,
+    action_id: int,
+) -> ExecutionJobResult:
     conn.execute(
         text(
             """
@@ -486,25 +612,46 @@ def process_execution_job(
 
     metadata["status"] = HITL_STATUS_DONE
     metadata["execution_status"] = HITL_STATUS_DONE
-    metadata = _append_audit(
+    _append_audit(
+        conn,
+        thread_id,
         metadata,
         event_type="execution_succeeded",
         actor="worker",
         correlation_id=job_id,
         detail={"action_id": action_id},
     )
-    _upsert_checkpoint(conn, thread_id, checkpoint, metadata)
+    upsert_checkpoint(conn, thread_id, checkpoint, metadata)
 
-    _notify_execution_result(metadata, thread_id, action_id, job_id, HITL_STATUS_DONE, None)
+    _notify_execution_result(conn, metadata, thread_id, action_id, job_id, HITL_STATUS_DONE, None)
 
     logger.info("execution succeeded thread_id=%s action_id=%s job_id=%s", thread_id, action_id, job_id)
 
     return ExecutionJobResult(job_id=job_id, status=HITL_STATUS_DONE, thread_id=thread_id, action_id=action_id)
 
 
-def fetch_audit_logs(conn: Connection, thread_id: str) -> list[dict[str, Any]]:
-    _, _, metadata = _load_checkpoint(conn, thread_id)
-    return list(metadata.get("audit_events") or []) if metadata else []
+def fetch_audit_logs(
+    conn: Connection,
+    thread_id: str,
+    *,
+    after: int | None = None,
+    limit: int = AUDIT_PAGE_SIZE,
+) -> list[dict[str, Any]]:
+    """Audit events of ``thread_id`` in order, ``limit`` at a time after the ``audit_id`` ``after``."""
+    rows = conn.execute(
+        text(
+            f"""
+            SELECT audit_id, thread_id, event_type, actor, correlation_id, detail, created_at
+            FROM hitl_audit_logs
+            WHERE thread_id = :thread_id
+              {"AND audit_id > :after" if after is not None else ""}
+            ORDER BY audit_id
+            LIMIT :limit
+            """
+        ),
+        {"thread_id": thread_id, "after": after, "limit": max(1, limit)},
+    ).mappings().all()
+    return [_audit_event(row) for row in rows]
 
 
 def fetch_history(
@@ -514,49 +661,156 @@ def fetch_history(
     project_id: str | None = None,
     limit: int = 50,
 ) -> list[dict[str, Any]]:
+    return fetch_history_page(conn, status=status, project_id=project_id, limit=limit).entries
+
+
+def fetch_history_page(
+    conn: Connection,
+    *,
+    status: str | None = None,
+    project_id: str | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+    compact: bool = False,
+) -> HistoryPage:
+    """Newest-first approval threads, ``limit`` at a time; pass the returned ``next_cursor`` back for more.
+
+    ``compact`` leaves out each thread's audit events.
+    """
+    filters = []
+    params: dict[str, Any] = {"status": status, "project_id": project_id, "limit": max(1, limit)}
+    if status:
+        filters.append("status = :status")
+    if project_id:
+        filters.append("project_id = :project_id")
+    if cursor:
+        params["cursor_updated_at"], params["cursor_thread_id"] = _decode_history_cursor(cursor)
+        filters.append(
+            "(updated_at < :cursor_updated_at OR (updated_at = :cursor_updated_at AND thread_id < :cursor_thread_id))"
+        )
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
     rows = conn.execute(
-        text("SELECT thread_id, checkpoint, metadata FROM langgraph_checkpoints")
+        text(
+            f"""
+            SELECT thread_id, checkpoint, metadata, updated_at
+            FROM langgraph_checkpoints
+            {where}
+            ORDER BY updated_at DESC, thread_id DESC
+            LIMIT :limit
+            """
+        ),
+        params,
     ).mappings().all()
-    results: list[dict[str, Any]] = []
+
+    checkpoints = {row["thread_id"]: _deserialize_blob(row.get("checkpoint")) or {} for row in rows}
+    actions = _load_actions(conn, [int(checkpoint.get("action_id") or 0) for checkpoint in checkpoints.values()])
+    events_by_thread = {} if compact else _audit_events_by_thread(conn, list(checkpoints))
+    entries: list[dict[str, Any]] = []
     for row in rows:
         metadata = _deserialize_json(row.get("metadata"))
         if not isinstance(metadata, dict):
             continue
-        if project_id and str(metadata.get("project_id") or "") != project_id:
-            continue
-        current_status = str(metadata.get("status") or "")
-        if status and current_status != status:
-            continue
-
-        checkpoint = _deserialize_blob(row.get("checkpoint")) or {}
-        action_id = int(checkpoint.get("action_id") or 0)
-        action = _load_action(conn, action_id) if action_id else None
-        draft_summary = (action or {}).get("draft_content") or ""
+        action_id = int(checkpoints[row["thread_id"]].get("action_id") or 0)
+        action = actions.get(action_id) or {}
+        draft_summary = action.get("draft_content") or ""
         if len(draft_summary) > 160:
             draft_summary = draft_summary[:160] + "..."
+        entry = {
+            "thread_id": row["thread_id"],
+            "action_id": action_id,
+            "status": str(metadata.get("status") or "") or action.get("status"),
+            "summary": draft_summary,
+            "project_id": metadata.get("project_id"),
+            "severity": metadata.get("severity"),
+            "updated_at": _utc_isoformat(row.get("updated_at")) or str(metadata.get("requested_at") or ""),
+        }
+        if not compact:
+            entry["events"] = events_by_thread.get(row["thread_id"], [])
+        entries.append(entry)
 
-        events = list(metadata.get("audit_events") or [])
-        updated_at = ""
-        if events:
-            updated_at = str(events[-1].get("created_at") or "")
-        else:
-            updated_at = str(metadata.get("requested_at") or "")
-
-        results.append(
-            {
-                "thread_id": row.get("thread_id"),
-                "action_id": action_id,
-                "status": current_status or (action or {}).get("status"),
-                "summary": draft_summary,
-                "project_id": metadata.get("project_id"),
-                "severity": metadata.get("severity"),
-                "updated_at": updated_at,
-                "events": events,
-            }
-        )
+    next_cursor = None
+    if len(rows) == params["limit"] and rows[-1].get("updated_at") is not None:
+        next_cursor = _encode_history_cursor(rows[-1]["updated_at"], rows[-1]["thread_id"])
+    return HistoryPage(entries=entries, next_cursor=next_cursor)
+
+
+def _encode_history_cursor(updated_at: Any, thread_id: str) -> str:
+    raw = json.dumps([_utc_isoformat(updated_at), thread_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
 
-    results.sort(key=lambda item: item.get("updated_at") or "", reverse=True)
-    return results[:limit]
+
+def _decode_history_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, thread_id = json.loads(raw)
+        parsed = datetime.fromisoformat(updated_at)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("invalid history cursor") from exc
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed, str(thread_id)
+
+
+def _load_actions(conn: Connection, action_ids: list[int]) -> dict[int, dict[str, Any]]:
+    action_ids = sorted({action_id for action_id in action_ids if action_id})
+    if not action_ids:
+        return {}
+    rows = conn.execute(
+        text(
+            """
+            SELECT action_id, status, draft_content
+            FROM autonomous_actions
+            WHERE action_id IN :action_ids
+            """
+        ).bindparams(bindparam("action_ids", expanding=True)),
+        {"action_ids": action_ids},
+    ).mappings()
+    return {row["action_id"]: dict(row) for row in rows}
+
+
+def _audit_events_by_thread(conn: Connection, thread_ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+    if not thread_ids:
+        return {}
+    rows = conn.execute(
+        text(
+            """
+            SELECT audit_id, thread_id, event_type, actor, correlation_id, detail, created_at
+            FROM hitl_audit_logs
+            WHERE thread_id IN :thread_ids
+            ORDER BY audit_id
+            """
+        ).bindparams(bindparam("thread_ids", expanding=True)),
+        {"thread_ids": thread_ids},
+    ).mappings()
+    events: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        events.setdefault(row["thread_id"], []).append(_audit_event(row))
+    return events
+
+
+def _audit_event(row: Any) -> dict[str, Any]:
+    detail = _deserialize_json(row.get("detail"))
+    return {
+        "audit_id": row["audit_id"],
+        "event_type": row["event_type"],
+        "actor": row.get("actor"),
+        "correlation_id": row.get("correlation_id"),
+        "detail": detail if isinstance(detail, dict) else {},
+        "created_at": _utc_isoformat(row.get("created_at")),
+    }
+
+
+def _utc_isoformat(value: Any) -> str:
+    if value is None:
+        return ""
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return str(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
 
 
 def _load_action(conn: Connection, action_id: int) -> dict[str, Any] | None:
@@ -594,74 +848,174 @@ def _load_checkpoint(conn: Connection, thread_id: str) -> tuple[dict[str, Any] |
 def _find_by_approval_id(
     conn: Connection, approval_request_id: str
 ) -> tuple[str | None, dict[str, Any] | None, dict[str, Any] | None]:
-    rows = conn.execute(
-        text("SELECT thread_id, checkpoint, metadata FROM langgraph_checkpoints")
-    ).mappings().all()
-    for row in rows:
-        metadata = _deserialize_json(row.get("metadata"))
-        if not isinstance(metadata, dict):
+    row = conn.execute(
+        text(
+            """
+            SELECT thread_id, checkpoint, metadata
+            FROM langgraph_checkpoints
+            WHERE approval_request_id = :approval_request_id
+            LIMIT 1
+            """
+        ),
+        {"approval_request_id": approval_request_id},
+    ).mappings().first()
+    if not row:
+        return None, None, None
+    metadata = _deserialize_json(row.get("metadata"))
+    if not isinstance(metadata, dict):
+        return None, None, None
+    return row["thread_id"], _deserialize_blob(row.get("checkpoint")), metadata
+
+
+def find_approval_by_slack_ts(conn: Connection, ts: str) -> str | None:
+    """Approval request id of the checkpoint whose Slack thread or message has timestamp ``ts``."""
+    return conn.execute(
+        text(
+            """
+            SELECT approval_request_id
+            FROM langgraph_checkpoints
+            WHERE approval_request_id IS NOT NULL
+              AND (slack_thread_ts = :ts OR slack_message_ts = :ts)
+            LIMIT 1
+            """
+        ),
+        {"ts": ts},
+    ).scalar()
+
+
+def checkpoint_lookup_columns(metadata: dict[str, Any]) -> dict[str, Any]:
+    """Indexed copies of the metadata fields that checkpoints are looked up and listed by."""
+    slack = metadata.get("slack") if isinstance(metadata.get("slack"), dict) else {}
+    return {
+        "approval_request_id": metadata.get("approval_request_id") or None,
+        "slack_thread_ts": slack.get("thread_ts") or None,
+        "slack_message_ts": slack.get("message_ts") or None,
+        "status": metadata.get("status") or None,
+        "project_id": metadata.get("project_id") or None,
+        "updated_at": _metadata_updated_at(metadata),
+    }
+
+
+def _metadata_updated_at(metadata: dict[str, Any]) -> datetime:
+    candidates = [metadata.get("updated_at")]
+    # Checkpoints written before the audit log table still carry their events inline.
+    events = metadata.get("audit_events") or []
+    if events and isinstance(events[-1], dict):
+        candidates.append(events[-1].get("created_at"))
+    candidates += [metadata.get("requested_at"), metadata.get("created_at")]
+    for value in candidates:
+        if not value:
             continue
-        if metadata.get("approval_request_id") == approval_request_id:
-            return row["thread_id"], _deserialize_blob(row.get("checkpoint")), metadata
-    return None, None, None
+        try:
+            parsed = datetime.fromisoformat(str(value))
+        except ValueError:
+            continue
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
+_CHECKPOINT_LOOKUP_ASSIGNMENTS = """
+    approval_request_id = :approval_request_id,
+    slack_thread_ts = :slack_thread_ts,
+    slack_message_ts = :slack_message_ts,
+    status = :status,
+    project_id = :project_id,
+    updated_at = :updated_at
+"""
 
-def _upsert_checkpoint(
+
+def upsert_checkpoint(
     conn: Connection,
     thread_id: str,
     checkpoint: dict[str, Any] | None,
     metadata: dict[str, Any] | None,
 ) -> None:
-    checkpoint_bytes = json.dumps(checkpoint or {}).encode("utf-8")
-    metadata_json = json.dumps(metadata or {})
-    exists = conn.execute(
-        text("SELECT 1 FROM langgraph_checkpoints WHERE thread_id = :thread_id"),
+    metadata = dict(metadata or {})
+    # Audit events live in hitl_audit_logs; drop the inline copy older checkpoints still carry.
+    metadata.pop("audit_events", None)
+    conn.execute(
+        text(
+            """
+            INSERT INTO langgraph_checkpoints
+              (thread_id, checkpoint, metadata, approval_request_id, slack_thread_ts, slack_message_ts, status,
+               project_id, updated_at)
+            VALUES
+              (:thread_id, :checkpoint, :metadata, :approval_request_id, :slack_thread_ts, :slack_message_ts, :status,
+               :project_id, :updated_at)
+            ON CONFLICT (thread_id) DO UPDATE
+            SET checkpoint = EXCLUDED.checkpoint,
+                metadata = EXCLUDED.metadata,
+                approval_request_id = EXCLUDED.approval_request_id,
+                slack_thread_ts = EXCLUDED.slack_thread_ts,
+                slack_message_ts = EXCLUDED.slack_message_ts,
+                status = EXCLUDED.status,
+                project_id = EXCLUDED.project_id,
+                updated_at = EXCLUDED.updated_at
+            """
+        ),
+        {
+            "thread_id": thread_id,
+            "checkpoint": json.dumps(checkpoint or {}).encode("utf-8"),
+            "metadata": json.dumps(metadata),
+            **checkpoint_lookup_columns(metadata),
+        },
+    )
+
+
+def merge_checkpoint_metadata(conn: Connection, thread_id: str, extra: dict[str, Any]) -> None:
+    """Merge ``extra`` into a checkpoint's metadata, keeping the lookup columns in step."""
+    row = conn.execute(
+        text("SELECT metadata FROM langgraph_checkpoints WHERE thread_id = :thread_id"),
         {"thread_id": thread_id},
-    ).scalar()
-    if exists:
-        conn.execute(
-            text(
-                """
-                UPDATE langgraph_checkpoints
-                SET checkpoint = :checkpoint,
-                    metadata = :metadata
-                WHERE thread_id = :thread_id
-                """
-            ),
-            {"thread_id": thread_id, "checkpoint": checkpoint_bytes, "metadata": metadata_json},
-        )
+    ).mappings().first()
+    if not row:
         return
-
+    metadata = _deserialize_json(row.get("metadata"))
+    if not isinstance(metadata, dict):
+        metadata = {}
+    metadata.update(extra)
     conn.execute(
         text(
-            """
-            INSERT INTO langgraph_checkpoints (thread_id, checkpoint, metadata)
-            VALUES (:thread_id, :checkpoint, :metadata)
+            f"""
+            UPDATE langgraph_checkpoints
+            SET metadata = :metadata,
+                {_CHECKPOINT_LOOKUP_ASSIGNMENTS}
+            WHERE thread_id = :thread_id
             """
         ),
-        {"thread_id": thread_id, "checkpoint": checkpoint_bytes, "metadata": metadata_json},
+        {"thread_id": thread_id, "metadata": json.dumps(metadata), **checkpoint_lookup_columns(metadata)},
     )
 
 
 def _append_audit(
+    conn: Connection,
+    thread_id: str,
     metadata: dict[str, Any],
     event_type: str,
     actor: str | None,
     correlation_id: str | None,
     detail: dict[str, Any] | None = None,
-) -> dict[str, Any]:
-    events = list(metadata.get("audit_events") or [])
-    events.append(
+) -> None:
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    conn.execute(
+        text(
+            """
+            INSERT INTO hitl_audit_logs (thread_id, event_type, actor, correlation_id, detail, created_at)
+            VALUES (:thread_id, :event_type, :actor, :correlation_id, :detail, :created_at)
+            """
+        ),
         {
+            "thread_id": thread_id,
             "event_type": event_type,
             "actor": actor,
             "correlation_id": correlation_id,
-            "detail": detail or {},
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
+            "detail": json.dumps(detail or {}),
+            "created_at": created_at,
+        },
     )
-    metadata["audit_events"] = events
-    return metadata
+    metadata["updated_at"] = created_at.replace(tzinfo=timezone.utc).isoformat()
 
 
 def _deserialize_json(value: Any) -> Any:
@@ -719,15 +1073,17 @@ def _mark_failed(
 
     metadata["status"] = HITL_STATUS_FAILED
     metadata["execution_status"] = HITL_STATUS_FAILED
-    metadata = _append_audit(
+    _append_audit(
+        conn,
+        thread_id,
         metadata,
         event_type="execution_failed",
         actor="worker",
         correlation_id=job_id,
         detail={"action_id": action_id, "error": error_message},
     )
-    _upsert_checkpoint(conn, thread_id, checkpoint, metadata)
-    _notify_execution_result(metadata, thread_id, action_id, job_id, HITL_STATUS_FAILED, error_message)
+    upsert_checkpoint(conn, thread_id, checkpoint, metadata)
+    _notify_execution_result(conn, metadata, thread_id, action_id, job_id, HITL_STATUS_FAILED, error_message)
     logger.warning(
         "execution failed thread_id=%s action_id=%s job_id=%s error=%s",
         thread_id,
@@ -751,7 +1107,38 @@ def _slack_meta_from_metadata(metadata: dict[str, Any]) -> SlackMeta | None:
     )
 
 
+def _record_approval_message(
+    conn: Connection,
+    payload: dict[str, Any],
+    response: dict[str, Any],
+    context: dict[str, Any],
+) -> None:
+    """Outbox callback: attach the delivered approval message to its thread so replies can be matched."""
+    slack_meta = slack_meta_from_response(response, payload)
+    thread_id = context.get("thread_id")
+    if not slack_meta or not thread_id:
+        return
+    _, metadata = _load_checkpoint(conn, thread_id)
+    if not metadata or metadata.get("approval_request_id") != context.get("approval_request_id"):
+        return
+    merge_checkpoint_metadata(
+        conn,
+        thread_id,
+        {
+            "slack": {
+                "channel": slack_meta.channel,
+                "message_ts": slack_meta.message_ts,
+                "thread_ts": slack_meta.thread_ts,
+            }
+        },
+    )
+
+
+register_slack_outbox_callback(SLACK_APPROVAL_POSTED, _record_approval_message)
+
+
 def _notify_execution_result(
+    conn: Connection,
     metadata: dict[str, Any],
     thread_id: str,
     action_id: int,
@@ -767,7 +1154,7 @@ def _notify_execution_result(
         text = f"Execution completed. job_id={job_id} action_id={action_id}"
     else:
         text = f"Execution failed. job_id={job_id} action_id={action_id} error={error_message}"
-    post_thread_message(channel=slack.channel, thread_ts=thread_ts, text=text)
+    enqueue_thread_message(conn, slack.channel, thread_ts, text)
 
 
 def _resolve_timezone_name(raw: Any) -> str:
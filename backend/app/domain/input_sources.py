@@ -3,29 +3,44 @@ from __future__ import annotations
 import csv
 import json
 import os
-import urllib.error
-import urllib.parse
-import urllib.request
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
 from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, TextIO
 from uuid import uuid4
 
-from sqlalchemy import text
-from sqlalchemy.engine import Connection
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
 
-from app.domain.embeddings import ensure_weekly_report_embeddings
+from app.db.bulk import insert_returning_new
+from app.domain.embeddings import embed_weekly_reports
+from app.integrations.slack import SlackApiError, SlackRateLimited, call_slack_api
 
 SOURCE_WEEKLY_REPORTS = "weekly_reports"
 SOURCE_SLACK_LOGS = "slack_logs"
 SOURCE_ATTENDANCE = "attendance"
 
-SLACK_API_BASE = "https://slack.com/api"
 SLACK_LOG_CHANNELS = [c.strip() for c in os.getenv("SLACK_LOG_CHANNELS", "").split(",") if c.strip()]
 SLACK_LOG_LOOKBACK_DAYS = int(os.getenv("SLACK_LOG_LOOKBACK_DAYS", "14"))
 SLACK_LOG_LIMIT = int(os.getenv("SLACK_LOG_LIMIT", "200"))
+SLACK_INGEST_CONCURRENCY = max(1, int(os.getenv("SLACK_INGEST_CONCURRENCY", "4") or "4"))
+SLACK_INGEST_RATE_LIMIT_RETRIES = max(0, int(os.getenv("SLACK_INGEST_RATE_LIMIT_RETRIES", "3") or "3"))
+SLACK_MESSAGE_COLUMNS = (
+    "channel_id",
+    "message_ts",
+    "user_id",
+    "text",
+    "thread_ts",
+    "client_msg_id",
+    "message_type",
+    "raw_payload",
+)
 ATTENDANCE_LOG_SOURCE = os.getenv("ATTENDANCE_LOG_SOURCE", "")
+WEEKLY_REPORT_BATCH_SIZE = max(1, int(os.getenv("WEEKLY_REPORT_BATCH_SIZE", "1000") or "1000"))
+WEEKLY_REPORT_COLUMNS = ("user_id", "project_id", "reporting_date", "content_text", "reported_at")
 
 DEFAULT_WEEKLY_REPORT_SOURCE = (
     Path(__file__).resolve().parents[1] / "data" / "weekly_reports_source.json"
@@ -47,81 +62,68 @@ class IngestionRunResult:
 def ingest_weekly_reports(
     conn: Connection,
     source_path: Path | None = None,
+    *,
+    batch_size: int = WEEKLY_REPORT_BATCH_SIZE,
 ) -> IngestionRunResult:
+    """Load a JSON array or JSON Lines file of weekly reports in this transaction.
+
+    Records are parsed incrementally and inserted in batches; a report that already exists for the same user, project
+    and reporting date is skipped, and new rows are embedded per batch.
+    """
     run_id = f"ing-{uuid4().hex[:12]}"
     started_at = datetime.now(timezone.utc)
-    items_inserted = 0
     error: str | None = None
     status = "succeeded"
     source = source_path or DEFAULT_WEEKLY_REPORT_SOURCE
-    metadata: dict[str, Any] = {"source_path": str(source)}
+    progress = _WeeklyReportProgress()
 
     try:
-        payload = _load_source(source)
-        for row in payload:
-            user_id = str(row.get("user_id") or "")
-            project_id = str(row.get("project_id") or "")
-            content = str(row.get("content_text") or "")
-            reporting_date = _normalize_date(row.get("reporting_date"))
-            reported_at = _normalize_timestamp(str(row.get("reported_at") or ""))
-            if not user_id or not project_id or not content:
-                continue
-            exists = conn.execute(
-                text(
-                    """
-                    SELECT 1
-                    FROM weekly_reports
-                    WHERE user_id = :user_id
-                      AND project_id = :project_id
-                      AND reporting_date = :reporting_date
-                    LIMIT 1
-                    """
-                ),
-                {
-                    "user_id": user_id,
-                    "project_id": project_id,
-                    "reporting_date": reporting_date,
-                },
-            ).scalar()
-            if exists:
-                continue
+        for batch in _weekly_report_batches(source, batch_size, progress):
+            _insert_weekly_report_batch(conn, batch, progress)
+    except Exception as exc:
+        status = "failed"
+        error = str(exc)
+
+    result = _weekly_report_result(run_id, started_at, status, source, progress, error)
+    _record_ingestion_run(conn, result)
+    return result
 
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO weekly_reports
-                      (user_id, project_id, reporting_date, content_text, reported_at)
-                    VALUES
-                      (:user_id, :project_id, :reporting_date, :content_text, :reported_at)
-                    """
-                ),
-                {
-                    "user_id": user_id,
-                    "project_id": project_id,
-                    "reporting_date": reporting_date,
-                    "content_text": content,
-                    "reported_at": reported_at,
-                },
-            )
-            items_inserted += 1
 
-        metadata["embeddings_updated"] = ensure_weekly_report_embeddings(conn)
+def ingest_weekly_reports_chunked(
+    engine: Engine,
+    source_path: Path | None = None,
+    *,
+    batch_size: int = WEEKLY_REPORT_BATCH_SIZE,
+) -> IngestionRunResult:
+    """Like ``ingest_weekly_reports``, but every batch commits in its own transaction.
+
+    The run is recorded as ``running`` first and its counters are updated with each batch, so a long import shows up
+    in the run history while it progresses. A failed run keeps the batches committed before the failure; running the
+    same file again skips them.
+    """
+    run_id = f"ing-{uuid4().hex[:12]}"
+    started_at = datetime.now(timezone.utc)
+    error: str | None = None
+    status = "succeeded"
+    source = source_path or DEFAULT_WEEKLY_REPORT_SOURCE
+    progress = _WeeklyReportProgress()
+
+    with engine.begin() as conn:
+        row_id = _record_ingestion_run(conn, _weekly_report_result(run_id, started_at, "running", source, progress))
+    try:
+        for batch in _weekly_report_batches(source, batch_size, progress):
+            with engine.begin() as conn:
+                _insert_weekly_report_batch(conn, batch, progress)
+                _update_ingestion_run(
+                    conn, row_id, _weekly_report_result(run_id, started_at, "running", source, progress)
+                )
     except Exception as exc:
         status = "failed"
         error = str(exc)
 
-    finished_at = datetime.now(timezone.utc)
-    result = IngestionRunResult(
-        run_id=run_id,
-        source_type=SOURCE_WEEKLY_REPORTS,
-        status=status,
-        items_inserted=items_inserted,
-        started_at=started_at,
-        finished_at=finished_at,
-        error=error,
-        metadata=metadata,
-    )
-    _record_ingestion_run(conn, result)
+    result = _weekly_report_result(run_id, started_at, status, source, progress, error)
+    with engine.begin() as conn:
+        _update_ingestion_run(conn, row_id, result)
     return result
 
 
@@ -169,6 +171,13 @@ def ingest_slack_logs(
     oldest: float | None = None,
     latest: float | None = None,
 ) -> IngestionRunResult:
+    """Fetch channel history newer than each channel's stored high-water mark and bulk-insert it.
+
+    Channels are fetched concurrently (``SLACK_INGEST_CONCURRENCY``) under the Slack rate limiter; rows are
+    written on this connection as each channel completes, each under its own savepoint, and the channel's cursor
+    only moves forward once all of its pages are stored. An explicit ``oldest`` backfills from that point instead
+    of the cursor.
+    """
     run_id = f"ing-{uuid4().hex[:12]}"
     started_at = datetime.now(timezone.utc)
     items_inserted = 0
@@ -181,31 +190,43 @@ def ingest_slack_logs(
         status = "failed"
         error = "SLACK_LOG_CHANNELS is empty"
     else:
-        try:
-            oldest_ts = oldest
-            if oldest_ts is None:
-                oldest_ts = (datetime.now(timezone.utc) - timedelta(days=SLACK_LOG_LOOKBACK_DAYS)).timestamp()
-            for channel_id in channels:
-                cursor: str | None = None
-                while True:
-                    payload = _slack_api_call(
-                        "conversations.history",
-                        {
-                            "channel": channel_id,
-                            "limit": SLACK_LOG_LIMIT,
-                            "oldest": oldest_ts,
-                            **({"latest": latest} if latest else {}),
-                            **({"cursor": cursor} if cursor else {}),
-                        },
-                    )
-                    messages = payload.get("messages") or []
-                    items_inserted += _persist_slack_messages(conn, channel_id, messages)
-                    cursor = payload.get("response_metadata", {}).get("next_cursor") or None
-                    if not cursor:
-                        break
-        except Exception as exc:
+        cursors = _load_slack_cursors(conn, channels)
+        lookback_oldest = (datetime.now(timezone.utc) - timedelta(days=SLACK_LOG_LOOKBACK_DAYS)).timestamp()
+        channel_stats: dict[str, dict[str, Any]] = {}
+        errors: list[str] = []
+        with ThreadPoolExecutor(max_workers=min(SLACK_INGEST_CONCURRENCY, len(channels))) as pool:
+            futures = {
+                pool.submit(
+                    _fetch_slack_history,
+                    channel_id,
+                    oldest if oldest is not None else cursors.get(channel_id) or lookback_oldest,
+                    latest,
+                ): channel_id
+                for channel_id in channels
+            }
+            for future in as_completed(futures):
+                channel_id = futures[future]
+                try:
+                    messages = future.result()
+                except Exception as exc:
+                    errors.append(f"{channel_id}: {exc}")
+                    channel_stats[channel_id] = {"error": str(exc)}
+                    continue
+                # A channel whose rows fail to store rolls back alone, like a failed fetch; the run is still recorded.
+                try:
+                    with conn.begin_nested():
+                        inserted = _persist_slack_messages(conn, channel_id, messages)
+                        latest_ts = _advance_slack_cursor(conn, channel_id, messages, cursors.get(channel_id))
+                except Exception as exc:
+                    errors.append(f"{channel_id}: {exc}")
+                    channel_stats[channel_id] = {"fetched": len(messages), "error": str(exc)}
+                    continue
+                items_inserted += inserted
+                channel_stats[channel_id] = {"fetched": len(messages), "inserted": inserted, "latest_ts": latest_ts}
+        metadata["channel_stats"] = channel_stats
+        if errors:
             status = "failed"
-            error = str(exc)
+            error = "; ".join(sorted(errors))
 
     finished_at = datetime.now(timezone.utc)
     result = IngestionRunResult(
@@ -262,14 +283,159 @@ def ingest_attendance(
     return result
 
 
-def _load_source(source: Path) -> list[dict[str, Any]]:
+@dataclass
+class _WeeklyReportProgress:
+    records_read: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    items_inserted: int = 0
+    batches: int = 0
+    embeddings_updated: int = 0
+
+
+def _weekly_report_result(
+    run_id: str,
+    started_at: datetime,
+    status: str,
+    source: Path,
+    progress: _WeeklyReportProgress,
+    error: str | None = None,
+) -> IngestionRunResult:
+    return IngestionRunResult(
+        run_id=run_id,
+        source_type=SOURCE_WEEKLY_REPORTS,
+        status=status,
+        items_inserted=progress.items_inserted,
+        started_at=started_at,
+        finished_at=datetime.now(timezone.utc),
+        error=error,
+        metadata={"source_path": str(source), **asdict(progress)},
+    )
+
+
+def _weekly_report_batches(
+    source: Path,
+    batch_size: int,
+    progress: _WeeklyReportProgress,
+) -> Iterator[list[dict[str, Any]]]:
+    # Repeats within a batch are dropped here; repeats across batches and already stored reports hit the unique index.
+    batch: dict[tuple[str, str, str], dict[str, Any]] = {}
+    for record in _iter_source_records(source):
+        progress.records_read += 1
+        row = _weekly_report_row(record)
+        if row is None:
+            progress.skipped += 1
+            continue
+        key = (row["user_id"], row["project_id"], row["reporting_date"])
+        if key in batch:
+            progress.duplicates += 1
+            continue
+        batch[key] = row
+        if len(batch) >= max(1, batch_size):
+            yield list(batch.values())
+            batch = {}
+    if batch:
+        yield list(batch.values())
+
+
+def _weekly_report_row(record: Any) -> dict[str, Any] | None:
+    if not isinstance(record, dict):
+        return None
+    user_id = str(record.get("user_id") or "")
+    project_id = str(record.get("project_id") or "")
+    content = str(record.get("content_text") or "")
+    if not user_id or not project_id or not content:
+        return None
+    return {
+        "user_id": user_id,
+        "project_id": project_id,
+        "reporting_date": _normalize_date(record.get("reporting_date")),
+        "content_text": content,
+        "reported_at": _normalize_timestamp(str(record.get("reported_at") or "")),
+    }
+
+
+def _insert_weekly_report_batch(
+    conn: Connection,
+    rows: list[dict[str, Any]],
+    progress: _WeeklyReportProgress,
+) -> None:
+    report_ids = insert_returning_new(
+        conn,
+        "weekly_reports",
+        WEEKLY_REPORT_COLUMNS,
+        rows,
+        conflict_columns=("user_id", "project_id", "reporting_date"),
+        returning="report_id",
+    )
+    progress.batches += 1
+    progress.items_inserted += len(report_ids)
+    progress.duplicates += len(rows) - len(report_ids)
+    progress.embeddings_updated += embed_weekly_reports(conn, report_ids)
+
+
+def _iter_source_records(source: Path) -> Iterator[Any]:
+    """Top-level values of a JSON array file, or of a JSON Lines file, read incrementally."""
     if not source.exists():
-        return []
+        return
     with source.open(encoding="utf-8-sig") as handle:
-        data = json.load(handle)
-    if isinstance(data, list):
-        return [row for row in data if isinstance(row, dict)]
-    return []
+        first = handle.read(1)
+        while first.isspace():
+            first = handle.read(1)
+        handle.seek(0)
+        if first == "[":
+            yield from _iter_json_array(handle)
+        else:
+            for number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    if first == "{":
+                        # Most likely one pretty-printed object rather than one report per line.
+                        raise ValueError(
+                            f"weekly report source must be a JSON array or JSON Lines; line {number} is not a "
+                            f"complete JSON value ({exc.msg})"
+                        ) from exc
+                    raise
+
+
+def _iter_json_array(handle: TextIO, read_size: int = 1 << 16) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    opened = False
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or (opened and buffer[pos] == ",")):
+            pos += 1
+        if pos < len(buffer):
+            if not opened:
+                if buffer[pos] != "[":
+                    raise ValueError("weekly report source is not a JSON array")
+                opened = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+            # A value that reaches the end of the buffer may be cut off (e.g. a number), so it waits for more input.
+            if end is not None and (end < len(buffer) or eof):
+                yield value
+                pos = end
+                continue
+        elif eof:
+            raise ValueError("weekly report source ends before the closing ]")
+        chunk = handle.read(read_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
 
 
 def _normalize_timestamp(value: str) -> str:
@@ -292,34 +458,85 @@ def _normalize_date(value: Any) -> str:
     return date.today().isoformat()
 
 
+def _fetch_slack_history(channel_id: str, oldest: float | str, latest: float | None) -> list[dict[str, Any]]:
+    """All ``conversations.history`` pages of one channel after ``oldest``; runs on a worker thread, no DB access."""
+    messages: list[dict[str, Any]] = []
+    cursor: str | None = None
+    while True:
+        payload = _slack_api_call(
+            "conversations.history",
+            {
+                "channel": channel_id,
+                "limit": SLACK_LOG_LIMIT,
+                "oldest": oldest,
+                **({"latest": latest} if latest else {}),
+                **({"cursor": cursor} if cursor else {}),
+            },
+        )
+        messages.extend(payload.get("messages") or [])
+        cursor = payload.get("response_metadata", {}).get("next_cursor") or None
+        if not cursor:
+            return messages
+
+
 def _slack_api_call(method: str, params: dict[str, Any]) -> dict[str, Any]:
-    token = (os.getenv("SLACK_BOT_TOKEN") or "").strip()
-    if not token:
-        raise RuntimeError("SLACK_BOT_TOKEN is not configured")
-    query = urllib.parse.urlencode(params)
-    url = f"{SLACK_API_BASE}/{method}?{query}"
-    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"}, method="GET")
-    try:
-        with urllib.request.urlopen(request, timeout=10) as response:
-            body = response.read().decode("utf-8")
-    except urllib.error.URLError as exc:
-        raise RuntimeError(f"Slack API error: {exc}") from exc
-    payload = json.loads(body)
-    if not payload.get("ok"):
-        raise RuntimeError(f"Slack API error: {payload.get('error')}")
-    return payload
+    attempts = 0
+    while True:
+        try:
+            return call_slack_api(method, params, http_method="GET")
+        except SlackRateLimited as exc:
+            attempts += 1
+            if attempts > SLACK_INGEST_RATE_LIMIT_RETRIES:
+                raise RuntimeError(f"Slack API error: {exc}") from exc
+            # History reads are not latency-sensitive: wait out the shared bucket instead of failing the channel.
+            time.sleep(exc.retry_after or 1.0)
+        except SlackApiError as exc:
+            raise RuntimeError(f"Slack API error: {exc}") from exc
+
+
+def _load_slack_cursors(conn: Connection, channel_ids: list[str]) -> dict[str, str]:
+    rows = conn.execute(
+        text("SELECT channel_id, latest_ts FROM slack_ingestion_cursors WHERE channel_id IN :channel_ids").bindparams(
+            bindparam("channel_ids", expanding=True)
+        ),
+        {"channel_ids": channel_ids},
+    ).mappings()
+    return {row["channel_id"]: row["latest_ts"] for row in rows}
+
+
+def _advance_slack_cursor(
+    conn: Connection,
+    channel_id: str,
+    messages: list[dict[str, Any]],
+    current: str | None,
+) -> str | None:
+    timestamps = [str(message["ts"]) for message in messages if message.get("ts")]
+    if current:
+        timestamps.append(current)
+    if not timestamps:
+        return None
+    latest_ts = max(timestamps, key=Decimal)
+    if latest_ts != current:
+        conn.execute(
+            text(
+                """
+                INSERT INTO slack_ingestion_cursors (channel_id, latest_ts, updated_at)
+                VALUES (:channel_id, :latest_ts, :updated_at)
+                ON CONFLICT (channel_id) DO UPDATE
+                SET latest_ts = EXCLUDED.latest_ts,
+                    updated_at = EXCLUDED.updated_at
+                """
+            ),
+            {"channel_id": channel_id, "latest_ts": latest_ts, "updated_at": datetime.now(timezone.utc)},
+        )
+    return latest_ts
 
 
 def _persist_slack_messages(conn: Connection, channel_id: str, messages: list[dict[str, Any]]) -> int:
-    dialect = conn.engine.dialect.name
-    inserted = 0
-    for message in messages:
-        message_ts = str(message.get("ts") or "")
-        if not message_ts:
-            continue
-        row = {
+    rows = [
+        {
             "channel_id": channel_id,
-            "message_ts": message_ts,
+            "message_ts": str(message["ts"]),
             "user_id": message.get("user") or message.get("bot_id"),
             "text": message.get("text") or "",
             "thread_ts": message.get("thread_ts"),
@@ -327,37 +544,18 @@ def _persist_slack_messages(conn: Connection, channel_id: str, messages: list[di
             "message_type": message.get("subtype") or "message",
             "raw_payload": json.dumps(message, ensure_ascii=False),
         }
-        inserted += _insert_slack_message(conn, row, dialect)
-    return inserted
-
-
-def _insert_slack_message(conn: Connection, row: dict[str, Any], dialect: str) -> int:
-    if dialect.startswith("postgres"):
-        result = conn.execute(
-            text(
-                """
-                INSERT INTO slack_messages
-                  (channel_id, message_ts, user_id, text, thread_ts, client_msg_id, message_type, raw_payload)
-                VALUES
-                  (:channel_id, :message_ts, :user_id, :text, :thread_ts, :client_msg_id, :message_type, :raw_payload)
-                ON CONFLICT (channel_id, message_ts) DO NOTHING
-                """
-            ),
-            row,
-        )
-        return result.rowcount or 0
-    result = conn.execute(
-        text(
-            """
-            INSERT OR IGNORE INTO slack_messages
-              (channel_id, message_ts, user_id, text, thread_ts, client_msg_id, message_type, raw_payload)
-            VALUES
-              (:channel_id, :message_ts, :user_id, :text, :thread_ts, :client_msg_id, :message_type, :raw_payload)
-            """
-        ),
-        row,
+        for message in messages
+        if message.get("ts")
+    ]
+    inserted = insert_returning_new(
+        conn,
+        "slack_messages",
+        SLACK_MESSAGE_COLUMNS,
+        rows,
+        conflict_columns=("channel_id", "message_ts"),
+        returning="message_ts",
     )
-    return result.rowcount or 0
+    return len(inserted)
 
 
 def _load_attendance(conn: Connection, source: Path) -> int:
@@ -417,31 +615,43 @@ def _insert_attendance_row(conn: Connection, row: dict[str, Any], dialect: str)
     return result.rowcount or 0
 
 
-def _record_ingestion_run(conn: Connection, result: IngestionRunResult) -> None:
-    payload = {
-        "run_id": result.run_id,
-        "status": result.status,
-        "items_inserted": result.items_inserted,
-        "started_at": result.started_at.isoformat(),
-        "finished_at": result.finished_at.isoformat(),
-        "error": result.error,
-        "metadata": result.metadata or {},
-    }
-    conn.execute(
+def _record_ingestion_run(conn: Connection, result: IngestionRunResult) -> int:
+    return conn.execute(
         text(
             """
             INSERT INTO input_ingestion_runs (source, status, payload)
             VALUES (:source, :status, :payload)
+            RETURNING run_id
             """
         ),
         {
             "source": result.source_type,
             "status": result.status,
-            "payload": json.dumps(payload, ensure_ascii=False),
+            "payload": _ingestion_payload(result),
         },
+    ).scalar_one()
+
+
+def _update_ingestion_run(conn: Connection, row_id: int, result: IngestionRunResult) -> None:
+    conn.execute(
+        text("UPDATE input_ingestion_runs SET status = :status, payload = :payload WHERE run_id = :run_id"),
+        {"run_id": row_id, "status": result.status, "payload": _ingestion_payload(result)},
     )
 
 
+def _ingestion_payload(result: IngestionRunResult) -> str:
+    payload = {
+        "run_id": result.run_id,
+        "status": result.status,
+        "items_inserted": result.items_inserted,
+        "started_at": result.started_at.isoformat(),
+        "finished_at": result.finished_at.isoformat(),
+        "error": result.error,
+        "metadata": result.metadata or {},
+    }
+    return json.dumps(payload, ensure_ascii=False)
+
+
 def _deserialize_payload(value: Any) -> dict[str, Any]:
     if value is None:
         return {}
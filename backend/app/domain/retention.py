@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
+
+from app.db.bulk import chunked, execute_chunked
+
+RESOLUTION_DAY = "day"
+RESOLUTION_WEEK = "week"
+RESOLUTION_MONTH = "month"
+
+RETENTION_DAILY_DAYS = max(7, int(os.getenv("RETENTION_DAILY_DAYS", "90") or "90"))
+RETENTION_WEEKLY_DAYS = max(RETENTION_DAILY_DAYS, int(os.getenv("RETENTION_WEEKLY_DAYS", "730") or "730"))
+RETENTION_KEY_BATCH = max(1, int(os.getenv("RETENTION_KEY_BATCH", "500") or "500"))
+
+_RISK_ORDER = {"Safe": 0, "Warning": 1, "Critical": 2}
+
+logger = logging.getLogger("saihai.retention")
+
+
+@dataclass(frozen=True)
+class Series:
+    """A daily history table and the rollup table its older rows are folded into."""
+
+    name: str
+    source_table: str
+    rollup_table: str
+    key: str
+    date_column: str
+    metrics: tuple[str, ...]
+    risk_column: str | None = None
+
+    @property
+    def primary_metric(self) -> str:
+        return self.metrics[0]
+
+
+MOTIVATION = Series(
+    name="motivation",
+    source_table="user_motivation_history",
+    rollup_table="user_motivation_rollups",
+    key="user_id",
+    date_column="recorded_at",
+    metrics=("motivation_score", "sentiment_score"),
+)
+PROJECT_HEALTH = Series(
+    name="project_health",
+    source_table="project_health_snapshots",
+    rollup_table="project_health_rollups",
+    key="project_id",
+    date_column="snapshot_date",
+    metrics=("health_score", "variance_score", "manager_gap_score"),
+    risk_column="risk_level",
+)
+SERIES = (MOTIVATION, PROJECT_HEALTH)
+
+
+@dataclass
+class _Bucket:
+    samples: int = 0
+    sums: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+    minimum: float | None = None
+    maximum: float | None = None
+    worst_risk: str | None = None
+
+    def add(
+        self,
+        samples: int,
+        averages: dict[str, float | None],
+        minimum: float | None,
+        maximum: float | None,
+        risk: str | None,
+    ) -> None:
+        self.samples += samples
+        for metric, value in averages.items():
+            if value is None:
+                continue
+            self.sums[metric] = self.sums.get(metric, 0.0) + float(value) * samples
+            self.counts[metric] = self.counts.get(metric, 0) + samples
+        if minimum is not None:
+            self.minimum = float(minimum) if self.minimum is None else min(self.minimum, float(minimum))
+        if maximum is not None:
+            self.maximum = float(maximum) if self.maximum is None else max(self.maximum, float(maximum))
+        if risk and _RISK_ORDER.get(risk, -1) > _RISK_ORDER.get(self.worst_risk or "", -1):
+            self.worst_risk = risk
+
+    def average(self, metric: str) -> float | None:
+        count = self.counts.get(metric)
+        return round(self.sums[metric] / count, 4) if count else None
+
+
+def run_retention(
+    conn: Connection,
+    *,
+    today: date | None = None,
+    daily_days: int = RETENTION_DAILY_DAYS,
+    weekly_days: int = RETENTION_WEEKLY_DAYS,
+) -> dict[str, Any]:
+    """Fold daily rows past ``daily_days`` into weekly rollups and weeks past ``weekly_days`` into months."""
+    started = time.perf_counter()
+    today = today or date.today()
+    # Cutoffs sit on period boundaries so only complete weeks/months are ever folded.
+    daily_cutoff = period_start(today - timedelta(days=daily_days), RESOLUTION_WEEK)
+    weekly_cutoff = period_start(today - timedelta(days=weekly_days), RESOLUTION_MONTH)
+    stats: dict[str, Any] = {}
+    for series in SERIES:
+        stats[series.name] = {
+            "daily_rows_rolled": _compact(conn, series, RESOLUTION_DAY, RESOLUTION_WEEK, daily_cutoff),
+            "weekly_rows_rolled": _compact(conn, series, RESOLUTION_WEEK, RESOLUTION_MONTH, weekly_cutoff),
+        }
+    wall_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "retention.run daily_cutoff=%s weekly_cutoff=%s stats=%s wall_ms=%.1f",
+        daily_cutoff,
+        weekly_cutoff,
+        stats,
+        wall_ms,
+    )
+    return {
+        "summary": "retention completed",
+        "daily_cutoff": daily_cutoff.isoformat(),
+        "weekly_cutoff": weekly_cutoff.isoformat(),
+        "series": stats,
+        "wall_ms": wall_ms,
+    }
+
+
+def load_trend(
+    conn: Connection,
+    series: Series,
+    key: str,
+    *,
+    days: int,
+    today: date | None = None,
+) -> dict[str, Any]:
+    """Trend for one user/project, at a resolution picked so the number of points stays bounded."""
+    today = today or date.today()
+    if days <= RETENTION_DAILY_DAYS:
+        resolution = RESOLUTION_DAY
+    elif days <= RETENTION_WEEKLY_DAYS:
+        resolution = RESOLUTION_WEEK
+    else:
+        resolution = RESOLUTION_MONTH
+    since = today - timedelta(days=days)
+
+    buckets: dict[date, _Bucket] = {}
+    for source in (RESOLUTION_DAY, RESOLUTION_WEEK, RESOLUTION_MONTH):
+        # Coarser sources start at the period containing ``since`` so a partially covered period is kept.
+        for _, day, bucket in _load_buckets(conn, series, source, [key], since=period_start(since, source)):
+            target = buckets.setdefault(period_start(day, resolution), _Bucket())
+            _merge(target, bucket, series)
+
+    points = [
+        {
+            "period_start": start.isoformat(),
+            "samples": bucket.samples,
+            "average": bucket.average(series.primary_metric),
+            "min": bucket.minimum,
+            "max": bucket.maximum,
+            "values": {metric: bucket.average(metric) for metric in series.metrics},
+            "worst_risk_level": bucket.worst_risk,
+        }
+        for start, bucket in sorted(buckets.items())
+    ]
+    return {"resolution": resolution, "since": since.isoformat(), "points": points}
+
+
+def period_start(value: date, resolution: str) -> date:
+    if resolution == RESOLUTION_WEEK:
+        return value - timedelta(days=value.weekday())
+    if resolution == RESOLUTION_MONTH:
+        return value.replace(day=1)
+    return value
+
+
+def _compact(conn: Connection, series: Series, source: str, target: str, cutoff: date) -> int:
+    if source == RESOLUTION_DAY:
+        key_sql = f"SELECT DISTINCT {series.key} FROM {series.source_table} WHERE {series.date_column} < :cutoff"
+    else:
+        key_sql = (
+            f"SELECT DISTINCT {series.key} FROM {series.rollup_table} "
+            "WHERE resolution = :resolution AND period_start < :cutoff"
+        )
+    keys = [
+        key
+        for key in conn.execute(text(key_sql), {"cutoff": cutoff, "resolution": source}).scalars()
+        if key is not None
+    ]
+
+    rolled = 0
+    for key_batch in chunked(keys, RETENTION_KEY_BATCH):
+        merged: dict[tuple[str, date], _Bucket] = {}
+        source_rows = _load_buckets(conn, series, source, key_batch, before=cutoff)
+        for key, day, bucket in source_rows:
+            _merge(merged.setdefault((key, period_start(day, target)), _Bucket()), bucket, series)
+        if not merged:
+            continue
+        # Periods may already hold earlier rollups (late rows, a re-run); fold them in instead of overwriting.
+        existing_since = min(start for _, start in merged)
+        for key, start, bucket in _load_buckets(conn, series, target, key_batch, since=existing_since, before=cutoff):
+            if (key, start) in merged:
+                _merge(merged[(key, start)], bucket, series)
+        _upsert_rollups(conn, series, target, merged)
+        _delete_rows(conn, series, source, key_batch, cutoff)
+        rolled += len(source_rows)
+    return rolled
+
+
+def _load_buckets(
+    conn: Connection,
+    series: Series,
+    resolution: str,
+    keys: list[str],
+    *,
+    since: date | None = None,
+    before: date | None = None,
+) -> list[tuple[str, date, _Bucket]]:
+    if resolution == RESOLUTION_DAY:
+        columns = [series.key, f"{series.date_column} AS period_start", *series.metrics]
+        if series.risk_column:
+            columns.append(series.risk_column)
+        table, date_column, filters = series.source_table, series.date_column, [f"{series.date_column} IS NOT NULL"]
+    else:
+        columns = [
+            series.key,
+            "period_start",
+            "samples",
+            *(f"avg_{metric}" for metric in series.metrics),
+            f"min_{series.primary_metric}",
+            f"max_{series.primary_metric}",
+        ]
+        if series.risk_column:
+            columns.append("worst_risk_level")
+        table, date_column, filters = series.rollup_table, "period_start", ["resolution = :resolution"]
+    filters.append(f"{series.key} IN :keys")
+    if since is not None:
+        filters.append(f"{date_column} >= :since")
+    if before is not None:
+        filters.append(f"{date_column} < :before")
+    statement = text(
+        f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(filters)} ORDER BY {date_column}"
+    ).bindparams(bindparam("keys", expanding=True))
+    rows = conn.execute(
+        statement,
+        {"keys": list(keys), "resolution": resolution, "since": since, "before": before},
+    ).mappings()
+
+    result: list[tuple[str, date, _Bucket]] = []
+    for row in rows:
+        bucket = _Bucket()
+        if resolution == RESOLUTION_DAY:
+            primary = row[series.primary_metric]
+            bucket.add(
+                1,
+                {metric: row[metric] for metric in series.metrics},
+                primary,
+                primary,
+                row[series.risk_column] if series.risk_column else None,
+            )
+        else:
+            bucket.add(
+                int(row["samples"] or 0),
+                {metric: row[f"avg_{metric}"] for metric in series.metrics},
+                row[f"min_{series.primary_metric}"],
+                row[f"max_{series.primary_metric}"],
+                row["worst_risk_level"] if series.risk_column else None,
+            )
+        result.append((row[series.key], _as_date(row["period_start"]), bucket))
+    return result
+
+
+def _merge(target: _Bucket, source: _Bucket, series: Series) -> None:
+    target.add(
+        source.samples,
+        {metric: source.average(metric) for metric in series.metrics},
+        source.minimum,
+        source.maximum,
+        source.worst_risk,
+    )
+
+
+def _upsert_rollups(
+    conn: Connection,
+    series: Series,
+    resolution: str,
+    buckets: dict[tuple[str, date], _Bucket],
+) -> None:
+    avg_columns = [f"avg_{metric}" for metric in series.metrics]
+    columns = [
+        series.key,
+        "resolution",
+        "period_start",
+        "samples",
+        *avg_columns,
+        f"min_{series.primary_metric}",
+        f"max_{series.primary_metric}",
+    ]
+    if series.risk_column:
+        columns.append("worst_risk_level")
+    rows: list[dict[str, Any]] = []
+    for (key, start), bucket in sorted(buckets.items()):
+        row: dict[str, Any] = {
+            series.key: key,
+            "resolution": resolution,
+            "period_start": start,
+            "samples": bucket.samples,
+            f"min_{series.primary_metric}": bucket.minimum,
+            f"max_{series.primary_metric}": bucket.maximum,
+        }
+        for metric in series.metrics:
+            row[f"avg_{metric}"] = bucket.average(metric)
+        if series.risk_column:
+            row["worst_risk_level"] = bucket.worst_risk
+        rows.append(row)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns[3:])
+    execute_chunked(
+        conn,
+        text(
+            f"""
+            INSERT INTO {series.rollup_table} ({', '.join(columns)})
+            VALUES ({', '.join(f':{column}' for column in columns)})
+            ON CONFLICT ({series.key}, resolution, period_start) DO UPDATE SET {updates}
+            """
+        ),
+        rows,
+    )
+
+
+def _delete_rows(conn: Connection, series: Series, resolution: str, keys: list[str], cutoff: date) -> None:
+    if resolution == RESOLUTION_DAY:
+        sql = f"DELETE FROM {series.source_table} WHERE {series.key} IN :keys AND {series.date_column} < :cutoff"
+    else:
+        sql = (
+            f"DELETE FROM {series.rollup_table} "
+            f"WHERE {series.key} IN :keys AND resolution = :resolution AND period_start < :cutoff"
+        )
+    conn.execute(
+        text(sql).bindparams(bindparam("keys", expanding=True)),
+        {"keys": list(keys), "cutoff": cutoff, "resolution": resolution},
+    )
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Mapping
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.queue_utils import as_datetime, decode_json_object, run_workers, utcnow, worker_id_prefix
+from app.stage_metrics import percentiles
+
+SLACK_INBOX_CONSUMER_INPROCESS = "inprocess"
+SLACK_INBOX_CONSUMER_WORKER = "worker"
+
+# ``inprocess`` runs consumer threads in the web process (woken by each ack, polling for retries and rows a
+# restart left behind); ``worker`` leaves everything to scripts/slack_inbox_worker.py.
+SLACK_INBOX_CONSUMER = os.getenv("SLACK_INBOX_CONSUMER", SLACK_INBOX_CONSUMER_INPROCESS).strip().lower()
+SLACK_INBOX_MAX_ATTEMPTS = max(1, int(os.getenv("SLACK_INBOX_MAX_ATTEMPTS", "5") or "5"))
+SLACK_INBOX_LEASE_SECONDS = max(10, int(os.getenv("SLACK_INBOX_LEASE_SECONDS", "120") or "120"))
+SLACK_INBOX_RETRY_BASE_SECONDS = max(1.0, float(os.getenv("SLACK_INBOX_RETRY_BASE_SECONDS", "5") or "5"))
+SLACK_INBOX_RETRY_MAX_SECONDS = max(1.0, float(os.getenv("SLACK_INBOX_RETRY_MAX_SECONDS", "300") or "300"))
+SLACK_INBOX_WORKER_CONCURRENCY = max(1, int(os.getenv("SLACK_INBOX_WORKER_CONCURRENCY", "4") or "4"))
+SLACK_INBOX_POLL_SECONDS = max(0.1, float(os.getenv("SLACK_INBOX_POLL_SECONDS", "1") or "1"))
+
+SLACK_INBOX_STATUSES = ("pending", "processing", "done", "dead")
+
+SlackInboxHandler = Callable[..., None]
+
+logger = logging.getLogger("saihai.slack.inbox")
+
+
+def enqueue_slack_inbox(
+    conn: Connection,
+    *,
+    kind: str,
+    handler: str,
+    arguments: dict[str, Any],
+    idempotency_key: str,
+    ordering_key: str,
+    received_at: datetime,
+    ack_ms: float | None = None,
+) -> int | None:
+    """Store a verified Slack payload for processing. Returns ``None`` for a redelivery of a stored one."""
+    return conn.execute(
+        text(
+            """
+            INSERT INTO slack_inbox
+              (idempotency_key, kind, handler, ordering_key, arguments, status, attempts, received_at, ack_ms,
+               available_at)
+            VALUES
+              (:idempotency_key, :kind, :handler, :ordering_key, :arguments, 'pending', 0, :received_at, :ack_ms,
+               :received_at)
+            ON CONFLICT (idempotency_key) DO NOTHING
+            RETURNING inbox_id
+            """
+        ),
+        {
+            "idempotency_key": idempotency_key,
+            "kind": kind,
+            "handler": handler,
+            "ordering_key": ordering_key,
+            "arguments": json.dumps(arguments, ensure_ascii=False),
+            "received_at": received_at,
+            "ack_ms": ack_ms,
+        },
+    ).scalar()
+
+
+def record_slack_inbox_ack(conn: Connection, inbox_id: int, ack_ms: float) -> None:
+    """Store the ack latency, measured once the row had been committed, so it includes the inbox write."""
+    conn.execute(
+        text("UPDATE slack_inbox SET ack_ms = :ack_ms WHERE inbox_id = :inbox_id"),
+        {"inbox_id": inbox_id, "ack_ms": ack_ms},
+    )
+
+
+def claim_slack_inbox(
+    conn: Connection,
+    worker_id: str,
+    *,
+    ordering_key: str | None = None,
+    lease_seconds: int = SLACK_INBOX_LEASE_SECONDS,
+) -> dict[str, Any] | None:
+    """Lease the oldest due row whose earlier rows for the same ordering key are all finished."""
+    now = utcnow()
+    key_filter = "AND item.ordering_key = :ordering_key" if ordering_key is not None else ""
+    lock = "" if conn.dialect.name == "sqlite" else "FOR UPDATE SKIP LOCKED"
+    row = conn.execute(
+        text(
+            f"""
+            UPDATE slack_inbox
+            SET status = 'processing',
+                worker_id = :worker_id,
+                attempts = COALESCE(attempts, 0) + 1,
+                lease_expires_at = :lease_expires_at
+            WHERE inbox_id = (
+                SELECT item.inbox_id
+                FROM slack_inbox AS item
+                WHERE ((item.status = 'pending' AND item.available_at <= :now)
+                       OR (item.status = 'processing' AND item.lease_expires_at < :now
+                           AND item.attempts < :max_attempts))
+                  {key_filter}
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM slack_inbox AS earlier
+                      WHERE earlier.ordering_key = item.ordering_key
+                        AND earlier.inbox_id < item.inbox_id
+                        AND earlier.status IN ('pending', 'processing')
+                  )
+                ORDER BY item.inbox_id
+                LIMIT 1
+                {lock}
+            )
+            RETURNING inbox_id, kind, handler, ordering_key, arguments, attempts
+            """
+        ),
+        {
+            "worker_id": worker_id,
+            "now": now,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            "ordering_key": ordering_key,
+            "max_attempts": SLACK_INBOX_MAX_ATTEMPTS,
+        },
+    ).mappings().first()
+    if not row:
+        return None
+    item = dict(row)
+    item["arguments"] = decode_json_object(item.get("arguments"))
+    return item
+
+
+def bury_abandoned_slack_inbox(conn: Connection) -> int:
+    """Move rows whose last allowed attempt lost its consumer to ``dead`` so they stop blocking their thread."""
+    now = utcnow()
+    buried = conn.execute(
+        text(
+            """
+            UPDATE slack_inbox
+            SET status = 'dead',
+                processed_at = :now,
+                lease_expires_at = NULL,
+                last_error = COALESCE(last_error, 'consumer lease expired')
+            WHERE status = 'processing'
+              AND lease_expires_at < :now
+              AND attempts >= :max_attempts
+            """
+        ),
+        {"now": now, "max_attempts": SLACK_INBOX_MAX_ATTEMPTS},
+    ).rowcount
+    if buried:
+        logger.warning("slack.inbox_abandoned count=%s", buried)
+    return buried
+
+
+def finish_slack_inbox(conn: Connection, item: dict[str, Any], worker_id: str, error: str | None = None) -> str:
+    """Mark a claimed row ``done``, or requeue it with backoff after a failure (``dead`` once exhausted)."""
+    attempts = int(item.get("attempts") or 1)
+    if error is None:
+        status, available_at = "done", None
+    elif attempts >= SLACK_INBOX_MAX_ATTEMPTS:
+        status, available_at = "dead", None
+        logger.warning("slack.inbox_dead inbox_id=%s attempts=%s error=%s", item["inbox_id"], attempts, error)
+    else:
+        delay = min(SLACK_INBOX_RETRY_MAX_SECONDS, SLACK_INBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+        status, available_at = "pending", utcnow() + timedelta(seconds=delay)
+    now = utcnow()
+    conn.execute(
+        text(
+            """
+            UPDATE slack_inbox
+            SET status = :status,
+                available_at = COALESCE(:available_at, available_at),
+                processed_at = :processed_at,
+                lease_expires_at = NULL,
+                last_error = :error
+            WHERE inbox_id = :inbox_id
+              AND worker_id = :worker_id
+              AND status = 'processing'
+            """
+        ),
+        {
+            "status": status,
+            "available_at": available_at,
+            "processed_at": now if status in {"done", "dead"} else None,
+            "error": error,
+            "inbox_id": item["inbox_id"],
+            "worker_id": worker_id,
+        },
+    )
+    return status
+
+
+def process_next_slack_inbox(
+    engine: Engine,
+    handlers: Mapping[str, SlackInboxHandler],
+    worker_id: str,
+    *,
+    ordering_key: str | None = None,
+) -> str | None:
+    """Claim one row, run its handler and record the outcome. ``None`` when nothing is claimable.
+
+    Handlers commit their own work, so a crash between the handler and the outcome runs it again;
+    they are keyed by the Slack idempotency key for that reason.
+    """
+    with engine.begin() as conn:
+        bury_abandoned_slack_inbox(conn)
+        item = claim_slack_inbox(conn, worker_id, ordering_key=ordering_key)
+    if item is None:
+        return None
+    error = None
+    handler = handlers.get(item["handler"])
+    try:
+        if handler is None:
+            raise LookupError(f"no slack inbox handler named {item['handler']}")
+        handler(**item["arguments"])
+    except Exception as exc:
+        logger.exception("slack.inbox_failed inbox_id=%s handler=%s", item["inbox_id"], item["handler"])
+        error = str(exc) or exc.__class__.__name__
+    with engine.begin() as conn:
+        return finish_slack_inbox(conn, item, worker_id, error)
+
+
+def drain_slack_inbox(
+    engine: Engine,
+    handlers: Mapping[str, SlackInboxHandler],
+    *,
+    ordering_key: str | None = None,
+    worker_id: str | None = None,
+) -> int:
+    """Process claimable rows (of one ordering key, if given) until none is left; returns how many ran."""
+    worker_id = worker_id or worker_id_prefix("web")
+    processed = 0
+    while process_next_slack_inbox(engine, handlers, worker_id, ordering_key=ordering_key) is not None:
+        processed += 1
+    return processed
+
+
+def fetch_slack_inbox_stats(conn: Connection, *, window_seconds: int = 3600) -> dict[str, Any]:
+    """Backlog by status and, for rows received in the window, ack and end-to-end latency percentiles."""
+    now = utcnow()
+    backlog = {status: 0 for status in SLACK_INBOX_STATUSES}
+    for row in conn.execute(text("SELECT status, COUNT(*) AS items FROM slack_inbox GROUP BY status")).mappings():
+        backlog[str(row["status"])] = int(row["items"])
+    oldest = as_datetime(
+        conn.execute(
+            text("SELECT MIN(received_at) FROM slack_inbox WHERE status IN ('pending', 'processing')")
+        ).scalar()
+    )
+    ack_ms: list[float] = []
+    handled_ms: list[float] = []
+    rows = conn.execute(
+        text(
+            """
+            SELECT ack_ms, received_at, processed_at
+            FROM slack_inbox
+            WHERE received_at >= :since
+            """
+        ),
+        {"since": now - timedelta(seconds=window_seconds)},
+    ).mappings()
+    for row in rows:
+        if row["ack_ms"] is not None:
+            ack_ms.append(float(row["ack_ms"]))
+        received_at, processed_at = as_datetime(row["received_at"]), as_datetime(row["processed_at"])
+        if received_at and processed_at:
+            handled_ms.append((processed_at - received_at).total_seconds() * 1000)
+    return {
+        "consumer": SLACK_INBOX_CONSUMER,
+        "backlog": backlog,
+        "oldest_unprocessed_age_seconds": round((now - oldest).total_seconds(), 1) if oldest else None,
+        "window_seconds": window_seconds,
+        "received": len(ack_ms),
+        "ack_ms": percentiles(ack_ms),
+        "handled_ms": percentiles(handled_ms),
+    }
+
+
+class SlackInboxWorker:
+    def __init__(
+        self,
+        engine: Engine,
+        handlers: Mapping[str, SlackInboxHandler],
+        *,
+        worker_id: str,
+        stop_event: threading.Event,
+        poll_seconds: float = SLACK_INBOX_POLL_SECONDS,
+        exit_when_idle: bool = False,
+        wake_event: threading.Event | None = None,
+    ) -> None:
+        self.engine = engine
+        self.handlers = handlers
+        self.worker_id = worker_id
+        self.stop_event = stop_event
+        self.wake_event = wake_event or stop_event
+        self.poll_seconds = poll_seconds
+        self.exit_when_idle = exit_when_idle
+        self.processed: dict[str, int] = {}
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                status = process_next_slack_inbox(self.engine, self.handlers, self.worker_id)
+            except Exception:
+                logger.exception("slack.inbox_claim_failed worker_id=%s", self.worker_id)
+                status = None
+            if status is None:
+                if self.exit_when_idle:
+                    return
+                if self.wake_event.wait(self.poll_seconds) and self.wake_event is not self.stop_event:
+                    self.wake_event.clear()
+                continue
+            self.processed[status] = self.processed.get(status, 0) + 1
+
+
+_wake_consumers = threading.Event()
+
+
+def notify_slack_inbox() -> None:
+    """Wake the web process's consumers after an ack instead of waiting for their next poll."""
+    _wake_consumers.set()
+
+
+def start_slack_inbox_consumer(
+    engine: Engine,
+    handlers: Mapping[str, SlackInboxHandler],
+    *,
+    concurrency: int = SLACK_INBOX_WORKER_CONCURRENCY,
+) -> threading.Event | None:
+    """Start the web process's consumer threads (``SLACK_INBOX_CONSUMER=inprocess``); set the event to stop them."""
+    if SLACK_INBOX_CONSUMER != SLACK_INBOX_CONSUMER_INPROCESS:
+        return None
+    stop_event = threading.Event()
+    prefix = worker_id_prefix("web", "inbox")
+    for index in range(max(1, concurrency)):
+        worker = SlackInboxWorker(
+            engine, handlers, worker_id=f"{prefix}-{index}", stop_event=stop_event, wake_event=_wake_consumers
+        )
+        threading.Thread(target=worker.run, name=worker.worker_id, daemon=True).start()
+    return stop_event
+
+
+def serve(
+    engine: Engine,
+    handlers: Mapping[str, SlackInboxHandler],
+    *,
+    concurrency: int = SLACK_INBOX_WORKER_CONCURRENCY,
+    stop_event: threading.Event | None = None,
+    **worker_kwargs: Any,
+) -> list[SlackInboxWorker]:
+    """Run ``concurrency`` consumers until ``stop_event`` is set; rows of one thread never run in parallel."""
+    stop_event = stop_event or threading.Event()
+    prefix = worker_id_prefix("slack")
+    workers = [
+        SlackInboxWorker(engine, handlers, worker_id=f"{prefix}-{index}", stop_event=stop_event, **worker_kwargs)
+        for index in range(max(1, concurrency))
+    ]
+    return run_workers(workers)
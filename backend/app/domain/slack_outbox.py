@@ -0,0 +1,454 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import timedelta
+from typing import Any, Callable
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.queue_utils import as_datetime, decode_json_object, run_workers, utcnow, worker_id_prefix
+from app.integrations.slack import SlackApiError, SlackRateLimited, deliver_slack_message, slack_configured
+
+SLACK_OUTBOX_DISPATCHER_INPROCESS = "inprocess"
+SLACK_OUTBOX_DISPATCHER_OFF = "off"
+
+# ``inprocess`` runs a dispatcher thread in the web process; ``off`` leaves delivery to scripts/slack_outbox_worker.py.
+SLACK_OUTBOX_DISPATCHER = os.getenv("SLACK_OUTBOX_DISPATCHER", SLACK_OUTBOX_DISPATCHER_INPROCESS).strip().lower()
+SLACK_OUTBOX_MAX_ATTEMPTS = max(1, int(os.getenv("SLACK_OUTBOX_MAX_ATTEMPTS", "8") or "8"))
+SLACK_OUTBOX_LEASE_SECONDS = max(10, int(os.getenv("SLACK_OUTBOX_LEASE_SECONDS", "60") or "60"))
+SLACK_OUTBOX_RETRY_BASE_SECONDS = max(1.0, float(os.getenv("SLACK_OUTBOX_RETRY_BASE_SECONDS", "5") or "5"))
+SLACK_OUTBOX_RETRY_MAX_SECONDS = max(1.0, float(os.getenv("SLACK_OUTBOX_RETRY_MAX_SECONDS", "600") or "600"))
+SLACK_OUTBOX_POLL_SECONDS = max(0.1, float(os.getenv("SLACK_OUTBOX_POLL_SECONDS", "1") or "1"))
+SLACK_OUTBOX_COALESCE_MAX = max(1, int(os.getenv("SLACK_OUTBOX_COALESCE_MAX", "20") or "20"))
+SLACK_OUTBOX_COALESCE_MAX_CHARS = max(1, int(os.getenv("SLACK_OUTBOX_COALESCE_MAX_CHARS", "3000") or "3000"))
+# A token-bucket wait up to this long is slept through; a longer one reschedules the message instead.
+SLACK_OUTBOX_MAX_WAIT_SECONDS = 2.0
+
+SLACK_OUTBOX_STATUSES = ("pending", "sending", "sent", "dead")
+
+# Called as ``callback(conn, payload, response, context)`` in the transaction that marks the message sent.
+SlackOutboxCallback = Callable[[Connection, dict[str, Any], dict[str, Any], dict[str, Any]], None]
+
+_callbacks: dict[str, SlackOutboxCallback] = {}
+
+logger = logging.getLogger("saihai.slack.outbox")
+
+
+def register_slack_outbox_callback(name: str, callback: SlackOutboxCallback) -> None:
+    _callbacks[name] = callback
+
+
+def enqueue_slack_message(
+    conn: Connection,
+    payload: dict[str, Any],
+    *,
+    coalesce: bool | None = None,
+    on_delivered: str | None = None,
+    context: dict[str, Any] | None = None,
+) -> int | None:
+    """Queue a ``chat.postMessage`` payload in the caller's transaction; ``None`` when Slack is not configured.
+
+    Plain-text replies to the same thread are coalesced into one post by default; messages with blocks
+    or a delivery callback are always posted on their own.
+    """
+    if not slack_configured():
+        return None
+    channel = payload.get("channel")
+    thread_ts = payload.get("thread_ts")
+    ordering_key = f"{channel}:{thread_ts}" if thread_ts else None
+    if coalesce is None:
+        coalesce = bool(thread_ts) and not payload.get("blocks") and on_delivered is None
+    now = utcnow()
+    return conn.execute(
+        text(
+            """
+            INSERT INTO slack_outbox
+              (channel, thread_ts, ordering_key, coalesce_key, payload, on_delivered, context, status, attempts,
+               available_at, created_at)
+            VALUES
+              (:channel, :thread_ts, :ordering_key, :coalesce_key, :payload, :on_delivered, :context, 'pending', 0,
+               :now, :now)
+            RETURNING message_id
+            """
+        ),
+        {
+            "channel": channel,
+            "thread_ts": thread_ts,
+            "ordering_key": ordering_key,
+            "coalesce_key": ordering_key if coalesce and ordering_key else None,
+            "payload": json.dumps(payload, ensure_ascii=False),
+            "on_delivered": on_delivered,
+            "context": json.dumps(context or {}, ensure_ascii=False),
+            "now": now,
+        },
+    ).scalar_one()
+
+
+def enqueue_thread_message(conn: Connection, channel: str, thread_ts: str, text_value: str) -> int | None:
+    if not channel or not thread_ts:
+        return None
+    return enqueue_slack_message(conn, {"channel": channel, "thread_ts": thread_ts, "text": text_value})
+
+
+def claim_slack_outbox(
+    conn: Connection,
+    worker_id: str,
+    *,
+    lease_seconds: int = SLACK_OUTBOX_LEASE_SECONDS,
+) -> list[dict[str, Any]]:
+    """Lease the oldest due message whose thread has nothing earlier in flight, plus the queued replies it absorbs."""
+    now = utcnow()
+    lock = "" if conn.dialect.name == "sqlite" else "FOR UPDATE SKIP LOCKED"
+    params = {
+        "worker_id": worker_id,
+        "now": now,
+        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+        "max_attempts": SLACK_OUTBOX_MAX_ATTEMPTS,
+    }
+    primary = conn.execute(
+        text(
+            f"""
+            UPDATE slack_outbox
+            SET status = 'sending',
+                worker_id = :worker_id,
+                attempts = COALESCE(attempts, 0) + 1,
+                lease_expires_at = :lease_expires_at
+            WHERE message_id = (
+                SELECT item.message_id
+                FROM slack_outbox AS item
+                WHERE ((item.status = 'pending' AND item.available_at <= :now)
+                       OR (item.status = 'sending' AND item.lease_expires_at < :now
+                           AND item.attempts < :max_attempts))
+                  AND (item.ordering_key IS NULL OR NOT EXISTS (
+                      SELECT 1
+                      FROM slack_outbox AS earlier
+                      WHERE earlier.ordering_key = item.ordering_key
+                        AND earlier.message_id < item.message_id
+                        AND earlier.status IN ('pending', 'sending')
+                  ))
+                ORDER BY item.message_id
+                LIMIT 1
+                {lock}
+            )
+            RETURNING message_id, ordering_key, coalesce_key, payload, on_delivered, context, attempts
+            """
+        ),
+        params,
+    ).mappings().first()
+    if not primary:
+        return []
+    items = [_decode_item(primary)]
+    if primary["coalesce_key"]:
+        items += _claim_followers(conn, items[0], params)
+    return items
+
+
+def _claim_followers(conn: Connection, primary: dict[str, Any], params: dict[str, Any]) -> list[dict[str, Any]]:
+    # The primary blocks the rest of its thread, so no other dispatcher can claim these rows meanwhile.
+    candidates = conn.execute(
+        text(
+            """
+            SELECT message_id, coalesce_key, payload
+            FROM slack_outbox
+            WHERE ordering_key = :ordering_key
+              AND status = 'pending'
+              AND message_id > :message_id
+            ORDER BY message_id
+            LIMIT :limit
+            """
+        ),
+        {
+            "ordering_key": primary["ordering_key"],
+            "message_id": primary["message_id"],
+            "limit": SLACK_OUTBOX_COALESCE_MAX - 1,
+        },
+    ).mappings().all()
+    chars = len(primary["payload"].get("text") or "")
+    follower_ids = []
+    for row in candidates:
+        if row["coalesce_key"] != primary["coalesce_key"]:
+            break
+        chars += len(decode_json_object(row["payload"]).get("text") or "") + 1
+        if chars > SLACK_OUTBOX_COALESCE_MAX_CHARS:
+            break
+        follower_ids.append(row["message_id"])
+    if not follower_ids:
+        return []
+    rows = conn.execute(
+        text(
+            """
+            UPDATE slack_outbox
+            SET status = 'sending',
+                worker_id = :worker_id,
+                attempts = COALESCE(attempts, 0) + 1,
+                lease_expires_at = :lease_expires_at
+            WHERE message_id IN :ids
+              AND status = 'pending'
+            RETURNING message_id, ordering_key, coalesce_key, payload, on_delivered, context, attempts
+            """
+        ).bindparams(bindparam("ids", expanding=True)),
+        {**params, "ids": follower_ids},
+    ).mappings().all()
+    return sorted((_decode_item(row) for row in rows), key=lambda item: item["message_id"])
+
+
+def coalesced_payload(items: list[dict[str, Any]]) -> dict[str, Any]:
+    payload = dict(items[0]["payload"])
+    if len(items) > 1:
+        payload["text"] = "\n".join(str(item["payload"].get("text") or "") for item in items)
+    return payload
+
+
+def finish_slack_outbox(
+    conn: Connection,
+    items: list[dict[str, Any]],
+    worker_id: str,
+    *,
+    payload: dict[str, Any] | None = None,
+    response: dict[str, Any] | None = None,
+    error: str | None = None,
+    retry_after: float | None = None,
+) -> str:
+    """Record a delivery attempt for claimed ``items``; returns ``sent``, ``pending`` or ``dead``."""
+    now = utcnow()
+    primary_id = items[0]["message_id"]
+    if error is None:
+        for item in items:
+            _update_claimed(
+                conn,
+                item,
+                worker_id,
+                "status = 'sent', sent_at = :now, lease_expires_at = NULL, last_error = NULL, "
+                "merged_into = :merged_into, response = :response",
+                {
+                    "now": now,
+                    "merged_into": None if item["message_id"] == primary_id else primary_id,
+                    "response": json.dumps(response or {}, ensure_ascii=False),
+                },
+            )
+            if item["on_delivered"]:
+                _run_callback(conn, item, payload or item["payload"], response or {})
+        return "sent"
+
+    if retry_after is not None:
+        # Rate limited: the message was not posted, so the attempt is not counted.
+        for item in items:
+            _update_claimed(
+                conn,
+                item,
+                worker_id,
+                "status = 'pending', attempts = attempts - 1, available_at = :available_at, "
+                "lease_expires_at = NULL, last_error = :error",
+                {"available_at": now + timedelta(seconds=retry_after), "error": error},
+            )
+        return "pending"
+
+    statuses = set()
+    for item in items:
+        attempts = int(item.get("attempts") or 1)
+        if attempts >= SLACK_OUTBOX_MAX_ATTEMPTS:
+            statuses.add("dead")
+            _update_claimed(
+                conn,
+                item,
+                worker_id,
+                "status = 'dead', lease_expires_at = NULL, last_error = :error",
+                {"error": error},
+            )
+            logger.warning("slack.outbox_dead message_id=%s attempts=%s error=%s", item["message_id"], attempts, error)
+            continue
+        statuses.add("pending")
+        delay = min(SLACK_OUTBOX_RETRY_MAX_SECONDS, SLACK_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+        _update_claimed(
+            conn,
+            item,
+            worker_id,
+            "status = 'pending', available_at = :available_at, lease_expires_at = NULL, last_error = :error",
+            {"available_at": now + timedelta(seconds=delay), "error": error},
+        )
+    return "dead" if statuses == {"dead"} else "pending"
+
+
+def _run_callback(conn: Connection, item: dict[str, Any], payload: dict[str, Any], response: dict[str, Any]) -> None:
+    callback = _callbacks.get(item["on_delivered"])
+    if callback is None:
+        logger.warning("slack.outbox_unknown_callback message_id=%s name=%s", item["message_id"], item["on_delivered"])
+        return
+    # The message is already posted: a failing callback must not roll back ``sent`` and post it again.
+    try:
+        with conn.begin_nested():
+            callback(conn, payload, response, item["context"])
+    except Exception:
+        logger.exception("slack.outbox_callback_failed message_id=%s name=%s", item["message_id"], item["on_delivered"])
+
+
+def bury_abandoned_slack_outbox(conn: Connection) -> int:
+    """Move messages whose last allowed attempt lost its dispatcher to ``dead`` so their thread moves on."""
+    now = utcnow()
+    buried = conn.execute(
+        text(
+            """
+            UPDATE slack_outbox
+            SET status = 'dead',
+                lease_expires_at = NULL,
+                last_error = COALESCE(last_error, 'dispatcher lease expired')
+            WHERE status = 'sending'
+              AND lease_expires_at < :now
+              AND attempts >= :max_attempts
+            """
+        ),
+        {"now": now, "max_attempts": SLACK_OUTBOX_MAX_ATTEMPTS},
+    ).rowcount
+    if buried:
+        logger.warning("slack.outbox_abandoned count=%s", buried)
+    return buried
+
+
+def dispatch_next_slack_message(engine: Engine, worker_id: str) -> str | None:
+    """Claim, post and record one (possibly coalesced) message. ``None`` when nothing is due."""
+    with engine.begin() as conn:
+        bury_abandoned_slack_outbox(conn)
+        items = claim_slack_outbox(conn, worker_id)
+    if not items:
+        return None
+    payload = coalesced_payload(items)
+    outcome: dict[str, Any] = {}
+    try:
+        outcome["response"] = deliver_slack_message(payload, max_wait=SLACK_OUTBOX_MAX_WAIT_SECONDS)
+    except SlackRateLimited as exc:
+        outcome = {"error": str(exc), "retry_after": max(1.0, exc.retry_after or 1.0)}
+    except SlackApiError as exc:
+        outcome = {"error": str(exc)}
+    except Exception as exc:
+        logger.exception("slack.outbox_failed message_id=%s", items[0]["message_id"])
+        outcome = {"error": str(exc) or exc.__class__.__name__}
+    with engine.begin() as conn:
+        status = finish_slack_outbox(conn, items, worker_id, payload=payload, **outcome)
+    if len(items) > 1 and status == "sent":
+        logger.info("slack.outbox_coalesced message_id=%s messages=%s", items[0]["message_id"], len(items))
+    return status
+
+
+def fetch_slack_outbox_stats(conn: Connection, *, window_seconds: int = 3600) -> dict[str, Any]:
+    """Backlog by status, the age of the oldest unsent message, and posts vs. messages sent in the window."""
+    now = utcnow()
+    backlog = {status: 0 for status in SLACK_OUTBOX_STATUSES}
+    for row in conn.execute(text("SELECT status, COUNT(*) AS items FROM slack_outbox GROUP BY status")).mappings():
+        backlog[str(row["status"])] = int(row["items"])
+    oldest = as_datetime(
+        conn.execute(text("SELECT MIN(created_at) FROM slack_outbox WHERE status IN ('pending', 'sending')")).scalar()
+    )
+    sent = conn.execute(
+        text(
+            """
+            SELECT COUNT(*) AS messages,
+                   SUM(CASE WHEN merged_into IS NULL THEN 1 ELSE 0 END) AS posts
+            FROM slack_outbox
+            WHERE status = 'sent' AND sent_at >= :since
+            """
+        ),
+        {"since": now - timedelta(seconds=window_seconds)},
+    ).mappings().one()
+    return {
+        "dispatcher": SLACK_OUTBOX_DISPATCHER,
+        "backlog": backlog,
+        "oldest_unsent_age_seconds": round((now - oldest).total_seconds(), 1) if oldest else None,
+        "window_seconds": window_seconds,
+        "messages_sent": int(sent["messages"] or 0),
+        "posts": int(sent["posts"] or 0),
+    }
+
+
+class SlackOutboxDispatcher:
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        worker_id: str,
+        stop_event: threading.Event,
+        poll_seconds: float = SLACK_OUTBOX_POLL_SECONDS,
+        exit_when_idle: bool = False,
+    ) -> None:
+        self.engine = engine
+        self.worker_id = worker_id
+        self.stop_event = stop_event
+        self.poll_seconds = poll_seconds
+        self.exit_when_idle = exit_when_idle
+        self.processed: dict[str, int] = {}
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                status = dispatch_next_slack_message(self.engine, self.worker_id)
+            except Exception:
+                logger.exception("slack.outbox_claim_failed worker_id=%s", self.worker_id)
+                status = None
+            if status is None:
+                if self.exit_when_idle:
+                    return
+                self.stop_event.wait(self.poll_seconds)
+                continue
+            self.processed[status] = self.processed.get(status, 0) + 1
+
+
+def start_slack_outbox_dispatcher(engine: Engine) -> threading.Event | None:
+    """Start the web process's dispatcher thread (``SLACK_OUTBOX_DISPATCHER=inprocess``); set the event to stop it."""
+    if SLACK_OUTBOX_DISPATCHER != SLACK_OUTBOX_DISPATCHER_INPROCESS or not slack_configured():
+        return None
+    stop_event = threading.Event()
+    dispatcher = SlackOutboxDispatcher(
+        engine,
+        worker_id=worker_id_prefix("web", "outbox"),
+        stop_event=stop_event,
+    )
+    threading.Thread(target=dispatcher.run, name=dispatcher.worker_id, daemon=True).start()
+    return stop_event
+
+
+def serve(
+    engine: Engine,
+    *,
+    concurrency: int = 1,
+    stop_event: threading.Event | None = None,
+    **dispatcher_kwargs: Any,
+) -> list[SlackOutboxDispatcher]:
+    """Run ``concurrency`` dispatchers until ``stop_event`` is set; one thread's messages never go out in parallel."""
+    stop_event = stop_event or threading.Event()
+    prefix = worker_id_prefix("outbox")
+    dispatchers = [
+        SlackOutboxDispatcher(engine, worker_id=f"{prefix}-{index}", stop_event=stop_event, **dispatcher_kwargs)
+        for index in range(max(1, concurrency))
+    ]
+    return run_workers(dispatchers)
+
+
+def _update_claimed(
+    conn: Connection,
+    item: dict[str, Any],
+    worker_id: str,
+    assignments: str,
+    params: dict[str, Any],
+) -> None:
+    conn.execute(
+        text(
+            f"""
+            UPDATE slack_outbox
+            SET {assignments}
+            WHERE message_id = :message_id
+              AND worker_id = :worker_id
+              AND status = 'sending'
+            """
+        ),
+        {**params, "message_id": item["message_id"], "worker_id": worker_id},
+    )
+
+
+def _decode_item(row: Any) -> dict[str, Any]:
+    item = dict(row)
+    item["payload"] = decode_json_object(item.get("payload"))
+    item["context"] = decode_json_object(item.get("context"))
+    return item
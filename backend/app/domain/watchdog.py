@@ -1,159 +1,795 @@
 ﻿from __future__ import annotations
 
+import contextvars
+import hashlib
+import heapq
 import json
 import logging
-from datetime import date, datetime, timezone
-from typing import Any
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Iterator
 from uuid import uuid4
 
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 from sqlalchemy.engine import Connection
 
 from app.agents.drafting import DraftingResult, generate_drafts
-from app.agents.gunshi import GunshiPlan, generate_plans
-from app.agents.monitor import MonitorResult, analyze_risk
+from app.agents.gunshi import GunshiPlan, generate_plans, generate_plans_batch
+from app.agents.monitor import MonitorResult, analyze_risk, analyze_risk_batch
+from app.db.bulk import execute_chunked
+from app.db.queue_utils import decode_json_object, utcnow
+from app.db.streaming import stream_rows
 from app.domain.embeddings import ensure_weekly_report_embeddings
-from app.domain.hitl import request_approval
+from app.domain.hitl import merge_checkpoint_metadata, request_approval
+from app.domain.input_sources import (
+    SOURCE_ATTENDANCE,
+    SOURCE_SLACK_LOGS,
+    SOURCE_WEEKLY_REPORTS,
+    ingest_attendance,
+    ingest_slack_logs,
+    ingest_weekly_reports,
+)
+from app.domain.retention import run_retention
+from app.stage_metrics import StageRecorder
 
 POSITIVE_WORDS = ("挑戦", "伸びしろ", "育成", "学び", "成長")
 NEGATIVE_WORDS = ("疲労", "飽き", "燃え尽き", "限界")
 RISK_WORDS = ("炎上", "対人トラブル", "噂", "不満")
 
+LLM_MODE_SERIAL = "serial"
+LLM_MODE_BATCHED = "batched"
+LLM_MODE_CONCURRENT = "concurrent"
+WATCHDOG_LLM_MODE = (os.getenv("WATCHDOG_LLM_MODE") or LLM_MODE_SERIAL).strip().lower()
+WATCHDOG_LLM_BATCH_SIZE = max(1, int(os.getenv("WATCHDOG_LLM_BATCH_SIZE", "5") or "5"))
+WATCHDOG_LLM_CONCURRENCY = max(1, int(os.getenv("WATCHDOG_LLM_CONCURRENCY", "4") or "4"))
+# Project notes handed to the LLM stage are cut to this many characters.
+WATCHDOG_NOTES_MAX_CHARS = max(100, int(os.getenv("WATCHDOG_NOTES_MAX_CHARS", "1500") or "1500"))
+
+JOB_TYPE_CYCLE = "cycle"
+JOB_TYPE_RETENTION = "retention"
+JOB_TYPE_EMBEDDINGS = "embeddings"
+JOB_TYPE_INGESTION = "ingestion"
+JOB_TYPES = (JOB_TYPE_CYCLE, JOB_TYPE_RETENTION, JOB_TYPE_EMBEDDINGS, JOB_TYPE_INGESTION)
+# Statuses of jobs that make a new equivalent job redundant (the predicate of the unique dedupe_key index).
+ACTIVE_JOB_STATUSES = ("queued", "running", "sharded")
+
+SCOPE_FULL = "full"
+SCOPE_INCREMENTAL = "incremental"
+# Past this many affected ids an incremental cycle is no cheaper than a full one.
+WATCHDOG_INCREMENTAL_MAX_IDS = max(1, int(os.getenv("WATCHDOG_INCREMENTAL_MAX_IDS", "5000") or "5000"))
+
+WATCHDOG_LEASE_SECONDS = max(10, int(os.getenv("WATCHDOG_LEASE_SECONDS", "300") or "300"))
+WATCHDOG_MAX_ATTEMPTS = max(1, int(os.getenv("WATCHDOG_MAX_ATTEMPTS", "3") or "3"))
+WATCHDOG_EMBEDDING_BATCH = max(1, int(os.getenv("WATCHDOG_EMBEDDING_BATCH", "500") or "500"))
+
+_JOB_COLUMNS = "job_id, status, payload, parent_job_id, worker_id, attempts, created_at, started_at, finished_at"
+
 logger = logging.getLogger("saihai.watchdog")
 
 
-def enqueue_watchdog_job(conn: Connection, payload: dict | None = None) -> dict[str, str]:
-    conn.execute(
-        text(
-            """
-            INSERT INTO watchdog_jobs (status, payload)
-            VALUES ('queued', :payload)
-            """
-        ),
-        {"payload": json.dumps(payload or {}, ensure_ascii=False)},
-    )
-    job_id = conn.execute(
+def enqueue_watchdog_job(
+    conn: Connection,
+    payload: dict | None = None,
+    *,
+    coalesce: bool = False,
+) -> dict[str, Any]:
+    """Queue a watchdog run.
+
+    ``{"shards": K}`` or ``{"partitions": [[project_id, ...], ...]}`` fans the run out into one job per
+    shard under a parent job that is closed out once every shard has finished. With ``coalesce`` nothing
+    is queued while an equivalent job (same payload) is still queued or running; that job is returned
+    with status ``coalesced`` instead. A unique index on the active jobs' ``dedupe_key`` makes this hold
+    for concurrent enqueues too.
+    """
+    payload = dict(payload or {})
+    job_type = payload.get("type", JOB_TYPE_CYCLE)
+    if job_type not in JOB_TYPES:
+        raise ValueError(f"unknown watchdog job type: {job_type}")
+    dedupe_key = watchdog_dedupe_key(payload)
+    partitions = _fanout_partitions(payload) if job_type == JOB_TYPE_CYCLE else []
+    if not partitions:
+        job_id, inserted = _insert_keyed_job(conn, "queued", payload, dedupe_key, coalesce=coalesce)
+        return {"job_id": str(job_id), "status": "queued" if inserted else "coalesced"}
+
+    # Shards diff against the last completed logical run, and the parent records where this one starts.
+    full = _is_truthy(payload.get("full"))
+    since = None if full else _last_watermark(conn)
+    parent_payload: dict[str, Any] = {"request": payload}
+    if "partitions" not in payload:
+        # Hash shards cover every project, so the completed run can serve as the next baseline.
+        parent_payload["watermark"] = _current_watermark(conn).to_payload()
+    parent_id, inserted = _insert_keyed_job(conn, "sharded", parent_payload, dedupe_key, coalesce=coalesce)
+    if not inserted:
+        return {"job_id": str(parent_id), "status": "coalesced"}
+    shard_request = {key: value for key, value in payload.items() if key not in {"shards", "partitions"}}
+    shard_ids = [
+        _insert_watchdog_job(
+            conn,
+            "queued",
+            {
+                **shard_request,
+                "partition": partition.to_payload(),
+                "since": since.to_payload() if since else None,
+            },
+            parent_job_id=parent_id,
+        )
+        for partition in partitions
+    ]
+    return {"job_id": str(parent_id), "status": "sharded", "shard_job_ids": [str(job_id) for job_id in shard_ids]}
+
+
+def watchdog_dedupe_key(payload: dict[str, Any]) -> str:
+    """Jobs with the same type and request share a key; scheduler bookkeeping fields are ignored."""
+    request = {key: value for key, value in payload.items() if key not in _SCHEDULE_FIELDS}
+    request.setdefault("type", JOB_TYPE_CYCLE)
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{request['type']}:{hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]}"
+
+
+_SCHEDULE_FIELDS = frozenset({"schedule", "scheduled_for", "missed_runs"})
+
+
+def _active_job_id(conn: Connection, dedupe_key: str) -> int | None:
+    return conn.execute(
         text(
             """
             SELECT job_id
             FROM watchdog_jobs
-            ORDER BY job_id DESC
+            WHERE dedupe_key = :dedupe_key
+              AND status IN :statuses
+            ORDER BY job_id
             LIMIT 1
             """
-        )
+        ).bindparams(bindparam("statuses", expanding=True)),
+        {"dedupe_key": dedupe_key, "statuses": list(ACTIVE_JOB_STATUSES)},
     ).scalar()
-    return {"job_id": str(job_id), "status": "queued"}
+
+
+def _insert_keyed_job(
+    conn: Connection,
+    status: str,
+    payload: dict,
+    dedupe_key: str,
+    *,
+    coalesce: bool,
+) -> tuple[int, bool]:
+    """Insert a job holding ``dedupe_key``; ``(job_id, False)`` is the active job it coalesced into."""
+    while True:
+        job_id = _insert_watchdog_job(conn, status, payload, dedupe_key=dedupe_key)
+        if job_id is not None:
+            return job_id, True
+        if not coalesce:
+            # Only one active job holds the key; an uncoalesced duplicate runs without it.
+            return _insert_watchdog_job(conn, status, payload), True
+        existing = _active_job_id(conn, dedupe_key)
+        if existing is not None:
+            return existing, False
+        # The holder finished between the two statements: try to take the key again.
+
+
+def _insert_watchdog_job(
+    conn: Connection,
+    status: str,
+    payload: dict,
+    parent_job_id: int | None = None,
+    *,
+    dedupe_key: str | None = None,
+) -> int | None:
+    """Insert a job and return its id, or ``None`` when another active job already holds ``dedupe_key``."""
+    return conn.execute(
+        text(
+            """
+            INSERT INTO watchdog_jobs (status, payload, attempts, parent_job_id, dedupe_key)
+            VALUES (:status, :payload, 0, :parent_job_id, :dedupe_key)
+            ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running', 'sharded') DO NOTHING
+            RETURNING job_id
+            """
+        ),
+        {
+            "status": status,
+            "payload": json.dumps(payload, ensure_ascii=False),
+            "parent_job_id": parent_job_id,
+            "dedupe_key": dedupe_key,
+        },
+    ).scalar()
+
+
+def _fanout_partitions(payload: dict[str, Any]) -> list["_Partition"]:
+    explicit = payload.get("partitions")
+    if isinstance(explicit, list) and explicit:
+        lists = [frozenset(str(pid) for pid in group) for group in explicit if isinstance(group, list)]
+        return [_Partition(index=i, count=len(lists), project_ids=ids) for i, ids in enumerate(lists)]
+    try:
+        count = int(payload.get("shards") or 0)
+    except (TypeError, ValueError):
+        raise ValueError("shards must be an integer") from None
+    if count <= 1:
+        return []
+    return [_Partition(index=i, count=count) for i in range(count)]
 
 
 def run_watchdog_job(conn: Connection, job_id: str | None = None) -> dict[str, str]:
     if isinstance(job_id, str) and job_id.isdigit():
         job_id = int(job_id)
-    job_id = job_id or _next_watchdog_job_id(conn)
-    if not job_id:
+    worker_id = f"inline-{uuid4().hex[:8]}"
+    claimed = claim_watchdog_job(conn, worker_id, job_id=job_id)
+    if not claimed:
         raise ValueError("no queued job")
 
-    _update_watchdog_job(conn, job_id, "running", None)
+    job_id = claimed["job_id"]
+    request = claimed["request"]
     try:
-        summary = _perform_watchdog_cycle(conn, job_id=str(job_id))
-        _update_watchdog_job(conn, job_id, "succeeded", summary)
-        _record_watchdog_alerts(conn, job_id=job_id, alerts=summary.get("alerts") or [])
-        return {
-            "job_id": str(job_id),
-            "status": "succeeded",
-            "summary": summary.get("summary", "watchdog completed"),
-        }
+        # The savepoint keeps the failure record below when the cycle's own writes are rolled back.
+        with conn.begin_nested():
+            summary = execute_watchdog_job(conn, job_id, worker_id, request)
     except Exception as exc:
-        _update_watchdog_job(conn, job_id, "failed", {"error": str(exc)})
-        raise
+        logger.exception("watchdog job failed job_id=%s", job_id)
+        finish_watchdog_job(conn, job_id, worker_id, "failed", {"error": str(exc), "request": request})
+        return {"job_id": str(job_id), "status": "failed", "summary": str(exc)}
+    return {
+        "job_id": str(job_id),
+        "status": "succeeded",
+        "summary": summary.get("summary", "watchdog completed"),
+    }
 
 
-def _perform_watchdog_cycle(conn: Connection, job_id: str | None = None) -> dict[str, Any]:
-    ensure_weekly_report_embeddings(conn)
+class WatchdogLeaseLost(RuntimeError):
+    """The job's lease expired and another worker reclaimed it; this run's results are discarded."""
 
-    users = conn.execute(
+
+def claim_watchdog_job(
+    conn: Connection,
+    worker_id: str,
+    *,
+    lease_seconds: int = WATCHDOG_LEASE_SECONDS,
+    job_id: int | None = None,
+) -> dict[str, Any] | None:
+    now = utcnow()
+    _fail_exhausted_jobs(conn, now)
+    if job_id is None:
+        claimable = (
+            "(status = 'queued' OR (status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < :now)))"
+        )
+    else:
+        claimable = (
+            "job_id = :job_id AND status <> 'sharded' "
+            "AND (status <> 'running' OR lease_expires_at IS NULL OR lease_expires_at < :now)"
+        )
+    # SQLite serialises writers, so the single UPDATE is already atomic there.
+    lock = "" if conn.dialect.name == "sqlite" else "FOR UPDATE SKIP LOCKED"
+    row = conn.execute(
         text(
+            f"""
+            UPDATE watchdog_jobs
+            SET status = 'running',
+                worker_id = :worker_id,
+                attempts = COALESCE(attempts, 0) + 1,
+                started_at = :now,
+                heartbeat_at = :now,
+                lease_expires_at = :lease_expires_at,
+                finished_at = NULL
+            WHERE job_id = (
+                SELECT job_id
+                FROM watchdog_jobs
+                WHERE {claimable}
+                ORDER BY job_id
+                LIMIT 1
+                {lock}
+            )
+            RETURNING job_id, payload, attempts
             """
-            SELECT user_id, name, role, cost_per_month, career_aspiration
-            FROM users
-            ORDER BY user_id
+        ),
+        {
+            "worker_id": worker_id,
+            "now": now,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            "job_id": job_id,
+        },
+    ).mappings().first()
+    if not row:
+        return None
+    return {
+        "job_id": row["job_id"],
+        "attempts": row["attempts"],
+        "request": _request_from_payload(row["payload"]),
+    }
+
+
+def heartbeat_watchdog_job(
+    conn: Connection,
+    job_id: int,
+    worker_id: str,
+    *,
+    lease_seconds: int = WATCHDOG_LEASE_SECONDS,
+) -> bool:
+    now = utcnow()
+    result = conn.execute(
+        text(
             """
-        )
-    ).mappings().all()
-    projects = conn.execute(
+            UPDATE watchdog_jobs
+            SET heartbeat_at = :now,
+                lease_expires_at = :lease_expires_at
+            WHERE job_id = :job_id
+              AND worker_id = :worker_id
+              AND status = 'running'
+            """
+        ),
+        {
+            "job_id": job_id,
+            "worker_id": worker_id,
+            "now": now,
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+        },
+    )
+    return result.rowcount == 1
+
+
+def finish_watchdog_job(conn: Connection, job_id: int, worker_id: str, status: str, payload: dict) -> bool:
+    rows = conn.execute(
         text(
             """
-            SELECT project_id, project_name, manager_id, budget_cap
-            FROM projects
-            ORDER BY project_id
+            UPDATE watchdog_jobs
+            SET status = :status,
+                payload = :payload,
+                finished_at = :now,
+                lease_expires_at = NULL
+            WHERE job_id = :job_id
+              AND worker_id = :worker_id
+              AND status = 'running'
+            RETURNING parent_job_id
             """
-        )
+        ),
+        {
+            "job_id": job_id,
+            "worker_id": worker_id,
+            "status": status,
+            "payload": json.dumps(payload, ensure_ascii=False),
+            "now": utcnow(),
+        },
+    ).all()
+    if not rows:
+        return False
+    if rows[0][0] is not None:
+        _close_parent_job(conn, rows[0][0])
+    return True
+
+
+def execute_watchdog_job(conn: Connection, job_id: int, worker_id: str, request: dict[str, Any]) -> dict[str, Any]:
+    """Run the cycle for a claimed job and mark it succeeded in the same transaction."""
+    job_type = request.get("type", JOB_TYPE_CYCLE)
+    if job_type != JOB_TYPE_CYCLE:
+        summary = _run_maintenance_job(conn, job_type, request)
+        if not finish_watchdog_job(conn, job_id, worker_id, "succeeded", {**summary, "request": request}):
+            raise WatchdogLeaseLost(f"watchdog job {job_id} is no longer leased by {worker_id}")
+        return summary
+
+    full = _is_truthy(request.get("full"))
+    previous = None
+    if not full:
+        # Shard jobs carry the baseline chosen at fan-out; standalone jobs diff against the last run.
+        previous = _Watermark.from_payload(request["since"]) if "since" in request else _last_watermark(conn)
+    summary = _perform_watchdog_cycle(
+        conn,
+        job_id=str(job_id),
+        full=full,
+        previous=previous,
+        partition=_Partition.from_request(request),
+    )
+    _record_watchdog_alerts(conn, job_id=job_id, alerts=summary.get("alerts") or [])
+    if not finish_watchdog_job(conn, job_id, worker_id, "succeeded", {**summary, "request": request}):
+        raise WatchdogLeaseLost(f"watchdog job {job_id} is no longer leased by {worker_id}")
+    return summary
+
+
+def _run_maintenance_job(conn: Connection, job_type: str, request: dict[str, Any]) -> dict[str, Any]:
+    if job_type == JOB_TYPE_RETENTION:
+        return run_retention(conn)
+    if job_type == JOB_TYPE_EMBEDDINGS:
+        limit = int(request.get("limit") or WATCHDOG_EMBEDDING_BATCH)
+        updated = ensure_weekly_report_embeddings(conn, limit=limit)
+        return {"summary": f"embedded {updated} weekly reports", "updated": updated}
+    if job_type == JOB_TYPE_INGESTION:
+        source = request.get("source") or SOURCE_WEEKLY_REPORTS
+        ingest = _INGESTERS.get(source)
+        if ingest is None:
+            raise ValueError(f"unknown ingestion source: {source}")
+        # Ingestion records its own run (including failures), so the job reports it rather than raising.
+        run = ingest(conn)
+        return {
+            "summary": f"{source} ingestion {run.status}: {run.items_inserted} items",
+            "run_id": run.run_id,
+            "ingestion_status": run.status,
+            "items_inserted": run.items_inserted,
+            "error": run.error,
+        }
+    raise ValueError(f"unknown watchdog job type: {job_type}")
+
+
+_INGESTERS = {
+    SOURCE_WEEKLY_REPORTS: ingest_weekly_reports,
+    SOURCE_SLACK_LOGS: ingest_slack_logs,
+    SOURCE_ATTENDANCE: ingest_attendance,
+}
+
+
+def fetch_watchdog_job(conn: Connection, job_id: int) -> dict[str, Any] | None:
+    row = conn.execute(
+        text(f"SELECT {_JOB_COLUMNS} FROM watchdog_jobs WHERE job_id = :job_id"),
+        {"job_id": job_id},
+    ).mappings().first()
+    return _job_row(row) if row else None
+
+
+def fetch_recent_watchdog_jobs(conn: Connection, *, limit: int = 10, status: str | None = None) -> list[dict[str, Any]]:
+    """Most recent jobs first; shard children are included so per-shard stages can be compared."""
+    status_filter = "WHERE status = :status" if status else ""
+    rows = conn.execute(
+        text(
+            f"""
+            SELECT {_JOB_COLUMNS}
+            FROM watchdog_jobs
+            {status_filter}
+            ORDER BY job_id DESC
+            LIMIT :limit
+            """
+        ),
+        {"limit": limit, "status": status},
     ).mappings().all()
-    assignments = conn.execute(
+    return [_job_row(row) for row in rows]
+
+
+def _job_row(row: Any) -> dict[str, Any]:
+    job = dict(row)
+    job["payload"] = decode_json_object(job.get("payload"))
+    for key in ("created_at", "started_at", "finished_at"):
+        if isinstance(job.get(key), datetime):
+            job[key] = job[key].isoformat()
+    return job
+
+
+def _fail_exhausted_jobs(conn: Connection, now: datetime) -> None:
+    rows = conn.execute(
         text(
             """
-            SELECT assignment_id, user_id, project_id, allocation_rate
-            FROM assignments
-            ORDER BY assignment_id
+            UPDATE watchdog_jobs
+            SET status = 'failed',
+                finished_at = :now,
+                lease_expires_at = NULL
+            WHERE status = 'running'
+              AND lease_expires_at < :now
+              AND attempts >= :max_attempts
+            RETURNING parent_job_id
             """
-        )
-    ).mappings().all()
-    reports = conn.execute(
+        ),
+        {"now": now, "max_attempts": WATCHDOG_MAX_ATTEMPTS},
+    ).all()
+    if rows:
+        logger.warning("watchdog.jobs_abandoned count=%s max_attempts=%s", len(rows), WATCHDOG_MAX_ATTEMPTS)
+    for parent_job_id in sorted({row[0] for row in rows if row[0] is not None}):
+        _close_parent_job(conn, parent_job_id)
+
+
+def _close_parent_job(conn: Connection, parent_job_id: int) -> None:
+    # Locking the parent serialises sibling shards finishing at the same time, so exactly one closes it.
+    lock = "" if conn.dialect.name == "sqlite" else "FOR UPDATE"
+    parent = conn.execute(
+        text(f"SELECT status, payload FROM watchdog_jobs WHERE job_id = :job_id {lock}"),
+        {"job_id": parent_job_id},
+    ).mappings().first()
+    if not parent or parent["status"] != "sharded":
+        return
+    shards = conn.execute(
         text(
             """
-            SELECT user_id, project_id, reporting_date, content_text
-            FROM weekly_reports
-            ORDER BY reporting_date DESC
+            SELECT job_id, status, payload
+            FROM watchdog_jobs
+            WHERE parent_job_id = :job_id
+            ORDER BY job_id
             """
-        )
+        ),
+        {"job_id": parent_job_id},
     ).mappings().all()
+    if any(shard["status"] not in {"succeeded", "failed"} for shard in shards):
+        return
 
-    report_by_user = _latest_report_by_user(reports)
-    report_by_project = _reports_by_project(reports)
+    alerts: list[dict[str, Any]] = []
+    failed: list[str] = []
+    for shard in shards:
+        shard_payload = decode_json_object(shard["payload"])
+        if shard["status"] == "failed":
+            failed.append(str(shard["job_id"]))
+        alerts.extend(shard_payload.get("alerts") or [])
+    status = "failed" if failed else "succeeded"
+    payload = decode_json_object(parent["payload"])
+    payload.update(
+        {
+            "summary": f"watchdog shards {len(shards) - len(failed)}/{len(shards)} succeeded",
+            "shards": {
+                "total": len(shards),
+                "failed": len(failed),
+                "job_ids": [str(shard["job_id"]) for shard in shards],
+                "failed_job_ids": failed,
+            },
+            "alerts": alerts,
+        }
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE watchdog_jobs
+            SET status = :status,
+                payload = :payload,
+                finished_at = :now
+            WHERE job_id = :job_id
+            """
+        ),
+        {
+            "job_id": parent_job_id,
+            "status": status,
+            "payload": json.dumps(payload, ensure_ascii=False),
+            "now": utcnow(),
+        },
+    )
+    logger.info("watchdog.parent_closed job_id=%s status=%s shards=%s", parent_job_id, status, len(shards))
+
+
+
+@dataclass(frozen=True)
+class _Watermark:
+    """High-water mark of watchdog inputs, stored in the job payload on success."""
+
+    report_id: int
+    assignment_id: int
+    assignment_count: int
+    assignments_updated_at: str | None
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "report_id": self.report_id,
+            "assignment_id": self.assignment_id,
+            "assignment_count": self.assignment_count,
+            "assignments_updated_at": self.assignments_updated_at,
+        }
 
+    @classmethod
+    def from_payload(cls, payload: Any) -> "_Watermark | None":
+        if not isinstance(payload, dict):
+            return None
+        try:
+            return cls(
+                report_id=int(payload["report_id"]),
+                assignment_id=int(payload["assignment_id"]),
+                assignment_count=int(payload["assignment_count"]),
+                assignments_updated_at=payload.get("assignments_updated_at"),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+@dataclass(frozen=True)
+class _Partition:
+    """Slice of projects one shard job owns: a crc32 hash bucket, or an explicit project list."""
+
+    index: int
+    count: int
+    project_ids: frozenset[str] | None = None
+
+    @property
+    def primary(self) -> bool:
+        # Project-independent housekeeping (embeddings, pattern seeds) runs in one shard only.
+        return self.index == 0
+
+    def owns(self, project_id: str) -> bool:
+        if self.project_ids is not None:
+            return project_id in self.project_ids
+        return zlib.crc32(str(project_id).encode("utf-8")) % self.count == self.index
+
+    def to_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {"index": self.index, "count": self.count}
+        if self.project_ids is not None:
+            payload["project_ids"] = sorted(self.project_ids)
+        return payload
+
+    @classmethod
+    def from_request(cls, request: dict[str, Any]) -> "_Partition | None":
+        raw = request.get("partition")
+        if isinstance(raw, dict):
+            project_ids = raw.get("project_ids")
+            return cls(
+                index=int(raw.get("index") or 0),
+                count=max(1, int(raw.get("count") or 1)),
+                project_ids=frozenset(str(pid) for pid in project_ids) if isinstance(project_ids, list) else None,
+            )
+        if isinstance(request.get("project_ids"), list):
+            return cls(index=0, count=1, project_ids=frozenset(str(pid) for pid in request["project_ids"]))
+        return None
+
+
+@dataclass(frozen=True)
+class _CycleScope:
+    """Which users and projects a cycle loads; ``None`` id sets mean every row."""
+
+    mode: str
+    reason: str
+    user_ids: frozenset[str] | None = None
+    project_ids: frozenset[str] | None = None
+    partition: _Partition | None = None
+
+    @property
+    def full(self) -> bool:
+        return self.mode == SCOPE_FULL
+
+    def to_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {"mode": self.mode, "reason": self.reason}
+        if self.user_ids is not None:
+            payload["users"] = len(self.user_ids)
+        if self.project_ids is not None:
+            payload["projects"] = len(self.project_ids)
+        if self.partition is not None:
+            payload["partition"] = {"index": self.partition.index, "count": self.partition.count}
+        return payload
+
+
+@dataclass(frozen=True)
+class _AssetTarget:
+    project: dict
+    risk_level: str
+    notes: str
+    similar_reports: list
+
+
+AiAssets = tuple[MonitorResult | None, list[GunshiPlan], DraftingResult | None]
+
+
+def _perform_watchdog_cycle(
+    conn: Connection,
+    job_id: str | None = None,
+    *,
+    full: bool = True,
+    previous: _Watermark | None = None,
+    partition: _Partition | None = None,
+) -> dict[str, Any]:
+    cycle_started = time.perf_counter()
+    primary = partition is None or partition.primary
+    with StageRecorder(conn) as recorder:
+        if primary:
+            with recorder.stage("embeddings") as stage:
+                stage.rows_written = ensure_weekly_report_embeddings(conn)
+
+        with recorder.stage("scope"):
+            # Taken before loading so rows written during the cycle are picked up by the next one.
+            watermark = _current_watermark(conn)
+            if full:
+                scope = _CycleScope(mode=SCOPE_FULL, reason="requested")
+            elif previous is None:
+                scope = _CycleScope(mode=SCOPE_FULL, reason="no_watermark")
+            else:
+                scope = _incremental_scope(conn, watermark, previous)
+            if partition is not None:
+                scope = _restrict_to_partition(conn, scope, partition)
+
+        with recorder.stage("load") as stage:
+            users, projects, assignments = _load_cycle_inputs(conn, scope)
+            report_by_user, notes_by_project, report_count = _fold_reports(_stream_reports(conn, scope))
+            stage.rows_read = len(users) + len(projects) + len(assignments) + report_count
+            members_by_project = _members_by_project(assignments)
+
+        today = date.today().isoformat()
+        with recorder.stage("motivation") as stage:
+            motivation_map, stage.rows_written = _score_users(conn, users, report_by_user, today)
+
+        with recorder.stage("health") as stage:
+            project_health, alerts, stage.rows_written = _score_projects(
+                conn, projects, members_by_project, motivation_map, notes_by_project, today
+            )
+
+        with recorder.stage("analysis") as stage:
+            if primary:
+                _ensure_patterns(conn)
+            stage.rows_written = _refresh_analysis(conn, assignments, report_by_user)
+
+        with recorder.stage("proposals"):
+            _ensure_proposals(conn, projects, project_health)
+
+        with recorder.stage("actions") as stage:
+            actions_created, llm_stats = _ensure_actions(conn, projects, project_health, notes_by_project)
+            stage.rows_written = actions_created
+
+    summary = f"watchdog updated: {len(projects)} projects / {len(users)} users"
+    if actions_created:
+        summary = f"watchdog created {actions_created} actions"
+    wall_ms = round((time.perf_counter() - cycle_started) * 1000, 1)
+    logger.info(
+        "watchdog.cycle job_id=%s scope=%s users=%s projects=%s wall_ms=%.1f llm_mode=%s llm_projects=%s "
+        "llm_wall_ms=%.1f stages=%s",
+        job_id,
+        scope.mode,
+        len(users),
+        len(projects),
+        wall_ms,
+        llm_stats["mode"],
+        llm_stats["projects"],
+        llm_stats["wall_ms"],
+        " ".join(f"{stage.name}={stage.wall_ms:.1f}ms/{stage.db_round_trips}q" for stage in recorder.stages),
+    )
+    result = {
+        "summary": summary,
+        "job_id": job_id or f"wdjob-{uuid4().hex[:12]}",
+        "alerts": alerts,
+        "wall_ms": wall_ms,
+        "llm": llm_stats,
+        "scope": scope.to_payload(),
+        "stages": recorder.to_payload(),
+    }
+    if partition is None:
+        # A partial run cannot vouch for projects it did not look at; sharded runs record it on the parent.
+        result["watermark"] = watermark.to_payload()
+    return result
+
+
+def _score_users(
+    conn: Connection,
+    users: list[dict],
+    report_by_user: dict[str, str],
+    today: str,
+) -> tuple[dict[str, float], int]:
     motivation_map: dict[str, float] = {}
-    today = date.today().isoformat()
+    motivation_rows: list[dict[str, Any]] = []
     for user in users:
         notes = report_by_user.get(user["user_id"], user.get("career_aspiration") or "")
         motivation_score, sentiment_score = _score_motivation(notes)
         motivation_map[user["user_id"]] = motivation_score
-        exists = conn.execute(
-            text(
-                """
-                SELECT 1
-                FROM user_motivation_history
-                WHERE user_id = :user_id AND recorded_at = :recorded_at
-                """
-            ),
-            {"user_id": user["user_id"], "recorded_at": today},
-        ).scalar()
-        if exists:
-            continue
-        conn.execute(
-            text(
-                """
-                INSERT INTO user_motivation_history
-                  (user_id, motivation_score, sentiment_score, ai_summary, recorded_at)
-                VALUES
-                  (:user_id, :motivation_score, :sentiment_score, :ai_summary, :recorded_at)
-                """
-            ),
+        motivation_rows.append(
             {
                 "user_id": user["user_id"],
                 "motivation_score": motivation_score,
                 "sentiment_score": sentiment_score,
                 "ai_summary": _summarize_motivation(notes),
                 "recorded_at": today,
-            },
+            }
         )
+    written = execute_chunked(
+        conn,
+        text(
+            """
+            INSERT INTO user_motivation_history
+              (user_id, motivation_score, sentiment_score, ai_summary, recorded_at)
+            VALUES
+              (:user_id, :motivation_score, :sentiment_score, :ai_summary, :recorded_at)
+            ON CONFLICT (user_id, recorded_at) DO UPDATE
+            SET motivation_score = EXCLUDED.motivation_score,
+                sentiment_score = EXCLUDED.sentiment_score,
+                ai_summary = EXCLUDED.ai_summary
+            """
+        ),
+        motivation_rows,
+    )
+    return motivation_map, written
+
 
+def _score_projects(
+    conn: Connection,
+    projects: list[dict],
+    members_by_project: dict[str, list[str]],
+    motivation_map: dict[str, float],
+    notes_by_project: dict[str, "_ProjectNotes"],
+    today: str,
+) -> tuple[dict[str, dict], list[dict[str, Any]], int]:
     project_health: dict[str, dict] = {}
     alerts: list[dict[str, Any]] = []
+    snapshot_rows: list[dict[str, Any]] = []
+    calculated_at = datetime.now(timezone.utc).isoformat()
     for project in projects:
         project_id = project["project_id"]
-        project_notes = " ".join(report_by_project.get(project_id, []))
-        health_score, risk_level = _score_project_health(project_notes)
-        variance_score = _score_variance(project_id, assignments, motivation_map)
-        manager_gap_score = _score_manager_gap(project.get("manager_id"), project_id, assignments, motivation_map)
+        notes = notes_by_project.get(project_id) or _ProjectNotes()
+        health_score, risk_level = _health_from_hits(notes.positive, notes.negative, notes.risk)
+        members = [motivation_map.get(user_id, 0) for user_id in members_by_project.get(project_id, ())]
+        variance_score = _score_variance(members)
+        manager_gap_score = _score_manager_gap(project.get("manager_id"), members, motivation_map)
         project_health[project_id] = {
             "health_score": health_score,
             "risk_level": risk_level,
@@ -169,28 +805,7 @@ def _perform_watchdog_cycle(conn: Connection, job_id: str | None = None) -> dict
                 }
             )
 
-        exists = conn.execute(
-            text(
-                """
-                SELECT 1
-                FROM project_health_snapshots
-                WHERE project_id = :project_id AND DATE(calculated_at) = :calculated_at
-                """
-            ),
-            {"project_id": project_id, "calculated_at": today},
-        ).scalar()
-        if exists:
-            continue
-
-        conn.execute(
-            text(
-                """
-                INSERT INTO project_health_snapshots
-                  (project_id, health_score, risk_level, variance_score, manager_gap_score, aggregate_vector, calculated_at)
-                VALUES
-                  (:project_id, :health_score, :risk_level, :variance_score, :manager_gap_score, :aggregate_vector, :calculated_at)
-                """
-            ),
+        snapshot_rows.append(
             {
                 "project_id": project_id,
                 "health_score": health_score,
@@ -198,51 +813,296 @@ def _perform_watchdog_cycle(conn: Connection, job_id: str | None = None) -> dict
                 "variance_score": variance_score,
                 "manager_gap_score": manager_gap_score,
                 "aggregate_vector": None,
-                "calculated_at": datetime.now(timezone.utc).isoformat(),
-            },
+                "calculated_at": calculated_at,
+                "snapshot_date": today,
+            }
         )
+    written = execute_chunked(
+        conn,
+        text(
+            """
+            INSERT INTO project_health_snapshots
+              (project_id, health_score, risk_level, variance_score, manager_gap_score, aggregate_vector,
+               calculated_at, snapshot_date)
+            VALUES
+              (:project_id, :health_score, :risk_level, :variance_score, :manager_gap_score, :aggregate_vector,
+               :calculated_at, :snapshot_date)
+            ON CONFLICT (project_id, snapshot_date) DO UPDATE
+            SET health_score = EXCLUDED.health_score,
+                risk_level = EXCLUDED.risk_level,
+                variance_score = EXCLUDED.variance_score,
+                manager_gap_score = EXCLUDED.manager_gap_score,
+                calculated_at = EXCLUDED.calculated_at
+            """
+        ),
+        snapshot_rows,
+    )
+    return project_health, alerts, written
 
-    _ensure_patterns(conn)
-    _refresh_analysis(conn, assignments, report_by_user)
-    _ensure_proposals(conn, projects, project_health)
-    actions_created = _ensure_actions(conn, projects, project_health, report_by_project)
 
-    summary = f"watchdog updated: {len(projects)} projects / {len(users)} users"
-    if actions_created:
-        summary = f"watchdog created {actions_created} actions"
-    return {"summary": summary, "job_id": job_id or f"wdjob-{uuid4().hex[:12]}", "alerts": alerts}
+def _current_watermark(conn: Connection) -> _Watermark:
+    row = conn.execute(
+        text(
+            """
+            SELECT
+              (SELECT COALESCE(MAX(report_id), 0) FROM weekly_reports) AS report_id,
+              (SELECT COALESCE(MAX(assignment_id), 0) FROM assignments) AS assignment_id,
+              (SELECT COUNT(*) FROM assignments) AS assignment_count,
+              (SELECT MAX(updated_at) FROM assignments) AS assignments_updated_at
+            """
+        )
+    ).mappings().one()
+    updated_at = row["assignments_updated_at"]
+    return _Watermark(
+        report_id=int(row["report_id"]),
+        assignment_id=int(row["assignment_id"]),
+        assignment_count=int(row["assignment_count"]),
+        assignments_updated_at=str(updated_at) if updated_at is not None else None,
+    )
 
 
-def _next_watchdog_job_id(conn: Connection) -> str | None:
-    return conn.execute(
+def _last_watermark(conn: Connection) -> _Watermark | None:
+    # Only full-coverage cycles record a watermark; retention, ingestion and partial runs are skipped in SQL.
+    payload = conn.execute(
         text(
             """
-            SELECT job_id
+            SELECT payload
             FROM watchdog_jobs
-            WHERE status = 'queued'
-            ORDER BY job_id
+            WHERE status = 'succeeded'
+              AND parent_job_id IS NULL
+              AND payload -> 'watermark' ->> 'report_id' IS NOT NULL
+            ORDER BY job_id DESC
             LIMIT 1
             """
         )
     ).scalar()
+    if payload is None:
+        return None
+    return _Watermark.from_payload(decode_json_object(payload).get("watermark"))
 
 
-def _update_watchdog_job(conn: Connection, job_id: str, status: str, payload: dict | None) -> None:
-    conn.execute(
+def _incremental_scope(conn: Connection, current: _Watermark, previous: _Watermark) -> _CycleScope:
+    user_ids: set[str] = set()
+    project_ids: set[str] = set()
+
+    report_rows = conn.execute(
         text(
             """
-            UPDATE watchdog_jobs
-            SET status = :status,
-                payload = :payload
-            WHERE job_id = :job_id
+            SELECT DISTINCT user_id, project_id
+            FROM weekly_reports
+            WHERE report_id > :report_id
             """
         ),
-        {
-            "job_id": job_id,
-            "status": status,
-            "payload": json.dumps(payload or {}, ensure_ascii=False),
-        },
+        {"report_id": previous.report_id},
+    ).all()
+    for user_id, project_id in report_rows:
+        user_ids.add(user_id)
+        project_ids.add(project_id)
+
+    changed_filter = "assignment_id > :assignment_id"
+    params: dict[str, Any] = {"assignment_id": previous.assignment_id}
+    if previous.assignments_updated_at is None:
+        changed_filter += " OR updated_at IS NOT NULL"
+    else:
+        changed_filter += " OR updated_at > :updated_at"
+        params["updated_at"] = previous.assignments_updated_at
+    assignment_rows = conn.execute(
+        text(f"SELECT assignment_id, user_id, project_id FROM assignments WHERE {changed_filter}"),
+        params,
+    ).all()
+    added = sum(1 for row in assignment_rows if row[0] > previous.assignment_id)
+    if previous.assignment_count + added != current.assignment_count:
+        # Deleted assignments leave no row behind to diff against.
+        return _CycleScope(mode=SCOPE_FULL, reason="assignments_deleted")
+    for _, user_id, project_id in assignment_rows:
+        user_ids.add(user_id)
+        project_ids.add(project_id)
+
+    # Entities that have never been scored (new users/projects without reports yet).
+    user_ids.update(
+        conn.execute(
+            text(
+                """
+                SELECT u.user_id
+                FROM users u
+                WHERE NOT EXISTS (SELECT 1 FROM user_motivation_history h WHERE h.user_id = u.user_id)
+                """
+            )
+        ).scalars()
+    )
+    project_ids.update(
+        conn.execute(
+            text(
+                """
+                SELECT p.project_id
+                FROM projects p
+                WHERE NOT EXISTS (SELECT 1 FROM project_health_snapshots s WHERE s.project_id = p.project_id)
+                """
+            )
+        ).scalars()
+    )
+    user_ids.discard(None)
+    project_ids.discard(None)
+
+    # A user's motivation feeds the variance/manager-gap scores of every project they touch.
+    if user_ids:
+        project_ids.update(
+            conn.execute(
+                text(
+                    """
+                    SELECT project_id FROM assignments WHERE user_id IN :ids
+                    UNION
+                    SELECT project_id FROM projects WHERE manager_id IN :ids
+                    """
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"ids": sorted(user_ids)},
+            ).scalars()
+        )
+        project_ids.discard(None)
+    if project_ids:
+        user_ids.update(
+            conn.execute(
+                text(
+                    """
+                    SELECT user_id FROM assignments WHERE project_id IN :ids
+                    UNION
+                    SELECT manager_id FROM projects WHERE project_id IN :ids
+                    """
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"ids": sorted(project_ids)},
+            ).scalars()
+        )
+        user_ids.discard(None)
+
+    if len(user_ids) + len(project_ids) > WATCHDOG_INCREMENTAL_MAX_IDS:
+        return _CycleScope(mode=SCOPE_FULL, reason="scope_too_large")
+    return _CycleScope(
+        mode=SCOPE_INCREMENTAL,
+        reason="changes" if user_ids or project_ids else "unchanged",
+        user_ids=frozenset(user_ids),
+        project_ids=frozenset(project_ids),
+    )
+
+
+def _restrict_to_partition(conn: Connection, scope: _CycleScope, partition: _Partition) -> _CycleScope:
+    owned = {
+        project_id
+        for project_id in conn.execute(text("SELECT project_id FROM projects")).scalars()
+        if partition.owns(project_id)
+    }
+    project_ids = owned if scope.project_ids is None else owned & scope.project_ids
+    related: set[str] = set()
+    if project_ids:
+        related.update(
+            conn.execute(
+                text(
+                    """
+                    SELECT user_id FROM assignments WHERE project_id IN :ids
+                    UNION
+                    SELECT manager_id FROM projects WHERE project_id IN :ids
+                    """
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"ids": sorted(project_ids)},
+            ).scalars()
+        )
+    if partition.primary:
+        # Users outside every project still need a motivation score; the primary shard owns them.
+        related.update(
+            conn.execute(
+                text(
+                    """
+                    SELECT u.user_id
+                    FROM users u
+                    WHERE NOT EXISTS (SELECT 1 FROM assignments a WHERE a.user_id = u.user_id)
+                      AND NOT EXISTS (SELECT 1 FROM projects p WHERE p.manager_id = u.user_id)
+                    """
+                )
+            ).scalars()
+        )
+    related.discard(None)
+    user_ids = related if scope.user_ids is None else related & scope.user_ids
+    return _CycleScope(
+        mode=scope.mode,
+        reason=scope.reason,
+        user_ids=frozenset(user_ids),
+        project_ids=frozenset(project_ids),
+        partition=partition,
+    )
+
+
+def _load_cycle_inputs(conn: Connection, scope: _CycleScope) -> tuple[list, list, list]:
+    users_filter = projects_filter = assignments_filter = ""
+    params: dict[str, Any] = {}
+    if scope.user_ids is not None and scope.project_ids is not None:
+        users_filter = "WHERE user_id IN :user_ids"
+        projects_filter = "WHERE project_id IN :project_ids"
+        assignments_filter = "WHERE user_id IN :user_ids OR project_id IN :project_ids"
+        params = {"user_ids": sorted(scope.user_ids), "project_ids": sorted(scope.project_ids)}
+
+    def fetch(sql: str, *names: str) -> list:
+        statement = text(sql)
+        if params:
+            statement = statement.bindparams(*(bindparam(name, expanding=True) for name in names))
+        return conn.execute(statement, {name: params[name] for name in names if name in params}).mappings().all()
+
+    users = fetch(
+        f"""
+        SELECT user_id, name, role, cost_per_month, career_aspiration
+        FROM users
+        {users_filter}
+        ORDER BY user_id
+        """,
+        "user_ids",
     )
+    projects = fetch(
+        f"""
+        SELECT project_id, project_name, manager_id, budget_cap
+        FROM projects
+        {projects_filter}
+        ORDER BY project_id
+        """,
+        "project_ids",
+    )
+    assignments = fetch(
+        f"""
+        SELECT assignment_id, user_id, project_id, allocation_rate
+        FROM assignments
+        {assignments_filter}
+        ORDER BY assignment_id
+        """,
+        "user_ids",
+        "project_ids",
+    )
+    return users, projects, assignments
+
+
+def _stream_reports(conn: Connection, scope: _CycleScope) -> Iterator[Any]:
+    sql = "SELECT report_id, user_id, project_id, reporting_date, content_text FROM weekly_reports"
+    if scope.user_ids is None or scope.project_ids is None:
+        return stream_rows(conn, sql, key="report_id", descending=True)
+    return stream_rows(
+        conn,
+        f"{sql} WHERE user_id IN :user_ids OR project_id IN :project_ids",
+        {"user_ids": sorted(scope.user_ids), "project_ids": sorted(scope.project_ids)},
+        key="report_id",
+        descending=True,
+        expanding=("user_ids", "project_ids"),
+    )
+
+
+def _request_from_payload(payload: Any) -> dict[str, Any]:
+    decoded = decode_json_object(payload)
+    # Once a job has run, its payload holds the summary and the original request under "request".
+    if isinstance(decoded.get("request"), dict):
+        return decoded["request"]
+    return decoded
+
+
+
+def _is_truthy(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in {"1", "true", "yes", "on"}
+    return bool(value)
 
 
 def _record_watchdog_alerts(conn: Connection, job_id: int | str, alerts: list[dict[str, Any]]) -> None:
@@ -272,42 +1132,76 @@ def _ensure_patterns(conn: Connection) -> None:
         {"pattern_id": "toxic", "name_ja": "隠れ爆弾", "description": "Team risk"},
         {"pattern_id": "constraint", "name_ja": "制約あり", "description": "Availability constraints"},
     ]
-    for pattern in patterns:
-        exists = conn.execute(
-            text(
-                """
-                SELECT 1
-                FROM assignment_patterns
-                WHERE pattern_id = :pattern_id
-                """
-            ),
-            {"pattern_id": pattern["pattern_id"]},
-        ).scalar()
-        if exists:
-            continue
-        conn.execute(
-            text(
-                """
-                INSERT INTO assignment_patterns (pattern_id, name_ja, description)
-                VALUES (:pattern_id, :name_ja, :description)
-                """
-            ),
-            pattern,
-        )
+    conn.execute(
+        text(
+            """
+            INSERT INTO assignment_patterns (pattern_id, name_ja, description)
+            VALUES (:pattern_id, :name_ja, :description)
+            ON CONFLICT (pattern_id) DO NOTHING
+            """
+        ),
+        patterns,
+    )
 
 
-def _latest_report_by_user(reports: list[dict]) -> dict[str, str]:
-    latest: dict[str, str] = {}
+def _fold_reports(reports: Iterable[Any]) -> tuple[dict[str, str], dict[str, "_ProjectNotes"], int]:
+    """One pass over streamed reports: latest text per user, bounded notes per project, row count."""
+    latest: dict[str, tuple[str, int, str]] = {}
+    notes_by_project: dict[str, _ProjectNotes] = {}
+    count = 0
     for row in reports:
-        if row["user_id"] not in latest:
-            latest[row["user_id"]] = row.get("content_text") or ""
-    return latest
-
-
-def _reports_by_project(reports: list[dict]) -> dict[str, list[str]]:
+        count += 1
+        content = row.get("content_text") or ""
+        reported = str(row.get("reporting_date") or "")
+        report_id = int(row.get("report_id") or 0)
+        # Ranked by (reporting_date, report_id) rather than arrival order, so a bulk backfill does not look newest.
+        current = latest.get(row["user_id"])
+        if current is None or (reported, report_id) > current[:2]:
+            latest[row["user_id"]] = (reported, report_id, content)
+        notes = notes_by_project.get(row["project_id"])
+        if notes is None:
+            notes = notes_by_project[row["project_id"]] = _ProjectNotes()
+        notes.add(content, reported, report_id)
+    return {user_id: content for user_id, (_, _, content) in latest.items()}, notes_by_project, count
+
+
+@dataclass
+class _ProjectNotes:
+    """Keyword hit counts over all of a project's reports plus the head of their text, newest report first.
+
+    Counting per report gives the same totals as counting in the joined text (no keyword contains the
+    separator). Only the newest reports that fill ``WATCHDOG_NOTES_MAX_CHARS`` + 1 characters are kept, in a
+    heap keyed by (reporting_date, report_id); reports with equal keys keep their arrival order.
+    """
+
+    positive: int = 0
+    negative: int = 0
+    risk: int = 0
+    reports: int = 0
+    _kept: list[tuple[str, int, int, str]] = field(default_factory=list, repr=False)
+    _kept_chars: int = field(default=0, repr=False)
+
+    def add(self, text_value: str, reporting_date: str = "", report_id: int = 0) -> None:
+        self.positive += _count_hits(text_value, POSITIVE_WORDS)
+        self.negative += _count_hits(text_value, NEGATIVE_WORDS)
+        self.risk += _count_hits(text_value, RISK_WORDS)
+        heapq.heappush(self._kept, (reporting_date, report_id, -self.reports, text_value))
+        self._kept_chars += len(text_value) + 1
+        self.reports += 1
+        # Drop the oldest kept report while the newer ones alone still fill the excerpt.
+        while len(self._kept) > 1 and self._kept_chars - len(self._kept[0][3]) - 1 > WATCHDOG_NOTES_MAX_CHARS + 1:
+            self._kept_chars -= len(heapq.heappop(self._kept)[3]) + 1
+
+    @property
+    def excerpt(self) -> str:
+        joined = " ".join(entry[3] for entry in sorted(self._kept, reverse=True))
+        return joined[: WATCHDOG_NOTES_MAX_CHARS + 1]
+
+
+def _members_by_project(assignments: list[dict]) -> dict[str, list[str]]:
     grouped: dict[str, list[str]] = {}
-    for row in reports:
-        grouped.setdefault(row["project_id"], []).append(row.get("content_text") or "")
+    for assignment in assignments:
+        grouped.setdefault(assignment["project_id"], []).append(assignment["user_id"])
     return grouped
 
 
@@ -329,10 +1223,7 @@ def _summarize_motivation(text_value: str) -> str:
     return "安定傾向。"
 
 
-def _score_project_health(text_value: str) -> tuple[float, str]:
-    positive = _count_hits(text_value, POSITIVE_WORDS)
-    negative = _count_hits(text_value, NEGATIVE_WORDS)
-    risk = _count_hits(text_value, RISK_WORDS)
+def _health_from_hits(positive: int, negative: int, risk: int) -> tuple[float, str]:
     score = _clamp(80 + positive * 8 - negative * 15 - risk * 10, 0, 100)
     if score <= 50:
         return score, "Critical"
@@ -341,51 +1232,27 @@ def _score_project_health(text_value: str) -> tuple[float, str]:
     return score, "Safe"
 
 
-def _score_variance(
-    project_id: str,
-    assignments: list[dict],
-    motivation_map: dict[str, float],
-) -> float:
-    members = [a["user_id"] for a in assignments if a["project_id"] == project_id]
-    values = [motivation_map.get(user_id, 0) for user_id in members]
-    if len(values) <= 1:
+def _score_variance(member_scores: list[float]) -> float:
+    if len(member_scores) <= 1:
         return 0.0
-    return round((max(values) - min(values)) / 100, 2)
+    return round((max(member_scores) - min(member_scores)) / 100, 2)
 
 
 def _score_manager_gap(
     manager_id: str | None,
-    project_id: str,
-    assignments: list[dict],
+    member_scores: list[float],
     motivation_map: dict[str, float],
 ) -> float:
-    if not manager_id:
+    if not manager_id or not member_scores:
         return 0.0
-    members = [a["user_id"] for a in assignments if a["project_id"] == project_id]
-    if not members:
-        return 0.0
-    team_avg = sum(motivation_map.get(uid, 0) for uid in members) / len(members)
+    team_avg = sum(member_scores) / len(member_scores)
     return round(abs(motivation_map.get(manager_id, team_avg) - team_avg) / 100, 2)
 
 
-def _refresh_analysis(conn: Connection, assignments: list[dict], report_by_user: dict[str, str]) -> None:
+def _refresh_analysis(conn: Connection, assignments: list[dict], report_by_user: dict[str, str]) -> int:
+    rows: list[dict[str, Any]] = []
     for assignment in assignments:
         user_id = assignment["user_id"]
-        project_id = assignment["project_id"]
-        exists = conn.execute(
-            text(
-                """
-                SELECT 1
-                FROM ai_analysis_results
-                WHERE user_id = :user_id AND project_id = :project_id
-                LIMIT 1
-                """
-            ),
-            {"user_id": user_id, "project_id": project_id},
-        ).scalar()
-        if exists:
-            continue
-
         notes = report_by_user.get(user_id, "")
         pattern_id = _determine_pattern(notes)
         debate_log = json.dumps(
@@ -396,23 +1263,31 @@ def _refresh_analysis(conn: Connection, assignments: list[dict], report_by_user:
             },
             ensure_ascii=False,
         )
-        conn.execute(
-            text(
-                """
-                INSERT INTO ai_analysis_results
-                  (user_id, project_id, pattern_id, debate_log, final_decision)
-                VALUES
-                  (:user_id, :project_id, :pattern_id, :debate_log, :final_decision)
-                """
-            ),
+        rows.append(
             {
                 "user_id": user_id,
-                "project_id": project_id,
+                "project_id": assignment["project_id"],
                 "pattern_id": pattern_id,
                 "debate_log": debate_log,
                 "final_decision": _decision_from_pattern(pattern_id),
-            },
+            }
         )
+    return execute_chunked(
+        conn,
+        text(
+            """
+            INSERT INTO ai_analysis_results
+              (user_id, project_id, pattern_id, debate_log, final_decision)
+            VALUES
+              (:user_id, :project_id, :pattern_id, :debate_log, :final_decision)
+            ON CONFLICT (user_id, project_id) DO UPDATE
+            SET pattern_id = EXCLUDED.pattern_id,
+                debate_log = EXCLUDED.debate_log,
+                final_decision = EXCLUDED.final_decision
+            """
+        ),
+        rows,
+    )
 
 
 def _ensure_proposals(
@@ -471,9 +1346,9 @@ def _ensure_actions(
     conn: Connection,
     projects: list[dict],
     project_health: dict[str, dict],
-    report_by_project: dict[str, list[str]],
-) -> int:
-    created = 0
+    notes_by_project: dict[str, _ProjectNotes],
+) -> tuple[int, dict[str, Any]]:
+    targets: list[_AssetTarget] = []
     for project in projects:
         project_id = project["project_id"]
         health = project_health.get(project_id, {})
@@ -497,13 +1372,28 @@ def _ensure_actions(
         if existing:
             continue
 
-        project_notes = " ".join(report_by_project.get(project_id, []))
-        monitor_result, plans, draft_result = _generate_ai_assets(
-            conn=conn,
-            project=project,
-            risk_level=risk_level,
-            project_notes=project_notes,
+        project_notes = notes_by_project[project_id].excerpt if project_id in notes_by_project else ""
+        targets.append(
+            _prepare_ai_assets(conn=conn, project=project, risk_level=risk_level, project_notes=project_notes)
         )
+
+    mode = WATCHDOG_LLM_MODE
+    if mode not in {LLM_MODE_SERIAL, LLM_MODE_BATCHED, LLM_MODE_CONCURRENT}:
+        logger.warning("unknown WATCHDOG_LLM_MODE=%s; using serial", mode)
+        mode = LLM_MODE_SERIAL
+    llm_started = time.perf_counter()
+    assets = _generate_ai_assets(targets, mode=mode)
+    llm_stats = {
+        "mode": mode,
+        "projects": len(targets),
+        "wall_ms": round((time.perf_counter() - llm_started) * 1000, 1),
+    }
+
+    created = 0
+    for target in targets:
+        project_id = target.project["project_id"]
+        risk_level = target.risk_level
+        monitor_result, plans, draft_result = assets.get(str(project_id), (None, [], None))
         if plans:
             _upsert_llm_plans(conn, project_id, plans)
 
@@ -551,28 +1441,25 @@ def _ensure_actions(
             action_id=int(action_id),
             requested_by="watchdog",
             summary=f"{project_id} risk {risk_level}",
+            defer_slack=True,
         )
-        _merge_checkpoint_metadata(
+        merge_checkpoint_metadata(
             conn,
             approval.thread_id,
             {"mode": "watchdog", "project_id": project_id, "severity": risk_level},
         )
         created += 1
-    return created
+    return created, llm_stats
 
 
-def _generate_ai_assets(
+def _prepare_ai_assets(
     *,
     conn: Connection,
     project: dict,
     risk_level: str,
     project_notes: str,
-) -> tuple[MonitorResult | None, list[GunshiPlan], DraftingResult | None]:
-    monitor_result: MonitorResult | None = None
-    plans: list[GunshiPlan] = []
-    drafting: DraftingResult | None = None
-
-    notes = _truncate_text(project_notes or project.get("description") or "")
+) -> _AssetTarget:
+    notes = _truncate_text(project_notes or project.get("description") or "", WATCHDOG_NOTES_MAX_CHARS)
     similar_reports = []
     if notes:
         try:
@@ -581,41 +1468,112 @@ def _generate_ai_assets(
             similar_reports = search_weekly_reports(conn, notes, limit=3)
         except Exception:
             logger.exception("embedding search failed project_id=%s", project.get("project_id"))
-    if notes:
-        try:
-            monitor_result = analyze_risk(notes)
-        except Exception:
-            logger.exception("monitor failed project_id=%s", project.get("project_id"))
+    return _AssetTarget(project=project, risk_level=risk_level, notes=notes, similar_reports=similar_reports)
+
+
+def _generate_ai_assets(targets: list[_AssetTarget], *, mode: str) -> dict[str, AiAssets]:
+    # LLM-only stage: nothing below may touch the DB connection, so it is safe to fan out.
+    if not targets:
+        return {}
+    if mode == LLM_MODE_BATCHED:
+        assets: dict[str, AiAssets] = {}
+        for start in range(0, len(targets), WATCHDOG_LLM_BATCH_SIZE):
+            assets.update(_generate_ai_assets_batched(targets[start : start + WATCHDOG_LLM_BATCH_SIZE]))
+        return assets
+    if mode == LLM_MODE_CONCURRENT and len(targets) > 1:
+        with ThreadPoolExecutor(max_workers=min(WATCHDOG_LLM_CONCURRENCY, len(targets))) as executor:
+            results = _map_in_context(executor, _generate_project_assets, targets)
+        return {str(target.project["project_id"]): result for target, result in zip(targets, results)}
+    return {str(target.project["project_id"]): _generate_project_assets(target) for target in targets}
+
+
+def _generate_project_assets(target: _AssetTarget) -> AiAssets:
+    monitor_result = _run_monitor(target)
+    plans = _run_gunshi(target, _plan_context(target, monitor_result))
+    drafting = _run_drafting(target, monitor_result, plans)
+    return monitor_result, plans, drafting
+
+
+def _generate_ai_assets_batched(chunk: list[_AssetTarget]) -> dict[str, AiAssets]:
+    by_id = {str(target.project["project_id"]): target for target in chunk}
+
+    bundles = {project_id: target.notes for project_id, target in by_id.items() if target.notes}
+    monitors: dict[str, MonitorResult | None] = dict(analyze_risk_batch(bundles)) if len(bundles) > 1 else {}
+    for project_id in bundles:
+        if project_id not in monitors:
+            monitors[project_id] = _run_monitor(by_id[project_id])
+
+    contexts = {project_id: _plan_context(target, monitors.get(project_id)) for project_id, target in by_id.items()}
+    plans_by_id: dict[str, list[GunshiPlan]] = generate_plans_batch(contexts) if len(contexts) > 1 else {}
+    for project_id, context in contexts.items():
+        if project_id not in plans_by_id:
+            plans_by_id[project_id] = _run_gunshi(by_id[project_id], context)
 
-    context = {
-        "project_id": project.get("project_id"),
-        "project_name": project.get("project_name"),
-        "risk_level": risk_level,
+    def draft(project_id: str) -> DraftingResult | None:
+        return _run_drafting(by_id[project_id], monitors.get(project_id), plans_by_id.get(project_id, []))
+
+    project_ids = list(by_id)
+    with ThreadPoolExecutor(max_workers=min(WATCHDOG_LLM_CONCURRENCY, len(project_ids))) as executor:
+        drafts = _map_in_context(executor, draft, project_ids)
+    return {
+        project_id: (monitors.get(project_id), plans_by_id.get(project_id, []), drafting)
+        for project_id, drafting in zip(project_ids, drafts)
+    }
+
+
+def _map_in_context(executor: ThreadPoolExecutor, fn: Callable[[Any], Any], items: list) -> list:
+    # Each task gets its own copy of the caller's contextvars so Bedrock call counting follows it.
+    futures = [executor.submit(contextvars.copy_context().run, fn, item) for item in items]
+    return [future.result() for future in futures]
+
+
+def _run_monitor(target: _AssetTarget) -> MonitorResult | None:
+    if not target.notes:
+        return None
+    try:
+        return analyze_risk(target.notes)
+    except Exception:
+        logger.exception("monitor failed project_id=%s", target.project.get("project_id"))
+        return None
+
+
+def _plan_context(target: _AssetTarget, monitor_result: MonitorResult | None) -> dict[str, Any]:
+    return {
+        "project_id": target.project.get("project_id"),
+        "project_name": target.project.get("project_name"),
+        "risk_level": target.risk_level,
         "monitor_reason": monitor_result.reason if monitor_result else "",
-        "notes": notes,
-        "similar_reports": similar_reports,
+        "notes": target.notes,
+        "similar_reports": target.similar_reports,
     }
 
+
+def _run_gunshi(target: _AssetTarget, context: dict[str, Any]) -> list[GunshiPlan]:
     try:
-        plans = generate_plans(context)
+        return generate_plans(context)
     except Exception:
-        logger.exception("gunshi failed project_id=%s", project.get("project_id"))
+        logger.exception("gunshi failed project_id=%s", target.project.get("project_id"))
+        return []
 
-    recommended = next((plan for plan in plans if plan.is_recommended), None)
-    if recommended:
-        try:
-            draft_context = {
-                "project_id": project.get("project_id"),
-                "project_name": project.get("project_name"),
-                "plan_type": recommended.plan_type,
-                "plan_description": recommended.description,
-                "monitor_reason": monitor_result.reason if monitor_result else "",
-            }
-            drafting = generate_drafts(draft_context)
-        except Exception:
-            logger.exception("drafting failed project_id=%s", project.get("project_id"))
 
-    return monitor_result, plans, drafting
+def _run_drafting(
+    target: _AssetTarget, monitor_result: MonitorResult | None, plans: list[GunshiPlan]
+) -> DraftingResult | None:
+    recommended = next((plan for plan in plans if plan.is_recommended), None)
+    if not recommended:
+        return None
+    try:
+        draft_context = {
+            "project_id": target.project.get("project_id"),
+            "project_name": target.project.get("project_name"),
+            "plan_type": recommended.plan_type,
+            "plan_description": recommended.description,
+            "monitor_reason": monitor_result.reason if monitor_result else "",
+        }
+        return generate_drafts(draft_context)
+    except Exception:
+        logger.exception("drafting failed project_id=%s", target.project.get("project_id"))
+        return None
 
 
 def _upsert_llm_plans(conn: Connection, project_id: str, plans: list[GunshiPlan]) -> None:
@@ -758,36 +1716,6 @@ def _build_action_draft(
     return "\n".join([line for line in lines if line]).strip()
 
 
-def _merge_checkpoint_metadata(conn: Connection, thread_id: str, extra: dict[str, Any]) -> None:
-    row = conn.execute(
-        text("SELECT metadata FROM langgraph_checkpoints WHERE thread_id = :thread_id"),
-        {"thread_id": thread_id},
-    ).mappings().first()
-    if not row:
-        return
-    metadata = row.get("metadata")
-    if isinstance(metadata, (bytes, bytearray, memoryview)):
-        metadata = metadata.decode("utf-8")
-    if isinstance(metadata, str):
-        try:
-            metadata = json.loads(metadata)
-        except json.JSONDecodeError:
-            metadata = {}
-    if not isinstance(metadata, dict):
-        metadata = {}
-    metadata.update(extra)
-    conn.execute(
-        text(
-            """
-            UPDATE langgraph_checkpoints
-            SET metadata = :metadata
-            WHERE thread_id = :thread_id
-            """
-        ),
-        {"thread_id": thread_id, "metadata": json.dumps(metadata)},
-    )
-
-
 def _default_plans(project_id: str) -> dict[str, tuple[str, str, str]]:
     return {
         "Plan_A": ("Plan_A", "現状維持で短期安定を確保する", "短期安定"),
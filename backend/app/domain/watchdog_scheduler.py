@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.queue_utils import as_datetime, utcnow
+from app.domain.watchdog import JOB_TYPE_CYCLE, JOB_TYPES, enqueue_watchdog_job
+
+CATCH_UP_ONCE = "once"
+CATCH_UP_SKIP = "skip"
+
+WATCHDOG_SCHEDULER_TICK_SECONDS = max(1.0, float(os.getenv("WATCHDOG_SCHEDULER_TICK_SECONDS", "30") or "30"))
+# A ``skip`` schedule still fires when the daemon is at most this late.
+WATCHDOG_SCHEDULE_GRACE_SECONDS = max(0, int(os.getenv("WATCHDOG_SCHEDULE_GRACE_SECONDS", "300") or "300"))
+
+logger = logging.getLogger("saihai.watchdog.scheduler")
+
+_CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 6))
+
+
+@dataclass(frozen=True)
+class CronExpression:
+    """Five-field cron (minute hour day month weekday, UTC) with ``*``, lists, ranges and ``/`` steps.
+
+    As in cron, a restricted day and weekday match when either one does; weekday 0 and 7 are Sunday.
+    """
+
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    day_restricted: bool
+    weekday_restricted: bool
+
+    @classmethod
+    def parse(cls, raw: str) -> "CronExpression":
+        parts = raw.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {raw!r}")
+        values = [_parse_cron_field(part, name, low, high) for part, (name, low, high) in zip(parts, _CRON_FIELDS)]
+        return cls(
+            minutes=values[0],
+            hours=values[1],
+            days=values[2],
+            months=values[3],
+            weekdays=frozenset(value % 7 for value in values[4]),
+            day_restricted=parts[2] != "*",
+            weekday_restricted=parts[4] != "*",
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError("cron expression never fires")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        # datetime.weekday() is Monday=0; cron counts from Sunday=0.
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+
+def _parse_cron_field(raw: str, name: str, low: int, high: int) -> frozenset[int]:
+    # Weekday accepts 7 as an alias for Sunday.
+    top = 7 if name == "weekday" else high
+    values: set[int] = set()
+    for item in raw.split(","):
+        spec, _, step_raw = item.partition("/")
+        step = int(step_raw) if step_raw else 1
+        if spec == "*":
+            start, end = low, top
+        elif "-" in spec:
+            start_raw, end_raw = spec.split("-", 1)
+            start, end = int(start_raw), int(end_raw)
+        else:
+            start = int(spec)
+            end = top if step_raw else start
+        if step < 1 or start < low or end > top or start > end:
+            raise ValueError(f"invalid cron {name} field: {raw!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """A recurring watchdog job; exactly one of ``cron`` or ``interval_seconds`` is set."""
+
+    name: str
+    job_type: str = JOB_TYPE_CYCLE
+    payload: dict[str, Any] = field(default_factory=dict)
+    cron: CronExpression | None = None
+    interval_seconds: int | None = None
+    jitter_seconds: int = 0
+    catch_up: str = CATCH_UP_ONCE
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "Schedule":
+        name = str(raw.get("name") or "").strip()
+        job_type = str(raw.get("type") or JOB_TYPE_CYCLE)
+        cron = raw.get("cron")
+        interval = raw.get("interval_seconds")
+        catch_up = str(raw.get("catch_up") or CATCH_UP_ONCE)
+        if not name:
+            raise ValueError("schedule needs a name")
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"schedule {name}: unknown job type {job_type}")
+        if (cron is None) == (interval is None):
+            raise ValueError(f"schedule {name}: set exactly one of cron or interval_seconds")
+        if catch_up not in {CATCH_UP_ONCE, CATCH_UP_SKIP}:
+            raise ValueError(f"schedule {name}: catch_up must be {CATCH_UP_ONCE!r} or {CATCH_UP_SKIP!r}")
+        return cls(
+            name=name,
+            job_type=job_type,
+            payload=dict(raw.get("payload") or {}),
+            cron=CronExpression.parse(str(cron)) if cron is not None else None,
+            interval_seconds=max(1, int(interval)) if interval is not None else None,
+            jitter_seconds=max(0, int(raw.get("jitter_seconds") or 0)),
+            catch_up=catch_up,
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        if self.cron is not None:
+            return self.cron.next_after(moment)
+        return moment + timedelta(seconds=self.interval_seconds or 0)
+
+    def job_payload(self) -> dict[str, Any]:
+        return {**self.payload, "type": self.job_type}
+
+
+def load_schedules(raw: str | None = None) -> list[Schedule]:
+    """Parse ``WATCHDOG_SCHEDULES``: a JSON list of schedule objects (empty disables the scheduler)."""
+    raw = os.getenv("WATCHDOG_SCHEDULES", "") if raw is None else raw
+    if not raw.strip():
+        return []
+    entries = json.loads(raw)
+    if not isinstance(entries, list):
+        raise ValueError("WATCHDOG_SCHEDULES must be a JSON list")
+    schedules = [Schedule.from_dict(entry) for entry in entries]
+    names = [schedule.name for schedule in schedules]
+    if len(set(names)) != len(names):
+        raise ValueError("WATCHDOG_SCHEDULES has duplicate names")
+    return schedules
+
+
+def run_due_schedules(
+    conn: Connection,
+    schedules: list[Schedule],
+    *,
+    now: datetime,
+    rng: random.Random | None = None,
+) -> list[dict[str, Any]]:
+    """Enqueue a job for every schedule whose slot has come, and move each one to its next slot.
+
+    Missed slots (the daemon was down) are counted; ``once`` fires a single job for all of them and
+    ``skip`` fires only when the latest slot is within ``WATCHDOG_SCHEDULE_GRACE_SECONDS``. A slot whose
+    equivalent job is still queued or running is coalesced into it.
+    """
+    rng = rng or random.Random()
+    _ensure_schedule_rows(conn, schedules)
+    lock = "" if conn.dialect.name == "sqlite" else "FOR UPDATE SKIP LOCKED"
+    fired: list[dict[str, Any]] = []
+    for schedule in schedules:
+        # Several daemons may tick at once; whoever holds the row lock handles the slot.
+        state = conn.execute(
+            text(
+                f"SELECT next_slot_at, next_run_at, missed_runs FROM watchdog_schedules WHERE name = :name {lock}"
+            ),
+            {"name": schedule.name},
+        ).mappings().first()
+        if state is None:
+            continue
+        slot = as_datetime(state["next_slot_at"])
+        if slot is None:
+            _store_next_run(conn, schedule, schedule.next_after(now), rng)
+            continue
+        if as_datetime(state["next_run_at"]) > now:
+            continue
+
+        slots = [slot]
+        upcoming = schedule.next_after(slot)
+        while upcoming <= now:
+            slots.append(upcoming)
+            upcoming = schedule.next_after(upcoming)
+        missed = len(slots) - 1
+        late_seconds = (now - slots[-1]).total_seconds()
+        if schedule.catch_up == CATCH_UP_SKIP and late_seconds > WATCHDOG_SCHEDULE_GRACE_SECONDS:
+            outcome, job_id, missed = "missed", None, len(slots)
+        else:
+            result = enqueue_watchdog_job(
+                conn,
+                {
+                    **schedule.job_payload(),
+                    "schedule": schedule.name,
+                    "scheduled_for": slots[-1].isoformat(),
+                    "missed_runs": missed,
+                },
+                coalesce=True,
+            )
+            outcome, job_id = result["status"], int(result["job_id"])
+        _store_next_run(
+            conn,
+            schedule,
+            upcoming,
+            rng,
+            fired_at=now,
+            job_id=job_id,
+            outcome=outcome,
+            missed=int(state["missed_runs"] or 0) + missed,
+        )
+        logger.info(
+            "watchdog.schedule_fired name=%s outcome=%s job_id=%s missed=%s next_run_at=%s",
+            schedule.name,
+            outcome,
+            job_id,
+            missed,
+            upcoming.isoformat(),
+        )
+        fired.append({"name": schedule.name, "outcome": outcome, "job_id": job_id, "missed_runs": missed})
+    return fired
+
+
+def _ensure_schedule_rows(conn: Connection, schedules: list[Schedule]) -> None:
+    if not schedules:
+        return
+    conn.execute(
+        text(
+            """
+            INSERT INTO watchdog_schedules (name, missed_runs)
+            VALUES (:name, 0)
+            ON CONFLICT (name) DO NOTHING
+            """
+        ),
+        [{"name": schedule.name} for schedule in schedules],
+    )
+
+
+def _store_next_run(
+    conn: Connection,
+    schedule: Schedule,
+    next_slot_at: datetime,
+    rng: random.Random,
+    *,
+    fired_at: datetime | None = None,
+    job_id: int | None = None,
+    outcome: str | None = None,
+    missed: int | None = None,
+) -> None:
+    conn.execute(
+        text(
+            """
+            UPDATE watchdog_schedules
+            SET next_slot_at = :next_slot_at,
+                next_run_at = :next_run_at,
+                last_fired_at = COALESCE(:fired_at, last_fired_at),
+                last_job_id = COALESCE(:job_id, last_job_id),
+                last_outcome = COALESCE(:outcome, last_outcome),
+                missed_runs = COALESCE(:missed, missed_runs),
+                updated_at = :updated_at
+            WHERE name = :name
+            """
+        ),
+        {
+            "name": schedule.name,
+            "next_slot_at": next_slot_at,
+            # Jitter only delays the enqueue; slots stay on the cron/interval grid so it never drifts.
+            "next_run_at": next_slot_at + timedelta(seconds=rng.uniform(0, schedule.jitter_seconds)),
+            "fired_at": fired_at,
+            "job_id": job_id,
+            "outcome": outcome,
+            "missed": missed,
+            "updated_at": fired_at or utcnow(),
+        },
+    )
+
+
+
+
+class WatchdogScheduler:
+    """Ticks the configured schedules from inside the worker daemon until ``stop_event`` is set."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        schedules: list[Schedule],
+        *,
+        stop_event: threading.Event,
+        tick_seconds: float = WATCHDOG_SCHEDULER_TICK_SECONDS,
+    ) -> None:
+        self.engine = engine
+        self.schedules = schedules
+        self.stop_event = stop_event
+        self.tick_seconds = tick_seconds
+        self._rng = random.Random()
+
+    def tick(self, now: datetime | None = None) -> list[dict[str, Any]]:
+        now = now or utcnow()
+        with self.engine.begin() as conn:
+            return run_due_schedules(conn, self.schedules, now=now, rng=self._rng)
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("watchdog.scheduler_tick_failed")
+            self.stop_event.wait(self.tick_seconds)
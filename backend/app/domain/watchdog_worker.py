@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy.engine import Engine
+
+from app.db.queue_utils import run_workers, worker_id_prefix
+from app.domain.watchdog import (
+    WATCHDOG_LEASE_SECONDS,
+    WatchdogLeaseLost,
+    claim_watchdog_job,
+    execute_watchdog_job,
+    finish_watchdog_job,
+    heartbeat_watchdog_job,
+)
+from app.domain.watchdog_scheduler import Schedule, WatchdogScheduler
+
+WATCHDOG_WORKER_CONCURRENCY = max(1, int(os.getenv("WATCHDOG_WORKER_CONCURRENCY", "1") or "1"))
+WATCHDOG_HEARTBEAT_SECONDS = max(1.0, float(os.getenv("WATCHDOG_HEARTBEAT_SECONDS", "30") or "30"))
+WATCHDOG_POLL_SECONDS = max(0.1, float(os.getenv("WATCHDOG_POLL_SECONDS", "5") or "5"))
+
+logger = logging.getLogger("saihai.watchdog.worker")
+
+
+@dataclass
+class WorkerStats:
+    claimed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    lease_lost: int = 0
+
+
+class _Heartbeat:
+    """Extends a claimed job's lease from a side thread while the cycle transaction is open."""
+
+    def __init__(self, engine: Engine, job_id: int, worker_id: str, *, interval: float, lease_seconds: int) -> None:
+        self._engine = engine
+        self._job_id = job_id
+        self._worker_id = worker_id
+        self._interval = interval
+        self._lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"watchdog-heartbeat-{job_id}", daemon=True)
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                with self._engine.begin() as conn:
+                    alive = heartbeat_watchdog_job(
+                        conn, self._job_id, self._worker_id, lease_seconds=self._lease_seconds
+                    )
+            except Exception:
+                # SQLite keeps the database locked for the whole cycle; the lease still bounds the outage.
+                logger.warning("watchdog.heartbeat_failed job_id=%s worker_id=%s", self._job_id, self._worker_id)
+                continue
+            if not alive:
+                logger.warning("watchdog.lease_lost job_id=%s worker_id=%s", self._job_id, self._worker_id)
+                return
+
+
+class WatchdogWorker:
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        worker_id: str,
+        stop_event: threading.Event,
+        lease_seconds: int = WATCHDOG_LEASE_SECONDS,
+        heartbeat_seconds: float = WATCHDOG_HEARTBEAT_SECONDS,
+        poll_seconds: float = WATCHDOG_POLL_SECONDS,
+        exit_when_idle: bool = False,
+    ) -> None:
+        self.engine = engine
+        self.worker_id = worker_id
+        self.stop_event = stop_event
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.exit_when_idle = exit_when_idle
+        self.stats = WorkerStats()
+
+    def run_once(self) -> str | None:
+        """Claim and run one job. Returns its final status, or ``None`` when the queue is empty."""
+        with self.engine.begin() as conn:
+            claimed = claim_watchdog_job(conn, self.worker_id, lease_seconds=self.lease_seconds)
+        if not claimed:
+            return None
+
+        job_id = claimed["job_id"]
+        request = claimed["request"]
+        self.stats.claimed += 1
+        logger.info("watchdog.claimed job_id=%s worker_id=%s attempt=%s", job_id, self.worker_id, claimed["attempts"])
+        try:
+            with _Heartbeat(
+                self.engine,
+                job_id,
+                self.worker_id,
+                interval=self.heartbeat_seconds,
+                lease_seconds=self.lease_seconds,
+            ):
+                with self.engine.begin() as conn:
+                    execute_watchdog_job(conn, job_id, self.worker_id, request)
+        except WatchdogLeaseLost:
+            logger.warning("watchdog.result_discarded job_id=%s worker_id=%s", job_id, self.worker_id)
+            self.stats.lease_lost += 1
+            return "lease_lost"
+        except Exception as exc:
+            logger.exception("watchdog job failed job_id=%s worker_id=%s", job_id, self.worker_id)
+            # The cycle transaction is gone; record the failure in a fresh one.
+            with self.engine.begin() as conn:
+                finish_watchdog_job(conn, job_id, self.worker_id, "failed", {"error": str(exc), "request": request})
+            self.stats.failed += 1
+            return "failed"
+        self.stats.succeeded += 1
+        return "succeeded"
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                status = self.run_once()
+            except Exception:
+                logger.exception("watchdog.claim_failed worker_id=%s", self.worker_id)
+                status = None
+            if status is None:
+                if self.exit_when_idle:
+                    return
+                self.stop_event.wait(self.poll_seconds)
+
+
+def serve(
+    engine: Engine,
+    *,
+    concurrency: int = WATCHDOG_WORKER_CONCURRENCY,
+    stop_event: threading.Event | None = None,
+    schedules: list[Schedule] | None = None,
+    **worker_kwargs: object,
+) -> list[WatchdogWorker]:
+    """Run ``concurrency`` workers until ``stop_event`` is set; in-flight jobs finish before returning.
+
+    With ``schedules`` a scheduler thread enqueues their jobs alongside the workers.
+    """
+    stop_event = stop_event or threading.Event()
+    prefix = worker_id_prefix()
+    workers = [
+        WatchdogWorker(engine, worker_id=f"{prefix}-{index}", stop_event=stop_event, **worker_kwargs)
+        for index in range(max(1, concurrency))
+    ]
+    scheduler_thread = None
+    if schedules:
+        scheduler = WatchdogScheduler(engine, schedules, stop_event=stop_event)
+        scheduler_thread = threading.Thread(target=scheduler.run, name=f"{prefix}-scheduler", daemon=True)
+        scheduler_thread.start()
+        logger.info("watchdog.scheduler_started schedules=%s", ",".join(schedule.name for schedule in schedules))
+    run_workers(workers)
+    if scheduler_thread is not None:
+        # Workers leaving on --exit-when-idle must not leave the scheduler ticking.
+        stop_event.set()
+        scheduler_thread.join()
+    return workers
@@ -6,8 +6,12 @@ import os
 import re
 import threading
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterator
+
+from pydantic import BaseModel, ValidationError
 
 
 class BedrockError(RuntimeError):
@@ -36,6 +40,34 @@ class BedrockInvokeResult:
 _bedrock_logger = logging.getLogger("saihai.bedrock")
 _client_cache: dict[tuple[str, int | None, int | None, int | None, str | None], Any] = {}
 _client_cache_lock = threading.Lock()
+_concurrency_lock = threading.Lock()
+_concurrency_limiter: tuple[int, threading.BoundedSemaphore] | None = None
+
+
+class InvocationCounter:
+    """Thread-safe tally of Bedrock invocations made under ``count_invocations``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def increment(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+
+_invocation_counter: ContextVar[InvocationCounter | None] = ContextVar("bedrock_invocation_counter", default=None)
+
+
+@contextmanager
+def count_invocations() -> Iterator[InvocationCounter]:
+    """Count invocations in this context; worker threads must run in a ``contextvars.copy_context()``."""
+    counter = InvocationCounter()
+    token = _invocation_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _invocation_counter.reset(token)
 
 
 def _env(name: str) -> str:
@@ -110,6 +142,17 @@ def _clear_bedrock_client_cache() -> None:
         _client_cache.clear()
 
 
+def _bedrock_concurrency_limiter() -> threading.BoundedSemaphore | None:
+    global _concurrency_limiter
+    limit = _optional_int("BEDROCK_MAX_CONCURRENCY", min_value=1)
+    if limit is None:
+        return None
+    with _concurrency_lock:
+        if _concurrency_limiter is None or _concurrency_limiter[0] != limit:
+            _concurrency_limiter = (limit, threading.BoundedSemaphore(limit))
+        return _concurrency_limiter[1]
+
+
 def bedrock_model_id() -> str | None:
     model_id = _env("AWS_BEDROCK_MODEL_ID")
     return model_id or None
@@ -184,6 +227,9 @@ def invoke_bedrock_text(
         raise BedrockNotConfiguredError(
             "Set AWS_REGION (or AWS_DEFAULT_REGION) and AWS_BEDROCK_MODEL_ID (or AWS_BEDROCK_INFERENCE_PROFILE_ID)."
         )
+    counter = _invocation_counter.get()
+    if counter is not None:
+        counter.increment()
 
     prompt_chars = len(prompt or "")
     system_chars = len(system_prompt or "")
@@ -204,8 +250,16 @@ def invoke_bedrock_text(
     error_kind = "-"
     error_message = "-"
     request_started = None
+    queue_ms = 0.0
+    slot_held = False
+    limiter = _bedrock_concurrency_limiter()
 
     try:
+        if limiter is not None:
+            queue_started = time.perf_counter()
+            limiter.acquire()
+            slot_held = True
+            queue_ms = (time.perf_counter() - queue_started) * 1000
         client_started = time.perf_counter()
         try:
             client, client_reused, client_settings = _build_bedrock_client(region)
@@ -371,6 +425,8 @@ def invoke_bedrock_text(
         error_message = str(exc)
         raise
     finally:
+        if slot_held:
+            limiter.release()
         total_ms = (time.perf_counter() - total_started) * 1000
         if request_started is None:
             request_started = total_started
@@ -381,7 +437,7 @@ def invoke_bedrock_text(
             log_level,
             "bedrock.invoke result=%s region=%s model_id=%s effective_model_id=%s operation=%s attempts=%s "
             "fallback=%s prompt_chars=%s system_chars=%s response_chars=%s response_bytes=%s "
-            "client_reused=%s client_ms=%.1f bedrock_ms=%.1f parse_ms=%.1f total_ms=%.1f "
+            "client_reused=%s queue_ms=%.1f client_ms=%.1f bedrock_ms=%.1f parse_ms=%.1f total_ms=%.1f "
             "connect_timeout_ms=%s read_timeout_ms=%s max_attempts=%s retry_mode=%s error=%s error_message=%s",
             "ok" if error_kind == "-" else "error",
             region,
@@ -395,6 +451,7 @@ def invoke_bedrock_text(
             response_chars,
             response_bytes,
             client_reused,
+            queue_ms,
             client_ms,
             bedrock_call_ms,
             parse_ms,
@@ -431,7 +488,9 @@ def invoke_text(
     )
 
 
-_JSON_FENCE_RE = re.compile(r"```(?:json)?\\s*(.*?)\\s*```", flags=re.DOTALL | re.IGNORECASE)
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", flags=re.DOTALL | re.IGNORECASE)
+_BARE_WORDS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+_REPROMPT_MAX_CHARS = 6000
 
 
 def extract_json_text(text: str) -> str:
@@ -447,9 +506,187 @@ def extract_json_text(text: str) -> str:
     return stripped
 
 
-def parse_json(text: str) -> Any:
+def _string_start(out: list[str]) -> int:
+    index = len(out) - 2
+    while index >= 0:
+        if out[index] == '"':
+            backslashes = 0
+            probe = index - 1
+            while probe >= 0 and out[probe] == "\\":
+                backslashes += 1
+                probe -= 1
+            if backslashes % 2 == 0:
+                return index
+        index -= 1
+    return 0
+
+
+def _rstrip(out: list[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+
+
+def _trim_dangling(out: list[str], container: str) -> None:
+    """Drop a trailing comma, or a key whose value was cut off, before closing ``container``."""
+    _rstrip(out)
+    while out and out[-1] in ".-+eE" and len(out) > 1 and (out[-2].isdigit() or out[-2] in ".-+eE"):
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+        _rstrip(out)
+        return
+    if container != "{":
+        return
+    if out and out[-1] == ":":
+        out.pop()
+        _rstrip(out)
+    elif not out or out[-1] != '"':
+        return
+    else:
+        before = out[: _string_start(out)]
+        while before and before[-1].isspace():
+            before.pop()
+        if not before or before[-1] == ":":
+            return
+    # The trailing string is a key without a value: remove it and the comma before it.
+    del out[_string_start(out) :]
+    _rstrip(out)
+    if out and out[-1] == ",":
+        out.pop()
+        _rstrip(out)
+
+
+def repair_json_text(text: str) -> str:
+    """Best-effort repair of almost-valid model JSON.
+
+    Handles code fences and surrounding prose, ``//`` and ``/* */`` comments, trailing commas,
+    Python literals and output truncated mid-structure (open strings/containers are closed and a
+    dangling key is dropped).
+    """
+    source = text or ""
+    match = _JSON_FENCE_RE.search(source)
+    if match:
+        source = match.group(1)
+    else:
+        opener = re.search(r"```(?:json)?\s*", source, flags=re.IGNORECASE)
+        if opener:
+            source = source[opener.end() :]
+    starts = [index for index in (source.find("{"), source.find("[")) if index >= 0]
+    if not starts:
+        return source.strip()
+    source = source[min(starts) :]
+
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = False
+    escaped = False
+    index = 0
+    length = len(source)
+    while index < length:
+        char = source[index]
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                out[-1] = "\\n"
+            index += 1
+            continue
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif source.startswith("//", index):
+            newline = source.find("\n", index)
+            index = length if newline < 0 else newline
+            continue
+        elif source.startswith("/*", index):
+            end = source.find("*/", index + 2)
+            index = length if end < 0 else end + 2
+            continue
+        elif char in "{[":
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            _rstrip(out)
+            if out and out[-1] == ",":
+                out.pop()
+            if stack and {"{": "}", "[": "]"}[stack[-1]] == char:
+                stack.pop()
+                out.append(char)
+            if not stack:
+                break
+        elif char.isalpha() or char == "_":
+            end = index
+            while end < length and (source[end].isalnum() or source[end] == "_"):
+                end += 1
+            word = source[index:end]
+            if end >= length and any(literal.startswith(word) for literal in _BARE_WORDS) and word not in _BARE_WORDS:
+                index = end
+                continue
+            out.append(_BARE_WORDS.get(word, word))
+            index = end
+            continue
+        else:
+            out.append(char)
+        index += 1
+
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    while stack:
+        opener_char = stack.pop()
+        _trim_dangling(out, opener_char)
+        out.append("}" if opener_char == "{" else "]")
+    return "".join(out).strip()
+
+
+def parse_json(text: str, *, repair: bool = True) -> Any:
     payload = extract_json_text(text)
-    return json.loads(payload)
+    try:
+        return json.loads(payload)
+    except json.JSONDecodeError:
+        if not repair:
+            raise
+        repaired = repair_json_text(text)
+        if repaired == payload:
+            raise
+        try:
+            value = json.loads(repaired)
+        except json.JSONDecodeError:
+            pass
+        else:
+            _bedrock_logger.info(
+                "bedrock.json_repaired response_chars=%s repaired_chars=%s", len(text or ""), len(repaired)
+            )
+            return value
+        raise
+
+
+def _validation_error_text(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        problems = []
+        for error in exc.errors()[:10]:
+            location = ".".join(str(part) for part in error.get("loc") or ()) or "(root)"
+            problems.append(f"{location}: {error.get('msg')}")
+        return "; ".join(problems)
+    return str(exc)
+
+
+def _repair_prompt(previous_text: str, error: str) -> str:
+    previous = previous_text or ""
+    if len(previous) > _REPROMPT_MAX_CHARS:
+        previous = previous[:_REPROMPT_MAX_CHARS] + "...(truncated)"
+    return (
+        "Your previous response could not be used.\n"
+        f"[Error]\n{error}\n\n"
+        f"[Previous response]\n{previous}\n\n"
+        "Return the corrected JSON only, keeping the same content and structure. No prose, no markdown."
+    )
 
 
 def invoke_json(
@@ -459,8 +696,15 @@ def invoke_json(
     max_tokens: int = 1024,
     temperature: float = 0.2,
     retries: int = 1,
-    retry_delay: float = 0.4,
+    retry_delay: float = 0.0,
+    schema: type[BaseModel] | None = None,
 ) -> Any:
+    """Invoke the model and return parsed JSON.
+
+    Responses go through :func:`parse_json` (which repairs almost-valid JSON locally) and, when
+    ``schema`` is given, pydantic validation. Only when both fail is the model asked again, and the
+    follow-up carries the error and the previous output rather than the original prompt.
+    """
     last_error: Exception | None = None
     current_prompt = prompt
     current_system = system_prompt
@@ -472,20 +716,29 @@ def invoke_json(
             temperature=temperature,
         )
         try:
-            return parse_json(result.text)
-        except json.JSONDecodeError as exc:
+            payload = parse_json(result.text)
+            if schema is not None:
+                schema.model_validate(payload)
+            return payload
+        except (json.JSONDecodeError, ValidationError) as exc:
             last_error = exc
             if attempt >= retries:
                 break
+            error = _validation_error_text(exc)
             _bedrock_logger.warning(
-                "bedrock.json_parse_retry attempt=%s retries=%s prompt_chars=%s system_chars=%s response_chars=%s error=%s",
+                "bedrock.json_reprompt attempt=%s retries=%s kind=%s prompt_chars=%s system_chars=%s response_chars=%s error=%s",
                 attempt + 1,
                 retries,
+                "schema" if isinstance(exc, ValidationError) else "parse",
                 len(current_prompt or ""),
                 len(current_system or ""),
                 len(result.text or ""),
-                str(exc),
+                error,
             )
-            current_system = (current_system or "") + "\nReturn only valid JSON. No prose."
-            time.sleep(retry_delay)
+            current_prompt = _repair_prompt(result.text, error)
+            current_system = (system_prompt or "") + "\nReturn only valid JSON. No prose."
+            if retry_delay > 0:
+                time.sleep(retry_delay)
+    if isinstance(last_error, ValidationError):
+        raise BedrockInvocationError(f"JSON failed schema validation: {_validation_error_text(last_error)}") from last_error
     raise BedrockInvocationError(f"Failed to parse JSON: {last_error}") from last_error
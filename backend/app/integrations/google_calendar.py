@@ -6,14 +6,14 @@ import hmac
 import json
 import logging
 import os
-import urllib.error
 import urllib.parse
-import urllib.request
 from datetime import date, datetime, time, timezone
 from typing import Any
 from uuid import uuid4
 from zoneinfo import ZoneInfo
 
+from app.integrations.http_client import HttpClientError, HttpStatusError, get_http_client
+
 
 logger = logging.getLogger("saihai.google_calendar")
 
@@ -112,7 +112,13 @@ def fetch_google_user_info(access_token: str) -> dict[str, Any]:
     return _request_json(GOOGLE_OAUTH_USERINFO_URL, headers=headers)
 
 
-def create_google_calendar_event(access_token: str, payload: dict[str, Any]) -> dict[str, Any]:
+def create_google_calendar_event(
+    access_token: str,
+    payload: dict[str, Any],
+    *,
+    timeout: float | None = None,
+    retries: int | None = None,
+) -> dict[str, Any]:
     calendar_id = _resolve_calendar_id(payload)
     payload = dict(payload)
     payload.pop("calendar_id", None)
@@ -121,13 +127,22 @@ def create_google_calendar_event(access_token: str, payload: dict[str, Any]) ->
     include_conference = not meeting_url
     event = _build_event_payload(payload, include_conference=include_conference)
     try:
-        return _insert_event(access_token, event, include_conference=include_conference, calendar_id=calendar_id)
+        return _insert_event(
+            access_token,
+            event,
+            include_conference=include_conference,
+            calendar_id=calendar_id,
+            timeout=timeout,
+            retries=retries,
+        )
     except GoogleCalendarError as exc:
         if not include_conference:
             raise
         logger.warning("Meet generation failed; retrying without conference data: %s", exc)
         event = _build_event_payload(payload, include_conference=False)
-        return _insert_event(access_token, event, include_conference=False, calendar_id=calendar_id)
+        return _insert_event(
+            access_token, event, include_conference=False, calendar_id=calendar_id, timeout=timeout, retries=retries
+        )
 
 
 def _insert_event(
@@ -136,6 +151,8 @@ def _insert_event(
     *,
     include_conference: bool,
     calendar_id: str,
+    timeout: float | None = None,
+    retries: int | None = None,
 ) -> dict[str, Any]:
     params = {"sendUpdates": "all"}
     if include_conference:
@@ -143,7 +160,7 @@ def _insert_event(
     encoded_calendar_id = urllib.parse.quote(calendar_id, safe="")
     url = f"{GOOGLE_CALENDAR_API_BASE}/calendars/{encoded_calendar_id}/events?{urllib.parse.urlencode(params)}"
     headers = {"Authorization": f"Bearer {access_token}"}
-    return _request_json(url, data=event, headers=headers, method="POST")
+    return _request_json(url, data=event, headers=headers, method="POST", timeout=timeout, retries=retries)
 
 
 def _resolve_calendar_id(payload: dict[str, Any]) -> str:
@@ -247,14 +264,15 @@ def _request_json(
     data: dict[str, Any] | None = None,
     headers: dict[str, str] | None = None,
     method: str | None = None,
-    timeout: int = 10,
+    timeout: float | None = None,
+    retries: int | None = None,
 ) -> dict[str, Any]:
     headers = dict(headers or {})
     body = None
     if data is not None:
         body = json.dumps(data).encode("utf-8")
         headers.setdefault("Content-Type", "application/json; charset=utf-8")
-    return _request_raw(url, data=body, headers=headers, method=method, timeout=timeout)
+    return _request_raw(url, data=body, headers=headers, method=method, timeout=timeout, retries=retries)
 
 
 def _request_raw(
@@ -263,19 +281,22 @@ def _request_raw(
     data: bytes | None,
     headers: dict[str, str],
     method: str | None = None,
-    timeout: int = 10,
+    timeout: float | None = None,
+    retries: int | None = None,
 ) -> dict[str, Any]:
-    req = urllib.request.Request(url, data=data, headers=headers, method=method)
+    method = method or ("POST" if data is not None else "GET")
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            return _parse_json_response(response.read())
-    except urllib.error.HTTPError as exc:
-        body = exc.read().decode("utf-8") if exc.fp else ""
+        response = get_http_client().request(
+            method, url, body=data, headers=headers, timeout=timeout, retries=retries
+        )
+    except HttpStatusError as exc:
+        body = exc.response.text()
         details = _safe_parse_json(body)
         message = details.get("error_description") or details.get("error") or body or str(exc)
-        raise GoogleCalendarError(message, status=exc.code, details=details) from exc
-    except urllib.error.URLError as exc:
+        raise GoogleCalendarError(message, status=exc.status, details=details) from exc
+    except HttpClientError as exc:
         raise GoogleCalendarError(f"connection error: {exc}") from exc
+    return _parse_json_response(response.body)
 
 
 def _parse_json_response(raw: bytes) -> dict[str, Any]:
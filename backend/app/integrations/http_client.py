@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import http.client
+import json
+import logging
+import os
+import ssl
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping
+
+from app.stage_metrics import percentiles
+
+HTTP_TIMEOUT_SECONDS = max(0.1, float(os.getenv("HTTP_TIMEOUT_SECONDS", "10") or "10"))
+HTTP_POOL_SIZE = max(1, int(os.getenv("HTTP_POOL_SIZE", "8") or "8"))
+HTTP_MAX_RETRIES = max(0, int(os.getenv("HTTP_MAX_RETRIES", "2") or "2"))
+HTTP_RETRY_BACKOFF_SECONDS = max(0.0, float(os.getenv("HTTP_RETRY_BACKOFF_SECONDS", "0.5") or "0.5"))
+HTTP_RETRY_AFTER_MAX_SECONDS = max(0.0, float(os.getenv("HTTP_RETRY_AFTER_MAX_SECONDS", "30") or "30"))
+
+# 429 and 503 mean the request was not processed, so they are retried for any method; 502/504 and
+# connection failures only for methods that are safe to send twice.
+_ALWAYS_RETRY_STATUSES = frozenset({429, 503})
+_IDEMPOTENT_RETRY_STATUSES = frozenset({502, 504})
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+_LATENCY_SAMPLES = 1000
+
+logger = logging.getLogger("saihai.http_client")
+
+
+class HttpClientError(Exception):
+    """The request could not be completed (connection, TLS, timeout or an exhausted pool)."""
+
+
+class HttpStatusError(HttpClientError):
+    """The server answered with a 4xx/5xx status after retries."""
+
+    def __init__(self, response: HttpResponse) -> None:
+        super().__init__(f"HTTP {response.status} from {response.url}")
+        self.response = response
+        self.status = response.status
+        self.body = response.body
+
+
+@dataclass
+class HttpResponse:
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+
+@dataclass
+class _Metric:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    connections_opened: int = 0
+    latencies_ms: deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_SAMPLES))
+
+
+class _HostPool:
+    """Idle keep-alive connections to one origin; ``size`` bounds the connections in use at once."""
+
+    def __init__(self, scheme: str, host: str, port: int, size: int, ssl_context: ssl.SSLContext) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.proxy = _proxy_for(scheme, host)
+        self._ssl_context = ssl_context
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        if not self._slots.acquire(timeout=timeout):
+            raise HttpClientError(f"no free connection to {self.host}:{self.port} within {timeout}s")
+        with self._lock:
+            if self._idle:
+                conn = self._idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._connect(timeout), False
+
+    def release(self, conn: http.client.HTTPConnection, *, reusable: bool) -> None:
+        try:
+            if reusable:
+                with self._lock:
+                    self._idle.append(conn)
+            else:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _connect(self, timeout: float) -> http.client.HTTPConnection:
+        host, port = (self.proxy.hostname or "", self.proxy.port or 80) if self.proxy else (self.host, self.port)
+        if self.scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                host, port, timeout=timeout, context=self._ssl_context
+            )
+            if self.proxy:
+                conn.set_tunnel(self.host, self.port)
+            return conn
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+
+class HttpClient:
+    """Shared outbound HTTP with per-origin keep-alive pools, ``Retry-After`` aware retries and latency metrics."""
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = HTTP_POOL_SIZE,
+        timeout: float = HTTP_TIMEOUT_SECONDS,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff_seconds: float = HTTP_RETRY_BACKOFF_SECONDS,
+        retry_after_max_seconds: float = HTTP_RETRY_AFTER_MAX_SECONDS,
+    ) -> None:
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.retry_after_max_seconds = retry_after_max_seconds
+        self._ssl_context = ssl.create_default_context()
+        self._pools: dict[tuple[str, str, int], _HostPool] = {}
+        self._metrics: dict[tuple[str, str], _Metric] = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        body: bytes | None = None,
+        headers: Mapping[str, str] | None = None,
+        timeout: float | None = None,
+        retries: int | None = None,
+        raise_for_status: bool = True,
+    ) -> HttpResponse:
+        """Send a request, retrying per the rules above. Raises ``HttpStatusError`` for a final 4xx/5xx."""
+        method = method.upper()
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.max_retries if retries is None else retries
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in {"http", "https"} or not parsed.hostname:
+            raise HttpClientError(f"unsupported URL: {url}")
+        pool = self._pool(parsed)
+        metric = self._metric(pool.host, method)
+        target = url if pool.proxy and pool.scheme == "http" else urllib.parse.urlunsplit(("", "", *parsed[2:]))
+        request_headers = {"Host": parsed.netloc, "Connection": "keep-alive", **(headers or {})}
+        idempotent = method in _IDEMPOTENT_METHODS
+
+        started = time.perf_counter()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = self._send(pool, metric, method, url, target or "/", body, request_headers, timeout)
+                except HttpClientError:
+                    if attempt >= retries or not idempotent:
+                        raise
+                    delay = self._backoff(attempt)
+                else:
+                    delay = self._retry_delay(response, attempt, retries, idempotent)
+                    if delay is None:
+                        break
+                attempt += 1
+                with self._lock:
+                    metric.retries += 1
+                logger.info("http.retry host=%s method=%s attempt=%s delay_s=%.2f", pool.host, method, attempt, delay)
+                time.sleep(delay)
+        except HttpClientError:
+            self._record(metric, started, error=True)
+            raise
+        self._record(metric, started, error=response.status >= 400)
+        if raise_for_status and response.status >= 400:
+            raise HttpStatusError(response)
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> HttpResponse:
+        return self.request("GET", url, **kwargs)
+
+    def post_json(
+        self,
+        url: str,
+        payload: Any,
+        *,
+        headers: Mapping[str, str] | None = None,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        return self.request(
+            "POST",
+            url,
+            body=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json; charset=utf-8", **(headers or {})},
+            **kwargs,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Per ``host method``: requests, errors, retries, connections opened and latency percentiles (ms)."""
+        with self._lock:
+            snapshot = {key: (metric, list(metric.latencies_ms)) for key, metric in self._metrics.items()}
+        stats: dict[str, Any] = {}
+        for (host, method), (metric, latencies) in sorted(snapshot.items()):
+            stats[f"{host} {method}"] = {
+                "requests": metric.requests,
+                "errors": metric.errors,
+                "retries": metric.retries,
+                "connections_opened": metric.connections_opened,
+                "latency_ms": percentiles(latencies),
+            }
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def _send(
+        self,
+        pool: _HostPool,
+        metric: _Metric,
+        method: str,
+        url: str,
+        target: str,
+        body: bytes | None,
+        headers: dict[str, str],
+        timeout: float,
+    ) -> HttpResponse:
+        conn, reused = pool.acquire(timeout)
+        if not reused:
+            with self._lock:
+                metric.connections_opened += 1
+        reusable = False
+        try:
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                raw = conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server closed the idle keep-alive connection; nothing was processed, so resend once.
+                conn.close()
+                with self._lock:
+                    metric.connections_opened += 1
+                conn.request(method, target, body=body, headers=headers)
+                raw = conn.getresponse()
+            payload = raw.read()
+            reusable = not raw.will_close
+            return HttpResponse(
+                url=url,
+                status=raw.status,
+                headers={key.lower(): value for key, value in raw.getheaders()},
+                body=payload,
+            )
+        except (OSError, http.client.HTTPException) as exc:
+            raise HttpClientError(f"{method} {url} failed: {exc}") from exc
+        finally:
+            pool.release(conn, reusable=reusable)
+
+    def _retry_delay(self, response: HttpResponse, attempt: int, retries: int, idempotent: bool) -> float | None:
+        if attempt >= retries:
+            return None
+        if response.status in _ALWAYS_RETRY_STATUSES:
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+        elif idempotent and response.status in _IDEMPOTENT_RETRY_STATUSES:
+            retry_after = None
+        else:
+            return None
+        if retry_after is None:
+            return self._backoff(attempt)
+        # A wait longer than the cap is left to the caller (a queue retry) instead of holding the thread.
+        return retry_after if retry_after <= self.retry_after_max_seconds else None
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_seconds * 2**attempt
+
+    def _pool(self, parsed: urllib.parse.SplitResult) -> _HostPool:
+        scheme = parsed.scheme
+        key = (scheme, parsed.hostname or "", parsed.port or (443 if scheme == "https" else 80))
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _HostPool(*key, size=self.pool_size, ssl_context=self._ssl_context)
+            return pool
+
+    def _metric(self, host: str, method: str) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault((host, method), _Metric())
+
+    def _record(self, metric: _Metric, started: float, *, error: bool) -> None:
+        with self._lock:
+            metric.requests += 1
+            metric.errors += int(error)
+            metric.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """The process-wide client; integrations share its pools."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a ``Retry-After`` header, given as seconds or an HTTP date; ``None`` if unusable."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _proxy_for(scheme: str, host: str) -> urllib.parse.SplitResult | None:
+    """Honour ``HTTP(S)_PROXY`` / ``NO_PROXY`` as ``urlopen`` did."""
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    parsed = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    return parsed if parsed.hostname else None
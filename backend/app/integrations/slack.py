@@ -3,14 +3,18 @@ from __future__ import annotations
 import hashlib
 import hmac
 import json
+import logging
 import os
+import threading
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
 from dataclasses import dataclass
 from typing import Any, Mapping
 
+from app.integrations.http_client import HttpClientError, HttpStatusError, get_http_client, parse_retry_after
+
+logger = logging.getLogger("saihai.slack")
+
 
 def _clean_env(name: str) -> str:
     value = (os.getenv(name) or "").strip()
@@ -27,6 +31,33 @@ SLACK_WEBHOOK_URL = _clean_env("SLACK_WEBHOOK_URL")
 SLACK_REQUEST_TTL_SECONDS = int(os.getenv("SLACK_REQUEST_TTL_SECONDS", "300"))
 SLACK_ALLOW_UNSIGNED = os.getenv("SLACK_ALLOW_UNSIGNED", "").lower() in {"1", "true", "yes"}
 
+
+def _parse_rate_limits(raw: str) -> dict[str, float]:
+    limits: dict[str, float] = {}
+    for chunk in raw.split(","):
+        method, _, value = chunk.partition("=")
+        try:
+            limits[method.strip()] = max(1.0, float(value))
+        except ValueError:
+            continue
+    return limits
+
+
+# Requests per minute by Web API method, after Slack's tiers (tier 2: 20, tier 3: 50, tier 4: 100);
+# chat.postMessage is limited to about one message per second per channel. SLACK_RATE_LIMITS overrides
+# entries as "method=per_minute,...".
+SLACK_RATE_LIMITS = {
+    "chat.postMessage": 60.0,
+    "chat.update": 50.0,
+    "views.open": 100.0,
+    "conversations.history": 50.0,
+    "conversations.replies": 50.0,
+    **_parse_rate_limits(os.getenv("SLACK_RATE_LIMITS", "")),
+}
+SLACK_DEFAULT_RATE_PER_MINUTE = 20.0
+SLACK_RATE_BURST = max(1, int(os.getenv("SLACK_RATE_BURST", "3") or "3"))
+SLACK_RATE_LIMIT_MAX_WAIT_SECONDS = max(0.0, float(os.getenv("SLACK_RATE_LIMIT_MAX_WAIT_SECONDS", "30") or "30"))
+
 DEMO_ACTION_PLAN = "demo_plan_select"
 DEMO_ACTION_INTERVENE = "demo_intervene"
 DEMO_ACTION_APPROVE = "demo_approve"
@@ -106,34 +137,134 @@ def build_demo_action_value(alert_id: str, **extra: str) -> str:
     return "|".join(f"{key}={value}" for key, value in parts.items())
 
 
-def _call_slack_api(method: str, payload: dict[str, Any]) -> dict[str, Any] | None:
-    if not SLACK_BOT_TOKEN:
-        return None
+class SlackApiError(RuntimeError):
+    def __init__(self, message: str, *, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
 
-    data = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        f"https://slack.com/api/{method}",
-        data=data,
-        headers={
-            "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-            "Content-Type": "application/json; charset=utf-8",
-        },
-        method="POST",
-    )
+
+class SlackRateLimited(SlackApiError):
+    """Slack answered 429, or the local token bucket would make the caller wait longer than allowed."""
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: float, burst: int) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float | None:
+        """Take a token, returning how long to wait before using it; ``None`` when that exceeds ``max_wait``."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, self.paused_until - now, (1.0 - self.tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self.tokens -= 1.0
+            return wait
+
+    def pause(self, seconds: float) -> None:
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def wait_time(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            return max(0.0, self.paused_until - now, (1.0 - tokens) / self.rate)
+
+
+_buckets: dict[str, _TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def _bucket(method: str, payload: Mapping[str, Any]) -> _TokenBucket:
+    key = f"{method}:{payload.get('channel') or ''}" if method == "chat.postMessage" else method
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            per_minute = SLACK_RATE_LIMITS.get(method, SLACK_DEFAULT_RATE_PER_MINUTE)
+            bucket = _buckets[key] = _TokenBucket(per_minute, SLACK_RATE_BURST)
+        return bucket
+
+
+def slack_bot_configured() -> bool:
+    return bool(SLACK_BOT_TOKEN)
+
+
+def slack_configured() -> bool:
+    return bool(SLACK_BOT_TOKEN or SLACK_WEBHOOK_URL)
+
+
+def call_slack_api(
+    method: str,
+    payload: dict[str, Any],
+    *,
+    max_wait: float = SLACK_RATE_LIMIT_MAX_WAIT_SECONDS,
+    retries: int | None = None,
+    http_method: str = "POST",
+) -> dict[str, Any]:
+    """Call a Web API method within its rate limit. Raises ``SlackRateLimited`` or ``SlackApiError``.
+
+    ``http_method="GET"`` sends ``payload`` as query parameters, as read methods such as ``conversations.history``
+    expect.
+    """
+    if not SLACK_BOT_TOKEN:
+        raise SlackApiError("SLACK_BOT_TOKEN is not configured")
+    bucket = _bucket(method, payload)
+    wait = bucket.reserve(max_wait)
+    if wait is None:
+        raise SlackRateLimited(f"{method} rate limited locally", retry_after=bucket.wait_time())
+    if wait:
+        time.sleep(wait)
+
+    url = f"https://slack.com/api/{method}"
+    headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
     try:
-        with urllib.request.urlopen(request, timeout=10) as response:
-            body = response.read().decode("utf-8")
-    except urllib.error.URLError:
-        return None
+        if http_method == "GET":
+            response = get_http_client().get(
+                f"{url}?{urllib.parse.urlencode(payload)}", headers=headers, retries=retries
+            )
+        else:
+            response = get_http_client().post_json(url, payload, headers=headers, retries=retries)
+    except HttpStatusError as exc:
+        if exc.status == 429:
+            retry_after = max(1.0, parse_retry_after(exc.response.headers.get("retry-after")) or 1.0)
+            # Slack's limit is per workspace and method, so every caller backs off, not only this one.
+            bucket.pause(retry_after)
+            logger.warning("slack.rate_limited method=%s retry_after_s=%s", method, retry_after)
+            raise SlackRateLimited(f"{method} rate limited by Slack", retry_after=retry_after) from exc
+        raise SlackApiError(str(exc)) from exc
+    except HttpClientError as exc:
+        raise SlackApiError(str(exc)) from exc
 
     try:
-        response_payload = json.loads(body)
-    except json.JSONDecodeError:
-        return None
+        response_payload = response.json()
+    except ValueError as exc:
+        raise SlackApiError(f"{method} returned invalid JSON") from exc
+    if not isinstance(response_payload, dict) or not response_payload.get("ok"):
+        error = response_payload.get("error") if isinstance(response_payload, dict) else None
+        raise SlackApiError(f"{method} failed: {error or 'unknown error'}")
+    return response_payload
+
 
-    if not response_payload.get("ok"):
+def _call_slack_api(method: str, payload: dict[str, Any]) -> dict[str, Any] | None:
+    """Inline call for request handlers and open transactions: never waits on the rate limiter or a 429.
+
+    A limited call fails at once; the caller's error path (for messages, the outbox) deals with the delay.
+    """
+    if not SLACK_BOT_TOKEN:
+        return None
+    try:
+        return call_slack_api(method, payload, max_wait=0, retries=0)
+    except SlackApiError as exc:
+        logger.warning("slack api call failed method=%s error=%s", method, exc)
         return None
-    return response_payload
 
 
 def _post_slack_api(payload: dict[str, Any]) -> dict[str, Any] | None:
@@ -149,23 +280,31 @@ def _post_slack_webhook(payload: dict[str, Any]) -> bool:
     if not SLACK_WEBHOOK_URL:
         return False
 
-    data = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        SLACK_WEBHOOK_URL,
-        data=data,
-        headers={"Content-Type": "application/json; charset=utf-8"},
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(request, timeout=10) as response:
-            body = response.read().decode("utf-8")
-    except urllib.error.URLError:
+        response = get_http_client().post_json(SLACK_WEBHOOK_URL, payload)
+    except HttpClientError:
         return False
 
-    return body.strip().lower() == "ok"
+    return response.text().strip().lower() == "ok"
 
 
-def send_approval_message(
+def deliver_slack_message(payload: dict[str, Any], *, max_wait: float = 0.0) -> dict[str, Any]:
+    """Post ``payload`` once for the outbox dispatcher: no HTTP retries, so a 429 is rescheduled, not waited on.
+
+    Falls back to the webhook only when no bot token is configured; raises ``SlackApiError`` on failure.
+    """
+    if SLACK_BOT_TOKEN:
+        send_payload = dict(payload)
+        send_payload["channel"] = send_payload.get("channel") or SLACK_DEFAULT_CHANNEL
+        if not send_payload["channel"]:
+            raise SlackApiError("no Slack channel configured")
+        return call_slack_api("chat.postMessage", send_payload, max_wait=max_wait, retries=0)
+    if _post_slack_webhook(payload):
+        return {}
+    raise SlackApiError("Slack webhook delivery failed" if SLACK_WEBHOOK_URL else "Slack is not configured")
+
+
+def build_approval_payload(
     action_id: int,
     approval_request_id: str,
     thread_id: str,
@@ -174,7 +313,7 @@ def send_approval_message(
     *,
     channel: str | None = None,
     thread_ts: str | None = None,
-) -> SlackMeta | None:
+) -> dict[str, Any]:
     target_channel = channel or SLACK_DEFAULT_CHANNEL
 
     title = summary or "Approval required"
@@ -239,19 +378,48 @@ def send_approval_message(
         payload["channel"] = target_channel
     if thread_ts:
         payload["thread_ts"] = thread_ts
+    return payload
+
+
+def slack_meta_from_response(response: Mapping[str, Any], payload: Mapping[str, Any]) -> SlackMeta | None:
+    resolved_channel = response.get("channel") or payload.get("channel")
+    message_ts = response.get("ts") or (response.get("message") or {}).get("ts")
+    if not message_ts or not resolved_channel:
+        return None
+    return SlackMeta(channel=resolved_channel, message_ts=message_ts, thread_ts=payload.get("thread_ts") or message_ts)
+
+
+def send_approval_message(
+    action_id: int,
+    approval_request_id: str,
+    thread_id: str,
+    summary: str | None,
+    draft: str | None,
+    *,
+    channel: str | None = None,
+    thread_ts: str | None = None,
+    webhook_fallback: bool = True,
+) -> SlackMeta | None:
+    """Post the approval prompt with the bot, or through the webhook when the bot post fails.
+
+    Pass ``webhook_fallback=False`` when the caller queues a failed post for retry: a webhook post returns no
+    message ts, so it cannot be told apart from no post at all and the prompt would go out twice.
+    """
+    payload = build_approval_payload(
+        action_id,
+        approval_request_id,
+        thread_id,
+        summary,
+        draft,
+        channel=channel,
+        thread_ts=thread_ts,
+    )
+    target_channel = payload.get("channel")
     response = _post_slack_api(payload)
     if response:
-        resolved_channel = response.get("channel") or target_channel
-        message_ts = response.get("ts") or response.get("message", {}).get("ts")
-        if not message_ts or not resolved_channel:
-            return None
-        return SlackMeta(
-            channel=resolved_channel,
-            message_ts=message_ts,
-            thread_ts=thread_ts or message_ts,
-        )
+        return slack_meta_from_response(response, payload)
 
-    if _post_slack_webhook(payload):
+    if webhook_fallback and _post_slack_webhook(payload):
         if thread_ts and target_channel:
             return SlackMeta(channel=target_channel, message_ts=thread_ts, thread_ts=thread_ts)
         return None
@@ -259,24 +427,6 @@ def send_approval_message(
     return None
 
 
-def post_thread_message(channel: str, thread_ts: str, text: str) -> None:
-    if not channel or not thread_ts:
-        return
-    payload = {"channel": channel, "text": text, "thread_ts": thread_ts}
-    if _post_slack_api(payload):
-        return
-    _post_slack_webhook(payload)
-
-
-def post_thread_blocks(channel: str, thread_ts: str, text: str, blocks: list[dict[str, Any]]) -> None:
-    if not channel or not thread_ts:
-        return
-    payload = {"channel": channel, "text": text, "thread_ts": thread_ts, "blocks": blocks}
-    if _post_slack_api(payload):
-        return
-    _post_slack_webhook(payload)
-
-
 def post_demo_alert(alert_id: str, *, channel: str | None = None) -> SlackMeta | None:
     target_channel = channel or SLACK_DEMO_CHANNEL or SLACK_DEFAULT_CHANNEL
     if not SLACK_BOT_TOKEN or not target_channel:
@@ -340,13 +490,8 @@ def post_demo_alert(alert_id: str, *, channel: str | None = None) -> SlackMeta |
     return SlackMeta(channel=resolved_channel, message_ts=message_ts, thread_ts=message_ts)
 
 
-def post_demo_approval_prompt(
-    channel: str,
-    thread_ts: str,
-    summary: str,
-    alert_id: str,
-) -> None:
-    blocks: list[dict[str, Any]] = [
+def demo_approval_prompt_blocks(summary: str, alert_id: str) -> list[dict[str, Any]]:
+    return [
         {"type": "section", "text": {"type": "mrkdwn", "text": summary}},
         {
             "type": "actions",
@@ -380,17 +525,11 @@ def post_demo_approval_prompt(
             ],
         },
     ]
-    post_thread_blocks(channel, thread_ts, "Demo approval required", blocks)
 
 
-def post_demo_retry_prompt(
-    channel: str,
-    thread_ts: str,
-    alert_id: str,
-    reason: str,
-) -> None:
+def demo_retry_prompt_blocks(alert_id: str, reason: str) -> list[dict[str, Any]]:
     message = f":warning: Google Calendar 作成に失敗しました。\n{reason}"
-    blocks: list[dict[str, Any]] = [
+    return [
         {"type": "section", "text": {"type": "mrkdwn", "text": message}},
         {
             "type": "actions",
@@ -417,7 +556,6 @@ def post_demo_retry_prompt(
             ],
         },
     ]
-    post_thread_blocks(channel, thread_ts, "Demo approval retry", blocks)
 
 
 def open_demo_intervention_modal(trigger_id: str, alert_id: str) -> bool:
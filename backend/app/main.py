@@ -1,5 +1,6 @@
 import logging
 import time
+from contextlib import asynccontextmanager
 from urllib.parse import urlparse
 from uuid import uuid4
 
@@ -11,7 +12,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
+from app.api.slack import SLACK_INBOX_HANDLERS
 from app.api.slack import router as slack_router
+from app.db import engine
+from app.domain.slack_inbox import start_slack_inbox_consumer
+from app.domain.slack_outbox import start_slack_outbox_dispatcher
 from app.http_logging import (
     format_query_params,
     format_request_body,
@@ -66,7 +71,19 @@ try:
 except Exception:
     startup_logger.exception("Failed to resolve Bedrock settings for startup log")
 
-app = FastAPI(title="SaihAI API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    stop_events = [start_slack_outbox_dispatcher(engine), start_slack_inbox_consumer(engine, SLACK_INBOX_HANDLERS)]
+    try:
+        yield
+    finally:
+        for stop_event in stop_events:
+            if stop_event:
+                stop_event.set()
+
+
+app = FastAPI(title="SaihAI API", version="0.1.0", lifespan=lifespan)
 
 @app.middleware("http")
 async def http_request_logger(request, call_next):
@@ -121,6 +138,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(api_router)
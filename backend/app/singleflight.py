@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger("saihai.singleflight")
+
+
+def fingerprint(payload: Any) -> str:
+    try:
+        dumped = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    except Exception:
+        dumped = repr(payload)
+    return hashlib.sha256(dumped.encode("utf-8")).hexdigest()[:16]
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight computation."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+
+    def _acquire(self, key: str) -> tuple[Future, bool]:
+        with self._lock:
+            existing = self._inflight.get(key)
+            if existing is not None:
+                return existing, False
+            future: Future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _release(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _run(self, key: str, future: Future, fn: Callable[..., T], args: tuple, kwargs: dict) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+        finally:
+            self._release(key, future)
+
+    def do(self, key: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        future, leader = self._acquire(key)
+        if leader:
+            self._run(key, future, fn, args, kwargs)
+        else:
+            logger.info("singleflight.coalesced name=%s key=%s mode=sync", self._name, key)
+        return future.result()
+
+    async def do_async(self, key: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        future, leader = self._acquire(key)
+        if leader:
+            await asyncio.to_thread(self._run, key, future, fn, args, kwargs)
+        else:
+            logger.info("singleflight.coalesced name=%s key=%s mode=async", self._name, key)
+        return await asyncio.wrap_future(future)
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+
+from app.integrations.bedrock import InvocationCounter, count_invocations
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    wall_ms: float = 0.0
+    rows_read: int = 0
+    rows_written: int = 0
+    db_round_trips: int = 0
+    llm_calls: int = 0
+
+
+class StageRecorder:
+    """Per-stage wall time, row counts, DB round trips and Bedrock calls for one unit of work.
+
+    Round trips are counted with a ``before_cursor_execute`` listener on ``conn`` (an executemany is one
+    trip); Bedrock calls are counted for the current context, including pool threads started with
+    ``contextvars.copy_context()``.
+    """
+
+    def __init__(self, conn: Connection) -> None:
+        self._conn = conn
+        self._round_trips = 0
+        self._llm: InvocationCounter | None = None
+        self._exit_stack = ExitStack()
+        self.stages: list[StageMetrics] = []
+
+    def __enter__(self) -> "StageRecorder":
+        event.listen(self._conn, "before_cursor_execute", self._on_execute)
+        self._exit_stack.callback(event.remove, self._conn, "before_cursor_execute", self._on_execute)
+        self._llm = self._exit_stack.enter_context(count_invocations())
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._exit_stack.close()
+
+    def _on_execute(self, *args: object) -> None:
+        self._round_trips += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        metrics = StageMetrics(name=name)
+        started = time.perf_counter()
+        trips_before = self._round_trips
+        llm_before = self._llm.calls if self._llm else 0
+        try:
+            yield metrics
+        finally:
+            metrics.wall_ms = round((time.perf_counter() - started) * 1000, 1)
+            metrics.db_round_trips = self._round_trips - trips_before
+            metrics.llm_calls = (self._llm.calls if self._llm else 0) - llm_before
+            self.stages.append(metrics)
+
+    def to_payload(self) -> list[dict[str, Any]]:
+        return [asdict(stage) for stage in self.stages]
+
+
+def percentiles(values: list[float]) -> dict[str, float | None]:
+    """p50, p95 and max of ``values``, rounded to 0.1; all ``None`` when there are none."""
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(values)
+
+    def _at(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+    return {"p50": _at(0.5), "p95": _at(0.95), "max": round(ordered[-1], 1)}
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+from unittest import mock
+
+from app.integrations import bedrock
+
+_PROJECTS_RE = re.compile(r"\[Projects\]\s*(\[.*\])\s*$", flags=re.DOTALL)
+
+
+class StubThrottlingError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class LatencySpec:
+    """Latency distribution in milliseconds.
+
+    ``fixed:200``, ``uniform:100:400`` and ``lognormal:300:0.5`` (median, sigma) are accepted.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, raw: str) -> "LatencySpec":
+        parts = [part.strip() for part in (raw or "fixed:0").split(":")]
+        kind = parts[0].lower()
+        values = [float(part) for part in parts[1:]]
+        if kind == "fixed" and len(values) == 1:
+            return cls(kind, values[0])
+        if kind in {"uniform", "lognormal"} and len(values) == 2:
+            return cls(kind, values[0], values[1])
+        raise ValueError(f"invalid latency spec: {raw!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(max(self.a, 0.001)), self.b)
+        return self.a
+
+
+@dataclass
+class StubConfig:
+    latency: LatencySpec = field(default_factory=LatencySpec)
+    latency_by_route: dict[str, LatencySpec] = field(default_factory=dict)
+    throttle_rate: float = 0.0
+    max_inflight: int | None = None
+    client_init_ms: float = 0.0
+    seed: int = 7
+
+
+@dataclass
+class StubStats:
+    calls: int = 0
+    throttled: int = 0
+    inflight: int = 0
+    max_inflight: int = 0
+    client_builds: int = 0
+    calls_by_route: dict[str, int] = field(default_factory=dict)
+
+
+def _agent_opinion(agent_id: str) -> dict[str, Any]:
+    return {
+        "agent_id": agent_id,
+        "opinion_summary": f"{agent_id} stub opinion",
+        "data_points": {"score": 62.0, "confidence": 0.7},
+        "detailed_analysis": f"{agent_id} detailed analysis from the benchmark stub",
+        "analysis_evidence": "weekly report excerpt",
+        "critical_alert": None,
+        "discussion_draft": f"{agent_id} stub discussion",
+    }
+
+
+def _gunshi_plans() -> dict[str, Any]:
+    plans = []
+    for plan_id, score in (("Plan_A", 60), ("Plan_B", 72), ("Plan_C", 55)):
+        plans.append(
+            {
+                "id": plan_id,
+                "is_recommended": plan_id == "Plan_B",
+                "recommendation_score": score,
+                "risk_score": 100 - score,
+                "risk_reward_ratio": "1:2",
+                "description": f"{plan_id} stub description",
+                "debate_summary": [
+                    {"speaker": "PM", "content": "budget ok"},
+                    {"speaker": "Risk", "content": "watch attrition"},
+                ],
+                "final_judgment": {"decision": "採用", "gunshi_summary": f"{plan_id} summary"},
+            }
+        )
+    return {"analysis_meta": {"candidate_name": "benchmark team", "debate_intensity": "Mid"}, "three_plans": plans}
+
+
+def _requested_project_ids(prompt: str) -> list[str]:
+    match = _PROJECTS_RE.search(prompt)
+    if not match:
+        return []
+    try:
+        projects = json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return []
+    return [str(item.get("project_id")) for item in projects if isinstance(item, dict)]
+
+
+def _monitor_entry(project_id: str | None = None) -> dict[str, Any]:
+    entry = {"risk_level": 68, "reason": "stub: fatigue signals in weekly reports", "urgency": "Med"}
+    if project_id is not None:
+        entry["project_id"] = project_id
+    return entry
+
+
+def _watchdog_plans(project_id: str | None = None) -> dict[str, Any]:
+    entry: dict[str, Any] = {
+        "recommended_plan": "Plan_B",
+        "plans": [
+            {"plan_type": "Plan_A", "description": "keep staffing", "predicted_future_impact": "stable"},
+            {"plan_type": "Plan_B", "description": "rotate workload", "predicted_future_impact": "recovery"},
+        ],
+    }
+    if project_id is not None:
+        entry["project_id"] = project_id
+    return entry
+
+
+Route = tuple[str, Callable[[str, str], bool], Callable[[str, str], Any]]
+
+ROUTES: list[Route] = [
+    ("gunshi_synthesis", lambda system, prompt: "three_plans" in system, lambda s, p: _gunshi_plans()),
+    ("agent_pm", lambda s, prompt: '"agent_id": "PM"' in prompt, lambda s, p: _agent_opinion("PM")),
+    ("agent_hr", lambda s, prompt: '"agent_id": "HR"' in prompt, lambda s, p: _agent_opinion("HR")),
+    ("agent_risk", lambda s, prompt: '"agent_id": "Risk"' in prompt, lambda s, p: _agent_opinion("Risk")),
+    (
+        "monitor_batch",
+        lambda system, p: "risk analyst" in system and "projects" in system,
+        lambda s, prompt: {"projects": [_monitor_entry(pid) for pid in _requested_project_ids(prompt)]},
+    ),
+    ("monitor", lambda system, p: "risk analyst" in system, lambda s, p: _monitor_entry()),
+    (
+        "gunshi_batch",
+        lambda system, p: "senior strategist" in system and "projects" in system,
+        lambda s, prompt: {"projects": [_watchdog_plans(pid) for pid in _requested_project_ids(prompt)]},
+    ),
+    ("gunshi", lambda system, p: "senior strategist" in system, lambda s, p: _watchdog_plans()),
+    (
+        "drafting",
+        lambda system, p: "drafts client emails" in system,
+        lambda s, p: {
+            "email_draft": "Subject: follow-up\n\nstub body",
+            "approval_doc": "stub approval",
+            "email_payload": {"to": "pm@example.com", "subject": "follow-up", "body": "stub body"},
+        },
+    ),
+    (
+        "plan_chat",
+        lambda system, p: "staffing strategist" in system,
+        lambda s, p: {
+            "assistant_message": "stub: plan updated",
+            "plan": {"summary": "stub summary", "pros": ["faster"], "cons": ["cost"], "score": 70},
+        },
+    ),
+]
+
+
+class StubBedrockClient:
+    """Offline stand-in for a ``bedrock-runtime`` client exposing ``converse``."""
+
+    def __init__(self, config: StubConfig | None = None) -> None:
+        self.config = config or StubConfig()
+        self.stats = StubStats()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+
+    def _route(self, system: str, prompt: str) -> tuple[str, Any]:
+        for name, matches, respond in ROUTES:
+            if matches(system, prompt):
+                return name, respond(system, prompt)
+        return "default", {"ok": True, "provider": "stub"}
+
+    def converse(self, *, modelId: str, system: list, messages: list, inferenceConfig: dict) -> dict[str, Any]:
+        system_text = " ".join(str(part.get("text") or "") for part in system or [])
+        prompt = " ".join(
+            str(part.get("text") or "") for message in messages for part in message.get("content") or []
+        )
+        route, payload = self._route(system_text, prompt)
+        spec = self.config.latency_by_route.get(route, self.config.latency)
+        with self._lock:
+            self.stats.calls += 1
+            self.stats.calls_by_route[route] = self.stats.calls_by_route.get(route, 0) + 1
+            over_capacity = self.config.max_inflight is not None and self.stats.inflight >= self.config.max_inflight
+            throttled = over_capacity or self._rng.random() < self.config.throttle_rate
+            if throttled:
+                self.stats.throttled += 1
+            else:
+                self.stats.inflight += 1
+                self.stats.max_inflight = max(self.stats.max_inflight, self.stats.inflight)
+            delay_ms = spec.sample(self._rng)
+        if throttled:
+            raise StubThrottlingError("ThrottlingException: Rate exceeded (stub)")
+        try:
+            time.sleep(max(0.0, delay_ms) / 1000)
+        finally:
+            with self._lock:
+                self.stats.inflight -= 1
+        return {"output": {"message": {"role": "assistant", "content": [{"text": json.dumps(payload, ensure_ascii=False)}]}}}
+
+
+@contextmanager
+def install_stub(client: StubBedrockClient, *, cache_clients: bool = True) -> Iterator[StubBedrockClient]:
+    """Route every Bedrock call in the app through ``client``.
+
+    With ``cache_clients=False`` each call pays ``client_init_ms`` to model a cold boto3 client.
+    """
+
+    def build(region: str):
+        reused = cache_clients and client.stats.client_builds > 0
+        if not reused:
+            with client._lock:
+                client.stats.client_builds += 1
+            time.sleep(client.config.client_init_ms / 1000)
+        return client, reused, (None, None, None, None)
+
+    env = {"AWS_REGION": "stub-region-1", "AWS_BEDROCK_MODEL_ID": "stub.model-v1"}
+    with mock.patch.dict("os.environ", env), mock.patch.object(bedrock, "_build_bedrock_client", build):
+        yield client
@@ -0,0 +1,327 @@
+"""Offline latency/throughput benchmark for the Bedrock agent pipelines.
+
+Every Bedrock call is served by ``benchmarks.bedrock_stub`` and the watchdog runs against a throwaway
+SQLite database, so no network access or AWS credentials are needed::
+
+    python -m benchmarks.run --scenario all --concurrency 1,4,16 --requests 24 --latency lognormal:400:0.35
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+# Keep the run hermetic: no Slack side effects and a private SQLite file, decided before app modules import.
+for _key in [key for key in os.environ if key.startswith("SLACK_")]:
+    os.environ.pop(_key)
+_DB_DIR = tempfile.mkdtemp(prefix="saihai-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_DB_DIR) / 'bench.db'}"
+
+from benchmarks.bedrock_stub import LatencySpec, StubBedrockClient, StubConfig, install_stub  # noqa: E402
+from benchmarks.synthetic_org import SyntheticOrg, populate  # noqa: E402
+
+SCENARIOS = ("simulation", "chat", "watchdog", "stream")
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    variant: str
+    concurrency: int
+    requests: int
+    errors: int
+    wall_ms: float
+    latencies_ms: list[float] = field(default_factory=list)
+    stub: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        return (self.requests - self.errors) / (self.wall_ms / 1000) if self.wall_ms else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "scenario": self.scenario,
+            "variant": self.variant,
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "wall_ms": round(self.wall_ms, 1),
+            "throughput_rps": round(self.throughput, 2),
+            "p50_ms": round(percentile(self.latencies_ms, 50), 1),
+            "p95_ms": round(percentile(self.latencies_ms, 95), 1),
+            "p99_ms": round(percentile(self.latencies_ms, 99), 1),
+            "stub": self.stub,
+        }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def _run_threaded(fn: Callable[[int], Any], requests: int, concurrency: int) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+
+    def timed(index: int) -> tuple[float, bool]:
+        started = time.perf_counter()
+        try:
+            fn(index)
+            ok = True
+        except Exception:
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for elapsed, ok in executor.map(timed, range(requests)):
+            latencies.append(elapsed)
+            errors += 0 if ok else 1
+    return latencies, errors, (time.perf_counter() - started) * 1000
+
+
+def _simulation_payload(simulation_id: str) -> dict[str, Any]:
+    return {
+        "id": simulation_id,
+        "riskScore": 62,
+        "project": {"id": "bench-project", "name": "Benchmark project", "budget": 900},
+        "team": [
+            {"id": f"bench-u{idx}", "name": f"Member {idx}", "cost": 70 + idx, "notes": "疲労が溜まっている"}
+            for idx in range(5)
+        ],
+        "evaluation": {"metrics": {"budgetPct": 92, "riskPct": 62}, "pattern": "burnout", "requirementResult": []},
+    }
+
+
+def _simulation_ids(requests: int, duplicate_ratio: float) -> list[str]:
+    distinct = max(1, round(requests * (1 - duplicate_ratio)))
+    return [f"bench-sim-{index % distinct}" for index in range(requests)]
+
+
+def bench_simulation(args: argparse.Namespace, concurrency: int) -> tuple[list[float], int, float]:
+    from app.api import v1
+
+    ids = _simulation_ids(args.requests, args.duplicate_ratio)
+    for simulation_id in set(ids):
+        v1._simulations[simulation_id] = _simulation_payload(simulation_id)
+    return _run_threaded(lambda index: v1._build_plans_with_bedrock(ids[index], v1._simulations[ids[index]]), args.requests, concurrency)
+
+
+def bench_chat(args: argparse.Namespace, concurrency: int) -> tuple[list[float], int, float]:
+    from app.agents.plan_chat import update_plan_via_chat
+
+    plan = {"summary": "rotate workload", "prosCons": {"pros": ["recovery"], "cons": ["cost"]}, "score": 65}
+
+    def call(index: int) -> None:
+        update_plan_via_chat(
+            plan_type="B",
+            plan=plan,
+            simulation_context=_simulation_payload(f"bench-chat-{index}"),
+            history=[{"role": "user", "content": "コストを抑えたい"}],
+            user_message=f"request {index}: 予算内に収めて",
+        )
+
+    return _run_threaded(call, args.requests, concurrency)
+
+
+def _prepare_database(args: argparse.Namespace) -> None:
+    from app.db import db_connection, engine, is_sqlite_engine
+    from app.db.migrations import apply_migrations
+
+    with db_connection() as conn:
+        if apply_migrations(conn, sqlite=is_sqlite_engine(engine)):
+            populate(
+                conn,
+                SyntheticOrg(
+                    users=args.watchdog_users,
+                    projects=args.watchdog_projects,
+                    reports_per_user=args.watchdog_reports,
+                ),
+            )
+
+
+def bench_watchdog(args: argparse.Namespace, concurrency: int, mode: str) -> tuple[list[float], int, float]:
+    from app.db import engine
+    from app.domain import watchdog
+
+    _prepare_database(args)
+    latencies: list[float] = []
+    errors = 0
+    started = time.perf_counter()
+    with mock.patch.object(watchdog, "WATCHDOG_LLM_MODE", mode), mock.patch.object(
+        watchdog, "WATCHDOG_LLM_CONCURRENCY", concurrency
+    ):
+        for _ in range(args.watchdog_cycles):
+            # Each cycle is rolled back so every iteration sees the same at-risk projects.
+            with engine.connect() as conn:
+                transaction = conn.begin()
+                cycle_started = time.perf_counter()
+                try:
+                    watchdog._perform_watchdog_cycle(conn, job_id="bench")
+                except Exception:
+                    errors += 1
+                latencies.append((time.perf_counter() - cycle_started) * 1000)
+                transaction.rollback()
+    return latencies, errors, (time.perf_counter() - started) * 1000
+
+
+def bench_stream(args: argparse.Namespace, concurrency: int) -> tuple[list[float], int, float]:
+    from app.api import v1
+    from app.auth import AuthUser
+    from app.db import engine
+
+    _prepare_database(args)
+    ids = _simulation_ids(args.requests, args.duplicate_ratio)
+    for simulation_id in set(ids):
+        v1._simulations[simulation_id] = _simulation_payload(simulation_id)
+    user = AuthUser(user_id="bench-user", name="Benchmark")
+
+    async def consume(simulation_id: str) -> tuple[float, bool]:
+        started = time.perf_counter()
+        completed = False
+        with engine.begin() as conn:
+            response = await v1.stream_plans(simulation_id, user=user, conn=conn)
+            async for chunk in response.body_iterator:
+                if "event: complete" in (chunk if isinstance(chunk, str) else chunk.decode("utf-8")):
+                    completed = True
+        return (time.perf_counter() - started) * 1000, completed
+
+    async def run_all() -> list[tuple[float, bool]]:
+        gate = asyncio.Semaphore(concurrency)
+
+        async def bounded(simulation_id: str) -> tuple[float, bool]:
+            async with gate:
+                return await consume(simulation_id)
+
+        return await asyncio.gather(*(bounded(simulation_id) for simulation_id in ids))
+
+    started = time.perf_counter()
+    results = asyncio.run(run_all())
+    wall_ms = (time.perf_counter() - started) * 1000
+    return [elapsed for elapsed, _ in results], sum(1 for _, ok in results if not ok), wall_ms
+
+
+def _stub_config(args: argparse.Namespace) -> StubConfig:
+    latency_by_route: dict[str, LatencySpec] = {}
+    if args.gunshi_latency:
+        latency_by_route["gunshi_synthesis"] = LatencySpec.parse(args.gunshi_latency)
+    if args.hr_latency:
+        latency_by_route["agent_hr"] = LatencySpec.parse(args.hr_latency)
+    return StubConfig(
+        latency=LatencySpec.parse(args.latency),
+        latency_by_route=latency_by_route,
+        throttle_rate=args.throttle_rate,
+        max_inflight=args.service_max_inflight,
+        client_init_ms=args.client_init_ms,
+        seed=args.seed,
+    )
+
+
+def run_benchmarks(args: argparse.Namespace) -> list[ScenarioResult]:
+    from app.agents import simulator_planner
+
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    results: list[ScenarioResult] = []
+    env = {"BEDROCK_MAX_CONCURRENCY": str(args.bedrock_max_concurrency or "")}
+    with mock.patch.dict(os.environ, env), mock.patch.object(simulator_planner, "_PLAN_PIPELINE_MODE", args.plan_mode):
+        for scenario in scenarios:
+            variants = args.watchdog_modes.split(",") if scenario == "watchdog" else [args.plan_mode]
+            for variant in variants:
+                for concurrency in levels:
+                    client = StubBedrockClient(_stub_config(args))
+                    with install_stub(client, cache_clients=not args.no_client_cache):
+                        if scenario == "simulation":
+                            latencies, errors, wall_ms = bench_simulation(args, concurrency)
+                        elif scenario == "chat":
+                            latencies, errors, wall_ms = bench_chat(args, concurrency)
+                        elif scenario == "watchdog":
+                            latencies, errors, wall_ms = bench_watchdog(args, concurrency, variant)
+                        else:
+                            latencies, errors, wall_ms = bench_stream(args, concurrency)
+                    stats = client.stats
+                    result = ScenarioResult(
+                        scenario=scenario,
+                        variant=variant,
+                        concurrency=concurrency,
+                        requests=len(latencies),
+                        errors=errors,
+                        wall_ms=wall_ms,
+                        latencies_ms=latencies,
+                        stub={
+                            "llm_calls": stats.calls,
+                            "throttled": stats.throttled,
+                            "max_inflight": stats.max_inflight,
+                            "client_builds": stats.client_builds,
+                            "calls_by_route": dict(stats.calls_by_route),
+                        },
+                    )
+                    results.append(result)
+                    _print_row(result)
+    return results
+
+
+def _print_row(result: ScenarioResult) -> None:
+    row = result.summary()
+    print(
+        f"{row['scenario']:<10} {row['variant']:<10} c={row['concurrency']:<3} n={row['requests']:<4} "
+        f"err={row['errors']:<3} thr={row['throughput_rps']:>7.2f}/s p50={row['p50_ms']:>8.1f} "
+        f"p95={row['p95_ms']:>8.1f} p99={row['p99_ms']:>8.1f} llm={row['stub']['llm_calls']:<4} "
+        f"throttled={row['stub']['throttled']:<3} inflight_max={row['stub']['max_inflight']}",
+        flush=True,
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline Bedrock pipeline benchmark")
+    parser.add_argument("--scenario", choices=(*SCENARIOS, "all"), default="all")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=16, help="requests per level (simulation/chat/stream)")
+    parser.add_argument("--latency", default="lognormal:300:0.35", help="stub latency: fixed:MS | uniform:LO:HI | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--gunshi-latency", default="", help="latency override for the Gunshi synthesis call")
+    parser.add_argument("--hr-latency", default="", help="latency override for the HR agent call")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="probability of a ThrottlingException per call")
+    parser.add_argument("--service-max-inflight", type=int, default=None, help="stub-side capacity; calls above it are throttled")
+    parser.add_argument("--bedrock-max-concurrency", type=int, default=None, help="client-side limiter (BEDROCK_MAX_CONCURRENCY)")
+    parser.add_argument("--no-client-cache", action="store_true", help="rebuild the Bedrock client on every call")
+    parser.add_argument("--client-init-ms", type=float, default=0.0, help="simulated client construction cost")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0, help="share of requests reusing a simulation id")
+    parser.add_argument("--plan-mode", choices=("all", "quorum"), default="all", help="PLAN_PIPELINE_MODE")
+    parser.add_argument("--watchdog-modes", default="serial,batched,concurrent", help="WATCHDOG_LLM_MODE variants")
+    parser.add_argument("--watchdog-cycles", type=int, default=3)
+    parser.add_argument("--watchdog-users", type=int, default=60)
+    parser.add_argument("--watchdog-projects", type=int, default=12)
+    parser.add_argument("--watchdog-reports", type=int, default=4, help="weekly reports per user")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", default="", help="write the full results as JSON")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    results = run_benchmarks(args)
+    if args.json_path:
+        Path(args.json_path).write_text(
+            json.dumps([result.summary() | {"latencies_ms": result.latencies_ms} for result in results], indent=2),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+_REPORT_SNIPPETS = (
+    "今週は新機能の実装に挑戦し、学びが多かった。",
+    "レビュー対応が続き疲労が溜まっている。",
+    "顧客との調整で炎上気味、不満の声もある。",
+    "後輩の育成に時間を使い、成長を感じた。",
+    "単調な作業が続き飽きてきた。限界が近い。",
+    "特に問題なく順調に進捗している。",
+)
+_ROLES = ("Engineer", "PM", "Designer", "QA", "Architect")
+
+
+@dataclass(frozen=True)
+class SyntheticOrg:
+    users: int
+    projects: int
+    reports_per_user: int
+    seed: int = 42
+
+
+def populate(conn: Connection, org: SyntheticOrg) -> dict[str, int]:
+    """Insert a deterministic synthetic organisation into an empty, migrated database."""
+    rng = random.Random(org.seed)
+    user_ids = [f"SYN-U{idx:06d}" for idx in range(org.users)]
+    project_ids = [f"SYN-P{idx:05d}" for idx in range(max(1, org.projects))]
+
+    conn.execute(
+        text(
+            """
+            INSERT INTO users
+              (user_id, name, role, skill_level, unit_id, cost_per_month, can_overtime, career_aspiration)
+            VALUES
+              (:user_id, :name, :role, :skill_level, :unit_id, :cost_per_month, :can_overtime, :career_aspiration)
+            """
+        ),
+        [
+            {
+                "user_id": user_id,
+                "name": f"Synthetic {idx}",
+                "role": _ROLES[idx % len(_ROLES)],
+                "skill_level": 1 + idx % 10,
+                "unit_id": f"unit-{idx % 20}",
+                "cost_per_month": 60 + idx % 60,
+                "can_overtime": idx % 3 != 0,
+                "career_aspiration": rng.choice(_REPORT_SNIPPETS),
+            }
+            for idx, user_id in enumerate(user_ids)
+        ],
+    )
+    conn.execute(
+        text(
+            """
+            INSERT INTO projects
+              (project_id, project_name, manager_id, status, budget_cap, difficulty_level, required_skills, description)
+            VALUES
+              (:project_id, :project_name, :manager_id, :status, :budget_cap, :difficulty_level, :required_skills, :description)
+            """
+        ),
+        [
+            {
+                "project_id": project_id,
+                "project_name": f"Synthetic project {idx}",
+                "manager_id": user_ids[(idx * 7) % len(user_ids)] if user_ids else None,
+                "status": "稼働中",
+                "budget_cap": 500 + idx % 500,
+                "difficulty_level": f"L{1 + idx % 5}",
+                "required_skills": None,
+                "description": f"Synthetic project {idx}",
+            }
+            for idx, project_id in enumerate(project_ids)
+        ],
+    )
+
+    assignments = [
+        {
+            "user_id": user_id,
+            "project_id": project_ids[idx % len(project_ids)],
+            "role_in_pj": "Dev",
+            "allocation_rate": round(0.2 + (idx % 8) / 10, 2),
+            "start_date": "2025-04-01",
+            "end_date": None,
+        }
+        for idx, user_id in enumerate(user_ids)
+    ]
+    if assignments:
+        conn.execute(
+            text(
+                """
+                INSERT INTO assignments
+                  (project_id, user_id, role_in_pj, allocation_rate, start_date, end_date)
+                VALUES
+                  (:project_id, :user_id, :role_in_pj, :allocation_rate, :start_date, :end_date)
+                """
+            ),
+            assignments,
+        )
+
+    reports = 0
+    start = date.today() - timedelta(weeks=org.reports_per_user)
+    batch: list[dict] = []
+    for idx, user_id in enumerate(user_ids):
+        project_id = project_ids[idx % len(project_ids)]
+        for week in range(org.reports_per_user):
+            reporting_date = start + timedelta(weeks=week)
+            batch.append(
+                {
+                    "user_id": user_id,
+                    "project_id": project_id,
+                    "reporting_date": reporting_date.isoformat(),
+                    "content_text": " ".join(rng.sample(_REPORT_SNIPPETS, 2)),
+                    "reported_at": f"{reporting_date.isoformat()} 09:00:00",
+                }
+            )
+            if len(batch) >= 5000:
+                reports += _insert_reports(conn, batch)
+                batch = []
+    if batch:
+        reports += _insert_reports(conn, batch)
+    return {"users": len(user_ids), "projects": len(project_ids), "assignments": len(assignments), "reports": reports}
+
+
+def _insert_reports(conn: Connection, rows: list[dict]) -> int:
+    conn.execute(
+        text(
+            """
+            INSERT INTO weekly_reports
+              (user_id, project_id, reporting_date, content_text, reported_at)
+            VALUES
+              (:user_id, :project_id, :reporting_date, :content_text, :reported_at)
+            """
+        ),
+        rows,
+    )
+    return len(rows)
@@ -0,0 +1,121 @@
+"""Full watchdog cycle against a synthetic organisation in a throwaway SQLite file.
+
+Bedrock is served by ``benchmarks.bedrock_stub``, Slack is disabled and the cycle's transaction is
+rolled back, so nothing leaves the temporary database. Driven by ``scripts/watchdog_worker.py --dry-run``.
+"""
+
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from sqlalchemy import create_engine
+
+from app.db.migrations import apply_migrations
+from app.domain import watchdog
+from app.integrations import slack
+from benchmarks.bedrock_stub import LatencySpec, StubBedrockClient, StubConfig, install_stub
+from benchmarks.synthetic_org import SyntheticOrg, populate
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def parse_synthetic(items: list[str]) -> SyntheticOrg:
+    """``["users=50000", "projects=3000", "reports_per_user=52"]`` -> ``SyntheticOrg``."""
+    values: dict[str, int] = {}
+    for item in items:
+        key, sep, raw = item.partition("=")
+        if not sep or key not in {"users", "projects", "reports_per_user", "seed"}:
+            raise ValueError(f"expected users=N, projects=N, reports_per_user=N or seed=N, got {item!r}")
+        values[key] = int(raw)
+    return SyntheticOrg(
+        users=values.get("users", 1000),
+        projects=values.get("projects", 100),
+        reports_per_user=values.get("reports_per_user", 12),
+        seed=values.get("seed", 42),
+    )
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_dry_run(
+    org: SyntheticOrg,
+    *,
+    llm_mode: str | None = None,
+    latency: str = "fixed:0",
+    keep_db: bool = False,
+) -> dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="saihai-dry-run-"))
+    engine = create_engine(f"sqlite:///{workdir / 'watchdog.db'}", connect_args={"check_same_thread": False})
+    try:
+        populate_started = time.perf_counter()
+        with engine.begin() as conn:
+            apply_migrations(conn, sqlite=True)
+            counts = populate(conn, org)
+        populate_ms = round((time.perf_counter() - populate_started) * 1000, 1)
+        rss_before = peak_rss_mb()
+
+        client = StubBedrockClient(StubConfig(latency=LatencySpec.parse(latency)))
+        with install_stub(client), mock.patch.object(slack, "SLACK_BOT_TOKEN", ""), mock.patch.object(
+            slack, "SLACK_WEBHOOK_URL", ""
+        ), mock.patch.object(watchdog, "WATCHDOG_LLM_MODE", llm_mode or watchdog.WATCHDOG_LLM_MODE):
+            with engine.connect() as conn:
+                transaction = conn.begin()
+                try:
+                    summary = watchdog._perform_watchdog_cycle(conn, job_id="dry-run", full=True)
+                finally:
+                    transaction.rollback()
+    finally:
+        engine.dispose()
+        if not keep_db:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    stages = summary["stages"]
+    for stage in stages:
+        rows = stage["rows_read"] + stage["rows_written"]
+        stage["rows_per_sec"] = round(rows / (stage["wall_ms"] / 1000), 1) if stage["wall_ms"] and rows else None
+    return {
+        "org": counts,
+        "populate_ms": populate_ms,
+        "cycle_ms": summary["wall_ms"],
+        "llm": summary["llm"],
+        "stub_llm_calls": client.stats.calls,
+        "stages": stages,
+        "peak_rss_mb": {"after_populate": rss_before, "after_cycle": peak_rss_mb()},
+        "database": str(workdir / "watchdog.db") if keep_db else None,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    org = report["org"]
+    lines = [
+        f"org: users={org['users']} projects={org['projects']} assignments={org['assignments']} "
+        f"reports={org['reports']} (populated in {report['populate_ms']:.0f} ms)",
+        f"{'stage':<12} {'wall_ms':>10} {'read':>10} {'written':>9} {'rows/s':>11} {'db_trips':>9} {'llm':>5}",
+    ]
+    for stage in report["stages"]:
+        rate = f"{stage['rows_per_sec']:.0f}" if stage["rows_per_sec"] is not None else "-"
+        lines.append(
+            f"{stage['name']:<12} {stage['wall_ms']:>10.1f} {stage['rows_read']:>10} {stage['rows_written']:>9} "
+            f"{rate:>11} {stage['db_round_trips']:>9} {stage['llm_calls']:>5}"
+        )
+    rss = report["peak_rss_mb"]
+    lines.append(
+        f"cycle {report['cycle_ms']:.1f} ms, llm mode={report['llm']['mode']} calls={report['stub_llm_calls']}, "
+        f"peak RSS {rss['after_populate']} MB after populate / {rss['after_cycle']} MB after cycle"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,4 @@
+DROP INDEX IF EXISTS ai_analysis_results_user_project_idx;
+DROP INDEX IF EXISTS project_health_snapshots_project_date_idx;
+ALTER TABLE project_health_snapshots DROP COLUMN IF EXISTS snapshot_date;
+DROP INDEX IF EXISTS user_motivation_history_user_date_idx;
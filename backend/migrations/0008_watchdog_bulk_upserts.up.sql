@@ -0,0 +1,24 @@
+DELETE FROM user_motivation_history
+WHERE history_id NOT IN (
+    SELECT MIN(history_id) FROM user_motivation_history GROUP BY user_id, recorded_at
+);
+
+CREATE UNIQUE INDEX user_motivation_history_user_date_idx ON user_motivation_history (user_id, recorded_at);
+
+ALTER TABLE project_health_snapshots ADD COLUMN snapshot_date DATE;
+
+UPDATE project_health_snapshots SET snapshot_date = DATE(calculated_at);
+
+DELETE FROM project_health_snapshots
+WHERE snapshot_id NOT IN (
+    SELECT MIN(snapshot_id) FROM project_health_snapshots GROUP BY project_id, snapshot_date
+);
+
+CREATE UNIQUE INDEX project_health_snapshots_project_date_idx ON project_health_snapshots (project_id, snapshot_date);
+
+DELETE FROM ai_analysis_results
+WHERE analysis_id NOT IN (
+    SELECT MIN(analysis_id) FROM ai_analysis_results GROUP BY user_id, project_id
+);
+
+CREATE UNIQUE INDEX ai_analysis_results_user_project_idx ON ai_analysis_results (user_id, project_id);
@@ -0,0 +1,3 @@
+DROP INDEX IF EXISTS assignments_updated_at_idx;
+
+ALTER TABLE assignments DROP COLUMN IF EXISTS updated_at;
@@ -0,0 +1,5 @@
+ALTER TABLE assignments ADD COLUMN updated_at TIMESTAMP;
+
+UPDATE assignments SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL;
+
+CREATE INDEX assignments_updated_at_idx ON assignments (updated_at);
@@ -0,0 +1,9 @@
+DROP INDEX IF EXISTS watchdog_jobs_status_job_id_idx;
+
+ALTER TABLE watchdog_jobs
+    DROP COLUMN IF EXISTS finished_at,
+    DROP COLUMN IF EXISTS lease_expires_at,
+    DROP COLUMN IF EXISTS heartbeat_at,
+    DROP COLUMN IF EXISTS started_at,
+    DROP COLUMN IF EXISTS attempts,
+    DROP COLUMN IF EXISTS worker_id;
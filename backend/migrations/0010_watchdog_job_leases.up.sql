@@ -0,0 +1,11 @@
+ALTER TABLE watchdog_jobs
+    ADD COLUMN worker_id VARCHAR(100),
+    ADD COLUMN attempts INTEGER DEFAULT 0,
+    ADD COLUMN started_at TIMESTAMP,
+    ADD COLUMN heartbeat_at TIMESTAMP,
+    ADD COLUMN lease_expires_at TIMESTAMP,
+    ADD COLUMN finished_at TIMESTAMP;
+
+UPDATE watchdog_jobs SET attempts = 0 WHERE attempts IS NULL;
+
+CREATE INDEX watchdog_jobs_status_job_id_idx ON watchdog_jobs (status, job_id);
@@ -0,0 +1,3 @@
+DROP INDEX IF EXISTS watchdog_jobs_parent_job_id_idx;
+
+ALTER TABLE watchdog_jobs DROP COLUMN IF EXISTS parent_job_id;
@@ -0,0 +1,3 @@
+ALTER TABLE watchdog_jobs ADD COLUMN parent_job_id INTEGER REFERENCES watchdog_jobs(job_id);
+
+CREATE INDEX watchdog_jobs_parent_job_id_idx ON watchdog_jobs (parent_job_id);
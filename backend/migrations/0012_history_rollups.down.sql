@@ -0,0 +1,4 @@
+DROP INDEX IF EXISTS project_health_snapshots_snapshot_date_idx;
+DROP INDEX IF EXISTS user_motivation_history_recorded_at_idx;
+DROP TABLE IF EXISTS project_health_rollups;
+DROP TABLE IF EXISTS user_motivation_rollups;
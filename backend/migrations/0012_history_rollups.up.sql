@@ -0,0 +1,28 @@
+CREATE TABLE user_motivation_rollups (
+    user_id VARCHAR(50) REFERENCES users(user_id),
+    resolution VARCHAR(10) NOT NULL,
+    period_start DATE NOT NULL,
+    samples INTEGER NOT NULL,
+    avg_motivation_score DOUBLE PRECISION,
+    min_motivation_score DOUBLE PRECISION,
+    max_motivation_score DOUBLE PRECISION,
+    avg_sentiment_score DOUBLE PRECISION,
+    PRIMARY KEY (user_id, resolution, period_start)
+);
+
+CREATE TABLE project_health_rollups (
+    project_id VARCHAR(50) REFERENCES projects(project_id),
+    resolution VARCHAR(10) NOT NULL,
+    period_start DATE NOT NULL,
+    samples INTEGER NOT NULL,
+    avg_health_score DOUBLE PRECISION,
+    min_health_score DOUBLE PRECISION,
+    max_health_score DOUBLE PRECISION,
+    avg_variance_score DOUBLE PRECISION,
+    avg_manager_gap_score DOUBLE PRECISION,
+    worst_risk_level VARCHAR(20),
+    PRIMARY KEY (project_id, resolution, period_start)
+);
+
+CREATE INDEX user_motivation_history_recorded_at_idx ON user_motivation_history (recorded_at);
+CREATE INDEX project_health_snapshots_snapshot_date_idx ON project_health_snapshots (snapshot_date);
@@ -0,0 +1,5 @@
+DROP TABLE IF EXISTS watchdog_schedules;
+
+DROP INDEX IF EXISTS watchdog_jobs_dedupe_key_status_idx;
+
+ALTER TABLE watchdog_jobs DROP COLUMN IF EXISTS dedupe_key;
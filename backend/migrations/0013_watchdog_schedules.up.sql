@@ -0,0 +1,14 @@
+ALTER TABLE watchdog_jobs ADD COLUMN dedupe_key VARCHAR(200);
+
+CREATE INDEX watchdog_jobs_dedupe_key_status_idx ON watchdog_jobs (dedupe_key, status);
+
+CREATE TABLE watchdog_schedules (
+    name VARCHAR(100) PRIMARY KEY,
+    next_slot_at TIMESTAMP,
+    next_run_at TIMESTAMP,
+    last_fired_at TIMESTAMP,
+    last_job_id INTEGER REFERENCES watchdog_jobs(job_id),
+    last_outcome VARCHAR(30),
+    missed_runs INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,14 @@
+DROP INDEX IF EXISTS langgraph_checkpoints_updated_at_idx;
+DROP INDEX IF EXISTS langgraph_checkpoints_project_id_updated_at_idx;
+DROP INDEX IF EXISTS langgraph_checkpoints_status_updated_at_idx;
+DROP INDEX IF EXISTS langgraph_checkpoints_slack_message_ts_idx;
+DROP INDEX IF EXISTS langgraph_checkpoints_slack_thread_ts_idx;
+DROP INDEX IF EXISTS langgraph_checkpoints_approval_request_id_idx;
+
+ALTER TABLE langgraph_checkpoints
+    DROP COLUMN IF EXISTS approval_request_id,
+    DROP COLUMN IF EXISTS slack_thread_ts,
+    DROP COLUMN IF EXISTS slack_message_ts,
+    DROP COLUMN IF EXISTS status,
+    DROP COLUMN IF EXISTS project_id,
+    DROP COLUMN IF EXISTS updated_at;
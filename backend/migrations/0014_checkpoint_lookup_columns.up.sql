@@ -0,0 +1,36 @@
+ALTER TABLE langgraph_checkpoints
+    ADD COLUMN approval_request_id VARCHAR(100),
+    ADD COLUMN slack_thread_ts VARCHAR(50),
+    ADD COLUMN slack_message_ts VARCHAR(50),
+    ADD COLUMN status VARCHAR(30),
+    ADD COLUMN project_id VARCHAR(50),
+    ADD COLUMN updated_at TIMESTAMP;
+
+UPDATE langgraph_checkpoints
+SET approval_request_id = metadata ->> 'approval_request_id',
+    slack_thread_ts = metadata -> 'slack' ->> 'thread_ts',
+    slack_message_ts = metadata -> 'slack' ->> 'message_ts',
+    status = metadata ->> 'status',
+    project_id = metadata ->> 'project_id',
+    updated_at = (
+        COALESCE(
+            CASE
+                WHEN jsonb_typeof(metadata -> 'audit_events') = 'array' THEN
+                    CASE
+                        WHEN jsonb_array_length(metadata -> 'audit_events') > 0 THEN
+                            metadata -> 'audit_events' -> (jsonb_array_length(metadata -> 'audit_events') - 1)
+                                ->> 'created_at'
+                    END
+            END,
+            metadata ->> 'requested_at',
+            metadata ->> 'created_at',
+            '1970-01-01 00:00:00'
+        )
+    )::timestamp;
+
+CREATE INDEX langgraph_checkpoints_approval_request_id_idx ON langgraph_checkpoints (approval_request_id);
+CREATE INDEX langgraph_checkpoints_slack_thread_ts_idx ON langgraph_checkpoints (slack_thread_ts);
+CREATE INDEX langgraph_checkpoints_slack_message_ts_idx ON langgraph_checkpoints (slack_message_ts);
+CREATE INDEX langgraph_checkpoints_status_updated_at_idx ON langgraph_checkpoints (status, updated_at);
+CREATE INDEX langgraph_checkpoints_project_id_updated_at_idx ON langgraph_checkpoints (project_id, updated_at);
+CREATE INDEX langgraph_checkpoints_updated_at_idx ON langgraph_checkpoints (updated_at);
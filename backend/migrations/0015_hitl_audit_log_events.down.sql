@@ -0,0 +1,6 @@
+DROP INDEX IF EXISTS hitl_audit_logs_thread_id_audit_id_idx;
+
+ALTER TABLE hitl_audit_logs
+    DROP COLUMN IF EXISTS thread_id,
+    DROP COLUMN IF EXISTS actor,
+    DROP COLUMN IF EXISTS correlation_id;
@@ -0,0 +1,35 @@
+ALTER TABLE hitl_audit_logs
+    ADD COLUMN thread_id VARCHAR(100),
+    ADD COLUMN actor VARCHAR(100),
+    ADD COLUMN correlation_id VARCHAR(100);
+
+WITH RECURSIVE positions (n) AS (
+    SELECT 0
+    UNION ALL
+    SELECT n + 1
+    FROM positions
+    WHERE n + 1 < (
+        SELECT MAX(
+            CASE
+                WHEN jsonb_typeof(metadata -> 'audit_events') = 'array' THEN jsonb_array_length(metadata -> 'audit_events')
+            END
+        )
+        FROM langgraph_checkpoints
+    )
+)
+INSERT INTO hitl_audit_logs (thread_id, event_type, actor, correlation_id, detail, created_at)
+SELECT c.thread_id,
+       COALESCE(c.metadata -> 'audit_events' -> p.n ->> 'event_type', 'unknown'),
+       c.metadata -> 'audit_events' -> p.n ->> 'actor',
+       c.metadata -> 'audit_events' -> p.n ->> 'correlation_id',
+       c.metadata -> 'audit_events' -> p.n -> 'detail',
+       (c.metadata -> 'audit_events' -> p.n ->> 'created_at')::timestamp
+FROM langgraph_checkpoints c
+JOIN positions p ON p.n < CASE
+    WHEN jsonb_typeof(c.metadata -> 'audit_events') = 'array' THEN jsonb_array_length(c.metadata -> 'audit_events')
+    ELSE 0
+END
+WHERE jsonb_typeof(c.metadata -> 'audit_events' -> p.n) = 'object'
+ORDER BY c.thread_id, p.n;
+
+CREATE INDEX hitl_audit_logs_thread_id_audit_id_idx ON hitl_audit_logs (thread_id, audit_id);
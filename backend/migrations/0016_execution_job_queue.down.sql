@@ -0,0 +1,18 @@
+DROP INDEX IF EXISTS external_action_runs_job_id_idx;
+DROP INDEX IF EXISTS execution_jobs_status_finished_at_idx;
+DROP INDEX IF EXISTS execution_jobs_status_run_after_idx;
+DROP INDEX IF EXISTS execution_jobs_idempotency_key_idx;
+
+ALTER TABLE execution_jobs
+    DROP COLUMN IF EXISTS job_key,
+    DROP COLUMN IF EXISTS thread_id,
+    DROP COLUMN IF EXISTS action_id,
+    DROP COLUMN IF EXISTS idempotency_key,
+    DROP COLUMN IF EXISTS attempts,
+    DROP COLUMN IF EXISTS max_attempts,
+    DROP COLUMN IF EXISTS run_after,
+    DROP COLUMN IF EXISTS worker_id,
+    DROP COLUMN IF EXISTS lease_expires_at,
+    DROP COLUMN IF EXISTS started_at,
+    DROP COLUMN IF EXISTS finished_at,
+    DROP COLUMN IF EXISTS last_error;
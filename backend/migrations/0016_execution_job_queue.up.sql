@@ -0,0 +1,20 @@
+ALTER TABLE execution_jobs
+    ADD COLUMN job_key VARCHAR(50),
+    ADD COLUMN thread_id VARCHAR(100),
+    ADD COLUMN action_id INTEGER,
+    ADD COLUMN idempotency_key VARCHAR(200),
+    ADD COLUMN attempts INTEGER DEFAULT 0,
+    ADD COLUMN max_attempts INTEGER,
+    ADD COLUMN run_after TIMESTAMP,
+    ADD COLUMN worker_id VARCHAR(100),
+    ADD COLUMN lease_expires_at TIMESTAMP,
+    ADD COLUMN started_at TIMESTAMP,
+    ADD COLUMN finished_at TIMESTAMP,
+    ADD COLUMN last_error TEXT;
+
+UPDATE execution_jobs SET attempts = 0 WHERE attempts IS NULL;
+
+CREATE UNIQUE INDEX execution_jobs_idempotency_key_idx ON execution_jobs (idempotency_key);
+CREATE INDEX execution_jobs_status_run_after_idx ON execution_jobs (status, run_after, job_id);
+CREATE INDEX execution_jobs_status_finished_at_idx ON execution_jobs (status, finished_at);
+CREATE INDEX external_action_runs_job_id_idx ON external_action_runs (job_id);
@@ -0,0 +1,22 @@
+CREATE TABLE slack_inbox (
+    inbox_id SERIAL PRIMARY KEY,
+    idempotency_key VARCHAR(255) NOT NULL,
+    kind VARCHAR(30) NOT NULL,
+    handler VARCHAR(50) NOT NULL,
+    ordering_key VARCHAR(200) NOT NULL,
+    arguments JSONB,
+    status VARCHAR(20) DEFAULT 'pending',
+    attempts INTEGER DEFAULT 0,
+    received_at TIMESTAMP,
+    ack_ms DOUBLE PRECISION,
+    available_at TIMESTAMP,
+    worker_id VARCHAR(100),
+    lease_expires_at TIMESTAMP,
+    processed_at TIMESTAMP,
+    last_error TEXT
+);
+
+CREATE UNIQUE INDEX slack_inbox_idempotency_key_idx ON slack_inbox (idempotency_key);
+CREATE INDEX slack_inbox_status_inbox_id_idx ON slack_inbox (status, inbox_id);
+CREATE INDEX slack_inbox_ordering_key_inbox_id_idx ON slack_inbox (ordering_key, inbox_id);
+CREATE INDEX slack_inbox_received_at_idx ON slack_inbox (received_at);
@@ -0,0 +1,23 @@
+CREATE TABLE slack_outbox (
+    message_id SERIAL PRIMARY KEY,
+    channel VARCHAR(100),
+    thread_ts VARCHAR(50),
+    ordering_key VARCHAR(200),
+    coalesce_key VARCHAR(200),
+    payload JSONB NOT NULL,
+    on_delivered VARCHAR(100),
+    context JSONB,
+    status VARCHAR(20) DEFAULT 'pending',
+    attempts INTEGER DEFAULT 0,
+    available_at TIMESTAMP,
+    worker_id VARCHAR(100),
+    lease_expires_at TIMESTAMP,
+    merged_into INTEGER,
+    response JSONB,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP
+);
+
+CREATE INDEX slack_outbox_status_available_at_idx ON slack_outbox (status, available_at);
+CREATE INDEX slack_outbox_ordering_key_message_id_idx ON slack_outbox (ordering_key, message_id);
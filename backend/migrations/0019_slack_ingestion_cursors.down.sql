@@ -0,0 +1 @@
+DROP TABLE IF EXISTS slack_ingestion_cursors;
@@ -0,0 +1,5 @@
+CREATE TABLE slack_ingestion_cursors (
+    channel_id VARCHAR(100) PRIMARY KEY,
+    latest_ts VARCHAR(50) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1 @@
+DROP INDEX IF EXISTS weekly_reports_user_project_date_idx;
@@ -0,0 +1,9 @@
+DELETE FROM weekly_reports
+WHERE user_id IS NOT NULL
+  AND project_id IS NOT NULL
+  AND reporting_date IS NOT NULL
+  AND report_id NOT IN (
+    SELECT MIN(report_id) FROM weekly_reports GROUP BY user_id, project_id, reporting_date
+);
+
+CREATE UNIQUE INDEX weekly_reports_user_project_date_idx ON weekly_reports (user_id, project_id, reporting_date);
@@ -0,0 +1 @@
+DROP INDEX IF EXISTS watchdog_jobs_active_dedupe_key_idx;
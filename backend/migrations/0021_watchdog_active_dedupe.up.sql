@@ -0,0 +1,12 @@
+UPDATE watchdog_jobs
+SET dedupe_key = NULL
+WHERE dedupe_key IS NOT NULL
+  AND status IN ('queued', 'running', 'sharded')
+  AND job_id NOT IN (
+    SELECT MIN(job_id) FROM watchdog_jobs
+    WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running', 'sharded')
+    GROUP BY dedupe_key
+);
+
+CREATE UNIQUE INDEX watchdog_jobs_active_dedupe_key_idx ON watchdog_jobs (dedupe_key)
+WHERE status IN ('queued', 'running', 'sharded');
@@ -0,0 +1 @@
+ALTER TABLE assignments ALTER COLUMN updated_at DROP DEFAULT;
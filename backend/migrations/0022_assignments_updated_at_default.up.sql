@@ -0,0 +1,3 @@
+ALTER TABLE assignments ALTER COLUMN updated_at SET DEFAULT CURRENT_TIMESTAMP;
+
+UPDATE assignments SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL;
@@ -19,65 +19,22 @@ from sqlalchemy import text  # noqa: E402
 
 from app.data.seed import load_seed  # noqa: E402
 from app.db import db_connection, engine, is_sqlite_engine  # noqa: E402
-
-
-MIGRATIONS_DIR = ROOT / "migrations"
+from app.db.migrations import (  # noqa: E402
+    apply_migrations,
+    ensure_schema_migrations,
+    load_migrations,
+    split_sql,
+    translate_for_sqlite,
+)
 
 
 def _ensure_schema_migrations(conn) -> None:
-    conn.execute(
-        text(
-            """
-            CREATE TABLE IF NOT EXISTS schema_migrations (
-                version TEXT PRIMARY KEY,
-                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-        )
-    )
-
-
-def _split_sql(sql: str) -> list[str]:
-    statements: list[str] = []
-    for chunk in sql.split(";"):
-        stmt = chunk.strip()
-        if stmt:
-            statements.append(stmt)
-    return statements
-
-
-def _apply_sql(conn, sql: str) -> None:
-    for stmt in _split_sql(sql):
-        conn.execute(text(stmt))
-
-
-def _load_migrations(suffix: str) -> list[Path]:
-    return sorted(MIGRATIONS_DIR.glob(f"*{suffix}"))
+    ensure_schema_migrations(conn)
 
 
 def migrate_up() -> None:
     with db_connection() as conn:
-        _ensure_schema_migrations(conn)
-        applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
-        for path in _load_migrations(".up.sql"):
-            version = path.name.split("_", 1)[0]
-            if version in applied:
-                continue
-            sql = path.read_text(encoding="utf-8")
-            if is_sqlite_engine(engine):
-                sql = "\n".join(
-                    line for line in sql.splitlines() if "CREATE EXTENSION" not in line.upper()
-                )
-                sql = sql.replace("SERIAL PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT")
-                sql = sql.replace("BYTEA", "BLOB")
-                sql = sql.replace("JSONB", "TEXT")
-                sql = sql.replace("vector(1024)", "BLOB")
-                sql = sql.replace("TEXT[]", "TEXT")
-            _apply_sql(conn, sql)
-            conn.execute(
-                text("INSERT INTO schema_migrations (version) VALUES (:version)"),
-                {"version": version},
-            )
+        apply_migrations(conn, sqlite=is_sqlite_engine(engine))
 
 
 def migrate_down() -> None:
@@ -90,11 +47,13 @@ def migrate_down() -> None:
             print("No migrations to roll back.")
             return
         version = applied[-1]
-        candidates = [p for p in _load_migrations(".down.sql") if p.name.startswith(version)]
+        candidates = [p for p in load_migrations(".down.sql") if p.name.startswith(version)]
         if not candidates:
             raise RuntimeError(f"Missing down migration for version {version}")
         sql = candidates[0].read_text(encoding="utf-8")
-        _apply_sql(conn, sql)
+        statements = translate_for_sqlite(sql) if is_sqlite_engine(engine) else split_sql(sql)
+        for stmt in statements:
+            conn.execute(text(stmt))
         conn.execute(text("DELETE FROM schema_migrations WHERE version = :version"), {"version": version})
 
 
@@ -339,9 +298,9 @@ def seed_data(force: bool = False) -> None:
                 text(
                     """
                     INSERT INTO assignments
-                      (project_id, user_id, role_in_pj, allocation_rate, start_date, end_date)
+                      (project_id, user_id, role_in_pj, allocation_rate, start_date, end_date, updated_at)
                     VALUES
-                      (:project_id, :user_id, :role_in_pj, :allocation_rate, :start_date, :end_date)
+                      (:project_id, :user_id, :role_in_pj, :allocation_rate, :start_date, :end_date, CURRENT_TIMESTAMP)
                     """
                 ),
                 assignment_rows,
@@ -475,6 +434,7 @@ def seed_data(force: bool = False) -> None:
                     "manager_gap_score": round(0.2 + idx * 0.05, 2),
                     "aggregate_vector": None,
                     "calculated_at": date.today().isoformat(),
+                    "snapshot_date": date.today().isoformat(),
                 }
             )
         if snapshot_rows:
@@ -482,9 +442,11 @@ def seed_data(force: bool = False) -> None:
                 text(
                     """
                     INSERT INTO project_health_snapshots
-                      (project_id, health_score, risk_level, variance_score, manager_gap_score, aggregate_vector, calculated_at)
+                      (project_id, health_score, risk_level, variance_score, manager_gap_score, aggregate_vector,
+                       calculated_at, snapshot_date)
                     VALUES
-                      (:project_id, :health_score, :risk_level, :variance_score, :manager_gap_score, :aggregate_vector, :calculated_at)
+                      (:project_id, :health_score, :risk_level, :variance_score, :manager_gap_score, :aggregate_vector,
+                       :calculated_at, :snapshot_date)
                     """
                 ),
                 snapshot_rows,
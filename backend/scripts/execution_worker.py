@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.env import load_env  # noqa: E402
+
+load_env()
+
+from app.db import db_connection, engine  # noqa: E402
+from app.domain.execution_queue import fetch_execution_queue_stats  # noqa: E402
+from app.domain.execution_worker import (  # noqa: E402
+    EXECUTION_POLL_SECONDS,
+    EXECUTION_WORKER_CONCURRENCY,
+    serve,
+)
+from app.logging_config import configure_logging  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run queued HITL execution jobs (EXECUTION_QUEUE_MODE=queue)")
+    parser.add_argument("--concurrency", type=int, default=EXECUTION_WORKER_CONCURRENCY, help="worker threads")
+    parser.add_argument("--poll-seconds", type=float, default=EXECUTION_POLL_SECONDS, help="idle poll interval")
+    parser.add_argument("--exit-when-idle", action="store_true", help="stop once no job is due")
+    parser.add_argument("--stats", action="store_true", help="print queue depth and throughput, then exit")
+    parser.add_argument("--window", type=int, default=3600, help="throughput window in seconds for --stats")
+    args = parser.parse_args()
+
+    if args.stats:
+        with db_connection() as conn:
+            print(json.dumps(fetch_execution_queue_stats(conn, window_seconds=args.window), indent=2))
+        return
+
+    configure_logging(level=settings.log_level, log_file=settings.log_file)
+    stop_event = threading.Event()
+
+    def _request_stop(signum: int, _frame: object) -> None:
+        logging.getLogger("saihai.execution.worker").info("shutdown requested signal=%s", signum)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+    workers = serve(
+        engine,
+        concurrency=args.concurrency,
+        stop_event=stop_event,
+        poll_seconds=args.poll_seconds,
+        exit_when_idle=args.exit_when_idle,
+    )
+    print(json.dumps({worker.worker_id: vars(worker.stats) for worker in workers}))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,22 +12,35 @@ from app.env import load_env  # noqa: E402
 
 load_env()
 
-from app.db import db_connection  # noqa: E402
-from app.domain.input_sources import ingest_weekly_reports  # noqa: E402
+from app.db import db_connection, engine  # noqa: E402
+from app.domain.input_sources import (  # noqa: E402
+    WEEKLY_REPORT_BATCH_SIZE,
+    ingest_weekly_reports,
+    ingest_weekly_reports_chunked,
+)
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Ingest weekly reports")
     parser.add_argument(
         "--source",
-        help="path to weekly reports JSON",
+        help="path to weekly reports JSON (an array) or JSON Lines",
         default=None,
     )
+    parser.add_argument("--batch-size", type=int, default=WEEKLY_REPORT_BATCH_SIZE, help="reports per INSERT batch")
+    parser.add_argument(
+        "--single-transaction",
+        action="store_true",
+        help="load everything in one transaction instead of committing each batch",
+    )
     args = parser.parse_args()
 
     source_path = Path(args.source).resolve() if args.source else None
-    with db_connection() as conn:
-        result = ingest_weekly_reports(conn, source_path=source_path)
+    if args.single_transaction:
+        with db_connection() as conn:
+            result = ingest_weekly_reports(conn, source_path=source_path, batch_size=args.batch_size)
+    else:
+        result = ingest_weekly_reports_chunked(engine, source_path=source_path, batch_size=args.batch_size)
     payload = {
         "runId": result.run_id,
         "sourceType": result.source_type,
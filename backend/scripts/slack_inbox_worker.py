@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.env import load_env  # noqa: E402
+
+load_env()
+
+from app.api.slack import SLACK_INBOX_HANDLERS  # noqa: E402
+from app.db import db_connection, engine  # noqa: E402
+from app.domain.slack_inbox import (  # noqa: E402
+    SLACK_INBOX_POLL_SECONDS,
+    SLACK_INBOX_WORKER_CONCURRENCY,
+    fetch_slack_inbox_stats,
+    serve,
+)
+from app.logging_config import configure_logging  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process acked Slack interactions and events from slack_inbox")
+    parser.add_argument("--concurrency", type=int, default=SLACK_INBOX_WORKER_CONCURRENCY, help="consumer threads")
+    parser.add_argument("--poll-seconds", type=float, default=SLACK_INBOX_POLL_SECONDS, help="idle poll interval")
+    parser.add_argument("--exit-when-idle", action="store_true", help="stop once no row is claimable")
+    parser.add_argument("--stats", action="store_true", help="print backlog and latency, then exit")
+    parser.add_argument("--window", type=int, default=3600, help="latency window in seconds for --stats")
+    args = parser.parse_args()
+
+    if args.stats:
+        with db_connection() as conn:
+            print(json.dumps(fetch_slack_inbox_stats(conn, window_seconds=args.window), indent=2))
+        return
+
+    configure_logging(level=settings.log_level, log_file=settings.log_file)
+    stop_event = threading.Event()
+
+    def _request_stop(signum: int, _frame: object) -> None:
+        logging.getLogger("saihai.slack.inbox").info("shutdown requested signal=%s", signum)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+    workers = serve(
+        engine,
+        SLACK_INBOX_HANDLERS,
+        concurrency=args.concurrency,
+        stop_event=stop_event,
+        poll_seconds=args.poll_seconds,
+        exit_when_idle=args.exit_when_idle,
+    )
+    print(json.dumps({worker.worker_id: worker.processed for worker in workers}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.env import load_env  # noqa: E402
+
+load_env()
+
+import app.domain.hitl  # noqa: E402,F401  (registers the approval-message delivery callback)
+from app.db import db_connection, engine  # noqa: E402
+from app.domain.slack_outbox import SLACK_OUTBOX_POLL_SECONDS, fetch_slack_outbox_stats, serve  # noqa: E402
+from app.logging_config import configure_logging  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deliver queued Slack messages from slack_outbox")
+    parser.add_argument("--concurrency", type=int, default=1, help="dispatcher threads")
+    parser.add_argument("--poll-seconds", type=float, default=SLACK_OUTBOX_POLL_SECONDS, help="idle poll interval")
+    parser.add_argument("--exit-when-idle", action="store_true", help="stop once no message is due")
+    parser.add_argument("--stats", action="store_true", help="print backlog and posts sent, then exit")
+    parser.add_argument("--window", type=int, default=3600, help="window in seconds for --stats")
+    args = parser.parse_args()
+
+    if args.stats:
+        with db_connection() as conn:
+            print(json.dumps(fetch_slack_outbox_stats(conn, window_seconds=args.window), indent=2))
+        return
+
+    configure_logging(level=settings.log_level, log_file=settings.log_file)
+    stop_event = threading.Event()
+
+    def _request_stop(signum: int, _frame: object) -> None:
+        logging.getLogger("saihai.slack.outbox").info("shutdown requested signal=%s", signum)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+    dispatchers = serve(
+        engine,
+        concurrency=args.concurrency,
+        stop_event=stop_event,
+        poll_seconds=args.poll_seconds,
+        exit_when_idle=args.exit_when_idle,
+    )
+    print(json.dumps({dispatcher.worker_id: dispatcher.processed for dispatcher in dispatchers}))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,17 +13,24 @@ from app.env import load_env  # noqa: E402
 load_env()
 
 from app.db import db_connection  # noqa: E402
-from app.domain.watchdog import enqueue_watchdog_job  # noqa: E402
+from app.domain.watchdog import JOB_TYPES, enqueue_watchdog_job  # noqa: E402
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Enqueue a watchdog job")
     parser.add_argument("--payload", help="JSON payload to attach", default=None)
+    parser.add_argument("--shards", type=int, default=None, help="fan out into N project-hash shard jobs")
+    parser.add_argument("--type", choices=JOB_TYPES, default=None, help="job type (default: cycle)")
+    parser.add_argument("--coalesce", action="store_true", help="skip if an equivalent job is queued or running")
     args = parser.parse_args()
 
-    payload = json.loads(args.payload) if args.payload else None
+    payload = json.loads(args.payload) if args.payload else {}
+    if args.shards:
+        payload["shards"] = args.shards
+    if args.type:
+        payload["type"] = args.type
     with db_connection() as conn:
-        result = enqueue_watchdog_job(conn, payload=payload)
+        result = enqueue_watchdog_job(conn, payload=payload, coalesce=args.coalesce)
         print(json.dumps(result))
 
 
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import argparse
 import json
+import logging
+import signal
 import sys
+import threading
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -12,18 +15,108 @@ from app.env import load_env  # noqa: E402
 
 load_env()
 
-from app.db import db_connection  # noqa: E402
-from app.domain.watchdog import run_watchdog_job  # noqa: E402
+from app.db import db_connection, engine  # noqa: E402
+from app.domain.watchdog import fetch_recent_watchdog_jobs, run_watchdog_job  # noqa: E402
+from app.domain.watchdog_scheduler import load_schedules  # noqa: E402
+from app.domain.watchdog_worker import (  # noqa: E402
+    WATCHDOG_HEARTBEAT_SECONDS,
+    WATCHDOG_POLL_SECONDS,
+    WATCHDOG_WORKER_CONCURRENCY,
+    serve,
+)
+from app.logging_config import configure_logging  # noqa: E402
+from app.settings import settings  # noqa: E402
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run watchdog jobs")
     parser.add_argument("--job-id", help="specific watchdog job id", default=None)
+    parser.add_argument("--daemon", action="store_true", help="keep claiming queued jobs until SIGINT/SIGTERM")
+    parser.add_argument("--concurrency", type=int, default=WATCHDOG_WORKER_CONCURRENCY, help="worker threads")
+    parser.add_argument("--poll-seconds", type=float, default=WATCHDOG_POLL_SECONDS, help="idle poll interval")
+    parser.add_argument(
+        "--heartbeat-seconds", type=float, default=WATCHDOG_HEARTBEAT_SECONDS, help="lease heartbeat interval"
+    )
+    parser.add_argument("--exit-when-idle", action="store_true", help="stop once the queue is drained")
+    parser.add_argument("--no-scheduler", action="store_true", help="do not fire WATCHDOG_SCHEDULES in this daemon")
+    parser.add_argument("--stats", action="store_true", help="print per-stage metrics of recent succeeded jobs")
+    parser.add_argument("--last", type=int, default=5, help="number of jobs shown by --stats")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="run one full cycle on a synthetic org in a throwaway SQLite file"
+    )
+    parser.add_argument(
+        "--synthetic",
+        nargs="+",
+        default=[],
+        metavar="KEY=N",
+        help="synthetic org for --dry-run: users=N projects=N reports_per_user=N [seed=N]",
+    )
+    parser.add_argument("--llm-mode", choices=["serial", "batched", "concurrent"], default=None, help="--dry-run only")
+    parser.add_argument("--latency", default="fixed:0", help="stub LLM latency for --dry-run (see benchmarks.run)")
+    parser.add_argument("--keep-db", action="store_true", help="keep the --dry-run database file")
+    parser.add_argument("--json", dest="json_path", default="", help="write the --dry-run report as JSON")
     args = parser.parse_args()
 
-    with db_connection() as conn:
-        result = run_watchdog_job(conn, job_id=args.job_id)
-        print(json.dumps(result))
+    if args.dry_run:
+        from benchmarks.watchdog_dry_run import format_report, parse_synthetic, run_dry_run
+
+        try:
+            org = parse_synthetic(args.synthetic)
+        except ValueError as exc:
+            parser.error(str(exc))
+        report = run_dry_run(org, llm_mode=args.llm_mode, latency=args.latency, keep_db=args.keep_db)
+        print(format_report(report))
+        if args.json_path:
+            Path(args.json_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return
+
+    if args.stats:
+        with db_connection() as conn:
+            jobs = fetch_recent_watchdog_jobs(conn, limit=args.last, status="succeeded")
+        _print_stage_summary(jobs)
+        return
+
+    if not args.daemon:
+        with db_connection() as conn:
+            result = run_watchdog_job(conn, job_id=args.job_id)
+            print(json.dumps(result))
+        return
+
+    configure_logging(level=settings.log_level, log_file=settings.log_file)
+    stop_event = threading.Event()
+
+    def _request_stop(signum: int, _frame: object) -> None:
+        logging.getLogger("saihai.watchdog.worker").info("shutdown requested signal=%s", signum)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+    workers = serve(
+        engine,
+        concurrency=args.concurrency,
+        stop_event=stop_event,
+        poll_seconds=args.poll_seconds,
+        heartbeat_seconds=args.heartbeat_seconds,
+        exit_when_idle=args.exit_when_idle,
+        schedules=[] if args.no_scheduler else load_schedules(),
+    )
+    print(json.dumps({worker.worker_id: vars(worker.stats) for worker in workers}))
+
+
+def _print_stage_summary(jobs: list[dict]) -> None:
+    header = f"{'job':>8} {'stage':<12} {'wall_ms':>10} {'read':>8} {'written':>8} {'db_trips':>9} {'llm':>5}"
+    print(header)
+    print("-" * len(header))
+    for job in jobs:
+        stages = job["payload"].get("stages") or []
+        if not stages:
+            continue
+        for stage in stages:
+            print(
+                f"{job['job_id']:>8} {stage['name']:<12} {stage['wall_ms']:>10.1f} {stage['rows_read']:>8} "
+                f"{stage['rows_written']:>8} {stage['db_round_trips']:>9} {stage['llm_calls']:>5}"
+            )
+        print(f"{job['job_id']:>8} {'total':<12} {job['payload'].get('wall_ms', 0.0):>10.1f}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,31 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from app.db.migrations import apply_migrations
+
+
+class MigratedDatabaseTestCase(unittest.TestCase):
+    """Gives each test a fresh file-backed SQLite database with every migration applied.
+
+    A file rather than ``sqlite://`` so that worker threads and separate connections see the same data.
+    ``self.dir`` is the temporary directory holding it, for other files the test needs.
+    """
+
+    database_name = "test.db"
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.engine = create_engine(f"sqlite:///{tmp.name}/{self.database_name}")
+        self.addCleanup(self.engine.dispose)
+        with self.engine.begin() as conn:
+            apply_migrations(conn, sqlite=True)
+
+    def start_patches(self, *patches) -> None:
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
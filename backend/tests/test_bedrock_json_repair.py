@@ -0,0 +1,103 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.agents.monitor import _to_monitor_result  # noqa: E402
+from app.agents.simulator_planner import _extract_agent_message  # noqa: E402
+from app.domain.ai_response import (  # noqa: E402
+    AgentOpinion,
+    GunshiSynthesis,
+    MonitorAssessment,
+    StrategyProposal,
+)
+from app.integrations import bedrock  # noqa: E402
+
+
+class JsonRepairTests(unittest.TestCase):
+    def test_parse_json_repairs_common_defects(self) -> None:
+        cases = {
+            '```json\n{"a": 1,}\n```': {"a": 1},
+            'Sure:\n{"a": [1, 2,], // note\n "b": True}': {"a": [1, 2], "b": True},
+            '{"a": {"b": "trunc': {"a": {"b": "trunc"}},
+            '{"a": 1, "b": [1, 2': {"a": 1, "b": [1, 2]},
+            '{"a": 1, "dangling":': {"a": 1},
+            '{"a": "x"} trailing } prose': {"a": "x"},
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(bedrock.parse_json(raw), expected)
+
+    def test_fenced_json_is_extracted(self) -> None:
+        self.assertEqual(bedrock.extract_json_text('```json\n{"ok": true}\n```'), '{"ok": true}')
+
+    def test_unrepairable_text_still_raises(self) -> None:
+        with self.assertRaises(json.JSONDecodeError):
+            bedrock.parse_json("no json here")
+
+
+class InvokeJsonTests(unittest.TestCase):
+    def _result(self, text: str) -> bedrock.BedrockInvokeResult:
+        return bedrock.BedrockInvokeResult(provider="bedrock", model_id="stub", text=text)
+
+    def test_repairable_output_does_not_reinvoke(self) -> None:
+        with mock.patch.object(
+            bedrock, "invoke_bedrock_text", return_value=self._result('{"risk_level": 40,')
+        ) as invoke:
+            payload = bedrock.invoke_json("prompt", schema=MonitorAssessment)
+
+        self.assertEqual(payload, {"risk_level": 40})
+        self.assertEqual(invoke.call_count, 1)
+
+    def test_schema_failure_reprompts_with_error_not_prompt(self) -> None:
+        responses = [self._result('{"reason": "missing level"}'), self._result('{"risk_level": 70}')]
+        with mock.patch.object(bedrock, "invoke_bedrock_text", side_effect=responses) as invoke:
+            payload = bedrock.invoke_json("ORIGINAL PROMPT", schema=MonitorAssessment, retries=1)
+
+        self.assertEqual(payload, {"risk_level": 70})
+        followup = invoke.call_args_list[1].args[0]
+        self.assertIn("risk_level", followup)
+        self.assertIn("missing level", followup)
+        self.assertNotIn("ORIGINAL PROMPT", followup)
+
+    def test_schema_failure_after_retries_raises(self) -> None:
+        with mock.patch.object(bedrock, "invoke_bedrock_text", return_value=self._result('{"reason": "x"}')):
+            with self.assertRaises(bedrock.BedrockInvocationError):
+                bedrock.invoke_json("prompt", schema=MonitorAssessment, retries=1)
+
+    def test_loose_output_the_agents_normalise_is_accepted(self) -> None:
+        gunshi = (
+            '{"three_plans": [{"id": "Plan A", "recommendation_score": 72.5,'
+            ' "debate_summary": [{"speaker": "軍師", "content": "ok"}]}]}'
+        )
+        responses = {GunshiSynthesis: gunshi, StrategyProposal: '{"recommended_plan": "Plan_A"}'}
+        for schema, text in responses.items():
+            with self.subTest(schema=schema.__name__):
+                with mock.patch.object(bedrock, "invoke_bedrock_text", return_value=self._result(text)) as invoke:
+                    bedrock.invoke_json("prompt", schema=schema, retries=1)
+                self.assertEqual(invoke.call_count, 1)
+
+    def test_payloads_the_agent_parsers_handle_are_accepted(self) -> None:
+        opinions = {
+            '{"opinion_summary": "ok", "critical_alert": false}': "ok",
+            '{"opinion_summary": "ok", "critical_alert": {"level": "high"}}': "ok",
+            '{"discussion_draft": "draft only"}': "draft only",
+        }
+        for text, message in opinions.items():
+            with self.subTest(text=text):
+                with mock.patch.object(bedrock, "invoke_bedrock_text", return_value=self._result(text)) as invoke:
+                    payload = bedrock.invoke_json("prompt", schema=AgentOpinion, retries=1)
+                self.assertEqual(invoke.call_count, 1)
+                self.assertEqual(_extract_agent_message(payload), message)
+
+        with mock.patch.object(bedrock, "invoke_bedrock_text", return_value=self._result('{"risk_level": "High"}')):
+            payload = bedrock.invoke_json("prompt", schema=MonitorAssessment, retries=0)
+        self.assertEqual(_to_monitor_result(payload).risk_level, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import sys
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.db.bulk import chunked  # noqa: E402
+from app.db.migrations import apply_migrations, translate_for_sqlite  # noqa: E402
+from app.db.streaming import stream_rows  # noqa: E402
+
+
+class MigrationTranslationTests(unittest.TestCase):
+    def test_multi_column_alter_is_split_for_sqlite(self) -> None:
+        statements = translate_for_sqlite(
+            "ALTER TABLE t ADD COLUMN a JSONB, ADD COLUMN b TEXT;\n"
+            "ALTER TABLE t DROP COLUMN IF EXISTS a, DROP COLUMN IF EXISTS b;"
+        )
+        self.assertEqual(
+            statements,
+            [
+                "ALTER TABLE t ADD COLUMN a TEXT",
+                "ALTER TABLE t ADD COLUMN b TEXT",
+                "ALTER TABLE t DROP COLUMN a",
+                "ALTER TABLE t DROP COLUMN b",
+            ],
+        )
+
+    def test_all_migrations_apply_on_sqlite_and_enforce_upsert_keys(self) -> None:
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            applied = apply_migrations(conn, sqlite=True)
+            self.assertIn("0008", applied)
+            conn.execute(text("INSERT INTO users (user_id, name) VALUES ('u1', 'User')"))
+            insert = text(
+                """
+                INSERT INTO user_motivation_history (user_id, motivation_score, recorded_at)
+                VALUES ('u1', :score, '2026-01-05')
+                ON CONFLICT (user_id, recorded_at) DO NOTHING
+                """
+            )
+            conn.execute(insert, [{"score": 10}, {"score": 20}])
+            rows = conn.execute(text("SELECT motivation_score FROM user_motivation_history")).scalars().all()
+        self.assertEqual(rows, [10])
+
+    def test_assignments_updated_at_defaults_on_sqlite(self) -> None:
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            apply_migrations(conn, sqlite=True)
+            conn.execute(text("INSERT INTO assignments (user_id, project_id) VALUES ('u1', 'p1')"))
+            updated_at = conn.execute(text("SELECT updated_at FROM assignments")).scalar_one()
+        self.assertIsNotNone(updated_at)
+        self.assertEqual(
+            translate_for_sqlite("ALTER TABLE assignments ALTER COLUMN updated_at DROP DEFAULT;"),
+            ["DROP TRIGGER IF EXISTS assignments_updated_at_default"],
+        )
+
+    def test_chunked_splits_rows(self) -> None:
+        self.assertEqual([len(chunk) for chunk in chunked(range(5), 2)], [2, 2, 1])
+
+    def test_stream_rows_pages_by_key_on_sqlite(self) -> None:
+        with create_engine("sqlite://").connect() as conn:
+            conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, grp TEXT)"))
+            conn.execute(
+                text("INSERT INTO t (id, grp) VALUES (:id, :grp)"),
+                [{"id": i, "grp": "a" if i % 3 else "b"} for i in range(1, 11)],
+            )
+            statements: list[str] = []
+            event.listen(conn, "before_cursor_execute", lambda *args: statements.append(args[2]))
+            descending = [
+                row["id"] for row in stream_rows(conn, "SELECT id FROM t", key="id", descending=True, batch_size=3)
+            ]
+            filtered = [
+                row["id"]
+                for row in stream_rows(
+                    conn,
+                    "SELECT id, grp FROM t WHERE grp IN :groups",
+                    {"groups": ["a"]},
+                    key="id",
+                    expanding=("groups",),
+                    batch_size=4,
+                )
+            ]
+        self.assertEqual(descending, list(range(10, 0, -1)))
+        self.assertEqual(filtered, [i for i in range(1, 11) if i % 3])
+        self.assertEqual(len(statements), 4 + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
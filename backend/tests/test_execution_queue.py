@@ -0,0 +1,82 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.domain import execution_queue, external_actions, hitl  # noqa: E402
+from app.domain.execution_worker import ExecutionWorker  # noqa: E402
+from tests.support import MigratedDatabaseTestCase  # noqa: E402
+
+
+class ExecutionQueueTests(MigratedDatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.start_patches(
+            mock.patch.object(hitl, "EXECUTION_QUEUE_MODE", execution_queue.EXECUTION_QUEUE_MODE_QUEUE),
+            mock.patch.object(hitl, "send_approval_message", return_value=None),
+            mock.patch.object(execution_queue, "EXECUTION_MAX_ATTEMPTS", 2),
+        )
+        with self.engine.begin() as conn:
+            action_id = conn.execute(
+                text(
+                    "INSERT INTO autonomous_actions (action_type, draft_content, status) "
+                    "VALUES ('mail_draft', 'draft', 'pending') RETURNING action_id"
+                )
+            ).scalar_one()
+            approval = hitl.request_approval(conn, action_id=action_id, requested_by="u1")
+            self.queued = hitl.approve_request(conn, approval.approval_request_id, actor="u2")
+            self.thread_id = approval.thread_id
+        self.worker = ExecutionWorker(self.engine, worker_id="w1", stop_event=threading.Event())
+
+    def _make_due(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text("UPDATE execution_jobs SET run_after = '2000-01-01 00:00:00'"))
+
+    def _checkpoint_status(self) -> str:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT status FROM langgraph_checkpoints WHERE thread_id = :t"), {"t": self.thread_id}
+            ).scalar_one()
+
+    def test_approval_is_queued_once_and_retried_with_backoff(self) -> None:
+        self.assertEqual(self.queued.status, hitl.HITL_STATUS_EXECUTING)
+        with self.engine.begin() as conn:
+            again = hitl.process_execution_job(conn, action_id=self.queued.action_id)
+            self.assertEqual(again.job_id, self.queued.job_id)
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM execution_jobs")).scalar_one(), 1)
+
+        with mock.patch.object(external_actions, "_send_email", side_effect=RuntimeError("smtp down")):
+            self.assertEqual(self.worker.run_once(), "queued")
+        self.assertIsNone(self.worker.run_once(), "the retry waits for its backoff")
+        self._make_due()
+        self.assertEqual(self.worker.run_once(), "succeeded")
+
+        self.assertEqual(self._checkpoint_status(), hitl.HITL_STATUS_DONE)
+        with self.engine.connect() as conn:
+            stats = execution_queue.fetch_execution_queue_stats(conn)
+            runs = conn.execute(text("SELECT status FROM external_action_runs ORDER BY run_id")).scalars().all()
+        self.assertEqual((stats["depth"]["succeeded"], stats["depth"]["queued"], stats["succeeded"]), (1, 0, 1))
+        self.assertEqual(runs, ["failed", "succeeded"])
+
+    def test_exhausted_job_is_dead_lettered_and_marked_failed(self) -> None:
+        with mock.patch.object(external_actions, "_send_email", side_effect=RuntimeError("smtp down")):
+            self.assertEqual(self.worker.run_once(), "queued")
+            self._make_due()
+            self.assertEqual(self.worker.run_once(), "dead")
+
+        self.assertEqual(self._checkpoint_status(), hitl.HITL_STATUS_FAILED)
+        with self.engine.connect() as conn:
+            job = execution_queue.fetch_execution_job(conn, self.queued.job_id)
+            events = [event["event_type"] for event in hitl.fetch_audit_logs(conn, self.thread_id)]
+        self.assertEqual((job["status"], job["attempts"], job["last_error"]), ("dead", 2, "smtp down"))
+        self.assertEqual(events[-3:], ["execution_queued", "execution_started", "execution_failed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.db.migrations import apply_migrations  # noqa: E402
+from app.domain import external_actions  # noqa: E402
+
+
+def _slow(seconds: float, response: dict):
+    def call(_payload, **_kwargs):
+        time.sleep(seconds)
+        return response
+
+    return call
+
+
+class BatchActionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = create_engine("sqlite://").connect()
+        self.addCleanup(self.conn.close)
+        apply_migrations(self.conn, sqlite=True)
+        batch = {
+            "actions": [
+                {"type": "mail_draft", "payload": {"to": "a@example.com", "subject": "s", "body": "b"}},
+                {"type": "hr_request", "payload": {"kind": "transfer"}},
+                {"type": "meeting_request", "payload": {"title": "1on1"}},
+            ]
+        }
+        self.action_id = self.conn.execute(
+            text(
+                "INSERT INTO autonomous_actions (action_type, draft_content, status) "
+                "VALUES ('mail_draft', :draft, 'approved') RETURNING action_id"
+            ),
+            {"draft": "batch\n" + json.dumps(batch)},
+        ).scalar_one()
+
+    def _runs(self) -> list[tuple[str, str]]:
+        return [
+            tuple(row)
+            for row in self.conn.execute(text("SELECT action_type, status FROM external_action_runs ORDER BY run_id"))
+        ]
+
+    def test_actions_run_concurrently(self) -> None:
+        with mock.patch.object(external_actions, "_send_email", _slow(0.3, {"status": "sent"})), mock.patch.object(
+            external_actions, "_send_hr_request", _slow(0.3, {"status": "submitted"})
+        ):
+            started = time.perf_counter()
+            runs = external_actions.execute_external_action(self.conn, job_id="job-1", action_id=self.action_id)
+            elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual([run.status for run in runs], ["succeeded"] * 3)
+        self.assertEqual(
+            self._runs(), [("mail_draft", "succeeded"), ("hr_request", "succeeded"), ("meeting_request", "succeeded")]
+        )
+
+    def test_timed_out_action_fails_the_batch_but_the_rest_are_recorded(self) -> None:
+        with mock.patch.object(external_actions, "EXTERNAL_ACTION_TIMEOUT_SECONDS", 0.2), mock.patch.object(
+            external_actions, "_send_hr_request", _slow(1.0, {"status": "submitted"})
+        ), mock.patch.object(external_actions, "_send_email", side_effect=RuntimeError("smtp down")):
+            with self.assertRaises(external_actions.ExternalActionError) as raised:
+                external_actions.execute_external_action(self.conn, job_id="job-2", action_id=self.action_id)
+
+        self.assertRegex(str(raised.exception), r"^smtp down; timed out after 0\.\ds$")
+        self.assertEqual(
+            self._runs(), [("mail_draft", "failed"), ("hr_request", "failed"), ("meeting_request", "succeeded")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
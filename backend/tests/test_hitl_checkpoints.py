@@ -0,0 +1,122 @@
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.db.migrations import MIGRATIONS_DIR, apply_migrations  # noqa: E402
+from app.domain import hitl  # noqa: E402
+
+
+class CheckpointLookupTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = create_engine("sqlite://").connect()
+        self.addCleanup(self.conn.close)
+        no_slack = mock.patch.object(hitl, "send_approval_message", return_value=None)
+        no_slack.start()
+        self.addCleanup(no_slack.stop)
+
+    def _insert_action(self) -> int:
+        return self.conn.execute(
+            text(
+                "INSERT INTO autonomous_actions (action_type, draft_content, status) "
+                "VALUES ('mail_draft', 'draft', 'pending') RETURNING action_id"
+            )
+        ).scalar_one()
+
+    def test_backfill_copies_metadata_into_lookup_columns(self) -> None:
+        older = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, older)
+        for path in MIGRATIONS_DIR.glob("*.sql"):
+            if path.name < "0014":
+                shutil.copy(path, older / path.name)
+        apply_migrations(self.conn, sqlite=True, migrations_dir=older)
+        metadata = {
+            "approval_request_id": "apr-old",
+            "status": "approval_pending",
+            "project_id": "P1",
+            "requested_at": "2026-01-05T09:00:00+00:00",
+            "slack": {"thread_ts": "111.1", "message_ts": "111.2"},
+            "audit_events": [
+                {"event_type": "approval_requested", "actor": "u1", "correlation_id": "apr-old", "detail": {}},
+                {"event_type": "approval_approved", "actor": "u2", "correlation_id": "apr-old", "detail": {"n": 1}},
+            ],
+        }
+        self.conn.execute(
+            text("INSERT INTO langgraph_checkpoints (thread_id, checkpoint, metadata) VALUES ('t-old', :c, :m)"),
+            {"c": b"{}", "m": json.dumps(metadata)},
+        )
+
+        apply_migrations(self.conn, sqlite=True)
+
+        self.assertEqual(hitl._find_by_approval_id(self.conn, "apr-old")[0], "t-old")
+        self.assertEqual(hitl.find_approval_by_slack_ts(self.conn, "111.2"), "apr-old")
+        self.assertEqual([row["thread_id"] for row in hitl.fetch_history(self.conn, project_id="P1")], ["t-old"])
+        events = hitl.fetch_audit_logs(self.conn, "t-old")
+        self.assertEqual([event["event_type"] for event in events], ["approval_requested", "approval_approved"])
+        self.assertEqual(events[1]["detail"], {"n": 1})
+
+    def test_state_changes_keep_lookup_columns_current(self) -> None:
+        apply_migrations(self.conn, sqlite=True)
+        first = hitl.request_approval(self.conn, action_id=self._insert_action(), requested_by="u1")
+        second = hitl.request_approval(self.conn, action_id=self._insert_action(), requested_by="u1")
+        hitl.merge_checkpoint_metadata(self.conn, first.thread_id, {"project_id": "P9"})
+        hitl.reject_request(self.conn, approval_request_id=second.approval_request_id, actor="u2")
+
+        self.assertEqual(hitl._find_by_approval_id(self.conn, first.approval_request_id)[0], first.thread_id)
+        self.assertEqual([row["thread_id"] for row in hitl.fetch_history(self.conn, project_id="P9")], [first.thread_id])
+        rejected = hitl.fetch_history(self.conn, status=hitl.HITL_STATUS_REJECTED)
+        self.assertEqual([row["thread_id"] for row in rejected], [second.thread_id])
+        newest_first = [row["thread_id"] for row in hitl.fetch_history(self.conn)]
+        self.assertEqual(newest_first, [second.thread_id, first.thread_id])
+
+    def test_audit_events_are_appended_rows_read_by_keyset(self) -> None:
+        apply_migrations(self.conn, sqlite=True)
+        approval = hitl.request_approval(self.conn, action_id=self._insert_action(), requested_by="u1")
+        steered = hitl.apply_steer(
+            self.conn, approval_request_id=approval.approval_request_id, actor="u2", feedback="shorter"
+        )
+        hitl.reject_request(self.conn, approval_request_id=steered.approval_request_id, actor="u2")
+
+        first_page = hitl.fetch_audit_logs(self.conn, approval.thread_id, limit=2)
+        rest = hitl.fetch_audit_logs(self.conn, approval.thread_id, after=first_page[-1]["audit_id"])
+        self.assertEqual(
+            [event["event_type"] for event in first_page + rest],
+            ["approval_requested", "human_feedback_received", "approval_requested", "approval_rejected"],
+        )
+        metadata = self.conn.execute(
+            text("SELECT metadata FROM langgraph_checkpoints WHERE thread_id = :t"), {"t": approval.thread_id}
+        ).scalar_one()
+        self.assertNotIn("audit_events", json.loads(metadata))
+        history = hitl.fetch_history(self.conn)
+        self.assertEqual(len(history[0]["events"]), 4)
+
+    def test_history_pages_by_cursor(self) -> None:
+        apply_migrations(self.conn, sqlite=True)
+        threads = [
+            hitl.request_approval(self.conn, action_id=self._insert_action(), requested_by="u1").thread_id
+            for _ in range(5)
+        ]
+
+        seen, cursor = [], None
+        while True:
+            page = hitl.fetch_history_page(self.conn, limit=2, cursor=cursor, compact=True)
+            seen += [entry["thread_id"] for entry in page.entries]
+            self.assertTrue(all("events" not in entry and entry["summary"] == "draft" for entry in page.entries))
+            if not page.next_cursor:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, threads[::-1])
+        with self.assertRaises(ValueError):
+            hitl.fetch_history_page(self.conn, cursor="not-a-cursor")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import sys
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.integrations.http_client import HttpClient, HttpStatusError, parse_retry_after  # noqa: E402
+
+
+class _FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.scripted: dict[str, list[tuple[int, dict[str, str]]]] = {}
+        self.hits: list[str] = []
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._reply()
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._reply()
+
+    def _reply(self) -> None:
+        self.server.hits.append(f"{self.command} {self.path}")
+        script = self.server.scripted.get(self.path) or []
+        status, headers = script.pop(0) if script else (200, {})
+        body = b'{"ok": true}'
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+class HttpClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = _FakeServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = HttpClient(pool_size=2, timeout=2, max_retries=2, backoff_seconds=0)
+        self.addCleanup(self.client.close)
+
+    def _stats(self, method: str) -> dict:
+        return self.client.stats()[f"127.0.0.1 {method}"]
+
+    def test_requests_reuse_a_keep_alive_connection(self) -> None:
+        for _ in range(3):
+            self.assertEqual(self.client.get(f"{self.base}/ping").json(), {"ok": True})
+
+        stats = self._stats("GET")
+        self.assertEqual((stats["requests"], stats["connections_opened"], stats["errors"]), (3, 1, 0))
+        self.assertIsNotNone(stats["latency_ms"]["p95"])
+
+    def test_rate_limited_post_waits_for_retry_after(self) -> None:
+        self.server.scripted["/post"] = [(429, {"Retry-After": "0"}), (200, {})]
+
+        response = self.client.post_json(f"{self.base}/post", {"text": "hi"})
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(self.server.hits, ["POST /post", "POST /post"])
+        self.assertEqual(self._stats("POST")["retries"], 1)
+
+    def test_bad_gateway_is_only_retried_for_idempotent_methods(self) -> None:
+        self.server.scripted["/post"] = [(502, {})]
+        self.server.scripted["/get"] = [(502, {}), (200, {})]
+
+        with self.assertRaises(HttpStatusError) as raised:
+            self.client.post_json(f"{self.base}/post", {})
+        self.assertEqual(raised.exception.status, 502)
+        self.assertEqual(self.client.get(f"{self.base}/get").status, 200)
+
+        self.assertEqual(self.server.hits, ["POST /post", "GET /get", "GET /get"])
+        self.assertEqual(self._stats("POST")["errors"], 1)
+
+    def test_long_retry_after_is_left_to_the_caller(self) -> None:
+        self.server.scripted["/post"] = [(429, {"Retry-After": "3600"})]
+
+        with self.assertRaises(HttpStatusError):
+            self.client.post_json(f"{self.base}/post", {})
+        self.assertEqual(self.server.hits, ["POST /post"])
+
+    def test_retry_after_accepts_seconds_and_http_dates(self) -> None:
+        later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=90), usegmt=True)
+
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertAlmostEqual(parse_retry_after(later), 90, delta=2)
+        self.assertIsNone(parse_retry_after("soon"))
+
+
+if __name__ == "__main__":
+    unittest.main()
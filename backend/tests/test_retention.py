@@ -0,0 +1,89 @@
+import sys
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.db.migrations import apply_migrations  # noqa: E402
+from app.domain import retention  # noqa: E402
+
+TODAY = date(2026, 6, 15)
+
+
+class RetentionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = create_engine("sqlite://").connect()
+        self.addCleanup(self.conn.close)
+        apply_migrations(self.conn, sqlite=True)
+        self.conn.execute(text("INSERT INTO users (user_id, name) VALUES ('u1', 'User')"))
+        self.conn.execute(text("INSERT INTO projects (project_id, project_name) VALUES ('p1', 'Project')"))
+        days = [TODAY - timedelta(days=offset) for offset in range(400)]
+        self.conn.execute(
+            text(
+                """
+                INSERT INTO user_motivation_history (user_id, motivation_score, sentiment_score, recorded_at)
+                VALUES ('u1', :score, 0.5, :day)
+                """
+            ),
+            [{"score": 40 + offset % 20, "day": day} for offset, day in enumerate(days)],
+        )
+        self.conn.execute(
+            text(
+                """
+                INSERT INTO project_health_snapshots (project_id, health_score, risk_level, snapshot_date)
+                VALUES ('p1', :score, :risk, :day)
+                """
+            ),
+            [
+                {"score": 70, "risk": "Critical" if offset == 300 else "Safe", "day": day}
+                for offset, day in enumerate(days)
+            ],
+        )
+
+    def _count(self, sql: str) -> int:
+        return self.conn.execute(text(sql)).scalar()
+
+    def test_old_rows_fold_into_weeks_then_months_without_losing_samples(self) -> None:
+        stats = retention.run_retention(self.conn, today=TODAY, daily_days=30, weekly_days=120)
+
+        daily_cutoff = date.fromisoformat(stats["daily_cutoff"])
+        self.assertEqual(daily_cutoff.weekday(), 0)
+        self.assertEqual(
+            self._count(f"SELECT COUNT(*) FROM user_motivation_history WHERE recorded_at < '{daily_cutoff}'"), 0
+        )
+        self.assertEqual(
+            self._count(
+                "SELECT COUNT(*) + (SELECT SUM(samples) FROM user_motivation_rollups) FROM user_motivation_history"
+            ),
+            400,
+        )
+        resolutions = self.conn.execute(
+            text("SELECT DISTINCT resolution FROM project_health_rollups ORDER BY resolution")
+        ).scalars().all()
+        self.assertEqual(resolutions, ["month", "week"])
+        self.assertEqual(
+            self._count("SELECT COUNT(*) FROM project_health_rollups WHERE worst_risk_level = 'Critical'"), 1
+        )
+
+        again = retention.run_retention(self.conn, today=TODAY, daily_days=30, weekly_days=120)
+        self.assertEqual(again["series"]["motivation"], {"daily_rows_rolled": 0, "weekly_rows_rolled": 0})
+
+    def test_trend_resolution_tracks_the_requested_span(self) -> None:
+        retention.run_retention(self.conn, today=TODAY, daily_days=30, weekly_days=120)
+
+        short = retention.load_trend(self.conn, retention.MOTIVATION, "u1", days=14, today=TODAY)
+        self.assertEqual(short["resolution"], "day")
+        self.assertEqual(len(short["points"]), 15)
+
+        long = retention.load_trend(self.conn, retention.MOTIVATION, "u1", days=3650, today=TODAY)
+        self.assertEqual(long["resolution"], "month")
+        self.assertEqual(sum(point["samples"] for point in long["points"]), 400)
+        self.assertLessEqual(len(long["points"]), 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.agents import simulator_planner  # noqa: E402
+
+
+class FakeAgents:
+    def __init__(self, delays: dict[str, float]) -> None:
+        self.delays = delays
+        self.gunshi_prompts: list[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str, system_prompt: str | None = None, **kwargs) -> dict:
+        max_tokens = kwargs.get("max_tokens")
+        if max_tokens == simulator_planner._GUNSHI_MAX_TOKENS:
+            with self._lock:
+                self.gunshi_prompts.append(prompt)
+            time.sleep(self.delays.get("Gunshi", 0))
+            return {"three_plans": [{"id": "Plan_A", "description": "keep", "is_recommended": True}]}
+        name = {
+            simulator_planner._PM_MAX_TOKENS: "PM",
+            simulator_planner._HR_MAX_TOKENS: "HR",
+            simulator_planner._RISK_MAX_TOKENS: "Risk",
+        }[max_tokens]
+        time.sleep(self.delays.get(name, 0))
+        return {"agent_id": name, "opinion_summary": f"{name} ok"}
+
+
+class SimulatorPipelineTests(unittest.TestCase):
+    def _run(self, fake: FakeAgents, **settings):
+        patches = [mock.patch.object(simulator_planner, "invoke_json", fake)]
+        timeouts = settings.pop("timeouts", None)
+        if timeouts is not None:
+            patches.append(mock.patch.object(simulator_planner, "_PLAN_AGENT_TIMEOUT_MS", timeouts))
+        for key, value in settings.items():
+            patches.append(mock.patch.object(simulator_planner, key, value))
+        for patcher in patches:
+            patcher.start()
+        try:
+            return simulator_planner.generate_simulation_plans({"project": {"name": "demo"}})
+        finally:
+            for patcher in patches:
+                patcher.stop()
+
+    def test_all_mode_waits_for_every_agent(self) -> None:
+        fake = FakeAgents({"HR": 0.2})
+        result = self._run(fake, _PLAN_PIPELINE_MODE="all")
+
+        pipeline = result.raw["pipeline"]
+        self.assertEqual(pipeline["missing"], [])
+        self.assertEqual(pipeline["gunshi_passes"], 1)
+        self.assertEqual(result.diagnostics["career"], "HR ok")
+
+    def test_quorum_mode_reports_straggler_missing(self) -> None:
+        fake = FakeAgents({"HR": 0.6})
+        started = time.perf_counter()
+        result = self._run(
+            fake,
+            _PLAN_PIPELINE_MODE="quorum",
+            _PLAN_AGENT_QUORUM=2,
+            _PLAN_STRAGGLER_POLICY="missing",
+        )
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.5)
+        pipeline = result.raw["pipeline"]
+        self.assertEqual(pipeline["missing"], ["HR"])
+        self.assertEqual(pipeline["agents"]["HR"]["status"], "straggler")
+        self.assertIn('"status": "missing"', fake.gunshi_prompts[0])
+        logs = simulator_planner.build_simulation_plan_logs(result)
+        self.assertTrue(any(entry["agent"] == "SYSTEM" for entry in logs))
+
+    def test_quorum_mode_refines_with_straggler(self) -> None:
+        fake = FakeAgents({"HR": 0.1, "Gunshi": 0.2})
+        result = self._run(
+            fake,
+            _PLAN_PIPELINE_MODE="quorum",
+            _PLAN_AGENT_QUORUM=2,
+            _PLAN_STRAGGLER_POLICY="refine",
+        )
+
+        pipeline = result.raw["pipeline"]
+        self.assertEqual(pipeline["gunshi_passes"], 2)
+        self.assertEqual(pipeline["missing"], [])
+        self.assertIn("preliminary_gunshi", pipeline)
+        self.assertIn("HR ok", fake.gunshi_prompts[1])
+
+    def test_agent_timeout_does_not_stall_all_mode(self) -> None:
+        fake = FakeAgents({"HR": 1.0})
+        started = time.perf_counter()
+        result = self._run(
+            fake,
+            _PLAN_PIPELINE_MODE="all",
+            timeouts={"PM": 0, "HR": 150, "Risk": 0},
+        )
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(result.raw["pipeline"]["agents"]["HR"]["status"], "timeout")
+        self.assertEqual(result.raw["pipeline"]["missing"], ["HR"])
+
+
+if __name__ == "__main__":
+    unittest.main()
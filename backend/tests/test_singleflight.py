@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.singleflight import SingleFlight, fingerprint  # noqa: E402
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_sync_callers_share_one_call(self) -> None:
+        flight = SingleFlight("test")
+        calls: list[int] = []
+        started = threading.Event()
+
+        def work() -> str:
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return "done"
+
+        results: list[str] = []
+
+        def caller() -> None:
+            results.append(flight.do("key", work))
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait(1)
+        followers = [threading.Thread(target=caller) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader, *followers]:
+            thread.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["done"] * 5)
+        self.assertEqual(flight.inflight(), 0)
+
+    def test_errors_propagate_and_key_is_released(self) -> None:
+        flight = SingleFlight("test")
+
+        def fail() -> None:
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("key", fail)
+        self.assertEqual(flight.do("key", lambda: 42), 42)
+
+    def test_async_callers_share_one_call(self) -> None:
+        flight = SingleFlight("test")
+        calls: list[int] = []
+
+        def work(value: int) -> int:
+            calls.append(value)
+            time.sleep(0.1)
+            return value * 2
+
+        async def run() -> list[int]:
+            return await asyncio.gather(*(flight.do_async("key", work, 21) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(run()), [42, 42, 42])
+        self.assertEqual(len(calls), 1)
+
+    def test_fingerprint_ignores_key_order(self) -> None:
+        self.assertEqual(fingerprint({"a": 1, "b": [1, 2]}), fingerprint({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": 2}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import sys
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.domain import slack_inbox  # noqa: E402
+from tests.support import MigratedDatabaseTestCase  # noqa: E402
+
+
+class SlackInboxTests(MigratedDatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.handled: list[str] = []
+        self.handlers = {"record": lambda *, note: self.handled.append(note)}
+
+    def _enqueue(self, key: str, ordering_key: str, note: str) -> int | None:
+        with self.engine.begin() as conn:
+            return slack_inbox.enqueue_slack_inbox(
+                conn,
+                kind="event",
+                handler="record",
+                arguments={"note": note},
+                idempotency_key=key,
+                ordering_key=ordering_key,
+                received_at=datetime(2000, 1, 1),
+                ack_ms=3.0,
+            )
+
+    def _statuses(self) -> list[str]:
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT status FROM slack_inbox ORDER BY inbox_id")).scalars().all()
+
+    def test_redelivery_is_stored_once_and_threads_are_handled_in_order(self) -> None:
+        self.assertIsNotNone(self._enqueue("ev-1", "thread-a", "a1"))
+        self.assertIsNone(self._enqueue("ev-1", "thread-a", "a1"))
+        self._enqueue("ev-2", "thread-b", "b1")
+        self._enqueue("ev-3", "thread-a", "a2")
+
+        with self.engine.begin() as conn:
+            first = slack_inbox.claim_slack_inbox(conn, "w1")
+            second = slack_inbox.claim_slack_inbox(conn, "w2")
+            blocked = slack_inbox.claim_slack_inbox(conn, "w3")
+        self.assertEqual((first["arguments"], second["arguments"]), ({"note": "a1"}, {"note": "b1"}))
+        self.assertIsNone(blocked, "a2 waits until a1 is finished")
+
+        with self.engine.begin() as conn:
+            slack_inbox.finish_slack_inbox(conn, first, "w1")
+            slack_inbox.finish_slack_inbox(conn, second, "w2")
+        self.assertEqual(slack_inbox.drain_slack_inbox(self.engine, self.handlers, ordering_key="thread-a"), 1)
+        self.assertEqual(self.handled, ["a2"])
+        self.assertEqual(self._statuses(), ["done", "done", "done"])
+
+    def test_failed_row_is_retried_then_dead_and_stops_blocking_its_thread(self) -> None:
+        self._enqueue("ev-1", "thread-a", "a1")
+        self._enqueue("ev-2", "thread-a", "a2")
+        failing = {"record": mock.Mock(side_effect=RuntimeError("db down"))}
+
+        with mock.patch.object(slack_inbox, "SLACK_INBOX_MAX_ATTEMPTS", 2):
+            self.assertEqual(slack_inbox.process_next_slack_inbox(self.engine, failing, "w1"), "pending")
+            self.assertIsNone(slack_inbox.process_next_slack_inbox(self.engine, failing, "w1"), "backoff")
+            with self.engine.begin() as conn:
+                conn.execute(text("UPDATE slack_inbox SET available_at = '2000-01-01 00:00:00'"))
+            self.assertEqual(slack_inbox.process_next_slack_inbox(self.engine, failing, "w1"), "dead")
+        self.assertEqual(slack_inbox.drain_slack_inbox(self.engine, self.handlers), 1)
+
+        self.assertEqual(self.handled, ["a2"])
+        self.assertEqual(self._statuses(), ["dead", "done"])
+        with self.engine.connect() as conn:
+            stats = slack_inbox.fetch_slack_inbox_stats(conn, window_seconds=10**10)
+        self.assertEqual((stats["backlog"]["dead"], stats["backlog"]["done"], stats["received"]), (1, 1, 2))
+        self.assertEqual(stats["ack_ms"], {"p50": 3.0, "p95": 3.0, "max": 3.0})
+        self.assertIsNone(stats["oldest_unprocessed_age_seconds"])
+
+    def test_web_process_consumer_handles_rows_without_the_worker_script(self) -> None:
+        inbox_id = self._enqueue("ev-1", "thread-a", "a1")
+        with self.engine.begin() as conn:
+            slack_inbox.record_slack_inbox_ack(conn, inbox_id, 12.5)
+
+        stop = slack_inbox.start_slack_inbox_consumer(self.engine, self.handlers, concurrency=2)
+        self.addCleanup(stop.set)
+        slack_inbox.notify_slack_inbox()
+        for _ in range(200):
+            if self._statuses() == ["done"]:
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(self.handled, ["a1"])
+        with self.engine.connect() as conn:
+            stats = slack_inbox.fetch_slack_inbox_stats(conn, window_seconds=10**10)
+        self.assertEqual(stats["ack_ms"]["max"], 12.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.domain import input_sources  # noqa: E402
+from tests.support import MigratedDatabaseTestCase  # noqa: E402
+
+
+class _FakeHistory:
+    """conversations.history over an in-memory channel log, newest first, two messages per page."""
+
+    def __init__(self, channels: dict[str, list[str]]) -> None:
+        self.channels = channels
+        self.calls: list[dict] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, method: str, params: dict, *, http_method: str) -> dict:
+        with self.lock:
+            self.calls.append(dict(params))
+        if params["channel"] == "CBROKEN":
+            raise input_sources.SlackApiError("conversations.history failed: channel_not_found")
+        newer = sorted(
+            (ts for ts in self.channels[params["channel"]] if float(ts) > float(params["oldest"])),
+            key=float,
+            reverse=True,
+        )
+        start = int(params.get("cursor") or 0)
+        page = newer[start : start + 2]
+        next_cursor = str(start + 2) if start + 2 < len(newer) else ""
+        return {
+            "ok": True,
+            "messages": [{"ts": ts, "user": "U1", "text": f"message {ts}"} for ts in page],
+            "response_metadata": {"next_cursor": next_cursor},
+        }
+
+
+class SlackIngestionTests(MigratedDatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.history = _FakeHistory({"C1": ["100.000100", "101.5", "99.9"], "C2": ["200.1"]})
+        self.start_patches(
+            mock.patch.object(input_sources, "call_slack_api", self.history),
+            mock.patch.object(input_sources, "SLACK_LOG_LOOKBACK_DAYS", 365 * 100),
+        )
+
+    def _ingest(self, channels: list[str], **kwargs):
+        with self.engine.begin() as conn:
+            return input_sources.ingest_slack_logs(conn, channels, **kwargs)
+
+    def _cursors(self) -> dict[str, str]:
+        with self.engine.connect() as conn:
+            return dict(conn.execute(text("SELECT channel_id, latest_ts FROM slack_ingestion_cursors")).all())
+
+    def test_second_run_resumes_from_each_channels_high_water_mark(self) -> None:
+        first = self._ingest(["C1", "C2"])
+        self.assertEqual((first.status, first.items_inserted), ("succeeded", 4))
+        self.assertEqual(self._cursors(), {"C1": "101.5", "C2": "200.1"})
+
+        self.history.channels["C1"].append("102.0")
+        self.history.calls.clear()
+        second = self._ingest(["C1", "C2"])
+
+        self.assertEqual(second.items_inserted, 1)
+        oldest_by_channel = {call["channel"]: call["oldest"] for call in self.history.calls}
+        self.assertEqual(oldest_by_channel, {"C1": "101.5", "C2": "200.1"})
+        self.assertEqual(self._cursors()["C1"], "102.0")
+
+    def test_backfill_skips_stored_messages_and_a_failed_channel_keeps_its_cursor(self) -> None:
+        self._ingest(["C1"])
+
+        result = self._ingest(["C1", "CBROKEN"], oldest=0)
+
+        self.assertEqual(result.status, "failed")
+        self.assertIn("CBROKEN", result.error)
+        self.assertEqual(result.items_inserted, 0)
+        self.assertEqual(result.metadata["channel_stats"]["C1"], {"fetched": 3, "inserted": 0, "latest_ts": "101.5"})
+        self.assertNotIn("CBROKEN", self._cursors())
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM slack_messages")).scalar_one(), 3)
+
+    def test_a_channel_that_fails_to_store_rolls_back_alone_and_the_run_is_recorded(self) -> None:
+        persist = input_sources._persist_slack_messages
+
+        def _persist(conn, channel_id, messages):
+            inserted = persist(conn, channel_id, messages)
+            if channel_id == "C2":
+                raise RuntimeError("disk full")
+            return inserted
+
+        with mock.patch.object(input_sources, "_persist_slack_messages", _persist):
+            result = self._ingest(["C1", "C2"])
+
+        self.assertEqual((result.status, result.items_inserted), ("failed", 3))
+        self.assertEqual(result.metadata["channel_stats"]["C2"], {"fetched": 1, "error": "disk full"})
+        self.assertEqual(self._cursors(), {"C1": "101.5"})
+        with self.engine.connect() as conn:
+            channels = conn.execute(text("SELECT DISTINCT channel_id FROM slack_messages")).scalars().all()
+            runs = input_sources.fetch_ingestion_runs(conn, input_sources.SOURCE_SLACK_LOGS)
+        self.assertEqual(channels, ["C1"])
+        self.assertEqual([(run.run_id, run.status) for run in runs], [(result.run_id, "failed")])
+
+
+if __name__ == "__main__":
+    unittest.main()
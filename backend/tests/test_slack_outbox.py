@@ -0,0 +1,117 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.domain import hitl, slack_outbox  # noqa: E402
+from app.integrations import slack  # noqa: E402
+from tests.support import MigratedDatabaseTestCase  # noqa: E402
+
+
+class SlackOutboxTests(MigratedDatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.deliver = mock.Mock(return_value={"ok": True, "channel": "C1", "ts": "200.1"})
+        self.start_patches(
+            mock.patch.object(slack_outbox, "slack_configured", return_value=True),
+            mock.patch.object(slack_outbox, "deliver_slack_message", self.deliver),
+        )
+
+    def _dispatch_all(self) -> list[str]:
+        statuses = []
+        while (status := slack_outbox.dispatch_next_slack_message(self.engine, "w1")) is not None:
+            statuses.append(status)
+        return statuses
+
+    def _rows(self) -> list[tuple]:
+        with self.engine.connect() as conn:
+            return [
+                tuple(row)
+                for row in conn.execute(
+                    text("SELECT message_id, status, merged_into, attempts FROM slack_outbox ORDER BY message_id")
+                )
+            ]
+
+    def test_thread_replies_are_coalesced_up_to_a_message_with_blocks(self) -> None:
+        with self.engine.begin() as conn:
+            slack_outbox.enqueue_thread_message(conn, "C1", "100.1", "first")
+            slack_outbox.enqueue_thread_message(conn, "C1", "100.1", "second")
+            slack_outbox.enqueue_slack_message(
+                conn, {"channel": "C1", "thread_ts": "100.1", "text": "prompt", "blocks": [{"type": "divider"}]}
+            )
+            slack_outbox.enqueue_thread_message(conn, "C1", "100.1", "third")
+            slack_outbox.enqueue_thread_message(conn, "C2", "300.1", "other thread")
+
+        self.assertEqual(self._dispatch_all(), ["sent"] * 4)
+
+        texts = [call.args[0]["text"] for call in self.deliver.call_args_list]
+        self.assertEqual(texts, ["first\nsecond", "prompt", "third", "other thread"])
+        self.assertEqual([row[2] for row in self._rows()], [None, 1, None, None, None])
+        with self.engine.connect() as conn:
+            stats = slack_outbox.fetch_slack_outbox_stats(conn)
+        self.assertEqual((stats["messages_sent"], stats["posts"], stats["backlog"]["pending"]), (5, 4, 0))
+
+    def test_rate_limited_message_is_rescheduled_without_using_an_attempt(self) -> None:
+        with self.engine.begin() as conn:
+            slack_outbox.enqueue_thread_message(conn, "C1", "100.1", "hello")
+        self.deliver.side_effect = slack.SlackRateLimited("ratelimited", retry_after=30)
+
+        self.assertEqual(self._dispatch_all(), ["pending"])
+
+        self.assertEqual(self._rows(), [(1, "pending", None, 0)])
+
+    def test_queued_approval_message_records_its_slack_thread(self) -> None:
+        with self.engine.begin() as conn:
+            action_id = conn.execute(
+                text(
+                    "INSERT INTO autonomous_actions (action_type, draft_content, status) "
+                    "VALUES ('mail_draft', 'draft', 'pending') RETURNING action_id"
+                )
+            ).scalar_one()
+            with mock.patch.object(hitl, "send_approval_message") as send:
+                approval = hitl.request_approval(conn, action_id=action_id, requested_by="watchdog", defer_slack=True)
+            send.assert_not_called()
+            self.assertIsNone(approval.slack)
+
+        self.assertEqual(self._dispatch_all(), ["sent"])
+
+        with self.engine.connect() as conn:
+            self.assertEqual(hitl.find_approval_by_slack_ts(conn, "200.1"), approval.approval_request_id)
+
+    def test_failed_bot_post_is_queued_and_not_also_sent_through_the_webhook(self) -> None:
+        with self.engine.begin() as conn:
+            action_id = conn.execute(
+                text(
+                    "INSERT INTO autonomous_actions (action_type, draft_content, status) "
+                    "VALUES ('mail_draft', 'draft', 'pending') RETURNING action_id"
+                )
+            ).scalar_one()
+            with mock.patch.object(hitl, "slack_bot_configured", return_value=True), mock.patch.object(
+                slack, "_post_slack_api", return_value=None
+            ), mock.patch.object(slack, "_post_slack_webhook", return_value=True) as webhook:
+                approval = hitl.request_approval(conn, action_id=action_id, requested_by="watchdog")
+
+        webhook.assert_not_called()
+        self.assertIsNone(approval.slack)
+        self.assertEqual(self._rows(), [(1, "pending", None, 0)])
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_bucket_spaces_calls_after_the_burst_and_honours_a_pause(self) -> None:
+        bucket = slack._TokenBucket(per_minute=60, burst=2)
+
+        self.assertEqual([bucket.reserve(max_wait=0) for _ in range(2)], [0.0, 0.0])
+        self.assertIsNone(bucket.reserve(max_wait=0.5))
+        self.assertAlmostEqual(bucket.reserve(max_wait=2), 1.0, places=1)
+
+        bucket.pause(30)
+        self.assertIsNone(bucket.reserve(max_wait=10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from benchmarks.watchdog_dry_run import format_report, parse_synthetic, run_dry_run  # noqa: E402
+
+
+class WatchdogDryRunTests(unittest.TestCase):
+    def test_parse_synthetic_rejects_unknown_keys(self) -> None:
+        org = parse_synthetic(["users=30", "projects=3", "reports_per_user=2"])
+        self.assertEqual((org.users, org.projects, org.reports_per_user), (30, 3, 2))
+        with self.assertRaises(ValueError):
+            parse_synthetic(["teams=4"])
+
+    def test_dry_run_reports_stages_and_cleans_up(self) -> None:
+        report = run_dry_run(parse_synthetic(["users=30", "projects=3", "reports_per_user=2"]), llm_mode="batched")
+
+        self.assertEqual(report["org"]["reports"], 60)
+        self.assertIsNone(report["database"])
+        load = next(stage for stage in report["stages"] if stage["name"] == "load")
+        self.assertEqual(load["rows_read"], 30 + 3 + 30 + 60)
+        self.assertGreater(load["rows_per_sec"], 0)
+        self.assertIn("motivation", format_report(report))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.db.migrations import apply_migrations  # noqa: E402
+from app.domain import watchdog  # noqa: E402
+from benchmarks.synthetic_org import SyntheticOrg, populate  # noqa: E402
+
+
+class IncrementalWatchdogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = create_engine("sqlite://").connect()
+        self.addCleanup(self.conn.close)
+        apply_migrations(self.conn, sqlite=True)
+        populate(self.conn, SyntheticOrg(users=12, projects=4, reports_per_user=2))
+        no_actions = mock.patch.object(
+            watchdog, "_ensure_actions", return_value=(0, {"mode": "serial", "projects": 0, "wall_ms": 0.0})
+        )
+        no_actions.start()
+        self.addCleanup(no_actions.stop)
+
+    def _run(self, payload: dict | None = None) -> dict:
+        job = watchdog.enqueue_watchdog_job(self.conn, payload=payload)
+        watchdog.run_watchdog_job(self.conn, job_id=job["job_id"])
+        stored = self.conn.execute(
+            text("SELECT payload FROM watchdog_jobs WHERE job_id = :job_id"), {"job_id": int(job["job_id"])}
+        ).scalar()
+        return json.loads(stored)
+
+    def test_first_run_is_full_then_only_changes_are_rescored(self) -> None:
+        first = self._run()
+        self.assertEqual(first["scope"], {"mode": "full", "reason": "no_watermark"})
+
+        unchanged = self._run()
+        self.assertEqual(unchanged["scope"]["mode"], "incremental")
+        self.assertEqual((unchanged["scope"]["users"], unchanged["scope"]["projects"]), (0, 0))
+
+        self.conn.execute(
+            text(
+                """
+                INSERT INTO weekly_reports (user_id, project_id, reporting_date, content_text)
+                SELECT user_id, project_id, '2030-01-07', '燃え尽き 限界 炎上'
+                FROM assignments
+                ORDER BY assignment_id
+                LIMIT 1
+                """
+            )
+        )
+        changed = self._run()
+        self.assertEqual(changed["scope"]["mode"], "incremental")
+        self.assertGreaterEqual(changed["scope"]["projects"], 1)
+        self.assertLess(changed["scope"]["projects"], 4)
+        self.assertGreater(changed["watermark"]["report_id"], unchanged["watermark"]["report_id"])
+
+    def test_full_flag_forces_rebuild_and_request_is_kept(self) -> None:
+        self._run()
+        forced = self._run({"full": True, "reason": "backfill"})
+        self.assertEqual(forced["scope"]["mode"], "full")
+        self.assertEqual(forced["request"], {"full": True, "reason": "backfill"})
+
+    def test_watermark_is_found_behind_many_runs_without_one(self) -> None:
+        first = self._run()
+        self.conn.execute(
+            text("INSERT INTO watchdog_jobs (status, payload) VALUES ('succeeded', :payload)"),
+            [{"payload": json.dumps({"type": "retention", "watermark": None})}] * 60,
+        )
+
+        self.assertEqual(watchdog._last_watermark(self.conn).to_payload(), first["watermark"])
+        self.assertEqual(self._run()["scope"]["mode"], "incremental")
+
+    def test_deleted_assignment_falls_back_to_full(self) -> None:
+        self._run()
+        self.conn.execute(text("DELETE FROM assignments WHERE assignment_id = (SELECT MIN(assignment_id) FROM assignments)"))
+        self.assertEqual(self._run()["scope"], {"mode": "full", "reason": "assignments_deleted"})
+
+    def test_stage_metrics_are_stored_with_the_job(self) -> None:
+        stages = {stage["name"]: stage for stage in self._run()["stages"]}
+        self.assertEqual(
+            list(stages),
+            ["embeddings", "scope", "load", "motivation", "health", "analysis", "proposals", "actions"],
+        )
+        self.assertEqual(stages["motivation"]["rows_written"], 12)
+        self.assertEqual(stages["health"]["rows_written"], 4)
+        self.assertGreater(stages["load"]["rows_read"], 0)
+        self.assertTrue(all(stage["db_round_trips"] > 0 for name, stage in stages.items() if name != "actions"))
+
+
+class ProjectNotesTests(unittest.TestCase):
+    def test_streamed_notes_match_the_joined_text(self) -> None:
+        texts = ["挑戦 炎上", "疲労" * 600, "限界 噂"]
+        reports = [{"user_id": "u1", "project_id": "P1", "content_text": value} for value in texts]
+        joined = " ".join(texts)
+
+        _, notes_by_project, count = watchdog._fold_reports(reports)
+        notes = notes_by_project["P1"]
+
+        word_lists = (watchdog.POSITIVE_WORDS, watchdog.NEGATIVE_WORDS, watchdog.RISK_WORDS)
+        self.assertEqual(
+            (notes.positive, notes.negative, notes.risk),
+            tuple(watchdog._count_hits(joined, words) for words in word_lists),
+        )
+        self.assertEqual(watchdog._truncate_text(notes.excerpt), watchdog._truncate_text(joined))
+        self.assertLessEqual(len(notes.excerpt), watchdog.WATCHDOG_NOTES_MAX_CHARS + 1)
+        self.assertEqual(count, 3)
+
+    def test_notes_and_latest_report_follow_reporting_date_not_import_order(self) -> None:
+        reports = [
+            {"report_id": 1, "user_id": "u1", "project_id": "P1", "reporting_date": "2026-03-02", "content_text": "新"},
+            {"report_id": 9, "user_id": "u1", "project_id": "P1", "reporting_date": "2025-01-06", "content_text": "旧"},
+        ]
+
+        latest, notes_by_project, _ = watchdog._fold_reports(reports)
+
+        self.assertEqual(latest, {"u1": "新"})
+        self.assertEqual(notes_by_project["P1"].excerpt, "新 旧")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import create_engine
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.agents import gunshi, monitor  # noqa: E402
+from app.domain import watchdog  # noqa: E402
+from app.stage_metrics import StageRecorder  # noqa: E402
+from benchmarks.bedrock_stub import StubBedrockClient, install_stub  # noqa: E402
+
+
+class BatchSplitTests(unittest.TestCase):
+    def test_monitor_batch_keeps_only_requested_projects(self) -> None:
+        payload = {
+            "projects": [
+                {"project_id": "P1", "risk_level": 80, "reason": "burnout", "urgency": "High"},
+                {"project_id": "P1", "risk_level": 10, "reason": "duplicate", "urgency": "Low"},
+                {"project_id": "PX", "risk_level": 50, "reason": "unknown", "urgency": "Med"},
+                "garbage",
+            ]
+        }
+        with mock.patch.object(monitor, "invoke_json", return_value=payload):
+            results = monitor.analyze_risk_batch({"P1": "notes", "P2": "notes"})
+
+        self.assertEqual(set(results), {"P1"})
+        self.assertEqual(results["P1"].risk_level, 80)
+        self.assertEqual(results["P1"].urgency, "High")
+
+    def test_gunshi_batch_skips_projects_without_plans(self) -> None:
+        payload = {
+            "projects": [
+                {
+                    "project_id": "P1",
+                    "recommended_plan": "Plan_B",
+                    "plans": [{"plan_type": "Plan_A"}, {"plan_type": "Plan_B", "description": "rotate"}],
+                },
+                {"project_id": "P2", "plans": []},
+            ]
+        }
+        with mock.patch.object(gunshi, "invoke_json", return_value=payload):
+            results = gunshi.generate_plans_batch({"P1": {}, "P2": {}})
+
+        self.assertEqual(set(results), {"P1"})
+        self.assertEqual([plan.is_recommended for plan in results["P1"]], [False, True])
+
+    def test_watchdog_batched_mode_falls_back_to_single_calls(self) -> None:
+        targets = [
+            watchdog._AssetTarget(project={"project_id": pid}, risk_level="Warning", notes="tired", similar_reports=[])
+            for pid in ("P1", "P2")
+        ]
+        single_monitor = monitor.MonitorResult(risk_level=40, reason="single", urgency="Med", raw={})
+        plan = gunshi.GunshiPlan("Plan_A", "keep", "stable", True)
+        with mock.patch.object(
+            watchdog, "analyze_risk_batch", return_value={"P1": monitor.MonitorResult(70, "batch", "High", {})}
+        ), mock.patch.object(watchdog, "analyze_risk", return_value=single_monitor) as single, mock.patch.object(
+            watchdog, "generate_plans_batch", return_value={"P1": [plan], "P2": [plan]}
+        ), mock.patch.object(watchdog, "generate_drafts", return_value=None):
+            assets = watchdog._generate_ai_assets(targets, mode=watchdog.LLM_MODE_BATCHED)
+
+        self.assertEqual(single.call_count, 1)
+        self.assertEqual(assets["P1"][0].reason, "batch")
+        self.assertEqual(assets["P2"][0].reason, "single")
+        self.assertEqual(assets["P2"][1], [plan])
+
+    def test_concurrent_mode_counts_llm_calls_made_on_pool_threads(self) -> None:
+        targets = [
+            watchdog._AssetTarget(project={"project_id": pid}, risk_level="Warning", notes="tired", similar_reports=[])
+            for pid in ("P1", "P2", "P3")
+        ]
+        conn = create_engine("sqlite://").connect()
+        self.addCleanup(conn.close)
+        with install_stub(StubBedrockClient()) as stub:
+            with StageRecorder(conn) as recorder, recorder.stage("actions") as stage:
+                watchdog._generate_ai_assets(targets, mode=watchdog.LLM_MODE_CONCURRENT)
+
+        self.assertGreater(stub.stats.calls, 0)
+        self.assertEqual(stage.llm_calls, stub.stats.calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.db.migrations import apply_migrations  # noqa: E402
+from app.domain import watchdog  # noqa: E402
+from app.domain.watchdog_scheduler import (  # noqa: E402
+    CronExpression,
+    Schedule,
+    load_schedules,
+    run_due_schedules,
+)
+
+
+class CronExpressionTests(unittest.TestCase):
+    def test_next_after_walks_fields(self) -> None:
+        cases = [
+            ("*/15 * * * *", datetime(2026, 3, 1, 10, 7), datetime(2026, 3, 1, 10, 15)),
+            ("0 2 * * *", datetime(2026, 3, 1, 2, 0), datetime(2026, 3, 2, 2, 0)),
+            ("30 3 * * 0", datetime(2026, 3, 2, 0, 0), datetime(2026, 3, 8, 3, 30)),
+            ("0 0 1 */3 *", datetime(2026, 2, 15, 0, 0), datetime(2026, 4, 1, 0, 0)),
+            # Day and weekday both restricted: either one matches.
+            ("0 9 13 * 5", datetime(2026, 3, 1, 0, 0), datetime(2026, 3, 6, 9, 0)),
+        ]
+        for raw, moment, expected in cases:
+            with self.subTest(cron=raw):
+                self.assertEqual(CronExpression.parse(raw).next_after(moment), expected)
+
+    def test_invalid_schedules_are_rejected(self) -> None:
+        invalid = (
+            '[{"name": "a"}]',
+            '[{"name": "a", "cron": "61 * * * *"}]',
+            '[{"name": "a", "type": "x", "interval_seconds": 5}]',
+        )
+        for raw in invalid:
+            with self.subTest(raw=raw), self.assertRaises(ValueError):
+                load_schedules(raw)
+
+
+class ScheduleTickTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.conn = create_engine("sqlite://").connect()
+        self.addCleanup(self.conn.close)
+        apply_migrations(self.conn, sqlite=True)
+        self.start = datetime(2026, 3, 2, 0, 0)
+
+    def _tick(self, schedule: Schedule, now: datetime) -> list[dict]:
+        return run_due_schedules(self.conn, [schedule], now=now, rng=random.Random(1))
+
+    def _queued(self) -> int:
+        return self.conn.execute(text("SELECT COUNT(*) FROM watchdog_jobs WHERE status = 'queued'")).scalar_one()
+
+    def test_trigger_is_coalesced_while_an_equivalent_job_is_active(self) -> None:
+        schedule = Schedule(name="retention", job_type=watchdog.JOB_TYPE_RETENTION, interval_seconds=60)
+        self.assertEqual(self._tick(schedule, self.start), [])
+
+        first = self._tick(schedule, self.start + timedelta(seconds=60))
+        second = self._tick(schedule, self.start + timedelta(seconds=120))
+        self.assertEqual([first[0]["outcome"], second[0]["outcome"]], ["queued", "coalesced"])
+        self.assertEqual(second[0]["job_id"], first[0]["job_id"])
+        self.assertEqual(self._queued(), 1)
+
+        manual = watchdog.enqueue_watchdog_job(self.conn, {"type": "retention"}, coalesce=True)
+        self.assertEqual(manual, {"job_id": str(first[0]["job_id"]), "status": "coalesced"})
+
+    def test_only_one_active_job_holds_a_dedupe_key(self) -> None:
+        first = watchdog.enqueue_watchdog_job(self.conn, {"type": "retention"})
+        second = watchdog.enqueue_watchdog_job(self.conn, {"type": "retention"})
+        coalesced = watchdog.enqueue_watchdog_job(self.conn, {"type": "retention"}, coalesce=True)
+
+        self.assertEqual([first["status"], second["status"]], ["queued", "queued"])
+        self.assertEqual(coalesced, {"job_id": first["job_id"], "status": "coalesced"})
+        keys = self.conn.execute(text("SELECT dedupe_key FROM watchdog_jobs ORDER BY job_id")).scalars().all()
+        self.assertEqual(keys, [watchdog.watchdog_dedupe_key({"type": "retention"}), None])
+
+        self.conn.execute(
+            text("UPDATE watchdog_jobs SET status = 'succeeded' WHERE job_id = :job_id"), {"job_id": first["job_id"]}
+        )
+        requeued = watchdog.enqueue_watchdog_job(self.conn, {"type": "retention"}, coalesce=True)
+        self.assertEqual(requeued["status"], "queued")
+
+    def test_missed_runs_follow_the_catch_up_policy(self) -> None:
+        once = Schedule(name="nightly", cron=CronExpression.parse("0 2 * * *"), jitter_seconds=30)
+        skip = Schedule(
+            name="hourly-embeddings",
+            job_type=watchdog.JOB_TYPE_EMBEDDINGS,
+            cron=CronExpression.parse("0 * * * *"),
+            catch_up="skip",
+        )
+        run_due_schedules(self.conn, [once, skip], now=self.start)
+
+        late = self.start + timedelta(days=3, hours=5, minutes=10)
+        fired = {row["name"]: row for row in run_due_schedules(self.conn, [once, skip], now=late)}
+        self.assertEqual((fired["nightly"]["outcome"], fired["nightly"]["missed_runs"]), ("queued", 3))
+        self.assertEqual(fired["hourly-embeddings"]["outcome"], "missed")
+        self.assertEqual(self._queued(), 1)
+
+        state = self.conn.execute(
+            text("SELECT next_slot_at, next_run_at, missed_runs FROM watchdog_schedules WHERE name = 'nightly'")
+        ).mappings().one()
+        self.assertEqual(str(state["next_slot_at"]), "2026-03-06 02:00:00")
+        self.assertGreaterEqual(str(state["next_run_at"]), str(state["next_slot_at"]))
+        self.assertEqual(state["missed_runs"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import sys
+import threading
+import unittest
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.db.queue_utils import utcnow  # noqa: E402
+from app.domain import watchdog  # noqa: E402
+from app.domain.watchdog_worker import serve  # noqa: E402
+from benchmarks.synthetic_org import SyntheticOrg, populate  # noqa: E402
+from tests.support import MigratedDatabaseTestCase  # noqa: E402
+
+
+class _WatchdogDatabaseTestCase(MigratedDatabaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        with self.engine.begin() as conn:
+            populate(conn, SyntheticOrg(users=8, projects=3, reports_per_user=1))
+        self.start_patches(
+            mock.patch.object(
+                watchdog, "_ensure_actions", return_value=(0, {"mode": "serial", "projects": 0, "wall_ms": 0.0})
+            )
+        )
+
+    def _jobs(self) -> list[dict]:
+        with self.engine.connect() as conn:
+            return [
+                dict(row)
+                for row in conn.execute(
+                    text("SELECT job_id, status, worker_id, attempts FROM watchdog_jobs ORDER BY job_id")
+                ).mappings()
+            ]
+
+
+class WatchdogWorkerTests(_WatchdogDatabaseTestCase):
+    def test_enqueue_returns_its_own_id(self) -> None:
+        with self.engine.begin() as conn:
+            ids = [watchdog.enqueue_watchdog_job(conn)["job_id"] for _ in range(3)]
+        self.assertEqual(ids, [str(job["job_id"]) for job in self._jobs()])
+
+    def test_pool_runs_every_job_exactly_once(self) -> None:
+        with self.engine.begin() as conn:
+            for _ in range(4):
+                watchdog.enqueue_watchdog_job(conn)
+
+        workers = serve(
+            self.engine, concurrency=3, stop_event=threading.Event(), poll_seconds=0.1, exit_when_idle=True
+        )
+
+        jobs = self._jobs()
+        self.assertEqual({job["status"] for job in jobs}, {"succeeded"})
+        self.assertEqual({job["attempts"] for job in jobs}, {1})
+        self.assertEqual(sum(worker.stats.succeeded for worker in workers), 4)
+
+    def test_expired_lease_is_reclaimed_and_stale_worker_is_fenced(self) -> None:
+        with self.engine.begin() as conn:
+            job_id = int(watchdog.enqueue_watchdog_job(conn)["job_id"])
+            first = watchdog.claim_watchdog_job(conn, "crashed")
+            self.assertIsNone(watchdog.claim_watchdog_job(conn, "other"))
+            conn.execute(
+                text("UPDATE watchdog_jobs SET lease_expires_at = :past WHERE job_id = :job_id"),
+                {"past": utcnow() - timedelta(seconds=1), "job_id": job_id},
+            )
+            second = watchdog.claim_watchdog_job(conn, "rescuer")
+            self.assertFalse(watchdog.heartbeat_watchdog_job(conn, job_id, "crashed"))
+            self.assertFalse(watchdog.finish_watchdog_job(conn, job_id, "crashed", "succeeded", {}))
+
+        self.assertEqual((first["job_id"], second["job_id"]), (job_id, job_id))
+        self.assertEqual(second["attempts"], 2)
+        self.assertEqual(self._jobs()[0]["worker_id"], "rescuer")
+
+    def test_failure_is_recorded_outside_the_rolled_back_cycle(self) -> None:
+        with self.engine.begin() as conn:
+            watchdog.enqueue_watchdog_job(conn, payload={"full": True})
+        with mock.patch.object(watchdog, "_refresh_analysis", side_effect=RuntimeError("boom")):
+            workers = serve(self.engine, concurrency=1, poll_seconds=0.1, exit_when_idle=True)
+
+        self.assertEqual(workers[0].stats.failed, 1)
+        self.assertEqual(self._jobs()[0]["status"], "failed")
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM user_motivation_history")).scalar(), 0)
+
+
+class ShardedWatchdogTests(_WatchdogDatabaseTestCase):
+    def _parent(self, job_id: str) -> tuple[str, dict]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text("SELECT status, payload FROM watchdog_jobs WHERE job_id = :job_id"), {"job_id": int(job_id)}
+            ).one()
+        return row[0], json.loads(row[1])
+
+    def test_shards_cover_every_project_once_and_close_the_parent(self) -> None:
+        with self.engine.begin() as conn:
+            job = watchdog.enqueue_watchdog_job(conn, payload={"shards": 3})
+        self.assertEqual(job["status"], "sharded")
+        self.assertEqual(len(job["shard_job_ids"]), 3)
+
+        serve(self.engine, concurrency=2, poll_seconds=0.1, exit_when_idle=True)
+
+        status, payload = self._parent(job["job_id"])
+        self.assertEqual(status, "succeeded")
+        self.assertEqual(payload["shards"]["failed"], 0)
+        with self.engine.connect() as conn:
+            snapshots = conn.execute(text("SELECT COUNT(*) FROM project_health_snapshots")).scalar()
+            scored = conn.execute(text("SELECT COUNT(DISTINCT user_id) FROM user_motivation_history")).scalar()
+        self.assertEqual((snapshots, scored), (3, 8))
+
+        with self.engine.begin() as conn:
+            again = watchdog.enqueue_watchdog_job(conn, payload={"shards": 3})
+        serve(self.engine, concurrency=1, poll_seconds=0.1, exit_when_idle=True)
+        self.assertEqual(self._parent(again["job_id"])[0], "succeeded")
+        with self.engine.connect() as conn:
+            scopes = [
+                json.loads(payload)["scope"]
+                for payload in conn.execute(
+                    text("SELECT payload FROM watchdog_jobs WHERE parent_job_id = :job_id"),
+                    {"job_id": int(again["job_id"])},
+                ).scalars()
+            ]
+        self.assertEqual({scope["mode"] for scope in scopes}, {"incremental"})
+
+    def test_failed_shard_fails_the_parent_without_undoing_siblings(self) -> None:
+        with self.engine.begin() as conn:
+            job = watchdog.enqueue_watchdog_job(conn, payload={"partitions": [["SYN-P00000"], ["SYN-P00001"]]})
+        original = watchdog._refresh_analysis
+
+        def flaky(conn, assignments, report_by_user):
+            if any(row["project_id"] == "SYN-P00001" for row in assignments):
+                raise RuntimeError("boom")
+            return original(conn, assignments, report_by_user)
+
+        with mock.patch.object(watchdog, "_refresh_analysis", side_effect=flaky):
+            serve(self.engine, concurrency=1, poll_seconds=0.1, exit_when_idle=True)
+
+        status, payload = self._parent(job["job_id"])
+        self.assertEqual(status, "failed")
+        self.assertEqual(len(payload["shards"]["failed_job_ids"]), 1)
+        with self.engine.connect() as conn:
+            snapshots = conn.execute(text("SELECT project_id FROM project_health_snapshots")).scalars().all()
+        self.assertEqual(snapshots, ["SYN-P00000"])
+
+
+if __name__ == "__main__":
+    unittest.main()
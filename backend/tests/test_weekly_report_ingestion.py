@@ -0,0 +1,89 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.domain import input_sources  # noqa: E402
+from tests.support import MigratedDatabaseTestCase  # noqa: E402
+
+
+def _report(user_id: str, week: int, content: str = "steady progress") -> dict:
+    return {
+        "user_id": user_id,
+        "project_id": "P1",
+        "reporting_date": f"2026-01-{week:02d}",
+        "content_text": content,
+        "reported_at": f"2026-01-{week:02d}T09:00:00+00:00",
+    }
+
+
+class WeeklyReportIngestionTests(MigratedDatabaseTestCase):
+    def _rows(self) -> list[tuple]:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text(
+                    "SELECT user_id, reporting_date, content_text, content_vector IS NOT NULL "
+                    "FROM weekly_reports ORDER BY report_id"
+                )
+            ).all()
+
+    def test_array_source_is_deduplicated_within_and_across_batches(self) -> None:
+        source = self.dir / "reports.json"
+        records = [_report("U1", 5), _report("U2", 5), _report("U1", 5, "again"), {"user_id": "U3"}, _report("U1", 12)]
+        source.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        with self.engine.begin() as conn:
+            first = input_sources.ingest_weekly_reports(conn, source, batch_size=2)
+        with self.engine.begin() as conn:
+            second = input_sources.ingest_weekly_reports(conn, source, batch_size=2)
+
+        self.assertEqual((first.status, first.items_inserted, second.items_inserted), ("succeeded", 3, 0))
+        self.assertEqual(
+            {key: first.metadata[key] for key in ("records_read", "skipped", "duplicates", "batches")},
+            {"records_read": 5, "skipped": 1, "duplicates": 1, "batches": 2},
+        )
+        self.assertEqual(
+            self._rows(),
+            [
+                ("U1", "2026-01-05", "steady progress", 1),
+                ("U2", "2026-01-05", "steady progress", 1),
+                ("U1", "2026-01-12", "steady progress", 1),
+            ],
+        )
+
+    def test_chunked_run_commits_batches_and_records_progress(self) -> None:
+        source = self.dir / "reports.jsonl"
+        lines = [json.dumps(_report(f"U{index}", 5)) for index in range(5)]
+        source.write_text("\n".join(lines) + "\n{not json\n", encoding="utf-8")
+
+        result = input_sources.ingest_weekly_reports_chunked(self.engine, source, batch_size=2)
+
+        self.assertEqual(result.status, "failed")
+        self.assertEqual((result.items_inserted, result.metadata["batches"]), (4, 2))
+        self.assertEqual(len(self._rows()), 4, "batches committed before the bad line are kept")
+        with self.engine.connect() as conn:
+            runs = input_sources.fetch_ingestion_runs(conn)
+        self.assertEqual([(run.run_id, run.status, run.items_inserted) for run in runs], [(result.run_id, "failed", 4)])
+
+        source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        rerun = input_sources.ingest_weekly_reports_chunked(self.engine, source, batch_size=2)
+        self.assertEqual((rerun.status, rerun.items_inserted, rerun.metadata["duplicates"]), ("succeeded", 1, 4))
+
+    def test_pretty_printed_object_is_rejected_with_a_clear_error(self) -> None:
+        source = self.dir / "report.json"
+        source.write_text(json.dumps(_report("U1", 5), indent=2), encoding="utf-8")
+
+        with self.engine.begin() as conn:
+            result = input_sources.ingest_weekly_reports(conn, source)
+
+        self.assertEqual((result.status, result.items_inserted), ("failed", 0))
+        self.assertIn("must be a JSON array or JSON Lines; line 1", result.error)
+
+
+if __name__ == "__main__":
+    unittest.main()